@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Scaling benchmark for the workbook generators.
+
+Runs create_lead_tracker_v3.py and mis_system_v7.py as child processes over
+synthetic datasets of growing size and records, per run:
+
+  - wall time
+  - peak RSS of the child (os.wait4 resource usage, no extra dependencies)
+  - output .xlsx size
+  - per-sheet build times (the generators' --timings JSON)
+  - tracemalloc peak, with --tracemalloc (runs the children with
+    PYTHONTRACEMALLOC=1, which makes them several times slower)
+
+The report is written as JSON (for diffing across commits) and Markdown.
+
+Usage:
+  python benchmark_generators.py                              # 1k, 10k, 100k, 500k rows
+  python benchmark_generators.py --sizes 1000,10000 --generators mis
+  python benchmark_generators.py --compare old_report.json    # changes vs an earlier run
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import openpyxl
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# name -> (script, extra arguments, argument that sets the row count)
+GENERATORS = {
+    "tracker-stream": ("create_lead_tracker_v3.py", ["--stream"], "--history"),
+    "tracker": ("create_lead_tracker_v3.py", [], "--history"),
+    "mis": ("mis_system_v7.py", [], "--rows"),
+}
+DEFAULT_GENERATORS = "tracker-stream,mis"
+DEFAULT_SIZES = "1000,10000,100000,500000"
+
+
+def git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE,
+                             capture_output=True, text=True, timeout=30)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_generator(name, rows, work_dir, timeout=None, trace=False, seed=0):
+    """Run one generator in a child process; returns the result record."""
+    script, extra, rows_flag = GENERATORS[name]
+    output = os.path.join(work_dir, f"{name}_{rows}.xlsx")
+    timings = os.path.join(work_dir, f"{name}_{rows}.json")
+    log = os.path.join(work_dir, f"{name}_{rows}.log")
+    cmd = [sys.executable, os.path.join(HERE, script), *extra,
+           rows_flag, str(rows), "--seed", str(seed), "--output", output, "--timings", timings]
+    env = dict(os.environ)
+    if trace:
+        env["PYTHONTRACEMALLOC"] = "1"
+
+    result = {"generator": name, "rows": rows, "command": " ".join(cmd[1:])}
+    started = time.perf_counter()
+    with open(log, "w") as log_fh:
+        proc = subprocess.Popen(cmd, cwd=HERE, env=env, stdout=log_fh, stderr=subprocess.STDOUT)
+        timed_out = threading.Event()
+        watchdog = None
+        if timeout:
+            def kill():
+                timed_out.set()
+                proc.kill()
+            watchdog = threading.Timer(timeout, kill)
+            watchdog.start()
+        # wait4 reaps the child and returns its own resource usage
+        _, status, usage = os.wait4(proc.pid, 0)
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        if watchdog is not None:
+            watchdog.cancel()
+    result["wall_seconds"] = round(time.perf_counter() - started, 3)
+    result["max_rss_kb"] = usage.ru_maxrss       # kilobytes on Linux
+
+    if timed_out.is_set():
+        result["status"] = f"timeout after {timeout}s"
+    elif proc.returncode != 0:
+        with open(log) as fh:
+            tail = fh.read().strip().splitlines()[-1:] or [""]
+        result["status"] = f"failed (exit {proc.returncode}): {tail[0]}"
+    else:
+        result["status"] = "ok"
+        result["xlsx_bytes"] = os.path.getsize(output)
+        with open(timings) as fh:
+            result.update(json.load(fh))
+    for path in (output, timings):
+        if os.path.exists(path):
+            os.remove(path)
+    return result
+
+
+# ── Report ───────────────────────────────────────────────────────────────────
+def _mb(kb_or_bytes, unit_kb=False):
+    if kb_or_bytes is None:
+        return "-"
+    value = kb_or_bytes / 1024 if unit_kb else kb_or_bytes / (1024 * 1024)
+    return f"{value:,.1f}"
+
+
+def _change(new, old):
+    if not old or new is None:
+        return "-"
+    return f"{(new - old) / old:+.0%}"
+
+
+def markdown_report(report, baseline=None):
+    previous = {}
+    if baseline:
+        previous = {(r["generator"], r["rows"]): r for r in baseline["runs"]}
+
+    lines = [
+        "# Generator scaling benchmark",
+        "",
+        f"- Date: {report['created']}",
+        f"- Commit: {report['commit'] or 'unknown'}",
+        f"- Python {report['python']}, openpyxl {report['openpyxl']}, {report['platform']}",
+        f"- Synthetic data seed: {report.get('seed', 0)}",
+    ]
+    if baseline:
+        lines.append(f"- Compared with: commit {baseline.get('commit') or 'unknown'} ({baseline['created']})")
+    lines += ["", "| Generator | Rows | Status | Wall (s) | Peak RSS (MB) | tracemalloc peak (MB) | .xlsx (MB) |"
+              + (" Wall change | RSS change |" if baseline else ""),
+              "|---|---:|---|---:|---:|---:|---:|" + ("---:|---:|" if baseline else "")]
+    for run in report["runs"]:
+        row = (f"| {run['generator']} | {run['rows']:,} | {run['status']} | {run['wall_seconds']:,.2f} "
+               f"| {_mb(run['max_rss_kb'], unit_kb=True)} | {_mb(run.get('tracemalloc_peak_bytes'))} "
+               f"| {_mb(run.get('xlsx_bytes'))} |")
+        if baseline:
+            old = previous.get((run["generator"], run["rows"]), {})
+            row += (f" {_change(run['wall_seconds'], old.get('wall_seconds'))} "
+                    f"| {_change(run['max_rss_kb'], old.get('max_rss_kb'))} |")
+        lines.append(row)
+
+    for run in report["runs"]:
+        if not run.get("sections"):
+            continue
+        lines += ["", f"## {run['generator']}, {run['rows']:,} rows", "",
+                  "| Section | Seconds |", "|---|---:|"]
+        for section in run["sections"]:
+            lines.append(f"| {section['name']} | {section['seconds']:,.3f} |")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the workbook generators at growing sizes")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES,
+                        help=f"Comma-separated row counts (default {DEFAULT_SIZES})")
+    parser.add_argument("--generators", default=DEFAULT_GENERATORS,
+                        help=f"Comma-separated, from: {', '.join(GENERATORS)} (default {DEFAULT_GENERATORS})")
+    parser.add_argument("--json", default="benchmark_report.json", help="JSON report path")
+    parser.add_argument("--markdown", default="benchmark_report.md", help="Markdown report path")
+    parser.add_argument("--compare", metavar="JSON", help="Earlier JSON report to compare against")
+    parser.add_argument("--timeout", type=float, default=None, metavar="SECONDS",
+                        help="Kill a run that takes longer than this")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Seed of the generators' synthetic data (default 0)")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="Also record the tracemalloc peak (much slower runs)")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    names = [g.strip() for g in args.generators.split(",") if g.strip()]
+    unknown = [g for g in names if g not in GENERATORS]
+    if unknown:
+        parser.error(f"unknown generator(s): {', '.join(unknown)}")
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "openpyxl": openpyxl.__version__,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "tracemalloc": args.tracemalloc,
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory(prefix="xlsx_bench_") as work_dir:
+        for name in names:
+            for rows in sizes:
+                print(f"{name:<15} {rows:>9,} rows ... ", end="", flush=True)
+                run = run_generator(name, rows, work_dir, timeout=args.timeout, trace=args.tracemalloc,
+                                    seed=args.seed)
+                report["runs"].append(run)
+                print(f"{run['status']}, {run['wall_seconds']:.1f}s, "
+                      f"{_mb(run['max_rss_kb'], unit_kb=True)} MB RSS")
+
+    with open(args.json, "w") as fh:
+        json.dump(report, fh, indent=2)
+    with open(args.markdown, "w") as fh:
+        fh.write(markdown_report(report, baseline))
+    print(f"Report: {args.json}, {args.markdown}")
+
+
+if __name__ == "__main__":
+    main()
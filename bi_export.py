@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Columnar export of the Lead Tracker leads and the MIS transactional sheets
+for pandas / BI tools, so analysts load typed columns instead of re-parsing
+the styled .xlsx.
+
+One file per table in the output directory:
+
+  leads                  Lead Tracker columns (auto columns computed, as in
+                         lead_loader), plus Duplicate Of
+  income, expenses, salaries, contractor_payments, stock_purchases,
+  machines, machine_maintenance, stock_transactions, gst_invoices
+                         MIS sheet columns in sheet order (mis_schema.MIS_HEADERS),
+                         whether read from the workbook or the store; the
+                         formula columns (GST Amount, Total Amount, TDS ...)
+                         are computed from the row the same way as the sheet
+
+Format: <table>.parquet when pyarrow is installed, otherwise <table>.csv plus
+<table>.schema.json describing the column types.  Column types:
+
+  string          text
+  category        dropdown values (dictionary-encoded in Parquet)
+  int64 / float64 counts, SQFT, rates (GST % is a fraction: 0.18)
+  decimal(14,2)   amounts in ₹, exact (CSV: two decimals)
+  timestamp[ms]   dates and times (CSV: YYYY-MM-DD HH:MM:SS)
+
+Rows are written in batches of BATCH_ROWS (one Parquet row group / one CSV
+write per batch), so any source streams through in constant memory.
+read_frame() loads an export into pandas with those dtypes; read_records()
+reads a CSV export back as typed dicts without pandas.
+
+Usage:
+  python create_lead_tracker_v3.py --history 100000 --export exports/
+  python mis_system_v7.py --rows 100000 --export exports/
+  python bi_export.py --tracker Home_Services_Lead_Tracker.xlsx --output exports/
+  python bi_export.py --leads-db leads.db --mis-db mis.db --output exports/ --format csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from decimal import ROUND_HALF_UP, Decimal
+
+from data_store import BATCH_ROWS, DataStore
+from lead_loader import SCHEMA, parse_number, to_datetime, to_decimal, to_text, typed_record
+from lead_tracker_schema import LEAD_SCHEMA
+from mis_schema import MIS_HEADERS, MIS_TABLES, is_date_column
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:        # CSV + schema JSON instead
+    pa = pq = None
+
+FORMATS = ("parquet", "csv")
+DEFAULT_FORMAT = "parquet" if pa is not None else "csv"
+CENT = Decimal("0.01")
+DECIMAL = "decimal(14,2)"
+TIMESTAMP = "timestamp[ms]"
+CSV_TIME = "%Y-%m-%d %H:%M:%S"
+
+# ── Column types ─────────────────────────────────────────────────────────────
+LEAD_TYPES = {"text": "string", "phone": "string", "email": "string", "id": "string", "list": "category",
+              "number": "float64", "serial": "int64", "currency": DECIMAL,
+              "date": TIMESTAMP, "datetime": TIMESTAMP}
+LEAD_COLUMNS = [(c.header, c.key, LEAD_TYPES[c.kind]) for c in LEAD_SCHEMA.columns]
+LEAD_COLUMNS.append((SCHEMA.by_key["duplicate_of"].header, "duplicate_of", "string"))
+LEAD_AMOUNTS = [key for _, key, kind in LEAD_COLUMNS if kind == DECIMAL]
+
+MIS_CATEGORIES = {"Service Type", "Project Type", "Payment Mode", "Payment Status", "Category", "Item Type",
+                  "Unit", "Month", "Designation", "Department", "TDS Deposited", "GST Payment Status",
+                  "Transaction Type", "Current Status", "Maintenance Type", "Service Status"}
+
+
+def mis_type(header):
+    if is_date_column(header):
+        return TIMESTAMP
+    if "(₹)" in header:
+        return DECIMAL
+    if "%" in header or header == "Quantity":
+        return "float64"
+    return "category" if header in MIS_CATEGORIES else "string"
+
+
+def _quantize(value):
+    value = to_decimal(value)
+    return value.quantize(CENT, rounding=ROUND_HALF_UP) if value is not None else None
+
+
+def _float(value):
+    value = parse_number(value)
+    return float(value) if value is not None else None
+
+
+def _int(value):
+    value = parse_number(value)
+    return int(value) if value is not None else None
+
+
+CONVERT = {"string": to_text, "category": to_text, "int64": _int, "float64": _float,
+           DECIMAL: _quantize, TIMESTAMP: to_datetime}
+
+
+# ── MIS formula columns, as the sheets compute them ──────────────────────────
+def _d(row, header):
+    value = row.get(header)
+    return value if isinstance(value, Decimal) else Decimal(0)
+
+
+def _rate(row, header):
+    value = row.get(header)
+    return Decimal(repr(value)) if isinstance(value, float) else Decimal(value or 0)
+
+
+def _income(row):
+    row["Discount Amount (₹)"] = _d(row, "Base Amount (₹)") * _rate(row, "Discount %")
+    row["Amount After Discount (₹)"] = _d(row, "Base Amount (₹)") - row["Discount Amount (₹)"]
+    row["GST Amount (₹)"] = row["Amount After Discount (₹)"] * _rate(row, "GST %")
+    row["Total Amount (₹)"] = row["Amount After Discount (₹)"] + row["GST Amount (₹)"]
+
+
+def _with_gst(base, total="Total Amount (₹)"):
+    def derive(row):
+        row["GST Amount (₹)"] = _d(row, base) * _rate(row, "GST %")
+        row[total] = _d(row, base) + row["GST Amount (₹)"]
+    return derive
+
+
+def _contractor(row):
+    row["TDS Amount (₹)"] = _d(row, "Gross Amount (₹)") * _rate(row, "TDS % (Sec 194C)")
+    row["Net Payable (₹)"] = _d(row, "Gross Amount (₹)") - row["TDS Amount (₹)"]
+
+
+def _salary(row):
+    row["Gross Salary (₹)"] = sum(_d(row, h) for h in ("Basic Salary (₹)", "HRA (₹)", "Other Allowances (₹)"))
+    row["Total Deductions (₹)"] = sum(_d(row, h) for h in ("PF Deduction (₹)", "ESI Deduction (₹)",
+                                                           "Other Deductions (₹)"))
+    row["Net Salary (₹)"] = row["Gross Salary (₹)"] - row["Total Deductions (₹)"]
+
+
+def _stock_purchase(row):
+    row["Base Amount (₹)"] = Decimal(repr(_float(row.get("Quantity")) or 0)) * _d(row, "Rate (₹)")
+    _with_gst("Base Amount (₹)")(row)
+
+
+def _stock_transaction(row):
+    row["Base Amount (₹)"] = Decimal(repr(_float(row.get("Quantity")) or 0)) * _d(row, "Unit Rate (₹)")
+    row["GST Amount (₹)"] = row["Base Amount (₹)"] * _rate(row, "GST %")
+    row["Total Cost (₹)"] = row["Base Amount (₹)"] + row["GST Amount (₹)"]
+
+
+DERIVED = {
+    "income": (("Discount Amount (₹)", "Amount After Discount (₹)", "GST Amount (₹)", "Total Amount (₹)"),
+               _income),
+    "expenses": (("GST Amount (₹)", "Total Amount (₹)"), _with_gst("Base Amount (₹)")),
+    "salaries": (("Gross Salary (₹)", "Total Deductions (₹)", "Net Salary (₹)"), _salary),
+    "contractor_payments": (("TDS Amount (₹)", "Net Payable (₹)"), _contractor),
+    "stock_purchases": (("Base Amount (₹)", "GST Amount (₹)", "Total Amount (₹)"), _stock_purchase),
+    "machines": (("GST Amount (₹)", "Total Cost (₹)"), _with_gst("Base Cost (₹)", "Total Cost (₹)")),
+    "machine_maintenance": (("GST Amount (₹)", "Total Cost (₹)"), _with_gst("Base Cost (₹)", "Total Cost (₹)")),
+    "stock_transactions": (("Base Amount (₹)", "GST Amount (₹)", "Total Cost (₹)"), _stock_transaction),
+    "gst_invoices": (("GST Amount (₹)", "Total Amount (₹)"), _with_gst("Base Amount (₹)")),
+}
+
+
+# ── Writers ──────────────────────────────────────────────────────────────────
+def _batches(records, size=BATCH_ROWS):
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _arrow_type(kind):
+    return {"string": pa.string(), "category": pa.dictionary(pa.int32(), pa.string()), "int64": pa.int64(),
+            "float64": pa.float64(), DECIMAL: pa.decimal128(14, 2), TIMESTAMP: pa.timestamp("ms")}[kind]
+
+
+class ExportResult:
+    def __init__(self, table, path, rows, seconds):
+        self.table = table
+        self.path = path
+        self.rows = rows
+        self.seconds = seconds
+
+    def summary(self):
+        return f"{self.table}: {self.rows:,} rows -> {self.path} ({self.seconds:.1f}s)"
+
+
+def export_table(directory, table, columns, rows, fmt=DEFAULT_FORMAT):
+    """
+    Write `rows` (dicts keyed by the column keys, values already typed) to
+    <directory>/<table>.parquet or .csv + .schema.json.  `columns` is a list
+    of (name, key, type).  Returns an ExportResult.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {FORMATS}, not {fmt!r}")
+    if fmt == "parquet" and pa is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow); use --format csv")
+    started = time.perf_counter()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{table}.{fmt}")
+    count = 0
+    if fmt == "parquet":
+        schema = pa.schema([pa.field(name, _arrow_type(kind)) for name, _, kind in columns])
+        with pq.ParquetWriter(path, schema) as writer:
+            for batch in _batches(rows):
+                arrays = {name: [row.get(key) for row in batch] for name, key, _ in columns}
+                writer.write_table(pa.Table.from_pydict(arrays, schema=schema))
+                count += len(batch)
+    else:
+        with open(path, "w", newline="", encoding="utf-8") as fh:
+            out = csv.writer(fh)
+            out.writerow([name for name, _, _ in columns])
+            for batch in _batches(rows):
+                out.writerows([_csv_cell(row.get(key)) for _, key, _ in columns] for row in batch)
+                count += len(batch)
+        schema = {"table": table, "rows": count, "generated": datetime.now().strftime(CSV_TIME),
+                  "csv": {"encoding": "utf-8", "header": True, "null": "", "timestamp_format": CSV_TIME},
+                  "columns": [{"name": name, "key": key, "type": kind} for name, key, kind in columns]}
+        with open(os.path.join(directory, f"{table}.schema.json"), "w", encoding="utf-8") as fh:
+            json.dump(schema, fh, ensure_ascii=False, indent=2)
+    return ExportResult(table, path, count, time.perf_counter() - started)
+
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.strftime(CSV_TIME)
+    return str(value)
+
+
+# ── Sources ──────────────────────────────────────────────────────────────────
+def export_leads(directory, records, fmt=DEFAULT_FORMAT, typed=False):
+    """
+    Export lead records.  Generator / store / import records are typed and
+    get their auto columns as on sheet row first_row + i; pass typed=True
+    for TrackerLoader records, which already are.
+    """
+    if not typed:
+        records = (typed_record(record, r) for r, record in enumerate(records, start=LEAD_SCHEMA.first_row))
+    return export_table(directory, "leads", LEAD_COLUMNS, _cents(records), fmt)
+
+
+def _cents(records):
+    for record in records:
+        for key in LEAD_AMOUNTS:
+            if key in record:
+                record[key] = record[key].quantize(CENT, rounding=ROUND_HALF_UP)
+        yield record
+
+
+def mis_columns(headers):
+    return [(header, header, mis_type(header)) for header in headers]
+
+
+def typed_mis_rows(table, headers, rows):
+    """MIS sheet records with typed values and the formula columns computed."""
+    converters = [(header, CONVERT[mis_type(header)]) for header in headers]
+    derived, derive = DERIVED.get(table, ((), None))
+    for row in rows:
+        typed = {}
+        for header, convert in converters:
+            value = row.get(header)
+            if value in (None, "") or header in derived or (isinstance(value, str) and value.startswith("=")):
+                continue
+            value = convert(value)
+            if value is not None:
+                typed[header] = value
+        if derive:
+            derive(typed)
+            for header in derived:
+                typed[header] = typed[header].quantize(CENT, rounding=ROUND_HALF_UP)
+        yield typed
+
+
+def export_mis(directory, table, headers, rows, fmt=DEFAULT_FORMAT):
+    """Export the records of one MIS transactional sheet (a mis_schema.MIS_TABLES key)."""
+    if table not in MIS_TABLES:
+        raise ValueError(f"unknown MIS table {table!r}; one of {sorted(MIS_TABLES)}")
+    return export_table(directory, table, mis_columns(headers), typed_mis_rows(table, headers, rows), fmt)
+
+
+# ── Reading back ─────────────────────────────────────────────────────────────
+def _schema(path):
+    with open(os.path.splitext(path)[0] + ".schema.json", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+READ = {"string": str, "category": str, "int64": int, "float64": float, DECIMAL: Decimal,
+        TIMESTAMP: datetime.fromisoformat}    # CSV_TIME is ISO 8601 with a space
+
+
+def read_records(path):
+    """Typed dicts (keyed by column name) of a CSV export, using its schema JSON."""
+    columns = [(c["name"], READ[c["type"]]) for c in _schema(path)["columns"]]
+    with open(path, newline="", encoding="utf-8") as fh:
+        rows = csv.reader(fh)
+        next(rows, None)
+        for row in rows:
+            yield {name: convert(text) if text else None for (name, convert), text in zip(columns, row)}
+
+
+def read_frame(path):
+    """A pandas DataFrame of an export with its column types (amounts as float64 from CSV)."""
+    import pandas as pd
+
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    columns = _schema(path)["columns"]
+    dtypes = {"string": "string", "category": "category", "int64": "Int64", "float64": "float64",
+              DECIMAL: "float64"}
+    return pd.read_csv(path, keep_default_na=False, na_values=[""],
+                       dtype={c["name"]: dtypes[c["type"]] for c in columns if c["type"] in dtypes},
+                       parse_dates=[c["name"] for c in columns if c["type"] == TIMESTAMP])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export leads and MIS ledgers to columnar files.")
+    parser.add_argument("--output", required=True, metavar="DIR", help="Directory for the exported files")
+    parser.add_argument("--format", choices=FORMATS, default=DEFAULT_FORMAT,
+                        help=f"parquet (needs pyarrow) or csv + schema JSON (default {DEFAULT_FORMAT})")
+    parser.add_argument("--tracker", metavar="XLSX", help="Filled-in Lead Tracker to export (lead_loader)")
+    parser.add_argument("--leads-db", metavar="FILE", help="SQLite store with the leads (data_store)")
+    parser.add_argument("--mis-db", metavar="FILE", help="SQLite store with the MIS sheets (data_store)")
+    args = parser.parse_args()
+    if not (args.tracker or args.leads_db or args.mis_db):
+        parser.error("nothing to export: give --tracker, --leads-db and/or --mis-db")
+    if args.format == "parquet" and pa is None:
+        parser.error("--format parquet needs pyarrow (pip install pyarrow); use --format csv")
+
+    results = []
+    if args.tracker:
+        from lead_loader import TrackerLoader
+        loader = TrackerLoader(args.tracker)
+        results.append(export_leads(args.output, loader.records(), args.format, typed=True))
+        print(f"Tracker ({args.tracker}): {loader.summary()}")
+    if args.leads_db:
+        with DataStore(args.leads_db) as store:
+            results.append(export_leads(args.output, store.leads(), args.format))
+    if args.mis_db:
+        with DataStore(args.mis_db) as store:
+            for table in MIS_TABLES:
+                if store.table_columns(table):
+                    # The store keeps the input columns; the sheet's column order and formula columns
+                    # come from MIS_HEADERS, as in the generator's export
+                    results.append(export_mis(args.output, table, MIS_HEADERS[table], store.rows(table),
+                                              args.format))
+    for result in results:
+        print(result.summary())
+
+
+if __name__ == "__main__":
+    main()
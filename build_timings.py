@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Per-sheet build timings for the workbook generators (--timings FILE).
+
+The generators are top-to-bottom scripts, so timing is done with marks:
+TIMINGS.mark("Income Tracker") at the end of a sheet's section records the
+time since the previous mark.  write() dumps the sections, the total and -
+when the interpreter runs with tracemalloc on (python -X tracemalloc or
+PYTHONTRACEMALLOC=1) - the traced peak, as JSON for benchmark_generators.py.
+"""
+
+import json
+import time
+import tracemalloc
+
+
+class BuildTimings:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._last = self.started
+        self.sections = []    # (name, seconds) in build order
+
+    def mark(self, name):
+        now = time.perf_counter()
+        self.sections.append((name, now - self._last))
+        self._last = now
+
+    def as_dict(self):
+        result = {
+            "sections": [{"name": name, "seconds": round(seconds, 4)} for name, seconds in self.sections],
+            "total_seconds": round(time.perf_counter() - self.started, 4),
+        }
+        if tracemalloc.is_tracing():
+            result["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        return result
+
+    def write(self, path):
+        with open(path, "w") as fh:
+            json.dump(self.as_dict(), fh, indent=2)
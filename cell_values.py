@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Cell value coercion shared by the report engines (mis_pnl, mis_gst,
+mis_inventory, mis_tds, lead_metrics), following the spreadsheet rules their
+formulas use:
+
+  to_number(value)  the value if it is a number (int, float or Decimal), else 0 -
+                    blanks and text count as 0, as in SUM / SUMIFS
+  to_day(value)     the date of a date or datetime (INT of a timestamp), else None
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+
+def to_number(value):
+    if isinstance(value, bool) or not isinstance(value, (int, float, Decimal)):
+        return 0
+    return value
+
+
+def to_day(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return None
@@ -16,9 +16,30 @@ Column Layout (Original):
   AJ=Advance Amount, AK=Advance Status, AL=Pending Balance (auto),
   AM=Payment Value, AN=Payment Status, AO=Payment Mode, AP=Refund Amount,
   AQ=Invoice Number (auto), AR=Transaction Ref. No.
+
+Usage:
+  python create_lead_tracker_v3.py                            # 5 sample leads
+  python create_lead_tracker_v3.py --stream --history 100000  # large archive, flat memory
+  python create_lead_tracker_v3.py --history 5000 --seed 7    # another reproducible history
+  python create_lead_tracker_v3.py --history 5000 --history-end 2026-07-01  # the year to June 2026
+  python create_lead_tracker_v3.py --stream --import responses.csv  # Google Form responses (CSV/XLSX)
+  python create_lead_tracker_v3.py --import responses.csv --dedup merge  # one row per customer
+  python create_lead_tracker_v3.py --history 100000 --to-db leads.db     # also keep the leads in SQLite
+  python create_lead_tracker_v3.py --stream --from-db leads.db --days 90 # last 90 days from the store
+  python create_lead_tracker_v3.py --history 100000 --export exports/    # leads.parquet for BI tools
+  python create_lead_tracker_v3.py --column-defaults --entry-rows 20000  # a year of blank rows
+  python create_lead_tracker_v3.py --day-helper               # hidden Lead Day column (AS)
+  python create_lead_tracker_v3.py --order-lines              # one row per order service
+  python create_lead_tracker_v3.py --capacity 5000            # dashboard ranges sized to 5,000 leads
+  python create_lead_tracker_v3.py --stream --history 100000 --snapshot  # static dashboard values
+  python create_lead_tracker_v3.py --timings timings.json     # per-sheet build times as JSON
+  python create_lead_tracker_v3.py --stream --history 100000 --append-ready  # fast lead_append.py appends
 """
 
+import argparse
 import os
+from copy import copy
+from functools import lru_cache
 from datetime import datetime, timedelta
 from openpyxl import Workbook
 from openpyxl.styles import (
@@ -28,6 +49,24 @@ from openpyxl.utils import get_column_letter
 from openpyxl.chart import BarChart, PieChart, Reference
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.formatting.rule import CellIsRule, FormulaRule
+from openpyxl.workbook.defined_name import DefinedName
+
+from build_timings import BuildTimings
+from lead_tracker_schema import (
+    lead_schema, SERVICES, SOURCES, AREAS, SERVICE_SLOTS,
+    CITY_LIST, BHK_LIST, SERVICE_LIST, SLOT_LIST, SOURCE_LIST,
+    CURRENCY_FMT, DATE_FMT, DATETIME_FMT, SQFT_FMT, SERIAL_FMT,
+)
+from bi_export import DEFAULT_FORMAT, FORMATS, export_leads
+from data_store import DataStore, date_window
+from lead_append import ORDER_LINES_END, append_leads
+from lead_dedup import LeadIndex
+from lead_import import FormImport
+from lead_metrics import compute_dashboard
+from synthetic_data import SyntheticData
+from xlsx_formulas import FormulaLog, Aggregate, Ref, cond_sum, cond_count, eq, any_of, not_blank, cmp
+from xlsx_stream import stream_copy_sheet, styled_cell
+from xlsx_styles import StyleRegistry
 
 # ── Color Constants ──────────────────────────────────────────────────────────
 DARK_BLUE = "1B2A4A"
@@ -64,109 +103,99 @@ medium_blue_border = Border(
     bottom=Side(style="medium", color=MEDIUM_BLUE),
 )
 
+@lru_cache(maxsize=None)
 def make_fill(color):
     return PatternFill(start_color=color, end_color=color, fill_type="solid")
 
 def apply_cell(cell, font=None, fill=None, alignment=None, border=None, number_format=None):
-    if font:
-        cell.font = font
-    if fill:
-        cell.fill = fill
-    if alignment:
-        cell.alignment = alignment
-    if border:
-        cell.border = border
-    if number_format:
-        cell.number_format = number_format
-
-# ── Dropdown lists ───────────────────────────────────────────────────────────
-CITY_LIST = "Bangalore,Mumbai,Delhi,Hyderabad,Chennai,Pune,Other"
-BHK_LIST = "1BHK,2BHK,3BHK,4BHK,4+BHK,Not Applicable"
-SERVICE_LIST = ("Bathroom Cleaning,Kitchen Cleaning,Full Home Cleaning,"
-                "Rental Property Cleaning,Ready to Move In Cleaning,"
-                "Painting,Pest Control,Plumbing,Electrician,Other")
-SERVICES = [s.strip() for s in SERVICE_LIST.split(",")]
-SLOT_LIST = "Morning 8-10,Morning 10-12,Afternoon 12-2,Afternoon 2-4,Evening 4-6,Evening 6-8"
-SOURCE_LIST = "Website,Instagram,JustDial,Google,Referral,WhatsApp,Walk-in,Other"
-SOURCES = [s.strip() for s in SOURCE_LIST.split(",")]
-STATUS_LIST = "Confirmed,Pending,Cancelled,Scheduled,Completed,Refunded"
-ADV_STATUS_LIST = "Received,NIL,Cleared"
-PAY_STATUS_LIST = "Received,Pending,Refund Completed"
-PAY_MODE_LIST = "Cash,UPI,Debit Card,Payment Gateway,Bank Transfer,Other"
-
-AREAS = [
-    "Indiranagar", "Koramangala", "HSR Layout", "Whitefield", "JP Nagar",
-    "BTM Layout", "Electronic City", "MG Road", "Marathahalli", "Banashankari", "Other"
-]
-
-# ── Column headers for Lead Tracker (A-AR = 44 columns) ────────────────────
-# ORIGINAL column order
-HEADERS = [
-    "S.No",                   # A  (1)  auto
-    "Timestamp",              # B  (2)
-    "Order ID",               # C  (3)  auto
-    "Customer Name",          # D  (4)
-    "Phone Number",           # E  (5)
-    "WhatsApp Number",        # F  (6)
-    "Alternate Phone",        # G  (7)
-    "Email",                  # H  (8)
-    "City",                   # I  (9)
-    "Area / Locality",        # J  (10)
-    "Full Address",           # K  (11)
-    "BHK",                    # L  (12)
-    "SQFT",                   # M  (13)
-    "Service 1",              # N  (14)
-    "Price 1",                # O  (15)
-    "Service 2",              # P  (16)
-    "Price 2",                # Q  (17)
-    "Service 3",              # R  (18)
-    "Price 3",                # S  (19)
-    "Service 4",              # T  (20)
-    "Price 4",                # U  (21)
-    "Total Value",            # V  (22) auto
-    "Discount Amount",        # W  (23)
-    "Discounted Total",       # X  (24) auto
-    "Preferred Date",         # Y  (25)
-    "Slot Time",              # Z  (26)
-    "Order Source",           # AA (27)
-    "Order Status",           # AB (28)
-    "Reason / Notes",         # AC (29)
-    "Vendor Name",            # AD (30)
-    "Vendor Contact",         # AE (31)
-    "Vendor Alternate No.",   # AF (32)
-    "Order Scheduled Date",   # AG (33)
-    "Scheduled Time",         # AH (34)
-    "Order Completed Date",   # AI (35)
-    "Advance Amount",         # AJ (36)
-    "Advance Status",         # AK (37)
-    "Pending Balance",        # AL (38) auto
-    "Payment Value",          # AM (39)
-    "Payment Status",         # AN (40)
-    "Payment Mode",           # AO (41)
-    "Refund Amount",          # AP (42)
-    "Invoice Number",         # AQ (43) auto
-    "Transaction Ref. No."    # AR (44)
-]
-
-COL_WIDTHS = {
-    "A": 6, "B": 18, "C": 12, "D": 20, "E": 16, "F": 16, "G": 16, "H": 22,
-    "I": 14, "J": 18, "K": 30, "L": 10, "M": 10,
-    "N": 20, "O": 12, "P": 20, "Q": 12, "R": 20, "S": 12, "T": 20, "U": 12,
-    "V": 14, "W": 14, "X": 14,
-    "Y": 16, "Z": 22, "AA": 16, "AB": 16, "AC": 25,
-    "AD": 18, "AE": 16, "AF": 18, "AG": 16, "AH": 22, "AI": 16,
-    "AJ": 14, "AK": 14, "AL": 14, "AM": 14, "AN": 14, "AO": 18, "AP": 14,
-    "AQ": 16, "AR": 18,
-}
-
-CURRENCY_FMT = '₹#,##0'
-DATE_FMT = 'DD-MMM-YYYY'
-DATETIME_FMT = 'DD-MMM-YYYY HH:MM'
+    # Sets only the attributes given; each distinct combination is interned once in STYLES
+    STYLES.update(cell, font=font, fill=fill, alignment=alignment, border=border, number_format=number_format)
+
+# ── Command line ─────────────────────────────────────────────────────────────
+OUTPUT_DIR = "/var/lib/freelancer/projects/40182876"
+
+parser = argparse.ArgumentParser(description="Generate the Home Services Lead Tracker workbook.")
+parser.add_argument("--output", default=os.path.join(OUTPUT_DIR, "Home_Services_Lead_Tracker.xlsx"),
+                    help="Path of the .xlsx file to write")
+parser.add_argument("--stream", action="store_true",
+                    help="Write the Lead Tracker rows through a write-only workbook "
+                         "(flat memory for large histories)")
+parser.add_argument("--history", type=int, default=0, metavar="N",
+                    help="Pre-load N synthetic historical leads instead of the 5 sample rows")
+parser.add_argument("--seed", type=int, default=0,
+                    help="Seed of the --history leads (same seed, same leads; default 0)")
+parser.add_argument("--history-end", type=lambda v: datetime.strptime(v, "%Y-%m-%d"), default=datetime(2026, 1, 1),
+                    metavar="YYYY-MM-DD",
+                    help="--history leads fall in the 365 days before this date (default 2026-01-01, "
+                         "fixed so a seed gives the same workbook on any day)")
+parser.add_argument("--import", dest="import_file", metavar="FILE",
+                    help="Load the leads from a Google Form responses export (.csv or .xlsx), "
+                         "read in chunks; replaces the sample / --history rows")
+parser.add_argument("--date-order", choices=["dmy", "mdy"], default="dmy",
+                    help="Day/month order of slash dates in the --import file (default dmy)")
+parser.add_argument("--to-db", metavar="FILE",
+                    help="Also save the leads written to the Lead Tracker in the SQLite store FILE")
+parser.add_argument("--from-db", metavar="FILE",
+                    help="Render the Lead Tracker from the leads in the SQLite store FILE "
+                         "(instead of the sample / --history rows), within --days/--since/--until")
+parser.add_argument("--export", metavar="DIR",
+                    help="Also export the leads to DIR as a columnar file for pandas / BI tools (bi_export)")
+parser.add_argument("--export-format", choices=FORMATS, default=DEFAULT_FORMAT,
+                    help=f"--export file format: parquet (needs pyarrow) or csv + schema JSON "
+                         f"(default here: {DEFAULT_FORMAT})")
+parser.add_argument("--days", type=int, metavar="N",
+                    help="With --from-db: leads of the last N days up to today")
+parser.add_argument("--since", type=lambda v: datetime.strptime(v, "%Y-%m-%d"), metavar="YYYY-MM-DD",
+                    help="With --from-db: leads from this date")
+parser.add_argument("--until", type=lambda v: datetime.strptime(v, "%Y-%m-%d"), metavar="YYYY-MM-DD",
+                    help="With --from-db: leads up to and including this date")
+parser.add_argument("--dedup", choices=["flag", "merge"],
+                    help="Match leads of the same customer on phone / WhatsApp / alternate number "
+                         "or email: 'flag' fills a Duplicate Of column, 'merge' keeps one row each")
+parser.add_argument("--entry-rows", type=int, default=97, metavar="N",
+                    help="Pre-formatted entry rows with auto formulas below the headers "
+                         "(default 97: rows 4-100)")
+parser.add_argument("--column-defaults", action="store_true",
+                    help="Put data fonts, borders and number formats on the columns instead "
+                         "of on every blank entry cell")
+parser.add_argument("--day-helper", action="store_true",
+                    help="Add a hidden Lead Day column (day serial of the Timestamp) for the "
+                         "Date-wise report to compare, instead of a Timestamp range")
+parser.add_argument("--order-lines", action="store_true",
+                    help="Add an Order Lines sheet (one row per order service) and drive the "
+                         "Service Breakdown from it")
+parser.add_argument("--extra-lines", type=int, default=200, metavar="N",
+                    help="Manual Order Lines rows for 5th+ services (with --order-lines, default 200)")
+parser.add_argument("--capacity", type=int, default=None, metavar="N",
+                    help="Lead rows covered by dropdowns, conditional formats, the filter and the "
+                         "LT_* named ranges used by the Dashboard (default 997: rows 4-1000; "
+                         "raised to fit --history/--entry-rows)")
+parser.add_argument("--snapshot", action="store_true",
+                    help="Add a Dashboard Snapshot sheet with every Dashboard metric precomputed "
+                         "in Python as static values")
+parser.add_argument("--formula-report", action="store_true",
+                    help="List every dashboard aggregate cell and the formula form it was given")
+parser.add_argument("--append-ready", action="store_true",
+                    help="Set the splice point lead_append.py uses for fast appends (one extra "
+                         "pass over the saved Lead Tracker sheet)")
+parser.add_argument("--timings", metavar="FILE",
+                    help="Write per-sheet build times as JSON to FILE")
+args = parser.parse_args()
+if (args.days or args.since or args.until) and not args.from_db:
+    parser.error("--days/--since/--until select leads from the store; add --from-db FILE")
+TIMINGS = BuildTimings()
+
+# ── Column layout ────────────────────────────────────────────────────────
+# Headers, widths, formats, dropdowns and auto formulas of the Lead Tracker
+# columns live in lead_tracker_schema.py; L maps field keys to column letters.
+SCHEMA = lead_schema(day_helper=args.day_helper, duplicate_flag=args.dedup == "flag")
+L = SCHEMA.letter
 
 # ═══════════════════════════════════════════════════════════════════════════
 #  WORKBOOK
 # ═══════════════════════════════════════════════════════════════════════════
 wb = Workbook()
+STYLES = StyleRegistry(wb)
 
 # ═══════════════════════════════════════════════════════════════════════════
 #  SHEET 0: HOW TO USE
@@ -203,10 +232,10 @@ instructions = [
      "Right-click the file > Open with > Google Sheets. "
      "All formulas, dropdowns, and conditional formatting will work automatically."),
     ("2. DATA ENTRY",
-     "Enter data starting from row 4. S.No (A), Order ID (C), Total Value (V), "
-     "Discounted Total (X), Pending Balance (AL) and Invoice Number (AQ) are "
+     f"Enter data starting from row 4. S.No ({L['sno']}), Order ID ({L['order_id']}), Total Value ({L['total']}), "
+     f"Discounted Total ({L['discounted_total']}), Pending Balance ({L['pending_balance']}) and Invoice Number ({L['invoice']}) are "
      "auto-calculated — do NOT type in those columns. "
-     "Timestamp (B) triggers all auto-formulas: enter the date/time of the lead."),
+     f"Timestamp ({L['timestamp']}) triggers all auto-formulas: enter the date/time of the lead."),
     ("3. ENABLE FILTERS",
      "Go to Data > Create a filter. This adds filter arrows to every column header "
      "so you can sort and filter by status, service, area, date, etc."),
@@ -215,12 +244,12 @@ instructions = [
      "RED = Cancelled / Payment Pending  |  BLUE = Scheduled  |  PURPLE tint = Completed  |  "
      "ORANGE = Refunded / Refund Completed"),
     ("5. USING THE LEAD TRACKER",
-     "Enter Timestamp (B), Customer Name (D), Phone (E), WhatsApp (F), "
-     "Email (H), City (I), Area (J), Address (K), BHK (L), SQFT (M). "
-     "Select Service 1 (N) and enter Price 1 (O). Add up to 3 more services (P-U). "
-     "Set Preferred Date (Y), Slot Time (Z), Order Source (AA), Order Status (AB). "
-     "Fill vendor details (AD-AF), scheduling (AG-AH), completion (AI), "
-     "and payment info (AJ-AR) as the order progresses."),
+     f"Enter Timestamp ({L['timestamp']}), Customer Name ({L['customer']}), Phone ({L['phone']}), WhatsApp ({L['whatsapp']}), "
+     f"Email ({L['email']}), City ({L['city']}), Area ({L['area']}), Address ({L['address']}), BHK ({L['bhk']}), SQFT ({L['sqft']}). "
+     f"Select Service 1 ({L['service1']}) and enter Price 1 ({L['price1']}). Add up to 3 more services ({L['service2']}-{L['price4']}). "
+     f"Set Preferred Date ({L['preferred_date']}), Slot Time ({L['slot']}), Order Source ({L['source']}), Order Status ({L['status']}). "
+     f"Fill vendor details ({L['vendor']}-{L['vendor_alt']}), scheduling ({L['scheduled_date']}-{L['scheduled_time']}), completion ({L['completed_date']}), "
+     f"and payment info ({L['advance']}-{L['txn_ref']}) as the order progresses."),
     ("6. CALENDAR / DATE PICKERS",
      "In Google Sheets, click any date cell (Preferred Date, Scheduled Date, Completed Date) "
      "and a calendar picker appears automatically. Dates are formatted DD-MMM-YYYY."),
@@ -229,7 +258,7 @@ instructions = [
      "service-wise breakdown, area-wise distribution, order source tracking, "
      "and a date-wise report with calendar inputs. Charts visualise the data."),
     ("8. TIPS",
-     "Columns A through D (S.No, Timestamp, Order ID, Customer Name) are frozen for easy scrolling. "
+     f"Columns {L['sno']} through {L['customer']} (S.No, Timestamp, Order ID, Customer Name) are frozen for easy scrolling. "
      "Use Order Source to track your best marketing channels. "
      "Regularly review the Dashboard for business insights. "
      "Back up your sheet weekly."),
@@ -253,14 +282,16 @@ for heading, body in instructions:
 for col_letter in ["A", "B", "C", "D", "E", "F", "G", "H"]:
     ws0.column_dimensions[col_letter].width = 18
 
+TIMINGS.mark("HOW TO USE")
+
 # ═══════════════════════════════════════════════════════════════════════════
 #  SHEET 1: LEAD TRACKER
 # ═══════════════════════════════════════════════════════════════════════════
 ws1 = wb.create_sheet("Lead Tracker")
 ws1.sheet_properties.tabColor = MEDIUM_BLUE
 
-num_cols = len(HEADERS)  # 44
-last_col_letter = get_column_letter(num_cols)  # AR
+num_cols = len(SCHEMA)  # 44
+last_col_letter = SCHEMA.last_letter  # AR
 
 # ── Row 1: Title ─────────────────────────────────────────────────────────
 ws1.merge_cells(f"A1:{last_col_letter}1")
@@ -284,16 +315,30 @@ header_fill = make_fill(MEDIUM_BLUE)
 header_al = Alignment(horizontal="center", vertical="center", wrap_text=True)
 ws1.row_dimensions[3].height = 40
 
-for idx, hdr in enumerate(HEADERS, 1):
-    cell = ws1.cell(row=3, column=idx, value=hdr)
+for col in SCHEMA.columns:
+    cell = ws1.cell(row=3, column=col.index, value=col.header)
     apply_cell(cell, font=header_font, fill=header_fill, alignment=header_al, border=thin_border)
 
 # ── Column widths ────────────────────────────────────────────────────────
-for col_letter, w in COL_WIDTHS.items():
-    ws1.column_dimensions[col_letter].width = w
+for col in SCHEMA.columns:
+    ws1.column_dimensions[col.letter].width = col.width
+    ws1.column_dimensions[col.letter].hidden = col.hidden
+
+# ── Data rows ────────────────────────────────────────────────────────────
+FIRST_DATA_ROW = SCHEMA.first_row  # 4
+# Rows covered by validations, conditional formats and the dashboard's named
+# ranges: never fewer than the rows that actually hold leads or entry formulas
+FORM_IMPORT = FormImport(args.import_file, date_order=args.date_order) if args.import_file else None
+IMPORT_ROWS = FORM_IMPORT.count() if FORM_IMPORT else 0
+LEAD_STORE = DataStore(args.from_db) if args.from_db else None
+LEAD_WINDOW = date_window(args.days, args.since, args.until)
+STORED_ROWS = LEAD_STORE.count_leads(*LEAD_WINDOW) if LEAD_STORE else 0
+TRACKER_CAPACITY = max(args.capacity or 997, args.history, IMPORT_ROWS, STORED_ROWS, args.entry_rows)
+RANGE_LAST_ROW = FIRST_DATA_ROW + TRACKER_CAPACITY - 1
+PREFORMAT_LAST_ROW = FIRST_DATA_ROW + args.entry_rows - 1
 
 # ── Data Validations ────────────────────────────────────────────────────
-def add_dropdown(ws, col_letter, formula1, start_row=4, end_row=1000):
+def add_dropdown(ws, col_letter, formula1, start_row=FIRST_DATA_ROW, end_row=RANGE_LAST_ROW):
     dv = DataValidation(type="list", formula1=f'"{formula1}"', allow_blank=True)
     dv.showDropDown = False
     dv.showErrorMessage = True
@@ -301,21 +346,10 @@ def add_dropdown(ws, col_letter, formula1, start_row=4, end_row=1000):
     dv.add(f"{col_letter}{start_row}:{col_letter}{end_row}")
     return dv
 
-# Original column dropdowns
-add_dropdown(ws1, "I", CITY_LIST)           # City
-add_dropdown(ws1, "J", ",".join(AREAS))     # Area / Locality
-add_dropdown(ws1, "L", BHK_LIST)            # BHK
-add_dropdown(ws1, "N", SERVICE_LIST)        # Service 1
-add_dropdown(ws1, "P", SERVICE_LIST)        # Service 2
-add_dropdown(ws1, "R", SERVICE_LIST)        # Service 3
-add_dropdown(ws1, "T", SERVICE_LIST)        # Service 4
-add_dropdown(ws1, "Z", SLOT_LIST)           # Slot Time
-add_dropdown(ws1, "AA", SOURCE_LIST)        # Order Source
-add_dropdown(ws1, "AB", STATUS_LIST)        # Order Status
-add_dropdown(ws1, "AH", SLOT_LIST)          # Scheduled Time
-add_dropdown(ws1, "AK", ADV_STATUS_LIST)    # Advance Status
-add_dropdown(ws1, "AN", PAY_STATUS_LIST)    # Payment Status
-add_dropdown(ws1, "AO", PAY_MODE_LIST)      # Payment Mode
+# Dropdowns of the list columns (City, Area, BHK, Services, Slot, Source, Status, ...)
+for col in SCHEMA.columns:
+    if col.choices:
+        add_dropdown(ws1, col.letter, col.choices)
 
 # No DataValidation on date fields (causes errors in Google Sheets).
 # Google Sheets shows calendar picker automatically when a cell has date format.
@@ -324,228 +358,461 @@ add_dropdown(ws1, "AO", PAY_MODE_LIST)      # Payment Mode
 data_font = Font(name="Calibri", size=10)
 data_al = Alignment(horizontal="center", vertical="center", wrap_text=True)
 left_data_al = Alignment(horizontal="left", vertical="center", wrap_text=True)
+order_id_font = Font(name="Calibri", size=10, bold=True, color=MEDIUM_BLUE)
+
+# Named styles for the data area, one per distinct column format
+STYLES.add("LT Data", font=data_font, alignment=data_al, border=thin_border)
+STYLES.add("LT Data Left", font=data_font, alignment=left_data_al, border=thin_border)
+STYLES.add("LT Currency", font=data_font, alignment=data_al, border=thin_border,
+           number_format=CURRENCY_FMT)
+STYLES.add("LT Date", font=data_font, alignment=data_al, border=thin_border,
+           number_format=DATE_FMT)
+STYLES.add("LT Timestamp", font=data_font, alignment=data_al, border=thin_border,
+           number_format=DATETIME_FMT)
+STYLES.add("LT SQFT", font=data_font, alignment=data_al, border=thin_border,
+           number_format=SQFT_FMT)
+STYLES.add("LT S.No", font=data_font, alignment=data_al, border=thin_border,
+           number_format=SERIAL_FMT)
+STYLES.add("LT Order ID", font=order_id_font, alignment=data_al, border=thin_border)
+
+
+# STYLES key per value kind; anything else is plain centred text
+KIND_STYLES = {
+    "id": "LT Order ID",
+    "currency": "LT Currency",
+    "date": "LT Date",
+    "datetime": "LT Timestamp",
+    "number": "LT SQFT",
+    "serial": "LT S.No",
+}
+
+
+def data_cell_style(col):
+    """STYLES key of a Lead Tracker data cell in schema column col."""
+    # Left-align text-heavy columns (Customer Name, Area, Full Address, Notes)
+    if col.align == "left":
+        return "LT Data Left"
+    return KIND_STYLES.get(col.kind, "LT Data")
+
+
+# Precomputed per column (index 0 = column A), so row loops never look up formats
+COL_STYLES = [data_cell_style(col) for col in SCHEMA.columns]
+
 
-# Currency columns: O, Q, S, U, V, W, X, AJ, AL, AM, AP
-currency_cols = ["O", "Q", "S", "U", "V", "W", "X", "AJ", "AL", "AM", "AP"]
-# Date columns: Y, AG, AI
-date_cols = ["Y", "AG", "AI"]
-# Timestamp column: B
-ts_col = "B"
-
-for row in range(4, 101):
-    for col_idx in range(1, num_cols + 1):
-        cell = ws1.cell(row=row, column=col_idx)
-        col_l = get_column_letter(col_idx)
-        apply_cell(cell, font=data_font, alignment=data_al, border=thin_border)
-
-        # Number formats
-        if col_l in currency_cols:
-            cell.number_format = CURRENCY_FMT
-        elif col_l in date_cols:
-            cell.number_format = DATE_FMT
-        elif col_l == ts_col:
-            cell.number_format = DATETIME_FMT
-        elif col_l == "M":
-            cell.number_format = '#,##0'
-
-        # Left-align text-heavy columns
-        # D=CustomerName, K=FullAddress, J=Area/Locality, AC=Reason/Notes
-        if col_l in ["D", "J", "K", "AC"]:
-            cell.alignment = left_data_al
-
-    # Formulas (original column references)
-    r = row
-    # A: S.No (auto: check if Timestamp in B is not blank)
-    ws1[f"A{r}"] = f'=IF(B{r}<>"",ROW()-3,"")'
-    ws1[f"A{r}"].number_format = '0'
-    # C: Order ID (auto)
-    ws1[f"C{r}"] = f'=IF(B{r}<>"","ST-"&TEXT(ROW()-3,"0000"),"")'
-    ws1[f"C{r}"].font = Font(name="Calibri", size=10, bold=True, color=MEDIUM_BLUE)
-    # V: Total Value (auto: sum of prices if Service 1 exists)
-    ws1[f"V{r}"] = f'=IF(COUNTA(N{r})>0,SUM(O{r},Q{r},S{r},U{r}),"")'
-    # X: Discounted Total (auto)
-    ws1[f"X{r}"] = f'=IF(V{r}<>"",V{r}-IF(W{r}<>"",W{r},0),"")'
-    # AL: Pending Balance (0 when payment received OR advance cleared, otherwise Discounted Total - Advance)
-    ws1[f"AL{r}"] = f'=IF(X{r}="","",IF(OR(AN{r}="Received",AK{r}="Cleared",AN{r}="Refund Completed"),0,X{r}-IF(AJ{r}<>"",AJ{r},0)))'
-    # AQ: Invoice Number (auto)
-    ws1[f"AQ{r}"] = f'=IF(B{r}<>"","INV-"&TEXT(ROW()-3,"0000"),"")'
+def format_entry_row(row):
+    """Style the data cells of one entry row and add its auto-calculated formulas."""
+    if not args.column_defaults:
+        for col_idx, style in enumerate(COL_STYLES, 1):
+            STYLES.apply(ws1.cell(row=row, column=col_idx), style)
+
+    for col_l, formula in SCHEMA.formulas(row).items():
+        cell = ws1[f"{col_l}{row}"]
+        cell.value = formula
+        if args.column_defaults:
+            STYLES.apply(cell, COL_STYLES[SCHEMA.by_letter[col_l].index - 1])
+
+
+# --column-defaults: blank entry cells inherit the column style, so only cells
+# holding a value or formula are created (and styled explicitly, since a cell
+# written without a style index does not fall back to its column's style).
+if args.column_defaults:
+    for col, style in zip(SCHEMA.columns, COL_STYLES):
+        STYLES.apply(ws1.column_dimensions[col.letter], style)
+
+# In --stream mode rows 4+ are emitted by lead_rows() at save time instead.
+if not args.stream:
+    for row in range(FIRST_DATA_ROW, PREFORMAT_LAST_ROW + 1):
+        format_entry_row(row)
+
+# ── Named ranges ─────────────────────────────────────────────────────────
+LT = "'Lead Tracker'"
+
+
+def col_range(key):
+    """Data range of a Lead Tracker column, e.g. col_range("status") -> "AB4:AB1000"."""
+    col_l = L[key]
+    return f"{col_l}{FIRST_DATA_ROW}:{col_l}{RANGE_LAST_ROW}"
+
+
+def range_name(prefix, key):
+    """Defined name of a data column, e.g. range_name("LT", "payment_status") -> "LT_Payment_Status"."""
+    return f"{prefix}_{key.title()}"
+
+
+def add_range_name(name, sheet_ref, col_l, first_row, last_row):
+    ref = f"{sheet_ref}!${col_l}${first_row}:${col_l}${last_row}"
+    wb.defined_names[name] = DefinedName(name, attr_text=ref)
+
+
+# One workbook-level name per Lead Tracker column (LT_Status, LT_Payment_Value, ...),
+# sized to TRACKER_CAPACITY; every Dashboard formula references these names.
+for col in SCHEMA.columns:
+    add_range_name(range_name("LT", col.key), LT, col.letter, FIRST_DATA_ROW, RANGE_LAST_ROW)
 
 # ── Conditional Formatting ───────────────────────────────────────────────
-# Order Status column AB (col 28)
+
+# Order Status
 ws1.conditional_formatting.add(
-    "AB4:AB1000",
+    col_range("status"),
     CellIsRule(operator="equal", formula=['"Confirmed"'],
               fill=make_fill(GREEN_BG), font=Font(color=GREEN_FONT, bold=True)))
 ws1.conditional_formatting.add(
-    "AB4:AB1000",
+    col_range("status"),
     CellIsRule(operator="equal", formula=['"Pending"'],
               fill=make_fill(YELLOW_BG), font=Font(color=YELLOW_FONT, bold=True)))
 ws1.conditional_formatting.add(
-    "AB4:AB1000",
+    col_range("status"),
     CellIsRule(operator="equal", formula=['"Cancelled"'],
               fill=make_fill(RED_BG), font=Font(color=RED_FONT, bold=True)))
 ws1.conditional_formatting.add(
-    "AB4:AB1000",
+    col_range("status"),
     CellIsRule(operator="equal", formula=['"Scheduled"'],
               fill=make_fill(BLUE_BG), font=Font(color=BLUE_FONT, bold=True)))
 ws1.conditional_formatting.add(
-    "AB4:AB1000",
+    col_range("status"),
     CellIsRule(operator="equal", formula=['"Completed"'],
               fill=make_fill(COMPLETED_BG), font=Font(color=COMPLETED_FONT_CLR, bold=True)))
 ws1.conditional_formatting.add(
-    "AB4:AB1000",
+    col_range("status"),
     CellIsRule(operator="equal", formula=['"Refunded"'],
               fill=make_fill(REFUND_BG), font=Font(color=REFUND_FONT, bold=True)))
 
-# Payment Status column AN (col 40)
+# Payment Status
 ws1.conditional_formatting.add(
-    "AN4:AN1000",
+    col_range("payment_status"),
     CellIsRule(operator="equal", formula=['"Received"'],
               fill=make_fill(GREEN_BG), font=Font(color=GREEN_FONT, bold=True)))
 ws1.conditional_formatting.add(
-    "AN4:AN1000",
+    col_range("payment_status"),
     CellIsRule(operator="equal", formula=['"Pending"'],
               fill=make_fill(RED_BG), font=Font(color=RED_FONT, bold=True)))
 ws1.conditional_formatting.add(
-    "AN4:AN1000",
+    col_range("payment_status"),
     CellIsRule(operator="equal", formula=['"Refund Completed"'],
               fill=make_fill(REFUND_BG), font=Font(color=REFUND_FONT, bold=True)))
 
-# Advance Status column AK (col 37)
+# Advance Status
 ws1.conditional_formatting.add(
-    "AK4:AK1000",
+    col_range("advance_status"),
     CellIsRule(operator="equal", formula=['"Received"'],
               fill=make_fill(GREEN_BG), font=Font(color=GREEN_FONT, bold=True)))
 ws1.conditional_formatting.add(
-    "AK4:AK1000",
+    col_range("advance_status"),
     CellIsRule(operator="equal", formula=['"NIL"'],
               fill=make_fill(YELLOW_BG), font=Font(color=YELLOW_FONT, bold=True)))
 ws1.conditional_formatting.add(
-    "AK4:AK1000",
+    col_range("advance_status"),
     CellIsRule(operator="equal", formula=['"Cleared"'],
               fill=make_fill("A9D18E"), font=Font(color="375623", bold=True)))
 
-# Row-level conditional formatting based on $AB column (Order Status)
-row_range = f"A4:{last_col_letter}1000"
+# Row-level conditional formatting based on the Order Status column
+row_range = f"A{FIRST_DATA_ROW}:{last_col_letter}{RANGE_LAST_ROW}"
+status_ref = f"${L['status']}{FIRST_DATA_ROW}"
 ws1.conditional_formatting.add(
     row_range,
-    FormulaRule(formula=['$AB4="Confirmed"'], fill=make_fill("E2EFDA")))
+    FormulaRule(formula=[f'{status_ref}="Confirmed"'], fill=make_fill("E2EFDA")))
 ws1.conditional_formatting.add(
     row_range,
-    FormulaRule(formula=['$AB4="Pending"'], fill=make_fill("FFF2CC")))
+    FormulaRule(formula=[f'{status_ref}="Pending"'], fill=make_fill("FFF2CC")))
 ws1.conditional_formatting.add(
     row_range,
-    FormulaRule(formula=['$AB4="Cancelled"'], fill=make_fill("FCE4EC")))
+    FormulaRule(formula=[f'{status_ref}="Cancelled"'], fill=make_fill("FCE4EC")))
 ws1.conditional_formatting.add(
     row_range,
-    FormulaRule(formula=['$AB4="Scheduled"'], fill=make_fill("DAEEF3")))
+    FormulaRule(formula=[f'{status_ref}="Scheduled"'], fill=make_fill("DAEEF3")))
 ws1.conditional_formatting.add(
     row_range,
-    FormulaRule(formula=['$AB4="Completed"'], fill=make_fill("E8D5F5")))
+    FormulaRule(formula=[f'{status_ref}="Completed"'], fill=make_fill("E8D5F5")))
 ws1.conditional_formatting.add(
     row_range,
-    FormulaRule(formula=['$AB4="Refunded"'], fill=make_fill("FFF3E0")))
+    FormulaRule(formula=[f'{status_ref}="Refunded"'], fill=make_fill("FFF3E0")))
 
 # ── Sample Data (rows 4-8) ──────────────────────────────────────────────
 now = datetime.now()
 
-# Column letter -> column index mapping
-col_map = {}
-for i in range(1, num_cols + 1):
-    col_map[get_column_letter(i)] = i
-
-# Formula columns that must NOT be overwritten with static data
-formula_cols = {"A", "C", "V", "X", "AL", "AQ"}
-
+# Lead records are dicts keyed by schema field key; auto columns are never set
 samples = [
     {   # Row 4 - Rajesh Kumar, Confirmed
-        "B": now - timedelta(days=5),
-        "D": "Rajesh Kumar", "E": "9876543210", "F": "9876543210",
-        "G": "",
-        "H": "rajesh.k@email.com", "I": "Bangalore", "J": "Indiranagar",
-        "K": "123, 12th Main, Indiranagar, Bangalore - 560038",
-        "L": "2BHK", "M": 1200,
-        "N": "Bathroom Cleaning",
-        "O": 2000, "P": "Pest Control", "Q": 3500,
-        "W": 500,
-        "Y": now + timedelta(days=2), "Z": "Morning 10-12",
-        "AA": "Website",
-        "AB": "Confirmed", "AC": "",
-        "AD": "Suresh", "AE": "9988776655",
-        "AG": now + timedelta(days=2), "AH": "Morning 10-12",
-        "AJ": 500, "AK": "Received",
+        "timestamp": now - timedelta(days=5),
+        "customer": "Rajesh Kumar", "phone": "9876543210", "whatsapp": "9876543210",
+        "alt_phone": "",
+        "email": "rajesh.k@email.com", "city": "Bangalore", "area": "Indiranagar",
+        "address": "123, 12th Main, Indiranagar, Bangalore - 560038",
+        "bhk": "2BHK", "sqft": 1200,
+        "service1": "Bathroom Cleaning",
+        "price1": 2000, "service2": "Pest Control", "price2": 3500,
+        "discount": 500,
+        "preferred_date": now + timedelta(days=2), "slot": "Morning 10-12",
+        "source": "Website",
+        "status": "Confirmed", "notes": "",
+        "vendor": "Suresh", "vendor_contact": "9988776655",
+        "scheduled_date": now + timedelta(days=2), "scheduled_time": "Morning 10-12",
+        "advance": 500, "advance_status": "Received",
     },
     {   # Row 5 - Priya Sharma, Pending
-        "B": now - timedelta(days=3),
-        "D": "Priya Sharma", "E": "8765432109", "F": "",
-        "H": "priya.s@email.com", "I": "Bangalore", "J": "HSR Layout",
-        "K": "45, Sector 2, HSR Layout, Bangalore - 560102",
-        "L": "3BHK", "M": 1800,
-        "N": "Full Home Cleaning",
-        "O": 4500,
-        "Y": now + timedelta(days=5), "Z": "Afternoon 2-4",
-        "AA": "Instagram",
-        "AB": "Pending",
+        "timestamp": now - timedelta(days=3),
+        "customer": "Priya Sharma", "phone": "8765432109", "whatsapp": "",
+        "email": "priya.s@email.com", "city": "Bangalore", "area": "HSR Layout",
+        "address": "45, Sector 2, HSR Layout, Bangalore - 560102",
+        "bhk": "3BHK", "sqft": 1800,
+        "service1": "Full Home Cleaning",
+        "price1": 4500,
+        "preferred_date": now + timedelta(days=5), "slot": "Afternoon 2-4",
+        "source": "Instagram",
+        "status": "Pending",
     },
     {   # Row 6 - Amit Patel, Cancelled
-        "B": now - timedelta(days=7),
-        "D": "Amit Patel", "E": "7654321098", "F": "",
-        "H": "amit.p@email.com", "I": "Bangalore", "J": "Whitefield",
-        "K": "78, ITPL Road, Whitefield, Bangalore - 560066",
-        "L": "2BHK", "M": 1100,
-        "N": "Painting",
-        "O": 15000, "P": "Plumbing", "Q": 2000,
-        "W": 2000,
-        "AA": "Google",
-        "AB": "Cancelled", "AC": "Price too high",
+        "timestamp": now - timedelta(days=7),
+        "customer": "Amit Patel", "phone": "7654321098", "whatsapp": "",
+        "email": "amit.p@email.com", "city": "Bangalore", "area": "Whitefield",
+        "address": "78, ITPL Road, Whitefield, Bangalore - 560066",
+        "bhk": "2BHK", "sqft": 1100,
+        "service1": "Painting",
+        "price1": 15000, "service2": "Plumbing", "price2": 2000,
+        "discount": 2000,
+        "source": "Google",
+        "status": "Cancelled", "notes": "Price too high",
     },
     {   # Row 7 - Meera Reddy, Scheduled
-        "B": now - timedelta(days=2),
-        "D": "Meera Reddy", "E": "6543210987", "F": "6543210987",
-        "H": "meera.r@email.com", "I": "Bangalore", "J": "Koramangala",
-        "K": "22, 5th Block, Koramangala, Bangalore - 560095",
-        "L": "3BHK", "M": 1600,
-        "N": "Full Home Cleaning",
-        "O": 4500,
-        "Y": now + timedelta(days=3), "Z": "Morning 8-10",
-        "AA": "JustDial",
-        "AB": "Scheduled",
-        "AD": "Ramesh", "AE": "9876501234",
-        "AG": now + timedelta(days=3), "AH": "Morning 8-10",
-        "AJ": 1000, "AK": "Received",
+        "timestamp": now - timedelta(days=2),
+        "customer": "Meera Reddy", "phone": "6543210987", "whatsapp": "6543210987",
+        "email": "meera.r@email.com", "city": "Bangalore", "area": "Koramangala",
+        "address": "22, 5th Block, Koramangala, Bangalore - 560095",
+        "bhk": "3BHK", "sqft": 1600,
+        "service1": "Full Home Cleaning",
+        "price1": 4500,
+        "preferred_date": now + timedelta(days=3), "slot": "Morning 8-10",
+        "source": "JustDial",
+        "status": "Scheduled",
+        "vendor": "Ramesh", "vendor_contact": "9876501234",
+        "scheduled_date": now + timedelta(days=3), "scheduled_time": "Morning 8-10",
+        "advance": 1000, "advance_status": "Received",
     },
     {   # Row 8 - Karthik Nair, Completed
-        "B": now - timedelta(days=10),
-        "D": "Karthik Nair", "E": "5432109876", "F": "",
-        "H": "karthik.n@email.com", "I": "Bangalore", "J": "JP Nagar",
-        "K": "56, 6th Phase, JP Nagar, Bangalore - 560078",
-        "L": "1BHK", "M": 650,
-        "N": "Plumbing",
-        "O": 1500,
-        "Y": now - timedelta(days=8), "Z": "Evening 4-6",
-        "AA": "Website",
-        "AB": "Completed",
-        "AD": "Vijay", "AE": "9123456780",
-        "AG": now - timedelta(days=8), "AH": "Evening 4-6",
-        "AI": now - timedelta(days=8),
-        "AJ": 0, "AK": "NIL",
-        "AM": 1500, "AN": "Received", "AO": "Cash", "AP": 0,
+        "timestamp": now - timedelta(days=10),
+        "customer": "Karthik Nair", "phone": "5432109876", "whatsapp": "",
+        "email": "karthik.n@email.com", "city": "Bangalore", "area": "JP Nagar",
+        "address": "56, 6th Phase, JP Nagar, Bangalore - 560078",
+        "bhk": "1BHK", "sqft": 650,
+        "service1": "Plumbing",
+        "price1": 1500,
+        "preferred_date": now - timedelta(days=8), "slot": "Evening 4-6",
+        "source": "Website",
+        "status": "Completed",
+        "vendor": "Vijay", "vendor_contact": "9123456780",
+        "scheduled_date": now - timedelta(days=8), "scheduled_time": "Evening 4-6",
+        "completed_date": now - timedelta(days=8),
+        "advance": 0, "advance_status": "NIL",
+        "payment_value": 1500, "payment_status": "Received", "payment_mode": "Cash", "refund": 0,
     },
 ]
 
-for s_idx, sample in enumerate(samples):
-    row = 4 + s_idx
-    for col_letter, value in sample.items():
-        if col_letter in formula_cols:
-            continue
-        col_idx = col_map[col_letter]
-        cell = ws1.cell(row=row, column=col_idx)
-        cell.value = value
+def source_records():
+    """
+    A fresh pass over the source leads.  --from-db leads stream from the SQLite
+    store in timestamp order (data_store); --import rows are re-read from the
+    export a chunk at a time (lead_import); --history leads are seeded synthetic
+    leads over the year before --history-end (synthetic_data), regenerated on
+    every pass, not stored.
+    """
+    if LEAD_STORE:
+        return LEAD_STORE.leads(*LEAD_WINDOW)
+    if FORM_IMPORT:
+        return FORM_IMPORT.records()
+    if args.history:
+        return SyntheticData(args.seed).leads(args.history, end=args.history_end)
+    return iter(samples)
+
+
+# --dedup: one indexing pass over the source leads (lead_dedup)
+LEAD_INDEX = LeadIndex.build(source_records()) if args.dedup else None
+
+
+def iter_lead_records():
+    """A fresh pass over the lead records to write, flagged or merged with --dedup."""
+    if args.dedup == "flag":
+        return LEAD_INDEX.flagged(source_records())
+    if args.dedup == "merge":
+        return LEAD_INDEX.merged(source_records)
+    return source_records()
+
+
+# --to-db: the leads as written (merged with --dedup merge), in batched inserts
+SAVED_ROWS = None
+if args.to_db:
+    with DataStore(args.to_db) as store:
+        SAVED_ROWS = store.save_leads(iter_lead_records())
+
+# --export: the same leads, typed, with the auto columns computed
+EXPORT = export_leads(args.export, iter_lead_records(), args.export_format) if args.export else None
+
+lead_records = iter_lead_records()
+
+
+def lead_rows(ws, records, styles):
+    """
+    Row-at-a-time emitter for --stream mode: yields styled rows 4, 5, ...
+    (values, then the per-row formulas) for each record, followed by blank
+    pre-formatted rows up to PREFORMAT_LAST_ROW.  Nothing is held beyond the
+    current row.  With --column-defaults only non-blank cells are emitted.
+    """
+    col_styles = [styles.style_array(style) for style in COL_STYLES]
+
+    def emit(r, record):
+        values = SCHEMA.row_values(record, r)
+        if args.column_defaults:
+            return [styled_cell(ws, value, style) if value is not None else None
+                    for value, style in zip(values, col_styles)]
+        return [styled_cell(ws, value, style) for value, style in zip(values, col_styles)]
+
+    r = FIRST_DATA_ROW
+    for record in records:
+        yield emit(r, record)
+        r += 1
+    while r <= PREFORMAT_LAST_ROW:
+        yield emit(r, {})
+        r += 1
+
+
+if not args.stream:
+    for s_idx, sample in enumerate(lead_records):
+        row = FIRST_DATA_ROW + s_idx
+        if row > PREFORMAT_LAST_ROW:
+            # Beyond the pre-formatted block: style the row and add its formulas
+            format_entry_row(row)
+        for key, value in sample.items():
+            col = SCHEMA.by_key[key]
+            if col.is_auto:
+                continue
+            cell = ws1.cell(row=row, column=col.index)
+            cell.value = value
+            if args.column_defaults:
+                STYLES.apply(cell, COL_STYLES[col.index - 1])
 
 # ── Freeze panes & auto filter ──────────────────────────────────────────
-# Freeze at E4: keeps header rows 1-3 frozen, and columns A-D (S.No, Timestamp, Order ID, Customer Name) visible
-ws1.freeze_panes = "E4"
-ws1.auto_filter.ref = f"A3:{last_col_letter}1000"
+# Freeze below the headers, keeping S.No, Timestamp, Order ID and Customer Name visible
+ws1.freeze_panes = f"{L['phone']}{FIRST_DATA_ROW}"
+ws1.auto_filter.ref = f"A{SCHEMA.header_row}:{last_col_letter}{RANGE_LAST_ROW}"
+
+# Helper references
+OL = "'Order Lines'"
+# Conditional aggregates go through FORMULAS: SUMIFS/COUNTIFS where equivalent
+FORMULAS = FormulaLog()
+
+
+def lt(key):
+    """Named data range of a Lead Tracker column, e.g. lt("status") -> "LT_Status"."""
+    return range_name("LT", key)
+
+
+TIMINGS.mark("Lead Tracker")
+
+# ═══════════════════════════════════════════════════════════════════════════
+#  SHEET 1b: ORDER LINES (--order-lines)
+# ═══════════════════════════════════════════════════════════════════════════
+# One row per (order, service): lines 1-4 of every Lead Tracker row mirror its
+# Service/Price columns by formula, and the extra lines below take manual
+# entries for orders with more than four services (status looked up by Order ID).
+OL_COLUMNS = [
+    # (key, header, width, data style)
+    ("order_id", "Order ID", 12, "LT Order ID"),
+    ("line", "Line", 6, "LT Data"),
+    ("service", "Service", 24, "LT Data Left"),
+    ("price", "Price", 12, "LT Currency"),
+    ("status", "Order Status", 16, "LT Data"),
+    ("payment_status", "Payment Status", 16, "LT Data"),
+]
+OL_LETTER = {key: get_column_letter(i) for i, (key, *_) in enumerate(OL_COLUMNS, 1)}
+OL_STYLES = [style for *_, style in OL_COLUMNS]
+OL_FIRST_ROW = 4
+OL_EXTRA_FIRST_ROW = OL_FIRST_ROW + (RANGE_LAST_ROW - FIRST_DATA_ROW + 1) * len(SERVICE_SLOTS)
+OL_LAST_ROW = OL_EXTRA_FIRST_ROW + args.extra_lines - 1
+
+
+def ol(key):
+    """Named data range of an Order Lines column, e.g. ol("service") -> "OL_Service"."""
+    return range_name("OL", key)
+
+
+def order_line_rows():
+    """Values of the Order Lines data rows, one list per row, top to bottom."""
+    for r in range(FIRST_DATA_ROW, RANGE_LAST_ROW + 1):
+        order_id = f"{LT}!{L['order_id']}{r}"
+        status = f"{LT}!{L['status']}{r}"
+        pay_status = f"{LT}!{L['payment_status']}{r}"
+        for line, (svc_key, price_key) in enumerate(SERVICE_SLOTS, 1):
+            service = f"{LT}!{L[svc_key]}{r}"
+            price = f"{LT}!{L[price_key]}{r}"
+            empty = f'{service}=""'
+            # &"" keeps blank Lead Tracker cells from showing up as 0
+            yield [
+                f'=IF({empty},"",{order_id})',
+                line,
+                f'=IF({empty},"",{service})',
+                f'=IF({empty},"",{price})',
+                f'=IF({empty},"",{status}&"")',
+                f'=IF({empty},"",{pay_status}&"")',
+            ]
+    order_ids = lt("order_id")
+    for i in range(OL_EXTRA_FIRST_ROW, OL_LAST_ROW + 1):
+        id_cell = f"{OL_LETTER['order_id']}{i}"
+        lookup = lambda key: (f'=IF({id_cell}="","",IFERROR(INDEX({lt(key)},'
+                              f'MATCH({id_cell},{order_ids},0))&"",""))')
+        yield [None, None, None, None, lookup("status"), lookup("payment_status")]
+
+
+def order_line_cells(ws, styles):
+    """order_line_rows() as styled write-only cells, for --stream mode."""
+    col_styles = [styles.style_array(style) for style in OL_STYLES]
+    for values in order_line_rows():
+        yield [styled_cell(ws, value, style) for value, style in zip(values, col_styles)]
+
+
+if args.order_lines:
+    for key, *_ in OL_COLUMNS:
+        add_range_name(range_name("OL", key), OL, OL_LETTER[key], OL_FIRST_ROW, OL_LAST_ROW)
+    # lead_append warns once the leads run past the rows mirrored here
+    wb.defined_names[ORDER_LINES_END] = DefinedName(ORDER_LINES_END, attr_text=str(RANGE_LAST_ROW))
+
+    ws_ol = wb.create_sheet("Order Lines")
+    ws_ol.sheet_properties.tabColor = MEDIUM_BLUE
+    ol_last_col = get_column_letter(len(OL_COLUMNS))
+
+    ws_ol.merge_cells(f"A1:{ol_last_col}1")
+    c = ws_ol["A1"]
+    c.value = "ORDER LINES — ONE ROW PER SERVICE"
+    apply_cell(c, font=Font(name="Calibri", bold=True, size=16, color=WHITE),
+               fill=make_fill(DARK_BLUE), alignment=center_al)
+    ws_ol.row_dimensions[1].height = 45
+
+    ws_ol.merge_cells(f"A2:{ol_last_col}2")
+    c = ws_ol["A2"]
+    c.value = (f"Lines 1-4 follow Lead Tracker automatically. Add 5th+ services from row "
+               f"{OL_EXTRA_FIRST_ROW}: enter Order ID, Line, Service and Price.")
+    apply_cell(c, font=Font(name="Calibri", bold=True, size=11, color=WHITE),
+               fill=make_fill(MEDIUM_BLUE), alignment=center_al)
+    ws_ol.row_dimensions[2].height = 28
+
+    ws_ol.row_dimensions[3].height = 30
+    for i, (key, hdr, width, _) in enumerate(OL_COLUMNS, 1):
+        cell = ws_ol.cell(row=3, column=i, value=hdr)
+        apply_cell(cell, font=header_font, fill=header_fill, alignment=header_al, border=thin_border)
+        ws_ol.column_dimensions[OL_LETTER[key]].width = width
+
+    add_dropdown(ws_ol, OL_LETTER["service"], SERVICE_LIST,
+                 start_row=OL_EXTRA_FIRST_ROW, end_row=OL_LAST_ROW)
+    ws_ol.freeze_panes = f"A{OL_FIRST_ROW}"
+    ws_ol.auto_filter.ref = f"A3:{ol_last_col}{OL_LAST_ROW}"
+
+    # In --stream mode the rows are emitted by order_line_cells() at save time
+    if not args.stream:
+        for i, values in enumerate(order_line_rows(), OL_FIRST_ROW):
+            for col_idx, (value, style) in enumerate(zip(values, OL_STYLES), 1):
+                cell = ws_ol.cell(row=i, column=col_idx, value=value)
+                STYLES.apply(cell, style)
+
+if args.order_lines:
+    TIMINGS.mark("Order Lines")
 
 # ═══════════════════════════════════════════════════════════════════════════
 #  SHEET 2: DASHBOARD
@@ -553,9 +820,6 @@ ws1.auto_filter.ref = f"A3:{last_col_letter}1000"
 ws2 = wb.create_sheet("Dashboard")
 ws2.sheet_properties.tabColor = DARK_BLUE
 
-# Helper references
-LT = "'Lead Tracker'"
-
 # ── Row 1-2: Title ───────────────────────────────────────────────────────
 ws2.merge_cells("A1:N1")
 c = ws2["A1"]
@@ -611,16 +875,16 @@ stat_headers = ["Total Orders", "Confirmed", "Pending", "Cancelled", "Scheduled"
 stat_colors = [LIGHT_BLUE, GREEN_BG, YELLOW_BG, RED_BG, BLUE_BG, COMPLETED_BG, REFUND_BG]
 stat_font_colors = [DARK_BLUE, GREEN_FONT, YELLOW_FONT, RED_FONT, BLUE_FONT, COMPLETED_FONT_CLR, REFUND_FONT]
 
-# Total Orders: COUNTIF on Order ID (C) for "ST-*" pattern
-# Status counts: COUNTIF on Order Status (AB)
+# Total Orders: COUNTIF on Order ID for "ST-*" pattern
+# Status counts: COUNTIF on Order Status
 stat_formulas = [
-    f'=COUNTIF({LT}!C4:C1000,"ST-*")',
-    f'=COUNTIF({LT}!AB4:AB1000,"Confirmed")',
-    f'=COUNTIF({LT}!AB4:AB1000,"Pending")',
-    f'=COUNTIF({LT}!AB4:AB1000,"Cancelled")',
-    f'=COUNTIF({LT}!AB4:AB1000,"Scheduled")',
-    f'=COUNTIF({LT}!AB4:AB1000,"Completed")',
-    f'=COUNTIF({LT}!AB4:AB1000,"Refunded")',
+    f'=COUNTIF({lt("order_id")},"ST-*")',
+    f'=COUNTIF({lt("status")},"Confirmed")',
+    f'=COUNTIF({lt("status")},"Pending")',
+    f'=COUNTIF({lt("status")},"Cancelled")',
+    f'=COUNTIF({lt("status")},"Scheduled")',
+    f'=COUNTIF({lt("status")},"Completed")',
+    f'=COUNTIF({lt("status")},"Refunded")',
 ]
 
 for i, (hdr, bg, fg) in enumerate(zip(stat_headers, stat_colors, stat_font_colors)):
@@ -647,28 +911,26 @@ apply_cell(ws2[f"A{R_PS}"], font=Font(name="Calibri", bold=True, size=12, color=
 
 pay_headers = ["Total Quoted", "Total Received", "Total Pending", "Cash Received",
                "UPI Received", "Card / Gateway", "Total Advance", "Total Refunds", "Refund Completed"]
-# Original column references:
-#   Discounted Total = X, Payment Value = AM, Payment Status = AN,
-#   Payment Mode = AO, Advance Status = AK, Advance Amount = AJ, Refund Amount = AP
+paid = eq(lt("payment_status"), "Received")
 pay_formulas = [
-    # Total Quoted: sum of Discounted Total (X) where not blank
-    f'=SUMPRODUCT(({LT}!X4:X1000<>"")*({LT}!X4:X1000))',
-    # Total Received: sum AM where AN=Received
-    f'=SUMPRODUCT(({LT}!AN4:AN1000="Received")*({LT}!AM4:AM1000))',
-    # Total Pending: sum AM where AN=Pending
-    f'=SUMPRODUCT(({LT}!AN4:AN1000="Pending")*({LT}!AM4:AM1000))',
+    # Total Quoted: sum of Discounted Total where not blank
+    cond_sum(lt("discounted_total"), not_blank(lt("discounted_total"))),
+    # Total Received: sum Payment Value where Payment Status=Received
+    cond_sum(lt("payment_value"), paid),
+    # Total Pending: sum Payment Value where Payment Status=Pending
+    cond_sum(lt("payment_value"), eq(lt("payment_status"), "Pending")),
     # Cash Received
-    f'=SUMPRODUCT(({LT}!AO4:AO1000="Cash")*({LT}!AN4:AN1000="Received")*({LT}!AM4:AM1000))',
+    cond_sum(lt("payment_value"), eq(lt("payment_mode"), "Cash"), paid),
     # UPI Received
-    f'=SUMPRODUCT(({LT}!AO4:AO1000="UPI")*({LT}!AN4:AN1000="Received")*({LT}!AM4:AM1000))',
+    cond_sum(lt("payment_value"), eq(lt("payment_mode"), "UPI"), paid),
     # Card/Gateway
-    f'=SUMPRODUCT((({LT}!AO4:AO1000="Debit Card")+({LT}!AO4:AO1000="Payment Gateway"))*({LT}!AN4:AN1000="Received")*({LT}!AM4:AM1000))',
-    # Total Advance where AK=Received
-    f'=SUMPRODUCT(({LT}!AK4:AK1000="Received")*({LT}!AJ4:AJ1000))',
+    cond_sum(lt("payment_value"), any_of(lt("payment_mode"), ["Debit Card", "Payment Gateway"]), paid),
+    # Total Advance where Advance Status=Received
+    cond_sum(lt("advance"), eq(lt("advance_status"), "Received")),
     # Total Refunds (sum of refund amounts)
-    f'=SUM({LT}!AP4:AP1000)',
+    f'=SUM({lt("refund")})',
     # Refund Completed: count where Payment Status = "Refund Completed"
-    f'=COUNTIF({LT}!AN4:AN1000,"Refund Completed")',
+    f'=COUNTIF({lt("payment_status")},"Refund Completed")',
 ]
 
 r_pay_hdr = R_PS + 1
@@ -679,8 +941,11 @@ for i, (hdr, formula) in enumerate(zip(pay_headers, pay_formulas)):
     cell.value = hdr
     apply_cell(cell, font=Font(name="Calibri", bold=True, size=10, color=WHITE),
                fill=make_fill(MEDIUM_BLUE), alignment=center_al, border=thin_border)
-    cell = ws2[f"{col_l}{r_pay_data}"]
-    cell.value = formula
+    if isinstance(formula, Aggregate):
+        cell = FORMULAS.put(ws2, f"{col_l}{r_pay_data}", formula)
+    else:
+        cell = ws2[f"{col_l}{r_pay_data}"]
+        cell.value = formula
     fmt = '0' if hdr == "Refund Completed" else CURRENCY_FMT
     apply_cell(cell, font=Font(name="Calibri", bold=True, size=14, color=DARK_BLUE),
                fill=make_fill(LIGHT_BLUE), alignment=center_al, border=thin_border,
@@ -695,12 +960,11 @@ ws2[f"A{R_DS}"].value = "DISCOUNT SUMMARY"
 apply_cell(ws2[f"A{R_DS}"], font=Font(name="Calibri", bold=True, size=12, color=WHITE),
            fill=make_fill(DARK_BLUE), alignment=center_al)
 
-# Discount Amount = W (original)
 disc_headers = ["Orders with Discount", "Total Discount Given", "Avg Discount"]
 disc_formulas = [
-    f'=COUNTIF({LT}!W4:W1000,">"&0)',
-    f'=SUM({LT}!W4:W1000)',
-    f'=IFERROR(AVERAGEIF({LT}!W4:W1000,">"&0),0)',
+    f'=COUNTIF({lt("discount")},">"&0)',
+    f'=SUM({lt("discount")})',
+    f'=IFERROR(AVERAGEIF({lt("discount")},">"&0),0)',
 ]
 
 r_disc_hdr = R_DS + 1
@@ -736,7 +1000,6 @@ for i, hdr in enumerate(src_col_headers):
     apply_cell(cell, font=Font(name="Calibri", bold=True, size=10, color=WHITE),
                fill=make_fill(MEDIUM_BLUE), alignment=center_al, border=thin_border)
 
-# Order Source = AA, Order Status = AB, Payment Status = AN, Payment Value = AM
 r_src_start = r_src_hdr + 1
 for s_idx, source in enumerate(SOURCES):
     r = r_src_start + s_idx
@@ -744,18 +1007,16 @@ for s_idx, source in enumerate(SOURCES):
     apply_cell(ws2[f"A{r}"], font=Font(name="Calibri", bold=True, size=10),
                alignment=left_al, border=thin_border, fill=make_fill(LIGHT_GRAY))
     # Total Orders
-    ws2[f"B{r}"].value = f'=COUNTIF({LT}!AA4:AA1000,A{r})'
+    ws2[f"B{r}"].value = f'=COUNTIF({lt("source")},A{r})'
     apply_cell(ws2[f"B{r}"], font=data_font, alignment=center_al, border=thin_border)
     # Confirmed
-    ws2[f"C{r}"].value = f'=COUNTIFS({LT}!AA4:AA1000,A{r},{LT}!AB4:AB1000,"Confirmed")'
+    ws2[f"C{r}"].value = f'=COUNTIFS({lt("source")},A{r},{lt("status")},"Confirmed")'
     apply_cell(ws2[f"C{r}"], font=data_font, alignment=center_al, border=thin_border)
     # Completed
-    ws2[f"D{r}"].value = f'=COUNTIFS({LT}!AA4:AA1000,A{r},{LT}!AB4:AB1000,"Completed")'
+    ws2[f"D{r}"].value = f'=COUNTIFS({lt("source")},A{r},{lt("status")},"Completed")'
     apply_cell(ws2[f"D{r}"], font=data_font, alignment=center_al, border=thin_border)
     # Revenue
-    ws2[f"E{r}"].value = (
-        f'=SUMPRODUCT(({LT}!AA4:AA1000=A{r})*({LT}!AN4:AN1000="Received")*({LT}!AM4:AM1000))'
-    )
+    FORMULAS.put(ws2, f"E{r}", cond_sum(lt("payment_value"), eq(lt("source"), Ref(f"A{r}", source)), paid))
     apply_cell(ws2[f"E{r}"], font=data_font, alignment=center_al, border=thin_border,
                number_format=CURRENCY_FMT)
 
@@ -789,9 +1050,15 @@ for i, hdr in enumerate(svc_col_headers):
     apply_cell(cell, font=Font(name="Calibri", bold=True, size=10, color=WHITE),
                fill=make_fill(MEDIUM_BLUE), alignment=center_al, border=thin_border)
 
-# Service columns: N=Service1, P=Service2, R=Service3, T=Service4 (original)
-# Price columns:   O=Price1, Q=Price2, S=Price3, U=Price4 (original)
-# Order Status: AB, Payment Status: AN
+# Each order carries up to 4 services, each with its own price column (SERVICE_SLOTS).
+# With --order-lines every (order, service) is one Order Lines row instead, so
+# each metric is a single COUNTIFS/SUMIFS over that sheet.
+if args.order_lines:
+    svc_slots = [(ol("service"), ol("price"))]
+    svc_status, svc_paid = ol("status"), eq(ol("payment_status"), "Received")
+else:
+    svc_slots = [(lt(svc_key), lt(price_key)) for svc_key, price_key in SERVICE_SLOTS]
+    svc_status, svc_paid = lt("status"), paid
 r_svc_start = r_svc_hdr + 1
 for s_idx, svc in enumerate(SERVICES):
     r = r_svc_start + s_idx
@@ -799,33 +1066,23 @@ for s_idx, svc in enumerate(SERVICES):
     apply_cell(ws2[f"A{r}"], font=Font(name="Calibri", bold=True, size=10),
                alignment=left_al, border=thin_border, fill=make_fill(LIGHT_GRAY))
 
-    # Total Orders across 4 service columns (N, P, R, T)
-    ws2[f"B{r}"].value = (
-        f'=COUNTIF({LT}!N4:N1000,A{r})+COUNTIF({LT}!P4:P1000,A{r})'
-        f'+COUNTIF({LT}!R4:R1000,A{r})+COUNTIF({LT}!T4:T1000,A{r})'
-    )
+    # Total Orders across the service columns
+    ws2[f"B{r}"].value = "=" + "+".join(
+        f'COUNTIF({svc_range},A{r})' for svc_range, _ in svc_slots)
     apply_cell(ws2[f"B{r}"], font=data_font, alignment=center_al, border=thin_border)
 
-    # Status-wise counts across all 4 service columns (N, P, R, T)
+    # Status-wise counts across all service columns
     for si, (status_name, col_l) in enumerate(
             [("Confirmed", "C"), ("Scheduled", "D"), ("Completed", "E"),
              ("Pending", "F"), ("Cancelled", "G")]):
-        ws2[f"{col_l}{r}"].value = (
-            f'=COUNTIFS({LT}!N4:N1000,A{r},{LT}!AB4:AB1000,"{status_name}")'
-            f'+COUNTIFS({LT}!P4:P1000,A{r},{LT}!AB4:AB1000,"{status_name}")'
-            f'+COUNTIFS({LT}!R4:R1000,A{r},{LT}!AB4:AB1000,"{status_name}")'
-            f'+COUNTIFS({LT}!T4:T1000,A{r},{LT}!AB4:AB1000,"{status_name}")'
-        )
+        ws2[f"{col_l}{r}"].value = "=" + "+".join(
+            f'COUNTIFS({svc_range},A{r},{svc_status},"{status_name}")'
+            for svc_range, _ in svc_slots)
         apply_cell(ws2[f"{col_l}{r}"], font=data_font, alignment=center_al, border=thin_border)
 
-    # Revenue: SUMPRODUCT matching service in each col * price where AN=Received
-    # Service N * Price O, Service P * Price Q, Service R * Price S, Service T * Price U
-    ws2[f"H{r}"].value = (
-        f'=SUMPRODUCT(({LT}!N4:N1000=A{r})*({LT}!AN4:AN1000="Received")*({LT}!O4:O1000))'
-        f'+SUMPRODUCT(({LT}!P4:P1000=A{r})*({LT}!AN4:AN1000="Received")*({LT}!Q4:Q1000))'
-        f'+SUMPRODUCT(({LT}!R4:R1000=A{r})*({LT}!AN4:AN1000="Received")*({LT}!S4:S1000))'
-        f'+SUMPRODUCT(({LT}!T4:T1000=A{r})*({LT}!AN4:AN1000="Received")*({LT}!U4:U1000))'
-    )
+    # Revenue: price of each service column matching the service, where Payment Status=Received
+    FORMULAS.put(ws2, f"H{r}", [cond_sum(price_range, eq(svc_range, Ref(f"A{r}", svc)), svc_paid)
+                                for svc_range, price_range in svc_slots])
     apply_cell(ws2[f"H{r}"], font=data_font, alignment=center_al, border=thin_border,
                number_format=CURRENCY_FMT)
 
@@ -858,7 +1115,6 @@ for i, hdr in enumerate(area_col_headers):
     apply_cell(cell, font=Font(name="Calibri", bold=True, size=10, color=WHITE),
                fill=make_fill(MEDIUM_BLUE), alignment=center_al, border=thin_border)
 
-# Area/Locality = J (original), Order Status = AB, Payment Status = AN, Payment Value = AM
 r_area_start = r_area_hdr + 1
 for a_idx, area in enumerate(AREAS):
     r = r_area_start + a_idx
@@ -866,26 +1122,24 @@ for a_idx, area in enumerate(AREAS):
     apply_cell(ws2[f"A{r}"], font=Font(name="Calibri", bold=True, size=10),
                alignment=left_al, border=thin_border, fill=make_fill(LIGHT_GRAY))
 
-    # Total Orders - COUNTIF on J column (Area/Locality)
-    ws2[f"B{r}"].value = f'=COUNTIF({LT}!J4:J1000,A{r})'
+    # Total Orders - COUNTIF on Area / Locality
+    ws2[f"B{r}"].value = f'=COUNTIF({lt("area")},A{r})'
     apply_cell(ws2[f"B{r}"], font=data_font, alignment=center_al, border=thin_border)
 
     # Confirmed
-    ws2[f"C{r}"].value = f'=COUNTIFS({LT}!J4:J1000,A{r},{LT}!AB4:AB1000,"Confirmed")'
+    ws2[f"C{r}"].value = f'=COUNTIFS({lt("area")},A{r},{lt("status")},"Confirmed")'
     apply_cell(ws2[f"C{r}"], font=data_font, alignment=center_al, border=thin_border)
 
     # Completed
-    ws2[f"D{r}"].value = f'=COUNTIFS({LT}!J4:J1000,A{r},{LT}!AB4:AB1000,"Completed")'
+    ws2[f"D{r}"].value = f'=COUNTIFS({lt("area")},A{r},{lt("status")},"Completed")'
     apply_cell(ws2[f"D{r}"], font=data_font, alignment=center_al, border=thin_border)
 
     # Pending
-    ws2[f"E{r}"].value = f'=COUNTIFS({LT}!J4:J1000,A{r},{LT}!AB4:AB1000,"Pending")'
+    ws2[f"E{r}"].value = f'=COUNTIFS({lt("area")},A{r},{lt("status")},"Pending")'
     apply_cell(ws2[f"E{r}"], font=data_font, alignment=center_al, border=thin_border)
 
     # Revenue
-    ws2[f"F{r}"].value = (
-        f'=SUMPRODUCT(({LT}!J4:J1000=A{r})*({LT}!AN4:AN1000="Received")*({LT}!AM4:AM1000))'
-    )
+    FORMULAS.put(ws2, f"F{r}", cond_sum(lt("payment_value"), eq(lt("area"), Ref(f"A{r}", area)), paid))
     apply_cell(ws2[f"F{r}"], font=data_font, alignment=center_al, border=thin_border,
                number_format=CURRENCY_FMT)
 
@@ -916,7 +1170,8 @@ apply_cell(ws2[f"A{r_date_input}"], font=Font(name="Calibri", bold=True, size=11
            alignment=center_al, border=thin_border)
 # Pre-fill From/To with actual date objects so Google Sheets recognizes the cells as dates.
 from datetime import date as date_cls
-ws2[f"B{r_date_input}"].value = date_cls(2026, 1, 17)
+DATE_FROM, DATE_TO = date_cls(2026, 1, 17), date_cls(2026, 1, 28)
+ws2[f"B{r_date_input}"].value = DATE_FROM
 apply_cell(ws2[f"B{r_date_input}"], font=Font(name="Calibri", bold=True, size=12, color=DARK_BLUE),
            fill=make_fill(YELLOW_BG), alignment=center_al, border=medium_blue_border,
            number_format=DATE_FMT)
@@ -924,7 +1179,7 @@ apply_cell(ws2[f"B{r_date_input}"], font=Font(name="Calibri", bold=True, size=12
 ws2[f"C{r_date_input}"].value = "To Date"
 apply_cell(ws2[f"C{r_date_input}"], font=Font(name="Calibri", bold=True, size=11, color=DARK_BLUE),
            alignment=center_al, border=thin_border)
-ws2[f"D{r_date_input}"].value = date_cls(2026, 1, 28)
+ws2[f"D{r_date_input}"].value = DATE_TO
 apply_cell(ws2[f"D{r_date_input}"], font=Font(name="Calibri", bold=True, size=12, color=DARK_BLUE),
            fill=make_fill(YELLOW_BG), alignment=center_al, border=medium_blue_border,
            number_format=DATE_FMT)
@@ -954,68 +1209,34 @@ ws2.row_dimensions[r_date_data].height = 45
 from_cell = f"B{r_date_input}"
 to_cell = f"D{r_date_input}"
 
-# Date-wise formulas use INT() to strip time from Timestamp (col B) for reliable date comparison
-# Timestamp is column B (original)
-
-# Orders in Range
-ws2[f"A{r_date_data}"].value = (
-    f'=IF(OR({from_cell}="",{to_cell}=""),"Enter dates",'
-    f'SUMPRODUCT((INT({LT}!B4:B1000)>={from_cell})*(INT({LT}!B4:B1000)<={to_cell})*({LT}!B4:B1000<>"")))'
-)
-apply_cell(ws2[f"A{r_date_data}"], font=Font(name="Calibri", bold=True, size=16, color=DARK_BLUE),
-           fill=make_fill(LIGHT_BLUE), alignment=center_al, border=thin_border)
-
-# Confirmed in range
-ws2[f"B{r_date_data}"].value = (
-    f'=IF(OR({from_cell}="",{to_cell}=""),"",'
-    f'SUMPRODUCT((INT({LT}!B4:B1000)>={from_cell})*(INT({LT}!B4:B1000)<={to_cell})*({LT}!AB4:AB1000="Confirmed")))'
-)
-apply_cell(ws2[f"B{r_date_data}"], font=Font(name="Calibri", bold=True, size=16, color=GREEN_FONT),
-           fill=make_fill(LIGHT_BLUE), alignment=center_al, border=thin_border)
-
-# Completed in range
-ws2[f"C{r_date_data}"].value = (
-    f'=IF(OR({from_cell}="",{to_cell}=""),"",'
-    f'SUMPRODUCT((INT({LT}!B4:B1000)>={from_cell})*(INT({LT}!B4:B1000)<={to_cell})*({LT}!AB4:AB1000="Completed")))'
-)
-apply_cell(ws2[f"C{r_date_data}"], font=Font(name="Calibri", bold=True, size=16, color=DARK_BLUE),
-           fill=make_fill(LIGHT_BLUE), alignment=center_al, border=thin_border)
-
-# Pending in range
-ws2[f"D{r_date_data}"].value = (
-    f'=IF(OR({from_cell}="",{to_cell}=""),"",'
-    f'SUMPRODUCT((INT({LT}!B4:B1000)>={from_cell})*(INT({LT}!B4:B1000)<={to_cell})*({LT}!AB4:AB1000="Pending")))'
-)
-apply_cell(ws2[f"D{r_date_data}"], font=Font(name="Calibri", bold=True, size=16, color=YELLOW_FONT),
-           fill=make_fill(LIGHT_BLUE), alignment=center_al, border=thin_border)
-
-# Cancelled in range
-ws2[f"E{r_date_data}"].value = (
-    f'=IF(OR({from_cell}="",{to_cell}=""),"",'
-    f'SUMPRODUCT((INT({LT}!B4:B1000)>={from_cell})*(INT({LT}!B4:B1000)<={to_cell})*({LT}!AB4:AB1000="Cancelled")))'
-)
-apply_cell(ws2[f"E{r_date_data}"], font=Font(name="Calibri", bold=True, size=16, color=RED_FONT),
-           fill=make_fill(LIGHT_BLUE), alignment=center_al, border=thin_border)
-
-# Revenue in range
-ws2[f"F{r_date_data}"].value = (
-    f'=IF(OR({from_cell}="",{to_cell}=""),"",'
-    f'SUMPRODUCT((INT({LT}!B4:B1000)>={from_cell})*(INT({LT}!B4:B1000)<={to_cell})'
-    f'*({LT}!AN4:AN1000="Received")*({LT}!AM4:AM1000)))'
-)
-apply_cell(ws2[f"F{r_date_data}"], font=Font(name="Calibri", bold=True, size=16, color=DARK_BLUE),
-           fill=make_fill(LIGHT_BLUE), alignment=center_al, border=thin_border,
-           number_format=CURRENCY_FMT)
-
-# Pending Payments in range
-ws2[f"G{r_date_data}"].value = (
-    f'=IF(OR({from_cell}="",{to_cell}=""),"",'
-    f'SUMPRODUCT((INT({LT}!B4:B1000)>={from_cell})*(INT({LT}!B4:B1000)<={to_cell})'
-    f'*({LT}!AN4:AN1000="Pending")*({LT}!AM4:AM1000)))'
-)
-apply_cell(ws2[f"G{r_date_data}"], font=Font(name="Calibri", bold=True, size=16, color=RED_FONT),
-           fill=make_fill(LIGHT_BLUE), alignment=center_al, border=thin_border,
-           number_format=CURRENCY_FMT)
+# Date-wise formulas compare the day of the Timestamp. With --day-helper that is
+# the hidden Lead Day column; otherwise INT(Timestamp) >= From / <= To, which
+# xlsx_formulas turns into the COUNTIFS/SUMIFS range Timestamp >= INT(From),
+# Timestamp < INT(To)+1 on the raw column.
+ts_range = lt("timestamp")
+if "lead_day" in SCHEMA.by_key:
+    in_range = [cmp(lt("lead_day"), ">=", Ref(from_cell)), cmp(lt("lead_day"), "<=", Ref(to_cell))]
+else:
+    in_range = [cmp(ts_range, ">=", Ref(from_cell), fn="INT"), cmp(ts_range, "<=", Ref(to_cell), fn="INT")]
+date_metrics = [
+    # (column, aggregate, font colour, number format)
+    ("A", cond_count(*in_range, not_blank(ts_range)), DARK_BLUE, None),                   # Orders in Range
+    ("B", cond_count(*in_range, eq(lt("status"), "Confirmed")), GREEN_FONT, None),        # Confirmed
+    ("C", cond_count(*in_range, eq(lt("status"), "Completed")), DARK_BLUE, None),         # Completed
+    ("D", cond_count(*in_range, eq(lt("status"), "Pending")), YELLOW_FONT, None),         # Pending
+    ("E", cond_count(*in_range, eq(lt("status"), "Cancelled")), RED_FONT, None),          # Cancelled
+    ("F", cond_sum(lt("payment_value"), *in_range, paid), DARK_BLUE, CURRENCY_FMT),       # Revenue
+    ("G", cond_sum(lt("payment_value"), *in_range, eq(lt("payment_status"), "Pending")),  # Pending Payments
+     RED_FONT, CURRENCY_FMT),
+]
+for col_l, metric, fg, fmt in date_metrics:
+    # Orders in Range shows a prompt until both dates are filled in
+    blank = "Enter dates" if col_l == "A" else ""
+    template = f'=IF(OR({from_cell}="",{to_cell}=""),"{blank}",{{0}})'
+    cell = FORMULAS.put(ws2, f"{col_l}{r_date_data}", metric, template)
+    apply_cell(cell, font=Font(name="Calibri", bold=True, size=16, color=fg),
+               fill=make_fill(LIGHT_BLUE), alignment=center_al, border=thin_border,
+               number_format=fmt)
 
 # ── CHARTS ───────────────────────────────────────────────────────────────
 
@@ -1075,6 +1296,99 @@ ws2.add_chart(chart3, f"K{R_SRC}")
 # Freeze pane
 ws2.freeze_panes = "A4"
 
+TIMINGS.mark("Dashboard")
+
+# ═══════════════════════════════════════════════════════════════════════════
+#  SHEET 2b: DASHBOARD SNAPSHOT (--snapshot)
+# ═══════════════════════════════════════════════════════════════════════════
+# Every Dashboard metric computed in Python in one pass over the lead records
+# and written as static values: opens instantly, nothing to recalculate.
+if args.snapshot:
+    snap = compute_dashboard(iter_lead_records(), DATE_FROM, DATE_TO)
+    ws_snap = wb.create_sheet("Dashboard Snapshot")
+    ws_snap.sheet_properties.tabColor = DARK_BLUE
+
+    ws_snap.merge_cells("A1:I1")
+    c = ws_snap["A1"]
+    c.value = "DASHBOARD SNAPSHOT — PRECOMPUTED VALUES"
+    apply_cell(c, font=Font(name="Calibri", bold=True, size=16, color=WHITE),
+               fill=make_fill(DARK_BLUE), alignment=center_al)
+    ws_snap.row_dimensions[1].height = 45
+
+    ws_snap.merge_cells("A2:I2")
+    c = ws_snap["A2"]
+    c.value = (f"Computed at {datetime.now():%d-%b-%Y %H:%M} from {snap.leads:,} leads — "
+               f"static values, regenerate the workbook to refresh")
+    apply_cell(c, font=Font(name="Calibri", bold=True, size=11, color=WHITE),
+               fill=make_fill(MEDIUM_BLUE), alignment=center_al)
+    ws_snap.row_dimensions[2].height = 28
+
+    for col_l in ["A", "B", "C", "D", "E", "F", "G", "H", "I"]:
+        ws_snap.column_dimensions[col_l].width = 18
+
+    snap_header_font = Font(name="Calibri", bold=True, size=10, color=WHITE)
+    snap_label_font = Font(name="Calibri", bold=True, size=10)
+
+    def snap_section(row, title, headers, rows, formats):
+        """Title bar, header row and value rows; `formats` is one number format per column."""
+        last_l = get_column_letter(len(headers))
+        ws_snap.merge_cells(f"A{row}:{last_l}{row}")
+        ws_snap[f"A{row}"].value = title
+        apply_cell(ws_snap[f"A{row}"], font=Font(name="Calibri", bold=True, size=12, color=WHITE),
+                   fill=make_fill(DARK_BLUE), alignment=center_al)
+        row += 1
+        for i, hdr in enumerate(headers, 1):
+            cell = ws_snap.cell(row=row, column=i, value=hdr)
+            apply_cell(cell, font=snap_header_font, fill=make_fill(MEDIUM_BLUE),
+                       alignment=center_al, border=thin_border)
+        for values in rows:
+            row += 1
+            for i, (value, fmt) in enumerate(zip(values, formats), 1):
+                cell = ws_snap.cell(row=row, column=i, value=value)
+                if isinstance(value, str):
+                    apply_cell(cell, font=snap_label_font, alignment=left_al, border=thin_border,
+                               fill=make_fill(LIGHT_GRAY))
+                else:
+                    apply_cell(cell, font=data_font, alignment=center_al, border=thin_border,
+                               number_format=fmt)
+        return row + 2
+
+    def breakdown_rows(labels, lookup, metrics):
+        rows = [[label] + [lookup(label, m) for m in metrics] for label in labels]
+        rows.append(["TOTAL"] + [sum(r[i] for r in rows) for i in range(1, len(metrics) + 1)])
+        return rows
+
+    row = 4
+    row = snap_section(row, "ORDER STATISTICS", stat_headers,
+                       [[snap.total_orders] + [snap.status_count(h) for h in stat_headers[1:]]],
+                       ['0'] * len(stat_headers))
+    row = snap_section(row, "PAYMENT SUMMARY", pay_headers,
+                       [[snap.payment[h] for h in pay_headers]],
+                       ['0' if h == "Refund Completed" else CURRENCY_FMT for h in pay_headers])
+    row = snap_section(row, "DISCOUNT SUMMARY", disc_headers,
+                       [[snap.discount_orders, snap.discount_total, snap.discount_average]],
+                       ['0', CURRENCY_FMT, CURRENCY_FMT])
+    row = snap_section(row, "ORDER SOURCE TRACKING", src_col_headers,
+                       breakdown_rows(SOURCES, snap.source, ["orders", "Confirmed", "Completed", "revenue"]),
+                       [None, '0', '0', '0', CURRENCY_FMT])
+    row = snap_section(row, "SERVICE-WISE BREAKDOWN", svc_col_headers,
+                       breakdown_rows(SERVICES, snap.service,
+                                      ["orders", "Confirmed", "Scheduled", "Completed", "Pending",
+                                       "Cancelled", "revenue"]),
+                       [None] + ['0'] * 6 + [CURRENCY_FMT])
+    row = snap_section(row, "AREA-WISE ORDER DISTRIBUTION", area_col_headers,
+                       breakdown_rows(AREAS, snap.area, ["orders", "Confirmed", "Completed", "Pending", "revenue"]),
+                       [None, '0', '0', '0', '0', CURRENCY_FMT])
+    row = snap_section(row, f"DATE-WISE REPORT ({DATE_FROM:%d-%b-%Y} to {DATE_TO:%d-%b-%Y})",
+                       date_report_headers,
+                       [[snap.in_range(m) for m in ["orders", "Confirmed", "Completed", "Pending",
+                                                    "Cancelled", "revenue", "pending payments"]]],
+                       ['0'] * 5 + [CURRENCY_FMT] * 2)
+    ws_snap.freeze_panes = "A4"
+
+if args.snapshot:
+    TIMINGS.mark("Dashboard Snapshot")
+
 # ═══════════════════════════════════════════════════════════════════════════
 #  SHEET 3: FORM FIELDS REFERENCE
 # ═══════════════════════════════════════════════════════════════════════════
@@ -1111,19 +1425,19 @@ ws3.column_dimensions["C"].width = 55
 
 # Form fields reference with original column mapping
 form_fields = [
-    ("Customer Name", "Short Answer", "Required. Full name of the customer. (Maps to Lead Tracker column D)"),
-    ("Phone Number", "Short Answer", "Required. Primary contact number (10 digits). (Maps to column E)"),
-    ("WhatsApp Number", "Short Answer", "Optional. WhatsApp contact if different from phone. (Maps to column F)"),
-    ("Email", "Short Answer", "Optional. Customer email for invoices/updates. (Maps to column H)"),
-    ("City", "Dropdown", f"{CITY_LIST} (Maps to column I)"),
-    ("Area / Locality", "Short Answer", f"e.g. Indiranagar, Koramangala, HSR Layout, Whitefield, JP Nagar (Maps to column J)"),
-    ("Full Address", "Paragraph", "Complete address with landmark and pincode. (Maps to column K)"),
-    ("BHK", "Dropdown", f"{BHK_LIST} (Maps to column L)"),
-    ("SQFT (Approx)", "Short Answer", "Approximate area in square feet. (Maps to column M)"),
-    ("Service 1", "Dropdown", f"{SERVICE_LIST} (Maps to column N)"),
-    ("Preferred Date", "Date", "Customer's preferred service date. (Maps to column Y)"),
-    ("Time Slot", "Dropdown", f"{SLOT_LIST} (Maps to column Z)"),
-    ("Order Source", "Dropdown", f"{SOURCE_LIST} (Maps to column AA)"),
+    ("Customer Name", "Short Answer", f"Required. Full name of the customer. (Maps to Lead Tracker column {L['customer']})"),
+    ("Phone Number", "Short Answer", f"Required. Primary contact number (10 digits). (Maps to column {L['phone']})"),
+    ("WhatsApp Number", "Short Answer", f"Optional. WhatsApp contact if different from phone. (Maps to column {L['whatsapp']})"),
+    ("Email", "Short Answer", f"Optional. Customer email for invoices/updates. (Maps to column {L['email']})"),
+    ("City", "Dropdown", f"{CITY_LIST} (Maps to column {L['city']})"),
+    ("Area / Locality", "Short Answer", f"e.g. Indiranagar, Koramangala, HSR Layout, Whitefield, JP Nagar (Maps to column {L['area']})"),
+    ("Full Address", "Paragraph", f"Complete address with landmark and pincode. (Maps to column {L['address']})"),
+    ("BHK", "Dropdown", f"{BHK_LIST} (Maps to column {L['bhk']})"),
+    ("SQFT (Approx)", "Short Answer", f"Approximate area in square feet. (Maps to column {L['sqft']})"),
+    ("Service 1", "Dropdown", f"{SERVICE_LIST} (Maps to column {L['service1']})"),
+    ("Preferred Date", "Date", f"Customer's preferred service date. (Maps to column {L['preferred_date']})"),
+    ("Time Slot", "Dropdown", f"{SLOT_LIST} (Maps to column {L['slot']})"),
+    ("Order Source", "Dropdown", f"{SOURCE_LIST} (Maps to column {L['source']})"),
 ]
 
 for i, (field, ftype, notes) in enumerate(form_fields):
@@ -1152,43 +1466,47 @@ link_instructions = [
     "1. Create a Google Form at forms.google.com with the fields listed above (in the same order).",
     "2. Go to Responses tab in the Form > Click the Google Sheets icon > Select 'Select existing spreadsheet'.",
     "3. Choose your Lead Tracker spreadsheet and select the 'Lead Tracker' sheet.",
-    "4. Google Forms will write responses starting from column B (Timestamp) in the Lead Tracker sheet.",
-    "5. Column A = S.No (auto), Column B = Timestamp (auto from Form), Column C = Order ID (auto).",
+    f"4. Google Forms will write responses starting from column {L['timestamp']} (Timestamp) in the Lead Tracker sheet.",
+    f"5. Column {L['sno']} = S.No (auto), Column {L['timestamp']} = Timestamp (auto from Form), Column {L['order_id']} = Order ID (auto).",
     "",
     "COLUMN MAPPING (Original Layout):",
-    "Column A: S.No (auto-calculated)",
-    "Column B: Timestamp",
-    "Column C: Order ID (auto-calculated)",
-    "Column D: Customer Name",
-    "Column E: Phone Number",
-    "Column F: WhatsApp Number",
-    "Column G: Alternate Phone",
-    "Column H: Email",
-    "Column I: City",
-    "Column J: Area / Locality",
-    "Column K: Full Address",
-    "Column L: BHK",
-    "Column M: SQFT",
-    "Column N-U: Services 1-4 & Prices 1-4",
-    "Column V: Total Value (auto)",
-    "Column W: Discount Amount",
-    "Column X: Discounted Total (auto)",
-    "Column Y: Preferred Date",
-    "Column Z: Slot Time",
-    "Column AA: Order Source",
-    "Column AB: Order Status",
-    "Column AC-AI: Notes, Vendor, Scheduling, Completion",
-    "Column AJ-AR: Payment, Balance, Invoice, Transaction",
+    f"Column {L['sno']}: S.No (auto-calculated)",
+    f"Column {L['timestamp']}: Timestamp",
+    f"Column {L['order_id']}: Order ID (auto-calculated)",
+    f"Column {L['customer']}: Customer Name",
+    f"Column {L['phone']}: Phone Number",
+    f"Column {L['whatsapp']}: WhatsApp Number",
+    f"Column {L['alt_phone']}: Alternate Phone",
+    f"Column {L['email']}: Email",
+    f"Column {L['city']}: City",
+    f"Column {L['area']}: Area / Locality",
+    f"Column {L['address']}: Full Address",
+    f"Column {L['bhk']}: BHK",
+    f"Column {L['sqft']}: SQFT",
+    f"Column {L['service1']}-{L['price4']}: Services 1-4 & Prices 1-4",
+    f"Column {L['total']}: Total Value (auto)",
+    f"Column {L['discount']}: Discount Amount",
+    f"Column {L['discounted_total']}: Discounted Total (auto)",
+    f"Column {L['preferred_date']}: Preferred Date",
+    f"Column {L['slot']}: Slot Time",
+    f"Column {L['source']}: Order Source",
+    f"Column {L['status']}: Order Status",
+    f"Column {L['notes']}-{L['completed_date']}: Notes, Vendor, Scheduling, Completion",
+    f"Column {L['advance']}-{L['txn_ref']}: Payment, Balance, Invoice, Transaction",
     "",
-    "Auto-calculated columns (S.No=A, Order ID=C, Total Value=V, Discounted Total=X,",
-    "Pending Balance=AL, Invoice Number=AQ) will populate automatically when Timestamp data arrives.",
+    f"Auto-calculated columns (S.No={L['sno']}, Order ID={L['order_id']}, Total Value={L['total']}, Discounted Total={L['discounted_total']},",
+    f"Pending Balance={L['pending_balance']}, Invoice Number={L['invoice']}) will populate automatically when Timestamp data arrives.",
     "",
-    "Staff manually fills: Price 1 (O), Services 2-4 & Prices (P-U), Discount (W),",
-    "Order Status (AB), Vendor details (AD-AF), Payment info (AJ-AR), etc.",
+    f"Staff manually fills: Price 1 ({L['price1']}), Services 2-4 & Prices ({L['service2']}-{L['price4']}), Discount ({L['discount']}),",
+    f"Order Status ({L['status']}), Vendor details ({L['vendor']}-{L['vendor_alt']}), Payment info ({L['advance']}-{L['txn_ref']}), etc.",
     "",
     "ALTERNATIVE: If using a SEPARATE response sheet, use IMPORTRANGE formulas to pull data.",
     "",
     "IMPORTANT: When you paste the first IMPORTRANGE, Google Sheets will ask 'Allow access?' - click ALLOW.",
+    "",
+    "BULK IMPORT: Download the responses (File > Download > CSV or .xlsx) and regenerate the workbook with",
+    "  python create_lead_tracker_v3.py --stream --import responses.csv",
+    "Phone numbers are cleaned to 10 digits and timestamps/dates parsed (--date-order mdy for US-style dates).",
 ]
 
 for li, text in enumerate(link_instructions):
@@ -1199,17 +1517,58 @@ for li, text in enumerate(link_instructions):
                alignment=left_al, border=thin_border)
     ws3.row_dimensions[r].height = 22
 
+TIMINGS.mark("Form Fields")
+
 # ═══════════════════════════════════════════════════════════════════════════
 #  SAVE
 # ═══════════════════════════════════════════════════════════════════════════
-output_dir = "/var/lib/freelancer/projects/40182876"
-output_file = os.path.join(output_dir, "Home_Services_Lead_Tracker.xlsx")
-os.makedirs(output_dir, exist_ok=True)
-wb.save(output_file)
+output_file = args.output
+os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+if args.stream:
+    # Replay the laid-out sheets into a write-only workbook; the Lead Tracker
+    # data rows are generated on the fly and flushed to disk row by row.
+    out_wb = Workbook(write_only=True)
+    out_styles = STYLES.rebind(out_wb)
+    for name, defined_name in wb.defined_names.items():
+        out_wb.defined_names[name] = copy(defined_name)
+    for ws in wb.worksheets:
+        dst = out_wb.create_sheet(ws.title)
+        if ws is ws1:
+            extra_rows = lead_rows(dst, lead_records, out_styles)
+        elif ws.title == "Order Lines":
+            extra_rows = order_line_cells(dst, out_styles)
+        else:
+            extra_rows = None
+        stream_copy_sheet(ws, dst, extra_rows=extra_rows)
+        TIMINGS.mark(f"stream: {ws.title}")
+    out_wb.save(output_file)
+else:
+    wb.save(output_file)
+TIMINGS.mark("save")
+if args.append_ready:
+    append_leads(output_file, [])
+    TIMINGS.mark("append index")
+if args.timings:
+    TIMINGS.write(args.timings)
 print(f"Successfully created: {output_file}")
 print(f"Sheets: {wb.sheetnames}")
 print(f"Lead Tracker columns: {num_cols} (A to {last_col_letter})")
 print(f"Column layout: A=S.No, B=Timestamp, C=Order ID, D=Customer Name ... AR=Transaction Ref (ORIGINAL ORDER)")
 print(f"Dashboard sections: Order Stats, Payment Summary, Discount Summary, "
       f"Source Tracking, Service Breakdown, Area Distribution, Date-wise Report + 3 Charts")
+print(f"Tracker capacity: {TRACKER_CAPACITY} leads (rows {FIRST_DATA_ROW}-{RANGE_LAST_ROW}), "
+      f"{len(wb.defined_names)} named ranges")
+print(f"Dashboard aggregates: {FORMULAS.summary()}")
+if FORM_IMPORT:
+    print(f"Import ({args.import_file}): {FORM_IMPORT.summary()}")
+if LEAD_STORE:
+    print(f"Store ({args.from_db}): {STORED_ROWS:,} leads rendered")
+if SAVED_ROWS is not None:
+    print(f"Store ({args.to_db}): {SAVED_ROWS:,} leads saved")
+if EXPORT:
+    print(f"Export: {EXPORT.summary()}")
+if LEAD_INDEX:
+    print(f"Duplicates ({args.dedup}): {LEAD_INDEX.summary()}")
+if args.formula_report:
+    print(FORMULAS.report())
 print("Done!")
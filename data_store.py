@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+SQLite store of record for the Lead Tracker leads and the MIS transactional
+sheets, so the workbooks can be rendered from a date-range query instead of
+holding the whole history.
+
+  leads            one column per Lead Tracker input field (lead_tracker_schema;
+                   auto columns are formulas and not stored), indexed on
+                   timestamp, status, source, area and phone; unique on
+                   LEAD_KEY (timestamp, customer, phone)
+  <MIS table>      one column per input header of the sheet (mis_schema.MIS_HEADERS),
+                   indexed on the sheet's date column and unique on its natural
+                   key (mis_schema.MIS_TABLES)
+
+Saving is idempotent: a record whose key is already stored replaces the
+stored row (INSERT OR REPLACE), so re-running a generator with --to-db
+refreshes the rows instead of doubling them.
+
+The database runs in WAL mode, so a generator can read while leads are being
+written.  Rows go in through executemany in batches of BATCH_ROWS inside one
+transaction per call, and come back through a cursor read BATCH_ROWS at a time
+as dicts keyed like the generators' records - dates as datetimes.
+
+Usage (generators):
+  python create_lead_tracker_v3.py --history 100000 --to-db leads.db
+  python create_lead_tracker_v3.py --from-db leads.db --days 90
+  python mis_system_v7.py --rows 100000 --to-db mis.db
+  python mis_system_v7.py --from-db mis.db --since 2025-01-10 --until 2025-01-20
+"""
+
+import sqlite3
+from datetime import date, datetime, timedelta
+
+from lead_tracker_schema import LEAD_SCHEMA
+from mis_schema import MIS_TABLES, is_date_column
+
+BATCH_ROWS = 5000
+LEADS = "leads"
+LEAD_INDEXES = ("timestamp", "status", "source", "area", "phone")
+LEAD_KEY = ("timestamp", "customer", "phone")
+
+# Dates are stored as ISO text (sortable, so range queries use the index) and
+# read back as datetimes through the TIMESTAMP column type
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+
+
+def _timestamp(value):
+    text = value.decode()
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return text
+
+
+sqlite3.register_converter("TIMESTAMP", _timestamp)
+
+LEAD_TYPES = {"date": "TIMESTAMP", "datetime": "TIMESTAMP", "number": "NUMERIC", "currency": "NUMERIC"}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _column_type(header):
+    return " TIMESTAMP" if is_date_column(header) else ""
+
+
+def _key_columns(key):
+    # NULLs never collide in a UNIQUE index, so blank key fields compare as ''
+    return ", ".join(f"COALESCE({_quote(name)}, '')" for name in key)
+
+
+def date_window(days=None, since=None, until=None, today=None):
+    """(since, until) datetimes of a query window; --days N means the last N days up to today."""
+    if days:
+        today = today or datetime.now()
+        since = datetime(today.year, today.month, today.day) - timedelta(days=days - 1)
+    if until is not None and until.time() == datetime.min.time():
+        until = until + timedelta(days=1) - timedelta(microseconds=1)   # whole last day
+    return since, until
+
+
+class DataStore:
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.lead_fields = [c.key for c in LEAD_SCHEMA.columns if not c.is_auto]
+        columns = ", ".join(f"{key} {LEAD_TYPES.get(LEAD_SCHEMA.by_key[key].kind, 'TEXT')}"
+                            for key in self.lead_fields)
+        with self.conn:
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {LEADS} (id INTEGER PRIMARY KEY, {columns})")
+            for key in LEAD_INDEXES:
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{LEADS}_{key} ON {LEADS} ({key})")
+            self.conn.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{LEADS}_key ON {LEADS} "
+                              f"({_key_columns(LEAD_KEY)})")
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ── Writing ──────────────────────────────────────────────────────────────
+    def _insert(self, table, fields, records):
+        sql = (f"INSERT OR REPLACE INTO {_quote(table)} ({', '.join(map(_quote, fields))}) "
+               f"VALUES ({', '.join('?' * len(fields))})")
+        count = 0
+        batch = []
+        with self.conn:
+            for record in records:
+                batch.append([record.get(field) for field in fields])
+                if len(batch) == BATCH_ROWS:
+                    self.conn.executemany(sql, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self.conn.executemany(sql, batch)
+                count += len(batch)
+        return count
+
+    def save_leads(self, records):
+        """Save lead records (dicts keyed by schema field), replacing stored leads with the same LEAD_KEY."""
+        return self._insert(LEADS, self.lead_fields, records)
+
+    def table_columns(self, table):
+        """Stored columns of MIS table `table` ([] before its first save)."""
+        return [row[1] for row in self.conn.execute(f"PRAGMA table_info({_quote(table)})")][1:]
+
+    def save_rows(self, table, headers, records):
+        """
+        Save MIS sheet records (dicts keyed by sheet header) to `table`, a
+        MIS_TABLES key, replacing stored rows with the same natural key; the
+        table is created with `headers` as its columns on first use.  Returns
+        the number saved.
+        """
+        _, date_field, key = MIS_TABLES[table]
+        if not self.table_columns(table):
+            missing = [name for name in key if name not in headers]
+            if missing:
+                raise ValueError(f"{table}: key columns {missing} are not among the headers")
+            columns = ", ".join(_quote(h) + _column_type(h) for h in headers)
+            with self.conn:
+                self.conn.execute(f"CREATE TABLE {_quote(table)} (id INTEGER PRIMARY KEY, {columns})")
+                self.conn.execute(f"CREATE INDEX idx_{table}_date ON {_quote(table)} ({_quote(date_field)})")
+                self.conn.execute(f"CREATE UNIQUE INDEX idx_{table}_key ON {_quote(table)} ({_key_columns(key)})")
+        return self._insert(table, self.table_columns(table), records)
+
+    # ── Reading ──────────────────────────────────────────────────────────────
+    def _where(self, field, since, until):
+        clauses, params = [], []
+        if since is not None:
+            clauses.append(f"{_quote(field)} >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append(f"{_quote(field)} <= ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _stream(self, sql, params):
+        cursor = self.conn.execute(sql, params)
+        fields = [d[0] for d in cursor.description]
+        while True:
+            rows = cursor.fetchmany(BATCH_ROWS)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(zip(fields, row))
+
+    def count_leads(self, since=None, until=None):
+        where, params = self._where("timestamp", since, until)
+        return self.conn.execute(f"SELECT COUNT(*) FROM {LEADS}{where}", params).fetchone()[0]
+
+    def leads(self, since=None, until=None):
+        """Leads with a Timestamp in [since, until], oldest first, read BATCH_ROWS at a time."""
+        where, params = self._where("timestamp", since, until)
+        sql = f"SELECT {', '.join(self.lead_fields)} FROM {LEADS}{where} ORDER BY timestamp, id"
+        return self._stream(sql, params)
+
+    def count_rows(self, table, since=None, until=None):
+        if not self.table_columns(table):
+            return 0
+        where, params = self._where(MIS_TABLES[table][1], since, until)
+        return self.conn.execute(f"SELECT COUNT(*) FROM {_quote(table)}{where}", params).fetchone()[0]
+
+    def rows(self, table, since=None, until=None):
+        """MIS records of `table` dated in [since, until], in date order, read BATCH_ROWS at a time."""
+        columns = self.table_columns(table)
+        if not columns:
+            return iter(())
+        date_field = MIS_TABLES[table][1]
+        where, params = self._where(date_field, since, until)
+        sql = (f"SELECT {', '.join(map(_quote, columns))} FROM {_quote(table)}{where} "
+               f"ORDER BY {_quote(date_field)}, id")
+        return self._stream(sql, params)
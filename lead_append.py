@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""
+Append new leads to an existing Lead Tracker .xlsx without loading it.
+
+append_leads() works on the zip directly.  Every zip entry except the Lead
+Tracker sheet (and xl/workbook.xml when the named ranges have to grow) is
+copied byte for byte, so charts, styles and the other sheets are left exactly
+as they were.  The new leads are written as <row> elements carrying the
+Lead Tracker's auto formulas (lead_tracker_schema) and the style indices of
+the sheet's own rows, and replace the blank pre-formatted entry rows where
+there are any.
+
+Splice point: the sheet part is compressed as one deflate stream cut by a
+full flush just before the last lead row; the zip entry's comment records
+the compressed / uncompressed offsets of that cut and the CRC-32 of the data
+before it.  An append keeps the compressed bytes before the cut, inflates
+only the short tail after it (last lead, blank entry rows, filter /
+validation / format blocks), and deflates the new rows plus that tail - so
+appending 500 leads to a 100k-row tracker costs a copy of the file rather
+than a re-compression of the sheet.  A file without a valid splice point
+(freshly generated, or saved by Excel) gets one full streaming pass first;
+create_lead_tracker_v3.py --append-ready does that pass at generation time.
+
+When the leads run past the tracker capacity, the LT_* named ranges, the
+auto filter, dropdowns and conditional formats of the Lead Tracker are
+extended to the new last row.  The Order Lines mirror and the Dashboard
+Snapshot are not; regenerate for those.  Order Lines mirrors the Lead Tracker
+rows up to the OL_Mirror_End name (4 lines per row), and the summary warns when
+the leads run past it.
+
+Usage:
+  python lead_append.py Home_Services_Lead_Tracker.xlsx --import today.csv
+  python lead_append.py Home_Services_Lead_Tracker.xlsx --synthetic 500 --seed 3
+"""
+
+import argparse
+import os
+import re
+import struct
+import time
+import zipfile
+import zlib
+from datetime import date, datetime
+from xml.sax.saxutils import escape, unescape
+
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.datetime import to_excel
+
+from lead_tracker_schema import DAY_HELPER_COLUMN, DUPLICATE_COLUMN, LEAD_SCHEMA, lead_schema
+
+SPLICE_TAG = b"lead-append:"
+ORDER_LINES = "Order Lines"
+ORDER_LINES_END = "OL_Mirror_End"     # defined name: last Lead Tracker row Order Lines mirrors
+READ_CHUNK = 1 << 20
+LEVEL = 6                      # zipfile / openpyxl default deflate level
+
+ROW_NUMBER = re.compile(rb'<row\b[^>]*?\br="(\d+)"')
+ROW_ATTRS = re.compile(rb'<row\b([^>]*?)/?>')
+CELL = re.compile(rb'<c\b[^>]*?\br="([A-Z]+)\d+"([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+STYLE_ATTR = re.compile(rb'\bs="(\d+)"')
+COL_STYLE = re.compile(rb'<col\b([^>]*)/?>')
+DIMENSION = re.compile(rb'<dimension\b[^>]*/>')
+REF_ATTR = re.compile(rb'\b(sqref|ref)="([^"]*)"')
+WB_SHEET = re.compile(rb'<sheet\b[^>]*?\bname="([^"]*)"[^>]*?\br:id="([^"]*)"')
+RELATIONSHIP = re.compile(rb'<Relationship\b[^>]*?/>')
+
+
+# ── Zip entries ──────────────────────────────────────────────────────────────
+def _raw_bytes(fh, info):
+    """Compressed bytes of a zip entry, as stored."""
+    fh.seek(info.header_offset)
+    header = fh.read(30)
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    fh.seek(info.header_offset + 30 + name_len + extra_len)
+    return fh.read(info.compress_size)
+
+
+def _dos_time(date_time):
+    y, mo, d, h, mi, s = date_time
+    return (h << 11) | (mi << 5) | (s // 2), ((y - 1980) << 9) | (mo << 5) | d
+
+
+def _write_zip(path, entries, archive_comment=b""):
+    """
+    entries: (ZipInfo, compressed bytes, CRC-32, uncompressed size, entry comment).
+    Plain (non-zip64) archive; ZipInfo supplies name, method, time and attributes.
+    """
+    central = []
+    with open(path, "wb") as fh:
+        for info, data, crc, size, comment in entries:
+            if max(len(data), size, fh.tell()) > 0xFFFFFFFF:
+                raise ValueError(f"{info.filename}: entries over 4 GB are not supported")
+            name = info.filename.encode("utf-8")
+            flags = 0x800 if not name.isascii() else 0
+            dos_time, dos_date = _dos_time(info.date_time)
+            offset = fh.tell()
+            fh.write(struct.pack("<4s5H3L2H", b"PK\x03\x04", 20, flags, info.compress_type,
+                                 dos_time, dos_date, crc, len(data), size, len(name), 0))
+            fh.write(name)
+            fh.write(data)
+            central.append(struct.pack("<4s6H3L5H2L", b"PK\x01\x02", 20, 20, flags, info.compress_type,
+                                       dos_time, dos_date, crc, len(data), size, len(name), 0,
+                                       len(comment), 0, 0, info.external_attr, offset) + name + comment)
+        start = fh.tell()
+        for record in central:
+            fh.write(record)
+        fh.write(struct.pack("<4s4H2LH", b"PK\x05\x06", 0, 0, len(central), len(central),
+                             fh.tell() - start, start, len(archive_comment)))
+        fh.write(archive_comment)
+
+
+def sheet_part(zf, sheet):
+    """Zip path of the worksheet named `sheet`."""
+    rel_id = None
+    for name, rid in WB_SHEET.findall(zf.read("xl/workbook.xml")):
+        if unescape(name.decode("utf-8"), {"&apos;": "'", "&quot;": '"'}) == sheet:
+            rel_id = rid
+    if rel_id is None:
+        raise KeyError(f"no sheet named {sheet!r}")
+    for rel in RELATIONSHIP.findall(zf.read("xl/_rels/workbook.xml.rels")):
+        if re.search(rb'\bId="%s"' % re.escape(rel_id), rel):
+            target = re.search(rb'\bTarget="([^"]*)"', rel).group(1).decode("utf-8")
+            return target.lstrip("/") if target.startswith("/") else "xl/" + target
+    raise KeyError(f"no relationship {rel_id.decode()} for sheet {sheet!r}")
+
+
+# ── Sheet XML ────────────────────────────────────────────────────────────────
+def _row_end(buf, pos):
+    """End offset of the <row> element starting at pos, or -1 if buf cuts it off."""
+    gt = buf.find(b">", pos)
+    if gt < 0:
+        return -1
+    if buf[gt - 1:gt] == b"/":
+        return gt + 1
+    end = buf.find(b"</row>", gt)
+    return -1 if end < 0 else end + 6
+
+
+def _sheet_pieces(chunks, in_rows=False):
+    """
+    Split streamed sheet XML into ("prefix", up to and including <sheetData>),
+    ("row", one <row> element) ... and ("rest", </sheetData> to the end).
+    in_rows: the XML starts inside <sheetData> (a spliced tail).
+    """
+    chunks = iter(chunks)
+    buf = b""
+    for chunk in chunks:
+        buf += chunk
+        if not in_rows:
+            start = buf.find(b"<sheetData")
+            gt = buf.find(b">", start) if start >= 0 else -1
+            if gt < 0:
+                continue
+            if buf[gt - 1:gt] == b"/":                      # <sheetData/>
+                yield "prefix", buf[:start] + b"<sheetData>"
+                buf = b"</sheetData>" + buf[gt + 1:]
+            else:
+                yield "prefix", buf[:gt + 1]
+                buf = buf[gt + 1:]
+            in_rows = True
+        pos = 0
+        while True:
+            while buf[pos:pos + 1].isspace():
+                pos += 1
+            if not buf.startswith(b"<row", pos):
+                break
+            end = _row_end(buf, pos)
+            if end < 0:
+                break
+            yield "row", buf[pos:end]
+            pos = end
+        buf = buf[pos:]
+        if buf.startswith(b"</sheetData>"):
+            break
+    for chunk in chunks:
+        buf += chunk
+    yield "rest", buf
+
+
+def _cells(row):
+    """{column letter: (cell attributes, inner XML)} of a <row> element."""
+    return {m.group(1).decode(): (m.group(2), m.group(3)) for m in CELL.finditer(row)}
+
+
+def _column_styles(prefix):
+    """{column letter: style index} from the <cols> of the sheet."""
+    styles = {}
+    for attrs in COL_STYLE.findall(prefix):
+        style = STYLE_ATTR.search(attrs)
+        lo = re.search(rb'\bmin="(\d+)"', attrs)
+        hi = re.search(rb'\bmax="(\d+)"', attrs)
+        if style and lo and hi:
+            for idx in range(int(lo.group(1)), int(hi.group(1)) + 1):
+                styles[get_column_letter(idx)] = style.group(1).decode()
+    return styles
+
+
+class TrackerRows:
+    """
+    Classifies Lead Tracker rows and builds new ones.  A row holds a lead
+    when it is below the header row and its Timestamp cell has a value.
+    The optional columns (Lead Day, Duplicate Of) are recognized by the
+    header row in `sheet_start`.
+    """
+
+    def __init__(self, sheet_start=b""):
+        self.col_styles = _column_styles(sheet_start)
+        headers = set()
+        row = re.search(rb'<row\b[^>]*?\br="%d".*?</row>' % LEAD_SCHEMA.header_row, sheet_start, re.S)
+        for _, inner in _cells(row.group(0)).values() if row else ():
+            headers.add(unescape(b"".join(re.findall(rb"<t\b[^>]*>(.*?)</t>", inner or b"")).decode("utf-8")))
+        self.schema = lead_schema(day_helper=DAY_HELPER_COLUMN.header in headers,
+                                  duplicate_flag=DUPLICATE_COLUMN.header in headers)
+        self.timestamp = LEAD_SCHEMA.letter["timestamp"].encode()
+        self.first_row = LEAD_SCHEMA.first_row
+        self.timestamp_cell = re.compile(rb'<c\b[^>]*?\br="%s\d+"[^>]*?(?:/>|>(.*?)</c>)' % self.timestamp, re.S)
+
+    def number(self, row):
+        return int(ROW_NUMBER.match(row).group(1))
+
+    def is_lead(self, row):
+        if self.number(row) < self.first_row:
+            return False
+        m = self.timestamp_cell.search(row)
+        return bool(m and m.group(1) and re.search(rb"<v>[^<]|<is>", m.group(1)))
+
+    def template(self, blank, lead):
+        """Row attributes, cell styles and schema from a blank entry row and/or the last lead row."""
+        styles = {}
+        attrs = b""
+        for row in (lead, blank):                # blank (pre-formatted) styles win
+            if row is None:
+                continue
+            attrs = re.sub(rb'\s*\b(r|spans)="[^"]*"', b"", ROW_ATTRS.match(row).group(1))
+            for letter, (cell_attrs, _) in _cells(row).items():
+                style = STYLE_ATTR.search(cell_attrs)
+                styles[letter] = style.group(1).decode() if style else None
+        self.attrs = attrs.decode()
+        self.styles = styles
+
+    def build(self, record, r):
+        formulas = self.schema.formulas(r)
+        cells = []
+        for col in self.schema.columns:
+            ref = f"{col.letter}{r}"
+            style = self.styles.get(col.letter, self.col_styles.get(col.letter))
+            s = f' s="{style}"' if style is not None else ""
+            if col.is_auto:
+                cells.append(f'<c r="{ref}"{s}><f>{escape(formulas[col.letter][1:])}</f></c>')
+                continue
+            value = record.get(col.key)
+            if value is None or value == "":
+                if col.letter in self.styles:
+                    cells.append(f'<c r="{ref}"{s}/>')
+            elif isinstance(value, bool):
+                cells.append(f'<c r="{ref}"{s} t="b"><v>{int(value)}</v></c>')
+            elif isinstance(value, (int, float)):
+                cells.append(f'<c r="{ref}"{s} t="n"><v>{value!r}</v></c>')
+            elif isinstance(value, (datetime, date)):
+                cells.append(f'<c r="{ref}"{s} t="n"><v>{to_excel(value)!r}</v></c>')
+            else:
+                text = ILLEGAL_CHARACTERS_RE.sub("", str(value))
+                space = ' xml:space="preserve"' if text != text.strip() else ""
+                cells.append(f'<c r="{ref}"{s} t="inlineStr"><is><t{space}>{escape(text)}</t></is></c>')
+        return f'<row r="{r}"{self.attrs}>{"".join(cells)}</row>'.encode("utf-8")
+
+
+def _extend_refs(xml, old_last, new_last):
+    """Move every sqref/ref range that ends on row old_last down to new_last."""
+    end = re.compile(rb"(:\$?[A-Z]+\$?)%d\b" % old_last)
+
+    def widen(m):
+        return m.group(1) + b'="' + end.sub(rb"\g<1>%d" % new_last, m.group(2)) + b'"'
+    return REF_ATTR.sub(widen, xml)
+
+
+# ── Append ───────────────────────────────────────────────────────────────────
+class AppendResult:
+    def __init__(self, rows, first_row, last_row, capacity_row, full_pass, seconds, order_lines_end=None):
+        self.rows = rows
+        self.first_row = first_row
+        self.last_row = last_row
+        self.capacity_row = capacity_row
+        self.full_pass = full_pass
+        self.seconds = seconds
+        self.order_lines_end = order_lines_end    # None without an Order Lines sheet
+
+    def summary(self):
+        if not self.rows:
+            text = "no leads appended"
+        else:
+            text = f"{self.rows:,} leads appended (rows {self.first_row}-{self.last_row})"
+        text += f", ranges up to row {self.capacity_row}, {self.seconds:.2f}s"
+        if self.full_pass:
+            text += " (full pass to set the splice point)"
+        if self.order_lines_end is not None and self.last_row > self.order_lines_end:
+            text += (f"; WARNING: {ORDER_LINES} mirrors rows up to {self.order_lines_end} only, rows "
+                     f"{self.order_lines_end + 1}-{self.last_row} are missing from it - regenerate to include them")
+        return text
+
+
+def _order_lines_end(workbook_xml, capacity_row):
+    """Last Lead Tracker row the Order Lines sheet mirrors, or None without that sheet."""
+    end = re.search(rb'<definedName\b[^>]*\bname="%s"[^>]*>(\d+)</definedName>' % ORDER_LINES_END.encode(),
+                    workbook_xml)
+    if end:
+        return int(end.group(1))
+    sheets = [unescape(name.decode("utf-8")) for name, _ in WB_SHEET.findall(workbook_xml)]
+    # Trackers generated before the name: Order Lines was sized to the capacity
+    return capacity_row if ORDER_LINES in sheets else None
+
+
+def _splice_point(info):
+    comment = info.comment or b""
+    if not comment.startswith(SPLICE_TAG):
+        return None
+    try:
+        c_off, u_off, crc = comment[len(SPLICE_TAG):].split(b",")
+        return int(c_off), int(u_off), int(crc, 16)
+    except ValueError:
+        return None
+
+
+def _fast_tail(raw, info, point):
+    """(head bytes, head size, head CRC, tail XML) from a valid splice point, else None."""
+    c_off, u_off, crc = point
+    if c_off > len(raw):
+        return None
+    try:
+        tail = zlib.decompress(raw[c_off:], -15)
+    except zlib.error:
+        return None
+    if u_off + len(tail) != info.file_size or zlib.crc32(tail, crc) != info.CRC:
+        return None
+    return raw[:c_off], u_off, crc, tail
+
+
+def _full_pass(zf, info, compressor):
+    """Stream the whole sheet once: (compressed head, head size, head CRC, tail XML)."""
+    with zf.open(info) as fh:
+        pieces = _sheet_pieces(iter(lambda: fh.read(READ_CHUNK), b""))
+        out = []
+        batch = []                               # settled rows, compressed a few MB at a time
+        batch_size = size = crc = 0
+        rows = TrackerRows()
+        held = []                                # last lead row onwards
+        for kind, data in pieces:
+            if kind == "prefix":
+                # Dimension hints would go stale with every append; they are optional
+                batch.append(DIMENSION.sub(b"", data))
+            elif kind == "rest":
+                held.append(data)
+            elif rows.is_lead(data):
+                batch.extend(held)
+                batch_size += sum(map(len, held))
+                held = [data]
+            elif held or rows.number(data) >= rows.first_row:
+                held.append(data)
+            else:
+                batch.append(data)
+            if batch_size >= READ_CHUNK or kind == "rest":
+                settled = b"".join(batch)
+                out.append(compressor.compress(settled))
+                size += len(settled)
+                crc = zlib.crc32(settled, crc)
+                batch = []
+                batch_size = 0
+    return b"".join(out), size, crc, b"".join(held)
+
+
+def _sheet_start(zf, info):
+    """Start of the sheet XML, through the header row (a few KB decompressed)."""
+    header_row = b'<row r="%d"' % LEAD_SCHEMA.header_row
+    out = b""
+    with zf.open(info) as fh:
+        for chunk in iter(lambda: fh.read(1 << 16), b""):
+            out += chunk
+            at = out.find(header_row)
+            if at >= 0 and out.find(b"</row>", at) >= 0 or b"</sheetData>" in out:
+                break
+    return out
+
+
+def append_leads(path, records, output=None, sheet="Lead Tracker"):
+    """
+    Append lead `records` (dicts keyed by schema field, as the generators use)
+    after the last lead of `sheet` in the workbook at `path`, writing `output`
+    (default: replace `path`).  Returns an AppendResult.
+    """
+    started = time.perf_counter()
+    output = output or path
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as fh:
+        part = sheet_part(zf, sheet)
+        infos = zf.infolist()
+        info = zf.getinfo(part)
+        compressor = zlib.compressobj(LEVEL, zlib.DEFLATED, -15)
+
+        fast = None
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            raw = _raw_bytes(fh, info)
+            point = _splice_point(info)
+            fast = _fast_tail(raw, info, point) if point else None
+        if fast:
+            head, head_size, head_crc, tail = fast
+        else:
+            head, head_size, head_crc, tail = _full_pass(zf, info, compressor)
+            head += compressor.flush(zlib.Z_FULL_FLUSH)
+
+        rows = TrackerRows(_sheet_start(zf, info))
+        tail_pieces = list(_sheet_pieces([tail], in_rows=True))
+        tail_rows = [data for kind, data in tail_pieces if kind == "row"]
+        rest = tail_pieces[-1][1]
+        leads = [row for row in tail_rows if rows.is_lead(row)]
+        last_lead = leads[-1] if leads else None
+        next_row = rows.number(last_lead) + 1 if last_lead else LEAD_SCHEMA.first_row
+        blank = next((row for row in tail_rows if rows.number(row) >= next_row), None)
+        rows.template(blank, last_lead)
+
+        new_rows = [rows.build(record, r) for r, record in enumerate(records, next_row)]
+        last_row = next_row + len(new_rows) - 1
+        merged = ([row for row in tail_rows if rows.number(row) < next_row] + new_rows
+                  + [row for row in tail_rows if rows.number(row) > last_row])
+
+        # The next cut goes just before the last lead row
+        anchor = new_rows[-1] if new_rows else last_lead
+        cut = merged.index(anchor) if anchor is not None else 0
+        moved = b"".join(merged[:cut])
+        tail = b"".join(merged[cut:]) + rest
+
+        # Named ranges (and with them the sheet's ranges) end on the capacity row
+        workbook_xml = zf.read("xl/workbook.xml")
+        name_range = rb"('?%s'?!\$[A-Z]+\$\d+:\$[A-Z]+\$)(\d+)\b" % re.escape(sheet.replace("'", "''").encode())
+        capacity = re.search(name_range, workbook_xml)
+        capacity_row = int(capacity.group(2)) if capacity else max(last_row, next_row - 1)
+        order_lines_end = _order_lines_end(workbook_xml, capacity_row)
+        new_workbook = None
+        if last_row > capacity_row:
+            tail = _extend_refs(tail, capacity_row, last_row)
+            new_workbook = re.sub(name_range, lambda m: m.group(1) + (b"%d" % last_row if int(m.group(2)) == capacity_row
+                                                                      else m.group(2)), workbook_xml)
+            capacity_row = last_row
+
+        head += compressor.compress(moved) + compressor.flush(zlib.Z_FULL_FLUSH)
+        head_size += len(moved)
+        head_crc = zlib.crc32(moved, head_crc)
+        data = head + compressor.compress(tail) + compressor.flush()
+        comment = SPLICE_TAG + b"%d,%d,%08x" % (len(head), head_size, head_crc)
+        sheet_entry = (info, data, zlib.crc32(tail, head_crc), head_size + len(tail), comment)
+
+        entries = []
+        for item in infos:
+            if item.filename == part:
+                entries.append(sheet_entry)
+            elif item.filename == "xl/workbook.xml" and new_workbook is not None:
+                packed = zlib.compressobj(LEVEL, zlib.DEFLATED, -15)
+                entries.append((item, packed.compress(new_workbook) + packed.flush(),
+                                zlib.crc32(new_workbook), len(new_workbook), item.comment))
+            else:
+                entries.append((item, _raw_bytes(fh, item), item.CRC, item.file_size, item.comment))
+        temp = output + ".tmp"
+        _write_zip(temp, entries, zf.comment)
+    os.replace(temp, output)
+    return AppendResult(len(new_rows), next_row, last_row, capacity_row, not fast,
+                        time.perf_counter() - started, order_lines_end)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append leads to an existing Lead Tracker workbook.")
+    parser.add_argument("workbook", help="Lead Tracker .xlsx to append to")
+    parser.add_argument("--output", help="Write the result here instead of replacing the workbook")
+    parser.add_argument("--import", dest="import_file", metavar="FILE",
+                        help="Google Form responses export (.csv or .xlsx) to append")
+    parser.add_argument("--date-order", choices=["dmy", "mdy"], default="dmy",
+                        help="Day/month order of slash dates in the --import file (default dmy)")
+    parser.add_argument("--synthetic", type=int, default=0, metavar="N",
+                        help="Append N synthetic leads from the last day (for testing)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the --synthetic leads")
+    args = parser.parse_args()
+
+    if args.import_file:
+        from lead_import import FormImport
+        source = FormImport(args.import_file, date_order=args.date_order)
+        records = source.records()
+    else:
+        from synthetic_data import SyntheticData
+        source = None
+        records = SyntheticData(args.seed).leads(args.synthetic, end=datetime.now(), days=1)
+    result = append_leads(args.workbook, records, output=args.output)
+    print(f"{args.output or args.workbook}: {result.summary()}")
+    if source is not None:
+        print(f"Import ({args.import_file}): {source.summary()}")
+
+
+if __name__ == "__main__":
+    main()
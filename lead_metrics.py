@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Lead Tracker Dashboard metrics computed in Python.
+
+compute_dashboard() makes a single pass over the lead records (dicts keyed by
+schema field key) and fills hash-map group-bys for every Dashboard section.
+It follows the same rules as the Dashboard formulas so the numbers match:
+
+  - text criteria match case-insensitively (COUNTIFS/SUMIFS)
+  - amounts that are blank or not numbers count as 0 (Decimal amounts from
+    lead_loader count as numbers)
+  - Total Value exists only when Service 1 is filled in, Discounted Total
+    = Total Value - Discount (auto columns V and X)
+  - the date-wise report compares the day of the Timestamp (INT)
+"""
+
+from collections import Counter, defaultdict
+
+from cell_values import to_day, to_number
+from lead_tracker_schema import SERVICE_SLOTS, STATUS_LIST
+
+STATUSES = STATUS_LIST.split(",")
+CARD_MODES = ("debit card", "payment gateway")
+
+
+def _key(value):
+    """Criteria key of a text cell ("" for blanks)."""
+    if value is None:
+        return ""
+    return str(value).casefold()
+
+
+class DashboardMetrics:
+    """Accumulated Dashboard numbers; see compute_dashboard()."""
+
+    def __init__(self, date_from=None, date_to=None):
+        self.date_from = date_from
+        self.date_to = date_to
+        self.leads = 0
+        self.total_orders = 0
+        self.status = Counter()
+        self.payment = Counter()           # Payment Summary header -> amount / count
+        self.discount_orders = 0           # Discount > 0
+        self.discount_total = 0
+        self.discount_positive = 0         # sum of the discounts > 0, for the average
+        # label key -> Counter of metric -> value
+        self.sources = defaultdict(Counter)
+        self.services = defaultdict(Counter)
+        self.areas = defaultdict(Counter)
+        self.date_range = Counter()
+
+    def add(self, lead):
+        self.leads += 1
+        status = _key(lead.get("status"))
+        pay_status = _key(lead.get("payment_status"))
+        pay_mode = _key(lead.get("payment_mode"))
+        pay_value = to_number(lead.get("payment_value"))
+        received = pay_status == "received"
+
+        # ── Order statistics ─────────────────────────────────────────────
+        if lead.get("timestamp") not in (None, ""):
+            self.total_orders += 1
+        self.status[status] += 1
+
+        # ── Payment summary ──────────────────────────────────────────────
+        if lead.get("service1") not in (None, ""):
+            total = sum(to_number(lead.get(price_key)) for _, price_key in SERVICE_SLOTS)
+            self.payment["Total Quoted"] += total - to_number(lead.get("discount"))
+        if received:
+            self.payment["Total Received"] += pay_value
+            if pay_mode == "cash":
+                self.payment["Cash Received"] += pay_value
+            elif pay_mode == "upi":
+                self.payment["UPI Received"] += pay_value
+            elif pay_mode in CARD_MODES:
+                self.payment["Card / Gateway"] += pay_value
+        elif pay_status == "pending":
+            self.payment["Total Pending"] += pay_value
+        elif pay_status == "refund completed":
+            self.payment["Refund Completed"] += 1
+        if _key(lead.get("advance_status")) == "received":
+            self.payment["Total Advance"] += to_number(lead.get("advance"))
+        self.payment["Total Refunds"] += to_number(lead.get("refund"))
+
+        # ── Discounts ────────────────────────────────────────────────────
+        discount = to_number(lead.get("discount"))
+        self.discount_total += discount
+        if discount > 0:
+            self.discount_orders += 1
+            self.discount_positive += discount
+
+        # ── Source / area breakdowns ─────────────────────────────────────
+        for groups, key in ((self.sources, "source"), (self.areas, "area")):
+            group = groups[_key(lead.get(key))]
+            group["orders"] += 1
+            group[status] += 1
+            if received:
+                group["revenue"] += pay_value
+
+        # ── Service breakdown (each of the 4 service slots) ─────────────
+        for svc_key, price_key in SERVICE_SLOTS:
+            group = self.services[_key(lead.get(svc_key))]
+            group["orders"] += 1
+            group[status] += 1
+            if received:
+                group["revenue"] += to_number(lead.get(price_key))
+
+        # ── Date-wise report ─────────────────────────────────────────────
+        day = to_day(lead.get("timestamp"))
+        if day is not None and self.date_from is not None and self.date_from <= day <= self.date_to:
+            self.date_range["orders"] += 1
+            self.date_range[status] += 1
+            if received:
+                self.date_range["revenue"] += pay_value
+            elif pay_status == "pending":
+                self.date_range["pending payments"] += pay_value
+
+    # ── Lookups by display label ─────────────────────────────────────────
+    @staticmethod
+    def _metric(metric):
+        return _key(metric) if metric in STATUSES else metric
+
+    def status_count(self, status):
+        return self.status[_key(status)]
+
+    def source(self, label, metric):
+        return self.sources[_key(label)][self._metric(metric)]
+
+    def service(self, label, metric):
+        return self.services[_key(label)][self._metric(metric)]
+
+    def area(self, label, metric):
+        return self.areas[_key(label)][self._metric(metric)]
+
+    def in_range(self, metric):
+        return self.date_range[self._metric(metric)]
+
+    @property
+    def discount_average(self):
+        # IFERROR(AVERAGEIF(Discount, ">0"), 0)
+        if not self.discount_orders:
+            return 0
+        return self.discount_positive / self.discount_orders
+
+
+def compute_dashboard(leads, date_from=None, date_to=None):
+    """One pass over `leads`; returns the DashboardMetrics for every Dashboard section."""
+    metrics = DashboardMetrics(date_from, date_to)
+    for lead in leads:
+        metrics.add(lead)
+    return metrics
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Declarative column schema for the 44-column Lead Tracker layout (A-AR),
+plus the optional hidden helper column (AS).
+
+Each column is declared once with its field key, header, width, value kind,
+number format, alignment, dropdown list and (for auto columns) a formula
+template.  Formula templates name other columns by field key, e.g.
+'=IF({timestamp}{r}<>"",...)', so the layout can be reordered here without
+hunting for hard-coded letters in the generators.
+
+LEAD_SCHEMA is the compiled layout: letters, indexes and formulas are resolved
+once into dicts and arrays so builder loops do O(1) lookups per cell.
+"""
+
+from dataclasses import dataclass
+
+from openpyxl.utils import get_column_letter
+
+# ── Dropdown lists ───────────────────────────────────────────────────────────
+CITY_LIST = "Bangalore,Mumbai,Delhi,Hyderabad,Chennai,Pune,Other"
+BHK_LIST = "1BHK,2BHK,3BHK,4BHK,4+BHK,Not Applicable"
+SERVICE_LIST = ("Bathroom Cleaning,Kitchen Cleaning,Full Home Cleaning,"
+                "Rental Property Cleaning,Ready to Move In Cleaning,"
+                "Painting,Pest Control,Plumbing,Electrician,Other")
+SERVICES = [s.strip() for s in SERVICE_LIST.split(",")]
+SLOT_LIST = "Morning 8-10,Morning 10-12,Afternoon 12-2,Afternoon 2-4,Evening 4-6,Evening 6-8"
+SOURCE_LIST = "Website,Instagram,JustDial,Google,Referral,WhatsApp,Walk-in,Other"
+SOURCES = [s.strip() for s in SOURCE_LIST.split(",")]
+STATUS_LIST = "Confirmed,Pending,Cancelled,Scheduled,Completed,Refunded"
+ADV_STATUS_LIST = "Received,NIL,Cleared"
+PAY_STATUS_LIST = "Received,Pending,Refund Completed"
+PAY_MODE_LIST = "Cash,UPI,Debit Card,Payment Gateway,Bank Transfer,Other"
+
+AREAS = [
+    "Indiranagar", "Koramangala", "HSR Layout", "Whitefield", "JP Nagar",
+    "BTM Layout", "Electronic City", "MG Road", "Marathahalli", "Banashankari", "Other"
+]
+AREA_LIST = ",".join(AREAS)
+
+# ── Number formats ───────────────────────────────────────────────────────────
+CURRENCY_FMT = '₹#,##0'
+DATE_FMT = 'DD-MMM-YYYY'
+DATETIME_FMT = 'DD-MMM-YYYY HH:MM'
+SQFT_FMT = '#,##0'
+SERIAL_FMT = '0'
+
+# Value kinds and their default number formats
+KIND_FORMATS = {
+    "currency": CURRENCY_FMT,
+    "date": DATE_FMT,
+    "datetime": DATETIME_FMT,
+    "number": SQFT_FMT,
+    "serial": SERIAL_FMT,
+}
+
+
+@dataclass(frozen=True)
+class Column:
+    key: str                  # field key used by records and formula templates
+    header: str
+    width: float
+    kind: str = "text"        # text | phone | email | list | number | currency | date | datetime | serial | id
+    align: str = "center"     # center | left
+    choices: str = None       # comma-separated dropdown list
+    formula: str = None       # template for auto columns ({r} = row, {<key>} = column letter)
+    hidden: bool = False      # helper columns used only by dashboard formulas
+    index: int = 0            # 1-based, filled in by LeadSchema
+    letter: str = ""          # filled in by LeadSchema
+
+    @property
+    def number_format(self):
+        return KIND_FORMATS.get(self.kind)
+
+    @property
+    def is_auto(self):
+        return self.formula is not None
+
+
+class LeadSchema:
+    """
+    Compiled column layout.
+
+      schema.letter["status"]      -> "AB"
+      schema.by_letter["AB"].key   -> "status"
+      schema.columns[i]            -> Column at 1-based index i + 1
+      schema.formulas(r)           -> {letter: formula} of the auto columns in row r
+      schema.row_values(rec, r)    -> list of 44 cell values (record values + formulas)
+    """
+
+    def __init__(self, columns, header_row=3):
+        self.header_row = header_row
+        self.first_row = header_row + 1
+        compiled = []
+        for idx, col in enumerate(columns, 1):
+            fields = dict(col.__dict__, index=idx, letter=get_column_letter(idx))
+            compiled.append(Column(**fields))
+        self.columns = tuple(compiled)
+        self.keys = [c.key for c in self.columns]
+        self.headers = [c.header for c in self.columns]
+        self.letters = [c.letter for c in self.columns]
+        self.by_key = {c.key: c for c in self.columns}
+        self.by_letter = {c.letter: c for c in self.columns}
+        self.by_header = {c.header: c for c in self.columns}
+        self.letter = {c.key: c.letter for c in self.columns}
+        self.last_letter = self.letters[-1]
+        self.auto_keys = [c.key for c in self.columns if c.is_auto]
+        self.date_keys = [c.key for c in self.columns if c.kind in ("date", "datetime")]
+
+        # Resolve column letters now; only the row number is left as {r}
+        self._formula_templates = []
+        for col in self.columns:
+            if col.is_auto:
+                template = col.formula.format(r="{r}", hdr=header_row, **self.letter)
+                self._formula_templates.append((col.index - 1, col.letter, template))
+
+    def __len__(self):
+        return len(self.columns)
+
+    def col(self, key):
+        return self.by_key[key]
+
+    def formulas(self, r):
+        return {letter: template.format(r=r) for _, letter, template in self._formula_templates}
+
+    def row_values(self, record, r):
+        """Cell values of row r: record fields by key, auto columns as formulas."""
+        values = [record.get(key) for key in self.keys]
+        for idx, _, template in self._formula_templates:
+            values[idx] = template.format(r=r)
+        return values
+
+
+# ── Lead Tracker layout (ORIGINAL column order) ─────────────────────────────
+LEAD_COLUMNS = [
+    Column("sno", "S.No", 6, kind="serial",
+           formula='=IF({timestamp}{r}<>"",ROW()-{hdr},"")'),
+    Column("timestamp", "Timestamp", 18, kind="datetime"),
+    Column("order_id", "Order ID", 12, kind="id",
+           formula='=IF({timestamp}{r}<>"","ST-"&TEXT(ROW()-{hdr},"0000"),"")'),
+    Column("customer", "Customer Name", 20, align="left"),
+    Column("phone", "Phone Number", 16, kind="phone"),
+    Column("whatsapp", "WhatsApp Number", 16, kind="phone"),
+    Column("alt_phone", "Alternate Phone", 16, kind="phone"),
+    Column("email", "Email", 22, kind="email"),
+    Column("city", "City", 14, kind="list", choices=CITY_LIST),
+    Column("area", "Area / Locality", 18, kind="list", align="left", choices=AREA_LIST),
+    Column("address", "Full Address", 30, align="left"),
+    Column("bhk", "BHK", 10, kind="list", choices=BHK_LIST),
+    Column("sqft", "SQFT", 10, kind="number"),
+    Column("service1", "Service 1", 20, kind="list", choices=SERVICE_LIST),
+    Column("price1", "Price 1", 12, kind="currency"),
+    Column("service2", "Service 2", 20, kind="list", choices=SERVICE_LIST),
+    Column("price2", "Price 2", 12, kind="currency"),
+    Column("service3", "Service 3", 20, kind="list", choices=SERVICE_LIST),
+    Column("price3", "Price 3", 12, kind="currency"),
+    Column("service4", "Service 4", 20, kind="list", choices=SERVICE_LIST),
+    Column("price4", "Price 4", 12, kind="currency"),
+    Column("total", "Total Value", 14, kind="currency",
+           formula='=IF(COUNTA({service1}{r})>0,SUM({price1}{r},{price2}{r},{price3}{r},{price4}{r}),"")'),
+    Column("discount", "Discount Amount", 14, kind="currency"),
+    Column("discounted_total", "Discounted Total", 14, kind="currency",
+           formula='=IF({total}{r}<>"",{total}{r}-IF({discount}{r}<>"",{discount}{r},0),"")'),
+    Column("preferred_date", "Preferred Date", 16, kind="date"),
+    Column("slot", "Slot Time", 22, kind="list", choices=SLOT_LIST),
+    Column("source", "Order Source", 16, kind="list", choices=SOURCE_LIST),
+    Column("status", "Order Status", 16, kind="list", choices=STATUS_LIST),
+    Column("notes", "Reason / Notes", 25, align="left"),
+    Column("vendor", "Vendor Name", 18),
+    Column("vendor_contact", "Vendor Contact", 16, kind="phone"),
+    Column("vendor_alt", "Vendor Alternate No.", 18, kind="phone"),
+    Column("scheduled_date", "Order Scheduled Date", 16, kind="date"),
+    Column("scheduled_time", "Scheduled Time", 22, kind="list", choices=SLOT_LIST),
+    Column("completed_date", "Order Completed Date", 16, kind="date"),
+    Column("advance", "Advance Amount", 14, kind="currency"),
+    Column("advance_status", "Advance Status", 14, kind="list", choices=ADV_STATUS_LIST),
+    # Pending Balance: 0 when payment received OR advance cleared, otherwise Discounted Total - Advance
+    Column("pending_balance", "Pending Balance", 14, kind="currency",
+           formula='=IF({discounted_total}{r}="","",IF(OR({payment_status}{r}="Received",'
+                   '{advance_status}{r}="Cleared",{payment_status}{r}="Refund Completed"),0,'
+                   '{discounted_total}{r}-IF({advance}{r}<>"",{advance}{r},0)))'),
+    Column("payment_value", "Payment Value", 14, kind="currency"),
+    Column("payment_status", "Payment Status", 14, kind="list", choices=PAY_STATUS_LIST),
+    Column("payment_mode", "Payment Mode", 18, kind="list", choices=PAY_MODE_LIST),
+    Column("refund", "Refund Amount", 14, kind="currency"),
+    Column("invoice", "Invoice Number", 16,
+           formula='=IF({timestamp}{r}<>"","INV-"&TEXT(ROW()-{hdr},"0000"),"")'),
+    Column("txn_ref", "Transaction Ref. No.", 18),
+]
+
+# Optional hidden helper: day serial of the Timestamp, so date-range metrics can
+# compare whole days directly instead of a half-open range over the Timestamps
+DAY_HELPER_COLUMN = Column("lead_day", "Lead Day", 10, kind="serial", hidden=True,
+                           formula='=IF({timestamp}{r}<>"",INT({timestamp}{r}),"")')
+
+# Optional duplicate flag filled in by lead_dedup: Order ID of the first lead of
+# the same customer (matched on phone / WhatsApp / alternate number or email)
+DUPLICATE_COLUMN = Column("duplicate_of", "Duplicate Of", 14, kind="id")
+
+LEAD_SCHEMA = LeadSchema(LEAD_COLUMNS)
+
+
+def lead_schema(day_helper=False, duplicate_flag=False):
+    """Compiled Lead Tracker layout, optionally with the hidden day helper column
+    (AS) and the Duplicate Of column after it."""
+    extra = [DAY_HELPER_COLUMN] * day_helper + [DUPLICATE_COLUMN] * duplicate_flag
+    if extra:
+        return LeadSchema(LEAD_COLUMNS + extra)
+    return LEAD_SCHEMA
+
+# Service / price column pairs (Service 1-4)
+SERVICE_SLOTS = [("service1", "price1"), ("service2", "price2"),
+                 ("service3", "price3"), ("service4", "price4")]
+
+# Google Form question titles (Form Fields Reference sheet) -> field key; any
+# Lead Tracker header (e.g. "Order Status") is accepted as well
+FORM_FIELD_KEYS = {
+    "Timestamp": "timestamp",
+    "Customer Name": "customer",
+    "Phone Number": "phone",
+    "WhatsApp Number": "whatsapp",
+    "Email": "email",
+    "Email Address": "email",
+    "City": "city",
+    "Area / Locality": "area",
+    "Full Address": "address",
+    "BHK": "bhk",
+    "SQFT (Approx)": "sqft",
+    "Service 1": "service1",
+    "Preferred Date": "preferred_date",
+    "Time Slot": "slot",
+    "Order Source": "source",
+}
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+GST aggregation for the MIS GST Returns sheet.
+
+build_gst_book() makes one pass over the Income Tracker and GST Invoices rows
+(output tax) and the Expense Tracker, Stock Purchases, Machines & Equipment
+and Machine Maintenance rows (input tax), all dicts keyed by sheet header, and
+adds each row into a dict keyed by (month, direction, rate, GSTIN, source).
+Taxable values and tax are recomputed from the entered amounts and GST % the
+same way the sheets' formulas do, so thousands of invoices a month cost one
+dict update each instead of a grid of SUMIFS.
+
+Output tax carries no GSTIN (customers are mostly unregistered); input rows
+from sheets without a GSTIN column are booked under NO_GSTIN.
+"""
+
+from collections import defaultdict
+
+from cell_values import to_number
+from mis_pnl import month_key
+
+OUTPUT = "Output"
+INPUT = "Input"
+NO_GSTIN = "Not recorded"
+
+INCOME = "Income Tracker"
+INVOICES = "GST Invoices"
+EXPENSES = "Expense Tracker"
+STOCK = "Stock Purchases"
+MACHINES = "Machines & Equipment"
+MAINTENANCE = "Machine Maintenance"
+
+
+# ── Sheet rows -> (month, direction, rate, GSTIN, source, taxable) ───────────
+def income_entries(rows):
+    for row in rows:
+        base = to_number(row.get("Base Amount (₹)"))
+        yield (month_key(row.get("Date")), OUTPUT, to_number(row.get("GST %")), None, INCOME,
+               base - base * to_number(row.get("Discount %")))
+
+
+def invoice_entries(rows):
+    for row in rows:
+        yield (month_key(row.get("Invoice Date")), OUTPUT, to_number(row.get("GST %")), None, INVOICES,
+               to_number(row.get("Base Amount (₹)")))
+
+
+def expense_entries(rows):
+    for row in rows:
+        yield (month_key(row.get("Date")), INPUT, to_number(row.get("GST %")), NO_GSTIN, EXPENSES,
+               to_number(row.get("Base Amount (₹)")))
+
+
+def stock_entries(rows):
+    for row in rows:
+        yield (month_key(row.get("Date")), INPUT, to_number(row.get("GST %")), row.get("Vendor GSTIN") or NO_GSTIN,
+               STOCK, to_number(row.get("Quantity")) * to_number(row.get("Rate (₹)")))
+
+
+def machine_entries(rows):
+    for row in rows:
+        yield (month_key(row.get("Purchase Date")), INPUT, to_number(row.get("GST %")),
+               row.get("Vendor GST No") or NO_GSTIN, MACHINES, to_number(row.get("Base Cost (₹)")))
+
+
+def maintenance_entries(rows):
+    for row in rows:
+        yield (month_key(row.get("Date")), INPUT, to_number(row.get("GST %")), NO_GSTIN, MAINTENANCE,
+               to_number(row.get("Base Cost (₹)")))
+
+
+class GSTBook:
+    """[taxable, tax, documents] keyed by (month, direction, rate, GSTIN, source)."""
+
+    KEYS = ("month", "direction", "rate", "gstin", "source")
+
+    def __init__(self):
+        self.cells = defaultdict(lambda: [0, 0, 0])
+        self.rows = 0
+        self.undated = 0       # rows without a usable date, left out of the book
+
+    def add(self, month, direction, rate, gstin, source, taxable):
+        self.rows += 1
+        if month is None:
+            self.undated += 1
+            return
+        cell = self.cells[(month, direction, rate, gstin, source)]
+        cell[0] += taxable
+        cell[1] += taxable * rate
+        cell[2] += 1
+
+    @property
+    def months(self):
+        return sorted({key[0] for key in self.cells})
+
+    @property
+    def rates(self):
+        return sorted({key[2] for key in self.cells})
+
+    def rollup(self, *keys, **where):
+        """
+        One pass over the cells: {(values of `keys`): [taxable, tax, documents]}
+        for the cells matching every `where` filter, e.g.
+        rollup("month", "rate", direction=OUTPUT).
+        """
+        index = [self.KEYS.index(k) for k in keys]
+        filters = [(self.KEYS.index(k), v) for k, v in where.items()]
+        result = defaultdict(lambda: [0, 0, 0])
+        for key, (taxable, tax, documents) in self.cells.items():
+            if all(key[i] == v for i, v in filters):
+                total = result[tuple(key[i] for i in index)]
+                total[0] += taxable
+                total[1] += tax
+                total[2] += documents
+        return dict(result)
+
+
+def build_gst_book(income=(), invoices=(), expenses=(), stock_purchases=(), machines=(), maintenance=()):
+    """One pass over every source's rows; returns the GSTBook."""
+    book = GSTBook()
+    for entries in (income_entries(income), invoice_entries(invoices), expense_entries(expenses),
+                    stock_entries(stock_purchases), machine_entries(machines),
+                    maintenance_entries(maintenance)):
+        for entry in entries:
+            book.add(*entry)
+    return book
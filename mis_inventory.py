@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Inventory engine: stock levels derived from the Stock Transactions log.
+
+replay_stock() walks the movements once, keeping one ItemStock per Item ID
+in a dict, so hundreds of SKUs and tens of thousands of movements take linear
+time.  For a period [date_from, date_to]:
+
+  - opening   = the item's initial balance + net movements before date_from
+  - purchased / used / returned / damaged = movements inside the period
+  - closing   = opening + purchased + returned - used - damaged
+  - movements after date_to are ignored
+
+"Returned" is stock coming back to the warehouse from a team; "Damaged" is
+written off.  Initial balances are the stock on hand before the first logged
+movement (the item sheets' opening figures).  Each ItemStock also keeps the
+Item Type and Item Name last logged for it and its latest purchase Unit Rate,
+so items that are in the log but not in an item master can still be listed.
+
+value_stock() replays the same movements through per-item cost layers (FIFO
+or moving average) to value the closing stock at the prices actually paid and
+to cost what each team/project consumed.  Layers depend on the order the
+movements are applied, so value_stock() replays them by Date (stable: the log
+order within a day; undated movements last).  StockValuation.apply() takes one
+movement at a time, so appended transactions update it incrementally - in date
+order: a movement dated before one already applied raises ValueError.
+"""
+
+from collections import defaultdict, deque
+
+from cell_values import to_day, to_number
+
+INBOUND = {"purchase": "purchased", "returned": "returned"}
+OUTBOUND = {"used": "used", "damaged": "damaged"}
+
+
+class ItemStock:
+    __slots__ = ("item_id", "opening", "purchased", "used", "returned", "damaged", "last_movement",
+                 "item_type", "name", "unit_rate")
+
+    def __init__(self, item_id, opening=0):
+        self.item_id = item_id
+        self.item_type = None
+        self.name = None
+        self.unit_rate = None
+        self.opening = opening
+        self.purchased = 0
+        self.used = 0
+        self.returned = 0
+        self.damaged = 0
+        self.last_movement = None
+
+    @property
+    def closing(self):
+        return self.opening + self.purchased + self.returned - self.used - self.damaged
+
+
+class StockLedger:
+    """Per-item stock for one period; see replay_stock()."""
+
+    def __init__(self, initial=None, date_from=None, date_to=None):
+        self.initial = initial or {}
+        self.date_from = to_day(date_from)
+        self.date_to = to_day(date_to)
+        self.items = {}        # Item ID -> ItemStock
+        self.movements = 0
+        self.skipped = []      # movements with an unknown type or no Item ID
+
+    def item(self, item_id):
+        stock = self.items.get(item_id)
+        if stock is None:
+            stock = self.items[item_id] = ItemStock(item_id, to_number(self.initial.get(item_id)))
+        return stock
+
+    def apply(self, movement):
+        """Book one movement (a dict with Date, Item ID, Transaction Type, Quantity)."""
+        self.movements += 1
+        item_id = movement.get("Item ID")
+        kind = str(movement.get("Transaction Type") or "").strip().casefold()
+        if not item_id or (kind not in INBOUND and kind not in OUTBOUND):
+            self.skipped.append(movement)
+            return
+        day = to_day(movement.get("Date"))
+        if day is not None and self.date_to is not None and day > self.date_to:
+            return
+        stock = self.item(item_id)
+        stock.item_type = movement.get("Item Type") or stock.item_type
+        stock.name = movement.get("Item Name") or stock.name
+        if kind == "purchase" and to_number(movement.get("Unit Rate (₹)")):
+            stock.unit_rate = to_number(movement.get("Unit Rate (₹)"))
+        qty = to_number(movement.get("Quantity"))
+        if day is not None and self.date_from is not None and day < self.date_from:
+            stock.opening += qty if kind in INBOUND else -qty
+        elif kind in INBOUND:
+            setattr(stock, INBOUND[kind], getattr(stock, INBOUND[kind]) + qty)
+        else:
+            setattr(stock, OUTBOUND[kind], getattr(stock, OUTBOUND[kind]) + qty)
+        if day is not None and (stock.last_movement is None or day > stock.last_movement):
+            stock.last_movement = day
+
+    def get(self, item_id):
+        """ItemStock of item_id (initial balance only when it has no movements)."""
+        return self.item(item_id)
+
+
+def replay_stock(movements, initial=None, date_from=None, date_to=None):
+    """
+    One pass over `movements`; returns the StockLedger for the period.
+    `initial` maps Item ID -> stock on hand before the first movement.
+    """
+    ledger = StockLedger(initial, date_from, date_to)
+    for movement in movements:
+        ledger.apply(movement)
+    return ledger
+
+
+# ── Valuation ────────────────────────────────────────────────────────────────
+FIFO = "fifo"
+AVERAGE = "average"
+VALUATION_METHODS = (FIFO, AVERAGE)
+
+
+class CostLayers:
+    """
+    Cost layers of one item: [quantity, unit cost] oldest first.  In AVERAGE
+    mode receipts are merged into a single layer at the moving-average cost.
+    """
+
+    __slots__ = ("item_id", "layers", "last_cost", "shortfall")
+
+    def __init__(self, item_id):
+        self.item_id = item_id
+        self.layers = deque()
+        self.last_cost = 0       # unit cost of the latest receipt or issue
+        self.shortfall = 0       # quantity issued beyond the stock on hand
+
+    @property
+    def quantity(self):
+        return sum(qty for qty, _ in self.layers)
+
+    @property
+    def value(self):
+        return sum(qty * cost for qty, cost in self.layers)
+
+    @property
+    def unit_cost(self):
+        quantity = self.quantity
+        return self.value / quantity if quantity else self.last_cost
+
+    def receive(self, qty, unit_cost, average=False):
+        if qty <= 0:
+            return
+        self.last_cost = unit_cost
+        if average and self.layers:
+            total_qty = self.quantity + qty
+            self.layers = deque([[total_qty, (self.value + qty * unit_cost) / total_qty]])
+        elif self.layers and self.layers[-1][1] == unit_cost:
+            self.layers[-1][0] += qty
+        else:
+            self.layers.append([qty, unit_cost])
+
+    def issue(self, qty):
+        """Take qty out, oldest layers first; returns its cost."""
+        cost = 0
+        while qty > 0 and self.layers:
+            layer = self.layers[0]
+            take = min(qty, layer[0])
+            cost += take * layer[1]
+            self.last_cost = layer[1]
+            layer[0] -= take
+            qty -= take
+            if layer[0] <= 0:
+                self.layers.popleft()
+        if qty > 0:
+            # Issued more than was on hand: cost it at the last known price
+            self.shortfall += qty
+            cost += qty * self.last_cost
+        return cost
+
+
+class StockValuation:
+    """
+    Per-item cost layers plus the cost of goods consumed per team/project.
+
+      initial    Item ID -> (quantity, unit cost) on hand before the first movement
+      consumed   (team, "used" | "damaged") -> cost, for movements in the period
+    """
+
+    def __init__(self, method=FIFO, initial=None, date_from=None, date_to=None):
+        if method not in VALUATION_METHODS:
+            raise ValueError(f"valuation method must be one of {VALUATION_METHODS}, not {method!r}")
+        self.method = method
+        self.initial = initial or {}
+        self.date_from = to_day(date_from)
+        self.date_to = to_day(date_to)
+        self.items = {}                     # Item ID -> CostLayers
+        self.consumed = defaultdict(float)
+        self.last_day = None                # date of the latest movement applied
+
+    def item(self, item_id):
+        layers = self.items.get(item_id)
+        if layers is None:
+            layers = self.items[item_id] = CostLayers(item_id)
+            qty, unit_cost = self.initial.get(item_id, (0, 0))
+            layers.receive(to_number(qty), to_number(unit_cost), self.method == AVERAGE)
+            layers.last_cost = to_number(unit_cost)
+        return layers
+
+    def apply(self, movement):
+        """Book one movement (Date, Item ID, Transaction Type, Quantity, Unit Rate (₹), Project/Team)."""
+        item_id = movement.get("Item ID")
+        kind = str(movement.get("Transaction Type") or "").strip().casefold()
+        if not item_id or (kind not in INBOUND and kind not in OUTBOUND):
+            return
+        day = to_day(movement.get("Date"))
+        if day is not None:
+            if self.last_day is not None and day < self.last_day:
+                raise ValueError(f"movement {movement.get('Transaction ID') or item_id} dated {day} comes after "
+                                 f"one dated {self.last_day}; apply movements in date order (value_stock sorts)")
+            self.last_day = day
+        if day is not None and self.date_to is not None and day > self.date_to:
+            return
+        layers = self.item(item_id)
+        qty = to_number(movement.get("Quantity"))
+        if kind == "purchase":
+            unit_cost = to_number(movement.get("Unit Rate (₹)")) or layers.last_cost
+            layers.receive(qty, unit_cost, self.method == AVERAGE)
+        elif kind == "returned":
+            # Back into stock at the price it was last issued at
+            layers.receive(qty, layers.last_cost, self.method == AVERAGE)
+        else:
+            cost = layers.issue(qty)
+            if day is None or self.date_from is None or day >= self.date_from:
+                team = movement.get("Project/Team") or "Unassigned"
+                self.consumed[(team, OUTBOUND[kind])] += cost
+
+    def value(self, item_id):
+        return self.item(item_id).value
+
+    @property
+    def total_value(self):
+        return sum(layers.value for layers in self.items.values())
+
+    def teams(self):
+        return list(dict.fromkeys(team for team, _ in self.consumed))
+
+
+def value_stock(movements, method=FIFO, initial=None, date_from=None, date_to=None):
+    """`movements` in date order through per-item cost layers; returns the StockValuation."""
+    valuation = StockValuation(method, initial, date_from, date_to)
+    undated = []
+    dated = []
+    for movement in movements:
+        (undated if to_day(movement.get("Date")) is None else dated).append(movement)
+    dated.sort(key=lambda m: to_day(m["Date"]))
+    for movement in dated + undated:
+        valuation.apply(movement)
+    return valuation
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Payroll batch for the MIS Employee Salaries sheet.
+
+run_payroll() expands an employee master over a list of months and computes
+every pay column for the whole batch column by column (one list
+comprehension per column over all employee x month rows), then zips the
+columns into sheet rows in salary_headers order, ready for ws.append().
+The computed Gross Salary, Total Deductions and Net Salary are for other
+consumers; the Employee Salaries sheet writes those three as row formulas.
+
+Rules (PayrollRules, all overridable):
+  - HRA            hra_rate x basic
+  - PF (employee)  pf_rate x basic, basic capped at the PF wage ceiling
+  - ESI (employee) esi_rate x gross, only when gross <= the ESI gross limit,
+                   rounded up to the rupee
+"""
+
+import calendar
+import math
+from datetime import datetime
+
+
+class PayrollRules:
+    def __init__(self, hra_rate=0.10, pf_rate=0.12, pf_wage_ceiling=15000,
+                 esi_rate=0.0075, esi_gross_limit=21000, payment_mode="Bank Transfer", payment_status="Paid"):
+        self.hra_rate = hra_rate
+        self.pf_rate = pf_rate
+        self.pf_wage_ceiling = pf_wage_ceiling
+        self.esi_rate = esi_rate
+        self.esi_gross_limit = esi_gross_limit
+        self.payment_mode = payment_mode
+        self.payment_status = payment_status
+
+
+def payroll_months(year, count=12, first_month=1):
+    """The first day of `count` consecutive months starting at year/first_month."""
+    months = []
+    for n in range(count):
+        y, m = divmod(first_month - 1 + n, 12)
+        months.append(datetime(year + y, m + 1, 1))
+    return months
+
+
+def run_payroll(employees, months, rules=None):
+    """
+    employees  (Employee ID, Name, Designation, Department, Basic, Other Allowances) tuples;
+               Other Allowances may be left off (0)
+    months     datetimes, one per payroll month (see payroll_months())
+    Returns the rows employee-major within each month, month by month.
+    """
+    rules = rules or PayrollRules()
+    grid = [(month, emp) for month in months for emp in employees]
+
+    month_label = [m.strftime("%B %Y") for m, _ in grid]
+    pay_date = [datetime(m.year, m.month, calendar.monthrange(m.year, m.month)[1]) for m, _ in grid]
+    basic = [emp[4] for _, emp in grid]
+    other = [emp[5] if len(emp) > 5 else 0 for _, emp in grid]
+    hra = [round(b * rules.hra_rate) for b in basic]
+    gross = [b + h + o for b, h, o in zip(basic, hra, other)]
+    pf = [round(min(b, rules.pf_wage_ceiling) * rules.pf_rate) for b in basic]
+    esi = [math.ceil(g * rules.esi_rate) if g <= rules.esi_gross_limit else 0 for g in gross]
+    deductions = [p + e for p, e in zip(pf, esi)]
+    net = [g - d for g, d in zip(gross, deductions)]
+
+    return [
+        [label, emp[0], emp[1], emp[2], emp[3], b, h, o, g, p, e, 0, d, n, paid,
+         rules.payment_mode, rules.payment_status, None]
+        for label, (_, emp), b, h, o, g, p, e, d, n, paid
+        in zip(month_label, grid, basic, hra, other, gross, pf, esi, deductions, net, pay_date)
+    ]
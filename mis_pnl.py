@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Month x service x cost-category P&L cube for the MIS Profitability Report.
+
+build_pnl_cube() makes one pass over the Income, Expense, Salary, Contractor,
+Stock Purchase and Maintenance rows (dicts keyed by sheet header) and adds
+every amount into a small dict keyed by (month, service, category).  Amounts
+follow the Profitability Report: revenue after discount excluding GST, costs
+excluding GST (net salary, net contractor payable).
+
+Costs that belong to no service (expenses, salaries, stock, maintenance) are
+booked under the OVERHEADS service; contractor payouts are booked against the
+service the contractor worked on.
+"""
+
+from collections import defaultdict
+from datetime import date, datetime
+
+from cell_values import to_number
+
+REVENUE = "Revenue"
+OVERHEADS = "Overheads"
+
+SALARIES = "Salaries"
+CONTRACTORS = "Contractors"
+STOCK = "Stock Purchases"
+MAINTENANCE = "Maintenance"
+
+
+def month_key(value):
+    """'YYYY-MM' of a date/datetime or of a 'January 2025' label; None if neither."""
+    if isinstance(value, (datetime, date)):
+        return f"{value.year:04d}-{value.month:02d}"
+    if isinstance(value, str):
+        try:
+            parsed = datetime.strptime(value.strip(), "%B %Y")
+        except ValueError:
+            return None
+        return f"{parsed.year:04d}-{parsed.month:02d}"
+    return None
+
+
+def month_label(key):
+    """'2025-01' -> 'Jan 2025'."""
+    return datetime.strptime(key, "%Y-%m").strftime("%b %Y")
+
+
+# ── Sheet rows -> (month, service, category, amount) ─────────────────────────
+def income_entries(rows):
+    for row in rows:
+        base = to_number(row.get("Base Amount (₹)"))
+        yield (month_key(row.get("Date")), row.get("Service Type") or OVERHEADS, REVENUE,
+               base - base * to_number(row.get("Discount %")))
+
+
+def expense_entries(rows):
+    for row in rows:
+        yield (month_key(row.get("Date")), OVERHEADS, row.get("Category") or "Other",
+               to_number(row.get("Base Amount (₹)")))
+
+
+def salary_entries(rows):
+    for row in rows:
+        gross = sum(to_number(row.get(h)) for h in ("Basic Salary (₹)", "HRA (₹)", "Other Allowances (₹)"))
+        deductions = sum(to_number(row.get(h)) for h in ("PF Deduction (₹)", "ESI Deduction (₹)",
+                                                    "Other Deductions (₹)"))
+        yield month_key(row.get("Month")), OVERHEADS, SALARIES, gross - deductions
+
+
+def contractor_entries(rows):
+    for row in rows:
+        gross = to_number(row.get("Gross Amount (₹)"))
+        yield (month_key(row.get("Date")), row.get("Service Type") or OVERHEADS, CONTRACTORS,
+               gross - gross * to_number(row.get("TDS % (Sec 194C)")))
+
+
+def stock_entries(rows):
+    for row in rows:
+        yield (month_key(row.get("Date")), OVERHEADS, STOCK,
+               to_number(row.get("Quantity")) * to_number(row.get("Rate (₹)")))
+
+
+def maintenance_entries(rows):
+    for row in rows:
+        yield month_key(row.get("Date")), OVERHEADS, MAINTENANCE, to_number(row.get("Base Cost (₹)"))
+
+
+class PnLCube:
+    """Amounts keyed by (month, service, category); category REVENUE is income, the rest costs."""
+
+    def __init__(self):
+        self.cells = defaultdict(float)
+        self.rows = 0
+        self.undated = 0       # rows without a usable date/month, left out of the cube
+
+    def add(self, month, service, category, amount):
+        self.rows += 1
+        if month is None:
+            self.undated += 1
+            return
+        self.cells[(month, service, category)] += amount
+
+    @property
+    def months(self):
+        return sorted({m for m, _, _ in self.cells})
+
+    @property
+    def services(self):
+        """Services with revenue or direct costs, in first-seen order (OVERHEADS excluded)."""
+        seen = dict.fromkeys(s for _, s, _ in self.cells if s != OVERHEADS)
+        return list(seen)
+
+    @property
+    def cost_categories(self):
+        return list(dict.fromkeys(c for _, _, c in self.cells if c != REVENUE))
+
+    def total(self, month=None, service=None, category=None):
+        """Sum over the cells matching every given coordinate."""
+        return sum(amount for (m, s, c), amount in self.cells.items()
+                   if (month is None or m == month) and (service is None or s == service)
+                   and (category is None or c == category))
+
+    def revenue(self, month=None, service=None):
+        return self.total(month, service, REVENUE)
+
+    def costs(self, month=None, service=None):
+        return self.total(month, service) - self.revenue(month, service)
+
+    def profit(self, month=None, service=None):
+        return self.revenue(month, service) - self.costs(month, service)
+
+    def margin(self, month=None, service=None):
+        revenue = self.revenue(month, service)
+        return self.profit(month, service) / revenue if revenue else 0
+
+
+def build_pnl_cube(income=(), expenses=(), salaries=(), contractors=(), stock_purchases=(), maintenance=()):
+    """One pass over every source's rows; returns the PnLCube."""
+    cube = PnLCube()
+    for entries in (income_entries(income), expense_entries(expenses), salary_entries(salaries),
+                    contractor_entries(contractors), stock_entries(stock_purchases),
+                    maintenance_entries(maintenance)):
+        for month, service, category, amount in entries:
+            cube.add(month, service, category, amount)
+    return cube
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Column layout of the MIS transactional sheets, shared by the MIS generator
+(mis_system_v7), the SQLite store (data_store) and the columnar exports
+(bi_export), so a sheet, its table and its export file cannot drift apart.
+
+  MIS_TABLES    table -> (sheet, date column, natural key columns)
+  MIS_HEADERS   table -> every column of the sheet, in sheet order; the
+                generator writes these headers and the exports follow them,
+                whichever path the rows take.  The store keeps the input
+                columns of these (the formula columns are left out).
+
+is_date_column() tells which headers hold dates (stored as TIMESTAMP,
+exported as timestamp[ms]).
+"""
+
+# MIS table -> (sheet, date column, natural key columns)
+MIS_TABLES = {
+    "income": ("Income Tracker", "Date", ("Invoice No",)),
+    "expenses": ("Expense Tracker", "Date", ("Expense ID",)),
+    "salaries": ("Employee Salaries", "Payment Date", ("Month", "Employee ID")),
+    "contractor_payments": ("Contractor Payments", "Date", ("Payment ID",)),
+    "stock_purchases": ("Stock Purchases", "Date", ("Purchase ID",)),
+    "machines": ("Machines & Equipment", "Purchase Date", ("Machine ID",)),
+    "machine_maintenance": ("Machine Maintenance", "Date", ("Date", "Machine ID", "Maintenance Type")),
+    "stock_transactions": ("Stock Transactions", "Date", ("Transaction ID",)),
+    "gst_invoices": ("GST Invoices", "Invoice Date", ("Invoice Number",)),
+}
+
+MIS_HEADERS = {
+    "income": ["Date", "Invoice No", "Customer Name", "Service Type", "Project Type", "Project Name",
+               "Base Amount (₹)", "Discount %", "Discount Amount (₹)", "Amount After Discount (₹)",
+               "GST %", "GST Amount (₹)", "Total Amount (₹)", "Payment Mode", "Payment Status", "Notes"],
+    "expenses": ["Date", "Expense ID", "Category", "Description", "Vendor/Payee",
+                 "Base Amount (₹)", "GST %", "GST Amount (₹)", "Total Amount (₹)", "Payment Mode", "Payment Status",
+                 "Notes"],
+    "salaries": ["Month", "Employee ID", "Employee Name", "Designation", "Department",
+                 "Basic Salary (₹)", "HRA (₹)", "Other Allowances (₹)", "Gross Salary (₹)",
+                 "PF Deduction (₹)", "ESI Deduction (₹)", "Other Deductions (₹)", "Total Deductions (₹)",
+                 "Net Salary (₹)", "Payment Date", "Payment Mode", "Payment Status", "Notes"],
+    "contractor_payments": ["Date", "Payment ID", "Contractor Name", "Contractor PAN", "Service Type",
+                            "Project/Work Description", "Gross Amount (₹)", "TDS % (Sec 194C)", "TDS Amount (₹)",
+                            "Net Payable (₹)", "Payment Date", "Payment Mode", "Payment Status", "TDS Deposited",
+                            "Notes"],
+    "stock_purchases": ["Date", "Purchase ID", "Vendor Name", "Vendor GSTIN", "Invoice No", "Item Type",
+                        "Item Name", "Quantity", "Unit", "Rate (₹)", "Base Amount (₹)", "GST %", "GST Amount (₹)",
+                        "Total Amount (₹)", "Payment Status", "Notes"],
+    "machines": ["Machine ID", "Machine Name", "Model", "Category", "Purchase Date", "Purchase Invoice No",
+                 "Vendor GST No", "Base Cost (₹)", "GST %", "GST Amount (₹)", "Total Cost (₹)",
+                 "Current Status", "Location", "Notes"],
+    "machine_maintenance": ["Date", "Machine ID", "Machine Name", "Maintenance Type", "Description",
+                            "Base Cost (₹)", "GST %", "GST Amount (₹)", "Total Cost (₹)", "Done By",
+                            "Next Service", "Service Status", "Notes"],
+    "stock_transactions": ["Date", "Transaction ID", "Item Type", "Item ID", "Item Name", "Transaction Type",
+                           "Quantity", "Unit Rate (₹)", "Base Amount (₹)", "GST %", "GST Amount (₹)",
+                           "Total Cost (₹)", "Project/Team", "Notes"],
+    "gst_invoices": ["Invoice Date", "Invoice Number", "Customer Name", "Service Type", "Base Amount (₹)",
+                     "GST %", "GST Amount (₹)", "Total Amount (₹)", "GST Payment Status", "Payment Date", "Notes"],
+}
+
+# Date columns whose header does not say so
+DATE_HEADERS = {"Next Service"}
+
+
+def is_date_column(header):
+    return header == "Date" or header.endswith(" Date") or header in DATE_HEADERS
@@ -1,3 +1,22 @@
+"""
+MIS System v7 - Excel Generator (business books with date-filtered Dashboard)
+
+Usage:
+  python mis_system_v7.py                                  # sample data
+  python mis_system_v7.py --rows 100000 --output /tmp/mis.xlsx  # 100k income + expense rows
+  python mis_system_v7.py --timings timings.json           # per-sheet build times as JSON
+  python mis_system_v7.py --valuation average              # moving-average stock valuation
+  python mis_system_v7.py --employees 250                  # payroll for 250 staff x 12 months
+  python mis_system_v7.py --seed 7                         # another reproducible sample dataset
+  python mis_system_v7.py --rows 100000 --to-db mis.db     # also keep the transactions in SQLite
+  python mis_system_v7.py --from-db mis.db --since 2025-01-10 --until 2025-01-20  # a date range
+  python mis_system_v7.py --rows 100000 --export exports/  # transactional sheets as Parquet / CSV
+"""
+
+import argparse
+import os
+import re
+
 from openpyxl import Workbook
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
@@ -7,9 +26,96 @@ from openpyxl.chart.label import DataLabelList
 from openpyxl.worksheet.datavalidation import DataValidation
 from openpyxl.worksheet.table import Table, TableStyleInfo
 from datetime import datetime, timedelta
-import random
+
+from bi_export import DEFAULT_FORMAT, FORMATS, export_mis
+from build_timings import BuildTimings
+from data_store import DataStore, date_window
+from mis_inventory import FIFO, VALUATION_METHODS, replay_stock, value_stock
+from mis_gst import INPUT, OUTPUT, build_gst_book
+from mis_tds import ANNUAL_LIMIT, SINGLE_LIMIT, build_tds_ledger
+from mis_payroll import PayrollRules, payroll_months, run_payroll
+from mis_pnl import OVERHEADS, CONTRACTORS, build_pnl_cube, month_label
+from mis_schema import MIS_HEADERS
+from synthetic_data import SyntheticData
+from xlsx_styles import StyleRegistry
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {number}")
+    return number
+
+parser = argparse.ArgumentParser(description="Generate the MIS System workbook")
+parser.add_argument("--output", default='/var/lib/freelancer/projects/40182876/MIS_System_v7.xlsx',
+                    help="Output .xlsx path")
+parser.add_argument("--rows", type=int, default=None,
+                    help="Number of Income Tracker, Expense Tracker and Stock Transactions rows (default: 15 samples each)")
+parser.add_argument("--seed", type=int, default=0,
+                    help="Seed of the synthetic sample data (same seed, same workbook; default 0)")
+parser.add_argument("--employees", type=positive_int, default=None,
+                    help="Employees on the payroll (default: the 8 sample employees; fewer takes the first N, "
+                         "more are seeded synthetic staff, see --seed)")
+parser.add_argument("--payroll-months", type=positive_int, default=12,
+                    help="Months of salary rows to generate from January 2025 (default: 12)")
+parser.add_argument("--stock-from", type=lambda v: datetime.strptime(v, "%Y-%m-%d"), metavar="YYYY-MM-DD",
+                    help="Start of the stock period: earlier movements roll into Opening Stock "
+                         "(default with --from-db: the start of the store window)")
+parser.add_argument("--stock-to", type=lambda v: datetime.strptime(v, "%Y-%m-%d"), metavar="YYYY-MM-DD",
+                    help="End of the stock period: later movements are left out "
+                         "(default with --from-db: the end of the store window)")
+parser.add_argument("--valuation", choices=VALUATION_METHODS, default=FIFO,
+                    help="Stock valuation method for Est. Value and cost of goods consumed (default: fifo)")
+parser.add_argument("--timings", metavar="FILE",
+                    help="Write per-sheet build times as JSON to FILE")
+parser.add_argument("--to-db", metavar="FILE",
+                    help="Also save the transactional sheet rows in the SQLite store FILE")
+parser.add_argument("--from-db", metavar="FILE",
+                    help="Render the transactional sheets from the SQLite store FILE "
+                         "(instead of the samples), within --days/--since/--until")
+parser.add_argument("--export", metavar="DIR",
+                    help="Also export the transactional sheets to DIR as columnar files for pandas / BI tools")
+parser.add_argument("--export-format", choices=FORMATS, default=DEFAULT_FORMAT,
+                    help=f"--export file format: parquet (needs pyarrow) or csv + schema JSON "
+                         f"(default here: {DEFAULT_FORMAT})")
+parser.add_argument("--days", type=int, metavar="N",
+                    help="With --from-db: rows of the last N days up to today")
+parser.add_argument("--since", type=lambda v: datetime.strptime(v, "%Y-%m-%d"), metavar="YYYY-MM-DD",
+                    help="With --from-db: rows dated from this date")
+parser.add_argument("--until", type=lambda v: datetime.strptime(v, "%Y-%m-%d"), metavar="YYYY-MM-DD",
+                    help="With --from-db: rows dated up to and including this date")
+args = parser.parse_args()
+if args.to_db and args.from_db:
+    parser.error("--to-db and --from-db are exclusive: the store is either written or read")
+if (args.days or args.since or args.until) and not args.from_db:
+    parser.error("--days/--since/--until select rows from the store; add --from-db FILE")
+
+TIMINGS = BuildTimings()
+INCOME_ROWS = args.rows or 15
+EXPENSE_ROWS = args.rows or 15
+TRANS_ROWS = args.rows or 15
+
+# Transactional sheets read their rows through sheet_source(): the seeded
+# samples (saved on the way with --to-db), or a date-range query on the SQLite
+# store with --from-db (data_store)
+STORE = DataStore(args.from_db or args.to_db) if args.from_db or args.to_db else None
+STORE_WINDOW = date_window(args.days, args.since, args.until)
+STORE_COUNTS = {}  # table -> rows saved / rendered
+
+def sheet_source(table, fields, count, samples):
+    """(row count, records) of a transactional sheet; `samples` returns a fresh pass of `count` sample records."""
+    if args.from_db:
+        count = STORE_COUNTS[table] = STORE.count_rows(table, *STORE_WINDOW)
+        return count, STORE.rows(table, *STORE_WINDOW)
+    if args.to_db:
+        STORE_COUNTS[table] = STORE.save_rows(table, fields, samples())
+    return count, samples()
+
+def input_fields(headers, *formula_headers):
+    """Stored columns of a sheet: every header but the formula columns."""
+    return [h for h in headers if h not in formula_headers]
 
 wb = Workbook()
+STYLES = StyleRegistry(wb)
 
 # Styles
 header_fill = PatternFill("solid", fgColor="1F4E79")
@@ -29,26 +135,105 @@ thick_border = Border(
 )
 center_align = Alignment(horizontal='center', vertical='center')
 
+STYLES.add("MIS Header", font=header_font, fill=header_fill, alignment=center_align, border=thin_border)
+STYLES.add("MIS Row", border=thin_border)
+STYLES.add("MIS Row Alt", fill=alt_row_fill, border=thin_border)
+
 def style_header(ws, row, cols):
     for col in range(1, cols + 1):
-        cell = ws.cell(row=row, column=col)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = center_align
-        cell.border = thin_border
+        STYLES.apply(ws.cell(row=row, column=col), "MIS Header")
 
 def style_data_rows(ws, start_row, end_row, cols):
     for row in range(start_row, end_row + 1):
+        key = "MIS Row Alt" if row % 2 == 0 else "MIS Row"
         for col in range(1, cols + 1):
             cell = ws.cell(row=row, column=col)
-            cell.border = thin_border
-            if row % 2 == 0:
-                cell.fill = alt_row_fill
+            if cell.has_style:
+                # Already formatted (fonts / number formats): only add border and band
+                cell.border = thin_border
+                if row % 2 == 0:
+                    cell.fill = alt_row_fill
+            else:
+                STYLES.apply(cell, key)
 
 def auto_width(ws, cols):
     for col in range(1, cols + 1):
         ws.column_dimensions[get_column_letter(col)].width = 15
 
+# Transactional sheets are Excel Tables: summary formulas use structured
+# references such as tblIncome[[Total Amount (₹)]], which grow with the rows typed
+# below the table but only cover used rows (a whole column like
+# 'Income Tracker'!M:M is a million-row scan per criterion).  Headers here hold
+# spaces, brackets, % and periods, so every reference is written by col_ref() in
+# the double-bracket form, which is valid whatever the header contains.
+TABLE_COLUMNS = {}  # table name -> header list
+TABLE_NAME = re.compile(r"\b(tbl\w+)\[")
+TABLE_REF = re.compile(r"\b(tbl\w+)\[\[((?:[^\[\]#']|'.)+)\]\]")
+REF_ESCAPE = re.compile(r"([\[\]#'])")
+
+def col_ref(table, header):
+    """Structured reference to column `header` of Excel Table `table`: tbl[[Header]]."""
+    return table + "[[" + REF_ESCAPE.sub(r"'\1", header) + "]]"
+
+def add_table(ws, name, headers, last_row):
+    """Register A1:<last col><last_row> of ws as Excel Table `name` (replaces the sheet filter)."""
+    last_row = max(last_row, 2)  # an empty --from-db window still needs one data row
+    table = Table(displayName=name, ref=f"A1:{get_column_letter(len(headers))}{last_row}")
+    table.tableStyleInfo = TableStyleInfo(name="TableStyleLight9", showRowStripes=False)
+    ws.add_table(table)
+    TABLE_COLUMNS[name] = list(headers)
+
+# Dropdowns and highlights cover the data rows and ENTRY_ROWS blank rows below
+# them for typing new entries, however many rows the sheet was generated with
+ENTRY_ROWS = 1000
+
+def entry_range(column, last_row):
+    """column2:column<last_row + ENTRY_ROWS>, the cells a dropdown or highlight of `column` covers."""
+    return f"{column}2:{column}{last_row + ENTRY_ROWS}"
+
+def check_table_refs(wb):
+    """Fail before saving if a summary formula names a table column that does not exist."""
+    for ws in wb.worksheets:
+        # Table sheets repeat the same formulas on every row: the first data row is enough
+        for row in ws.iter_rows(max_row=2 if ws.tables else None):
+            for cell in row:
+                if not (isinstance(cell.value, str) and cell.value.startswith("=")):
+                    continue
+                for name in TABLE_NAME.finditer(cell.value):
+                    ref = TABLE_REF.match(cell.value, name.start())
+                    if not ref:
+                        raise ValueError(f"{ws.title}!{cell.coordinate}: malformed table reference at "
+                                         f"{cell.value[name.start():name.start() + 40]!r}, use col_ref()")
+                    table, column = ref.group(1), re.sub(r"'(.)", r"\1", ref.group(2))
+                    if column not in TABLE_COLUMNS.get(table, ()):
+                        raise ValueError(f"{ws.title}!{cell.coordinate}: unknown column {col_ref(table, column)}")
+
+# Precomputed report sheets (Monthly P&L, GST Returns) aggregate the data rows in
+# Python and write static values
+def sheet_records(ws, last_row):
+    """Rows 2..last_row of a data sheet as dicts keyed by the row-1 headers."""
+    rows = ws.iter_rows(min_row=1, max_row=last_row, values_only=True)
+    headers = next(rows)
+    return (dict(zip(headers, row)) for row in rows)
+
+def report_table(ws, top, title, headers, rows, formats):
+    """Section title, header row and value rows from `top`; the last row is bold. Returns the next free row."""
+    ws.cell(row=top, column=1).value = title
+    ws.cell(row=top, column=1).font = Font(bold=True, size=12)
+    for col, header in enumerate(headers, start=1):
+        ws.cell(row=top + 1, column=col).value = header
+    style_header(ws, top + 1, len(headers))
+    for r, values in enumerate(rows, start=top + 2):
+        for col, (value, fmt) in enumerate(zip(values, formats), start=1):
+            ws.cell(row=r, column=col).value = value
+            if fmt:
+                ws.cell(row=r, column=col).number_format = fmt
+    last_row = top + 1 + len(rows)
+    style_data_rows(ws, top + 2, last_row, len(headers))
+    for col in range(1, len(headers) + 1):
+        ws.cell(row=last_row, column=col).font = Font(bold=True)
+    return last_row + 3
+
 # Common data
 services = ["Deep Cleaning", "Regular Cleaning", "Pest Control", "Painting", "Plumbing", "Electrical", "Carpentry", "AC Service"]
 project_types = ["Individual", "Apartment Bulk", "Commercial"]
@@ -58,6 +243,12 @@ expense_cats = ["Vendor Payment", "Travel & Fuel", "Marketing", "Office Expenses
 machine_cats = ["Cleaning Machine", "Spray Equipment", "Power Tools", "Safety Equipment"]
 base_date = datetime(2025, 1, 1)
 
+# Sample rows come from seeded synthetic_data streams, drawn from the lists above
+data = SyntheticData(args.seed, distributions={
+    "service": services, "project_type": project_types, "payment_mode": payment_modes,
+    "payment_status": payment_status_list, "expense_category": expense_cats,
+})
+
 # ============ HOW TO USE ============
 ws_how = wb.active
 ws_how.title = "HOW TO USE"
@@ -67,21 +258,24 @@ instructions = [
     ["SHEET", "PURPOSE", "HOW TO USE"],
     ["Income Tracker", "Record all service revenue with GST & Discounts", "Enter each payment with service type"],
     ["Expense Tracker", "Track all business expenses with GST", "Log every expense with category"],
-    ["Employee Salaries", "Track employee salary payments", "Monthly salary - PF/ESI/HRA default 0"],
+    ["Employee Salaries", "Track employee salary payments", "Generated per month: HRA, PF (12% up to ₹15,000 basic), ESI (0.75% up to ₹21,000 gross)"],
     ["Contractor Payments", "Track contractor payouts with TDS", "Gross amount, TDS deduction, net payable"],
     ["Stock Purchases", "Track inventory purchases", "Vendor purchases with GST"],
     ["Machines & Equipment", "Asset register", "Add machines with Invoice & GST details"],
     ["Machine Maintenance", "Track repairs/servicing", "Log maintenance with status"],
-    ["Chemicals Stock", "Chemical inventory", "Track opening, added, used, closing stock"],
-    ["Accessories Stock", "Consumables inventory", "Track stock levels"],
+    ["Chemicals Stock", "Chemical inventory", "Quantities derived from Stock Transactions"],
+    ["Accessories Stock", "Consumables inventory", "Quantities derived from Stock Transactions"],
     ["Stock Transactions", "Stock movement log", "Record purchases and usage"],
     ["GST Invoices", "Track GST payments", "Invoice-wise GST paid/pending status"],
     ["Income Summary", "Revenue reports", "Auto-calculated with filters"],
     ["Expense Summary", "Expense reports", "Auto-calculated with filters"],
     ["GST Summary", "GST collected vs paid", "For GST filing reference"],
-    ["TDS Summary", "TDS deducted from contractors", "For TDS filing reference"],
+    ["GST Returns", "Month / rate / vendor GSTIN buckets", "Precomputed when generated - regenerate to refresh"],
+    ["TDS Summary", "TDS deducted from contractors", "194C thresholds per PAN and quarterly schedule"],
     ["Stock Reports", "Detailed stock summaries", "Item-wise stock values with filters"],
     ["Profitability Report", "Profit analysis", "Shows actual NET PROFIT"],
+    ["Monthly P&L", "Month-wise and service-wise profit", "Precomputed when generated - regenerate to refresh"],
+    ["Daily Ledger", "Per-day totals feeding the Dashboard", "Auto-calculated, one row per calendar day"],
     ["Dashboard", "Visual overview", "Key metrics with DATE FILTERS"],
 ]
 for row_data in instructions:
@@ -90,54 +284,45 @@ ws_how.merge_cells('A1:C1')
 ws_how['A1'].font = Font(bold=True, size=16, color="1F4E79")
 ws_how['A1'].alignment = center_align
 style_header(ws_how, 3, 3)
-for row in range(4, 23):
+for row in range(4, len(instructions) + 1):
     for col in range(1, 4):
         ws_how.cell(row=row, column=col).border = thin_border
 ws_how.column_dimensions['A'].width = 25
 ws_how.column_dimensions['B'].width = 40
 ws_how.column_dimensions['C'].width = 50
+TIMINGS.mark("HOW TO USE")
 
 # ============ INCOME TRACKER ============
 ws_income = wb.create_sheet("Income Tracker")
-income_headers = ["Date", "Invoice No", "Customer Name", "Service Type", "Project Type", "Project Name",
-                  "Base Amount (₹)", "Discount %", "Discount Amount (₹)", "Amount After Discount (₹)",
-                  "GST %", "GST Amount (₹)", "Total Amount (₹)", "Payment Mode", "Payment Status", "Notes"]
+income_headers = MIS_HEADERS["income"]
 ws_income.append(income_headers)
 style_header(ws_income, 1, len(income_headers))
 
-customers = ["Rajesh Kumar", "Priya Sharma", "Amit Patel", "Sunita Reddy", "Vikram Singh", "Deepa Nair", "Karthik Iyer", "Meena Gupta", "Rahul Verma", "Anjali Menon", "Suresh Rao", "Lakshmi Pillai", "Arun Krishnan", "Kavitha Srinivasan", "Manoj Das"]
-
-for i in range(15):
+income_fields = input_fields(income_headers, "Discount Amount (₹)", "Amount After Discount (₹)",
+                             "GST Amount (₹)", "Total Amount (₹)")
+INCOME_ROWS, income_records = sheet_source("income", income_fields, INCOME_ROWS,
+                                           lambda: data.income(INCOME_ROWS, base_date))
+INCOME_LAST_ROW = INCOME_ROWS + 1
+for i, rec in enumerate(income_records):
     row_num = i + 2
-    date = base_date + timedelta(days=random.randint(0, 28))
-    invoice = f"INV-2025-{1001+i}"
-    customer = customers[i]
-    service = random.choice(services)
-    proj_type = random.choice(project_types)
-    proj_name = "Green Valley Apartments" if proj_type == "Apartment Bulk" else ("Tech Park" if proj_type == "Commercial" else "")
-    base_amount = random.randint(2000, 25000) if proj_type == "Individual" else random.randint(50000, 200000)
-    discount_pct = random.choice([0, 0, 0, 0.05, 0.10])
-    gst_rate = 0.18
-    mode = random.choice(payment_modes)
-    status = random.choice(payment_status_list)
-
-    ws_income.cell(row=row_num, column=1).value = date
-    ws_income.cell(row=row_num, column=2).value = invoice
-    ws_income.cell(row=row_num, column=3).value = customer
-    ws_income.cell(row=row_num, column=4).value = service
-    ws_income.cell(row=row_num, column=5).value = proj_type
-    ws_income.cell(row=row_num, column=6).value = proj_name
-    ws_income.cell(row=row_num, column=7).value = base_amount
-    ws_income.cell(row=row_num, column=8).value = discount_pct
+    ws_income.cell(row=row_num, column=1).value = rec["Date"]
+    ws_income.cell(row=row_num, column=2).value = rec["Invoice No"]
+    ws_income.cell(row=row_num, column=3).value = rec["Customer Name"]
+    ws_income.cell(row=row_num, column=4).value = rec["Service Type"]
+    ws_income.cell(row=row_num, column=5).value = rec["Project Type"]
+    ws_income.cell(row=row_num, column=6).value = rec["Project Name"]
+    ws_income.cell(row=row_num, column=7).value = rec["Base Amount (₹)"]
+    ws_income.cell(row=row_num, column=8).value = rec["Discount %"]
     ws_income.cell(row=row_num, column=9).value = f"=G{row_num}*H{row_num}"
     ws_income.cell(row=row_num, column=10).value = f"=G{row_num}-I{row_num}"
-    ws_income.cell(row=row_num, column=11).value = gst_rate
+    ws_income.cell(row=row_num, column=11).value = rec["GST %"]
     ws_income.cell(row=row_num, column=12).value = f"=J{row_num}*K{row_num}"
     ws_income.cell(row=row_num, column=13).value = f"=J{row_num}+L{row_num}"
-    ws_income.cell(row=row_num, column=14).value = mode
-    ws_income.cell(row=row_num, column=15).value = status
+    ws_income.cell(row=row_num, column=14).value = rec["Payment Mode"]
+    ws_income.cell(row=row_num, column=15).value = rec["Payment Status"]
+    ws_income.cell(row=row_num, column=16).value = rec.get("Notes")
 
-style_data_rows(ws_income, 2, 16, len(income_headers))
+style_data_rows(ws_income, 2, INCOME_LAST_ROW, len(income_headers))
 ws_income.column_dimensions['A'].width = 12
 ws_income.column_dimensions['B'].width = 15
 ws_income.column_dimensions['C'].width = 18
@@ -154,7 +339,7 @@ ws_income.column_dimensions['M'].width = 14
 ws_income.column_dimensions['N'].width = 14
 ws_income.column_dimensions['O'].width = 14
 
-for row in range(2, 17):
+for row in range(2, INCOME_LAST_ROW + 1):
     ws_income.cell(row=row, column=1).number_format = date_format
     ws_income.cell(row=row, column=7).number_format = currency_format
     ws_income.cell(row=row, column=8).number_format = '0%'
@@ -164,7 +349,7 @@ for row in range(2, 17):
     ws_income.cell(row=row, column=12).number_format = currency_format
     ws_income.cell(row=row, column=13).number_format = currency_format
 ws_income.freeze_panes = 'A2'
-ws_income.auto_filter.ref = f"A1:P16"
+add_table(ws_income, "tblIncome", income_headers, INCOME_LAST_ROW)
 
 dv_service = DataValidation(type="list", formula1='"Deep Cleaning,Regular Cleaning,Pest Control,Painting,Plumbing,Electrical,Carpentry,AC Service"', allow_blank=True)
 dv_projtype = DataValidation(type="list", formula1='"Individual,Apartment Bulk,Commercial"', allow_blank=True)
@@ -180,68 +365,53 @@ ws_income.add_data_validation(dv_paystatus)
 ws_income.add_data_validation(dv_gst)
 ws_income.add_data_validation(dv_discount)
 
-dv_service.add('D2:D1000')
-dv_projtype.add('E2:E1000')
-dv_discount.add('H2:H1000')
-dv_gst.add('K2:K1000')
-dv_paymode.add('N2:N1000')
-dv_paystatus.add('O2:O1000')
+dv_service.add(entry_range('D', INCOME_LAST_ROW))
+dv_projtype.add(entry_range('E', INCOME_LAST_ROW))
+dv_discount.add(entry_range('H', INCOME_LAST_ROW))
+dv_gst.add(entry_range('K', INCOME_LAST_ROW))
+dv_paymode.add(entry_range('N', INCOME_LAST_ROW))
+dv_paystatus.add(entry_range('O', INCOME_LAST_ROW))
+
+TIMINGS.mark("Income Tracker")
 
 # ============ EXPENSE TRACKER ============
 ws_expense = wb.create_sheet("Expense Tracker")
-expense_headers = ["Date", "Expense ID", "Category", "Description", "Vendor/Payee",
-                   "Base Amount (₹)", "GST %", "GST Amount (₹)", "Total Amount (₹)", "Payment Mode", "Payment Status", "Notes"]
+expense_headers = MIS_HEADERS["expenses"]
 ws_expense.append(expense_headers)
 style_header(ws_expense, 1, len(expense_headers))
 
-vendors = ["Kumar Chemicals", "City Fuel Station", "Facebook Ads", "Airtel", "Office Depot", "Google Ads"]
-
-for i in range(15):
+expense_fields = input_fields(expense_headers, "GST Amount (₹)", "Total Amount (₹)")
+EXPENSE_ROWS, expense_records = sheet_source("expenses", expense_fields, EXPENSE_ROWS,
+                                             lambda: data.expenses(EXPENSE_ROWS, base_date))
+EXPENSE_LAST_ROW = EXPENSE_ROWS + 1
+for i, rec in enumerate(expense_records):
     row_num = i + 2
-    date = base_date + timedelta(days=random.randint(0, 28))
-    exp_id = f"EXP-2025-{101+i}"
-    cat = random.choice(expense_cats)
-    if cat == "Travel & Fuel":
-        desc = "Petrol/Diesel"
-        vendor = "City Fuel Station"
-        base_amount = random.randint(500, 3000)
-    elif cat == "Marketing":
-        desc = random.choice(["Facebook Ads", "Google Ads", "Pamphlets"])
-        vendor = desc
-        base_amount = random.randint(2000, 15000)
-    else:
-        desc = random.choice(["Office Supplies", "Utility Bill", "Misc Purchase"])
-        vendor = random.choice(vendors)
-        base_amount = random.randint(500, 5000)
-    gst_rate = 0.18
-    mode = random.choice(payment_modes)
-    status = random.choice(payment_status_list)
-
-    ws_expense.cell(row=row_num, column=1).value = date
-    ws_expense.cell(row=row_num, column=2).value = exp_id
-    ws_expense.cell(row=row_num, column=3).value = cat
-    ws_expense.cell(row=row_num, column=4).value = desc
-    ws_expense.cell(row=row_num, column=5).value = vendor
-    ws_expense.cell(row=row_num, column=6).value = base_amount
-    ws_expense.cell(row=row_num, column=7).value = gst_rate
+    ws_expense.cell(row=row_num, column=1).value = rec["Date"]
+    ws_expense.cell(row=row_num, column=2).value = rec["Expense ID"]
+    ws_expense.cell(row=row_num, column=3).value = rec["Category"]
+    ws_expense.cell(row=row_num, column=4).value = rec["Description"]
+    ws_expense.cell(row=row_num, column=5).value = rec["Vendor/Payee"]
+    ws_expense.cell(row=row_num, column=6).value = rec["Base Amount (₹)"]
+    ws_expense.cell(row=row_num, column=7).value = rec["GST %"]
     ws_expense.cell(row=row_num, column=8).value = f"=F{row_num}*G{row_num}"
     ws_expense.cell(row=row_num, column=9).value = f"=F{row_num}+H{row_num}"
-    ws_expense.cell(row=row_num, column=10).value = mode
-    ws_expense.cell(row=row_num, column=11).value = status
+    ws_expense.cell(row=row_num, column=10).value = rec["Payment Mode"]
+    ws_expense.cell(row=row_num, column=11).value = rec["Payment Status"]
+    ws_expense.cell(row=row_num, column=12).value = rec.get("Notes")
 
-style_data_rows(ws_expense, 2, 16, len(expense_headers))
+style_data_rows(ws_expense, 2, EXPENSE_LAST_ROW, len(expense_headers))
 auto_width(ws_expense, len(expense_headers))
 ws_expense.column_dimensions['D'].width = 20
 ws_expense.column_dimensions['G'].width = 8
 
-for row in range(2, 17):
+for row in range(2, EXPENSE_LAST_ROW + 1):
     ws_expense.cell(row=row, column=1).number_format = date_format
     ws_expense.cell(row=row, column=6).number_format = currency_format
     ws_expense.cell(row=row, column=7).number_format = '0%'
     ws_expense.cell(row=row, column=8).number_format = currency_format
     ws_expense.cell(row=row, column=9).number_format = currency_format
 ws_expense.freeze_panes = 'A2'
-ws_expense.auto_filter.ref = f"A1:L16"
+add_table(ws_expense, "tblExpenses", expense_headers, EXPENSE_LAST_ROW)
 
 dv_expcat = DataValidation(type="list", formula1='"Vendor Payment,Travel & Fuel,Marketing,Office Expenses,Miscellaneous"', allow_blank=True)
 dv_paymode_exp = DataValidation(type="list", formula1='"Cash,UPI,Bank Transfer,Card"', allow_blank=True)
@@ -253,17 +423,16 @@ ws_expense.add_data_validation(dv_paymode_exp)
 ws_expense.add_data_validation(dv_paystatus_exp)
 ws_expense.add_data_validation(dv_gst_exp)
 
-dv_expcat.add('C2:C1000')
-dv_gst_exp.add('G2:G1000')
-dv_paymode_exp.add('J2:J1000')
-dv_paystatus_exp.add('K2:K1000')
+dv_expcat.add(entry_range('C', EXPENSE_LAST_ROW))
+dv_gst_exp.add(entry_range('G', EXPENSE_LAST_ROW))
+dv_paymode_exp.add(entry_range('J', EXPENSE_LAST_ROW))
+dv_paystatus_exp.add(entry_range('K', EXPENSE_LAST_ROW))
+
+TIMINGS.mark("Expense Tracker")
 
 # ============ EMPLOYEE SALARIES ============
 ws_salary = wb.create_sheet("Employee Salaries")
-salary_headers = ["Month", "Employee ID", "Employee Name", "Designation", "Department",
-                  "Basic Salary (₹)", "HRA (₹)", "Other Allowances (₹)", "Gross Salary (₹)",
-                  "PF Deduction (₹)", "ESI Deduction (₹)", "Other Deductions (₹)", "Total Deductions (₹)",
-                  "Net Salary (₹)", "Payment Date", "Payment Mode", "Payment Status", "Notes"]
+salary_headers = MIS_HEADERS["salaries"]
 ws_salary.append(salary_headers)
 style_header(ws_salary, 1, len(salary_headers))
 
@@ -278,38 +447,59 @@ employees = [
     ("EMP008", "Meena Pillai", "Accounts", "Office", 25000),
 ]
 
-for i, emp in enumerate(employees, start=2):
-    ws_salary.cell(row=i, column=1).value = "January 2025"
-    ws_salary.cell(row=i, column=2).value = emp[0]
-    ws_salary.cell(row=i, column=3).value = emp[1]
-    ws_salary.cell(row=i, column=4).value = emp[2]
-    ws_salary.cell(row=i, column=5).value = emp[3]
-    ws_salary.cell(row=i, column=6).value = emp[4]
-    ws_salary.cell(row=i, column=7).value = 0
-    ws_salary.cell(row=i, column=8).value = 0
-    ws_salary.cell(row=i, column=9).value = f"=F{i}+G{i}+H{i}"
-    ws_salary.cell(row=i, column=10).value = 0
-    ws_salary.cell(row=i, column=11).value = 0
-    ws_salary.cell(row=i, column=12).value = 0
-    ws_salary.cell(row=i, column=13).value = f"=J{i}+K{i}+L{i}"
-    ws_salary.cell(row=i, column=14).value = f"=I{i}-M{i}"
-    ws_salary.cell(row=i, column=15).value = datetime(2025, 1, 31)
-    ws_salary.cell(row=i, column=16).value = "Bank Transfer"
-    ws_salary.cell(row=i, column=17).value = "Paid"
-
-style_data_rows(ws_salary, 2, 9, len(salary_headers))
+# --employees: the first N sample employees, or seeded field staff beyond the sample list
+employees = employees[:args.employees]
+employees += data.employees(max((args.employees or 0) - len(employees), 0), first_id=len(employees) + 1)
+
+# One batch for every employee x month, appended row by row (mis_payroll); Gross
+# Salary, Total Deductions and Net Salary stay row formulas over the pay columns
+PAYROLL_MONTHS = payroll_months(base_date.year, args.payroll_months)
+salary_fields = input_fields(salary_headers, "Gross Salary (₹)", "Total Deductions (₹)", "Net Salary (₹)")
+SALARY_ROWS, salary_records = sheet_source(
+    "salaries", salary_fields, len(employees) * len(PAYROLL_MONTHS),
+    lambda: (dict(zip(salary_headers, values)) for values in run_payroll(employees, PAYROLL_MONTHS, PayrollRules())))
+salary_month_labels = set()
+for r, rec in enumerate(salary_records, start=2):
+    rec.update({"Gross Salary (₹)": f"=F{r}+G{r}+H{r}", "Total Deductions (₹)": f"=J{r}+K{r}+L{r}",
+                "Net Salary (₹)": f"=I{r}-M{r}"})
+    ws_salary.append([rec.get(h) for h in salary_headers])
+    salary_month_labels.add(rec.get("Month"))
+SALARY_LAST_ROW = SALARY_ROWS + 1
+
+def month_start(label):
+    try:
+        return datetime.strptime(str(label), "%B %Y")
+    except ValueError:
+        return None
+
+# The months actually rendered (a --from-db window may hold other months than
+# PAYROLL_MONTHS); the payroll months when the window has no salary rows
+SALARY_MONTHS = sorted(filter(None, map(month_start, salary_month_labels))) or PAYROLL_MONTHS
+
+style_data_rows(ws_salary, 2, SALARY_LAST_ROW, len(salary_headers))
 auto_width(ws_salary, len(salary_headers))
 ws_salary.column_dimensions['C'].width = 18
 ws_salary.column_dimensions['D'].width = 14
 
-for row in range(2, 10):
-    for col in [6, 7, 8, 9, 10, 11, 12, 13, 14]:
-        ws_salary.cell(row=row, column=col).number_format = currency_format
-    ws_salary.cell(row=row, column=15).number_format = date_format
+for row in ws_salary.iter_rows(min_row=2, max_row=SALARY_LAST_ROW, min_col=6, max_col=15):
+    for cell in row[:9]:
+        cell.number_format = currency_format   # Basic .. Net Salary
+    row[9].number_format = date_format         # Payment Date
 ws_salary.freeze_panes = 'A2'
-ws_salary.auto_filter.ref = f"A1:R9"
-
-dv_month = DataValidation(type="list", formula1='"January 2025,February 2025,March 2025,April 2025,May 2025,June 2025,July 2025,August 2025,September 2025,October 2025,November 2025,December 2025"', allow_blank=True)
+add_table(ws_salary, "tblSalaries", salary_headers, SALARY_LAST_ROW)
+
+# Month dropdown: the salary months, inline while they fit Excel's 255-character list
+# limit, else from a hidden list column next to the table
+month_labels = [f"{m:%B %Y}" for m in SALARY_MONTHS]
+if len(",".join(month_labels)) <= 255:
+    dv_month = DataValidation(type="list", formula1=f'"{",".join(month_labels)}"', allow_blank=True)
+else:
+    list_col = get_column_letter(len(salary_headers) + 2)
+    for r, label in enumerate(month_labels, start=2):
+        ws_salary[f"{list_col}{r}"] = label
+    ws_salary.column_dimensions[list_col].hidden = True
+    dv_month = DataValidation(type="list", formula1=f"${list_col}$2:${list_col}${len(month_labels) + 1}",
+                              allow_blank=True)
 dv_salstatus = DataValidation(type="list", formula1='"Paid,Pending,On Hold"', allow_blank=True)
 dv_salmode = DataValidation(type="list", formula1='"Cash,UPI,Bank Transfer,Card"', allow_blank=True)
 
@@ -317,15 +507,15 @@ ws_salary.add_data_validation(dv_month)
 ws_salary.add_data_validation(dv_salstatus)
 ws_salary.add_data_validation(dv_salmode)
 
-dv_month.add('A2:A1000')
-dv_salmode.add('P2:P1000')
-dv_salstatus.add('Q2:Q1000')
+dv_month.add(entry_range('A', SALARY_LAST_ROW))
+dv_salmode.add(entry_range('P', SALARY_LAST_ROW))
+dv_salstatus.add(entry_range('Q', SALARY_LAST_ROW))
+
+TIMINGS.mark("Employee Salaries")
 
 # ============ CONTRACTOR PAYMENTS ============
 ws_contractor = wb.create_sheet("Contractor Payments")
-contractor_headers = ["Date", "Payment ID", "Contractor Name", "Contractor PAN", "Service Type",
-                      "Project/Work Description", "Gross Amount (₹)", "TDS % (Sec 194C)", "TDS Amount (₹)",
-                      "Net Payable (₹)", "Payment Date", "Payment Mode", "Payment Status", "TDS Deposited", "Notes"]
+contractor_headers = MIS_HEADERS["contractor_payments"]
 ws_contractor.append(contractor_headers)
 style_header(ws_contractor, 1, len(contractor_headers))
 
@@ -340,29 +530,35 @@ contractors = [
     ("Pest Masters", "VWXPM9012H", "Pest Control", "Quarterly Treatment", 48000, 0.02),
 ]
 
-for i, cont in enumerate(contractors, start=2):
-    ws_contractor.cell(row=i, column=1).value = base_date + timedelta(days=random.randint(0, 28))
-    ws_contractor.cell(row=i, column=2).value = f"CONT-2025-{301+i-2}"
-    ws_contractor.cell(row=i, column=3).value = cont[0]
-    ws_contractor.cell(row=i, column=4).value = cont[1]
-    ws_contractor.cell(row=i, column=5).value = cont[2]
-    ws_contractor.cell(row=i, column=6).value = cont[3]
-    ws_contractor.cell(row=i, column=7).value = cont[4]
-    ws_contractor.cell(row=i, column=8).value = cont[5]
+def contractor_samples():
+    rng = data.rng("contractors")
+    for i, cont in enumerate(contractors):
+        yield {
+            "Date": base_date + timedelta(days=rng.randint(0, 28)), "Payment ID": f"CONT-2025-{301+i}",
+            "Contractor Name": cont[0], "Contractor PAN": cont[1], "Service Type": cont[2],
+            "Project/Work Description": cont[3], "Gross Amount (₹)": cont[4], "TDS % (Sec 194C)": cont[5],
+            "Payment Date": base_date + timedelta(days=rng.randint(5, 30)),
+            "Payment Mode": rng.choice(["Bank Transfer", "UPI", "Cheque"]),
+            "Payment Status": rng.choice(["Paid", "Pending"]), "TDS Deposited": rng.choice(["Yes", "No"]),
+        }
+
+contractor_fields = input_fields(contractor_headers, "TDS Amount (₹)", "Net Payable (₹)")
+CONTRACTOR_ROWS, contractor_records = sheet_source("contractor_payments", contractor_fields,
+                                                   len(contractors), contractor_samples)
+CONTRACTOR_LAST_ROW = CONTRACTOR_ROWS + 1
+for i, rec in enumerate(contractor_records, start=2):
+    for col, header in enumerate(contractor_headers, start=1):
+        ws_contractor.cell(row=i, column=col).value = rec.get(header)
     ws_contractor.cell(row=i, column=9).value = f"=G{i}*H{i}"
     ws_contractor.cell(row=i, column=10).value = f"=G{i}-I{i}"
-    ws_contractor.cell(row=i, column=11).value = base_date + timedelta(days=random.randint(5, 30))
-    ws_contractor.cell(row=i, column=12).value = random.choice(["Bank Transfer", "UPI", "Cheque"])
-    ws_contractor.cell(row=i, column=13).value = random.choice(["Paid", "Pending"])
-    ws_contractor.cell(row=i, column=14).value = random.choice(["Yes", "No"])
 
-style_data_rows(ws_contractor, 2, 9, len(contractor_headers))
+style_data_rows(ws_contractor, 2, CONTRACTOR_LAST_ROW, len(contractor_headers))
 auto_width(ws_contractor, len(contractor_headers))
 ws_contractor.column_dimensions['C'].width = 22
 ws_contractor.column_dimensions['F'].width = 25
 ws_contractor.column_dimensions['H'].width = 16
 
-for row in range(2, 10):
+for row in range(2, CONTRACTOR_LAST_ROW + 1):
     ws_contractor.cell(row=row, column=1).number_format = date_format
     ws_contractor.cell(row=row, column=7).number_format = currency_format
     ws_contractor.cell(row=row, column=8).number_format = '0.0%'
@@ -370,7 +566,7 @@ for row in range(2, 10):
     ws_contractor.cell(row=row, column=10).number_format = currency_format
     ws_contractor.cell(row=row, column=11).number_format = date_format
 ws_contractor.freeze_panes = 'A2'
-ws_contractor.auto_filter.ref = f"A1:O9"
+add_table(ws_contractor, "tblContractorPayments", contractor_headers, CONTRACTOR_LAST_ROW)
 
 dv_tds = DataValidation(type="list", formula1='"1%,2%,10%"', allow_blank=True)
 dv_contstatus = DataValidation(type="list", formula1='"Paid,Pending,On Hold"', allow_blank=True)
@@ -384,66 +580,49 @@ ws_contractor.add_data_validation(dv_tdsdeposited)
 ws_contractor.add_data_validation(dv_contservice)
 ws_contractor.add_data_validation(dv_contpaymode)
 
-dv_contservice.add('E2:E1000')
-dv_tds.add('H2:H1000')
-dv_contpaymode.add('L2:L1000')
-dv_contstatus.add('M2:M1000')
-dv_tdsdeposited.add('N2:N1000')
+dv_contservice.add(entry_range('E', CONTRACTOR_LAST_ROW))
+dv_tds.add(entry_range('H', CONTRACTOR_LAST_ROW))
+dv_contpaymode.add(entry_range('L', CONTRACTOR_LAST_ROW))
+dv_contstatus.add(entry_range('M', CONTRACTOR_LAST_ROW))
+dv_tdsdeposited.add(entry_range('N', CONTRACTOR_LAST_ROW))
+
+TIMINGS.mark("Contractor Payments")
 
 # ============ STOCK PURCHASES ============
 ws_stock_purch = wb.create_sheet("Stock Purchases")
-stock_purch_headers = ["Date", "Purchase ID", "Vendor Name", "Vendor GSTIN", "Invoice No", "Item Type",
-                       "Item Name", "Quantity", "Unit", "Rate (₹)", "Base Amount (₹)", "GST %", "GST Amount (₹)",
-                       "Total Amount (₹)", "Payment Status", "Notes"]
+stock_purch_headers = MIS_HEADERS["stock_purchases"]
 ws_stock_purch.append(stock_purch_headers)
 style_header(ws_stock_purch, 1, len(stock_purch_headers))
 
-stock_vendors = [
-    ("Kumar Chemicals Pvt Ltd", "29AABCK1234A1ZV"),
-    ("City Supplies", "29AABCS5678B2ZW"),
-    ("Metro Cleaning Supplies", "29AABCM9012C3ZX"),
-]
-
-stock_items = [
-    ("Chemical", "Floor Cleaner", "Liters", 120),
-    ("Chemical", "Glass Cleaner", "Liters", 95),
-    ("Accessory", "Microfiber Cloth", "Pieces", 80),
-    ("Accessory", "Rubber Gloves", "Pairs", 45),
-    ("Chemical", "Surface Disinfectant", "Liters", 180),
-]
-
-for i in range(10):
+stock_purch_fields = input_fields(stock_purch_headers, "Base Amount (₹)", "GST Amount (₹)", "Total Amount (₹)")
+STOCK_PURCH_ROWS, stock_purch_records = sheet_source("stock_purchases", stock_purch_fields, 10,
+                                                     lambda: data.stock_purchases(10, base_date))
+STOCK_PURCH_LAST_ROW = STOCK_PURCH_ROWS + 1
+for i, rec in enumerate(stock_purch_records):
     row_num = i + 2
-    date = base_date + timedelta(days=random.randint(0, 28))
-    purch_id = f"PO-2025-{201+i}"
-    vendor, gstin = random.choice(stock_vendors)
-    inv_no = f"INV/{random.randint(1000, 9999)}"
-    item_type, item_name, unit, rate = random.choice(stock_items)
-    qty = random.randint(10, 100)
-    gst_rate = 0.18
-
-    ws_stock_purch.cell(row=row_num, column=1).value = date
-    ws_stock_purch.cell(row=row_num, column=2).value = purch_id
-    ws_stock_purch.cell(row=row_num, column=3).value = vendor
-    ws_stock_purch.cell(row=row_num, column=4).value = gstin
-    ws_stock_purch.cell(row=row_num, column=5).value = inv_no
-    ws_stock_purch.cell(row=row_num, column=6).value = item_type
-    ws_stock_purch.cell(row=row_num, column=7).value = item_name
-    ws_stock_purch.cell(row=row_num, column=8).value = qty
-    ws_stock_purch.cell(row=row_num, column=9).value = unit
-    ws_stock_purch.cell(row=row_num, column=10).value = rate
+    ws_stock_purch.cell(row=row_num, column=1).value = rec["Date"]
+    ws_stock_purch.cell(row=row_num, column=2).value = rec["Purchase ID"]
+    ws_stock_purch.cell(row=row_num, column=3).value = rec["Vendor Name"]
+    ws_stock_purch.cell(row=row_num, column=4).value = rec["Vendor GSTIN"]
+    ws_stock_purch.cell(row=row_num, column=5).value = rec["Invoice No"]
+    ws_stock_purch.cell(row=row_num, column=6).value = rec["Item Type"]
+    ws_stock_purch.cell(row=row_num, column=7).value = rec["Item Name"]
+    ws_stock_purch.cell(row=row_num, column=8).value = rec["Quantity"]
+    ws_stock_purch.cell(row=row_num, column=9).value = rec["Unit"]
+    ws_stock_purch.cell(row=row_num, column=10).value = rec["Rate (₹)"]
     ws_stock_purch.cell(row=row_num, column=11).value = f"=H{row_num}*J{row_num}"
-    ws_stock_purch.cell(row=row_num, column=12).value = gst_rate
+    ws_stock_purch.cell(row=row_num, column=12).value = rec["GST %"]
     ws_stock_purch.cell(row=row_num, column=13).value = f"=K{row_num}*L{row_num}"
     ws_stock_purch.cell(row=row_num, column=14).value = f"=K{row_num}+M{row_num}"
-    ws_stock_purch.cell(row=row_num, column=15).value = random.choice(["Paid", "Pending"])
+    ws_stock_purch.cell(row=row_num, column=15).value = rec["Payment Status"]
+    ws_stock_purch.cell(row=row_num, column=16).value = rec.get("Notes")
 
-style_data_rows(ws_stock_purch, 2, 11, len(stock_purch_headers))
+style_data_rows(ws_stock_purch, 2, STOCK_PURCH_LAST_ROW, len(stock_purch_headers))
 auto_width(ws_stock_purch, len(stock_purch_headers))
 ws_stock_purch.column_dimensions['C'].width = 22
 ws_stock_purch.column_dimensions['G'].width = 20
 
-for row in range(2, 12):
+for row in range(2, STOCK_PURCH_LAST_ROW + 1):
     ws_stock_purch.cell(row=row, column=1).number_format = date_format
     ws_stock_purch.cell(row=row, column=10).number_format = currency_format
     ws_stock_purch.cell(row=row, column=11).number_format = currency_format
@@ -451,7 +630,7 @@ for row in range(2, 12):
     ws_stock_purch.cell(row=row, column=13).number_format = currency_format
     ws_stock_purch.cell(row=row, column=14).number_format = currency_format
 ws_stock_purch.freeze_panes = 'A2'
-ws_stock_purch.auto_filter.ref = f"A1:P11"
+add_table(ws_stock_purch, "tblStockPurchases", stock_purch_headers, STOCK_PURCH_LAST_ROW)
 
 dv_stockitem = DataValidation(type="list", formula1='"Chemical,Accessory,Machine,Spare Part"', allow_blank=True)
 dv_purch_status = DataValidation(type="list", formula1='"Paid,Pending"', allow_blank=True)
@@ -461,16 +640,15 @@ ws_stock_purch.add_data_validation(dv_stockitem)
 ws_stock_purch.add_data_validation(dv_purch_status)
 ws_stock_purch.add_data_validation(dv_gst_stock)
 
-dv_stockitem.add('F2:F1000')
-dv_gst_stock.add('L2:L1000')
-dv_purch_status.add('O2:O1000')
+dv_stockitem.add(entry_range('F', STOCK_PURCH_LAST_ROW))
+dv_gst_stock.add(entry_range('L', STOCK_PURCH_LAST_ROW))
+dv_purch_status.add(entry_range('O', STOCK_PURCH_LAST_ROW))
+
+TIMINGS.mark("Stock Purchases")
 
 # ============ MACHINES & EQUIPMENT ============
 ws_machines = wb.create_sheet("Machines & Equipment")
-machine_headers = ["Machine ID", "Machine Name", "Model", "Category", "Purchase Date",
-                   "Purchase Invoice No", "Vendor GST No",
-                   "Base Cost (₹)", "GST %", "GST Amount (₹)", "Total Cost (₹)",
-                   "Current Status", "Location", "Notes"]
+machine_headers = MIS_HEADERS["machines"]
 ws_machines.append(machine_headers)
 style_header(ws_machines, 1, len(machine_headers))
 
@@ -485,36 +663,35 @@ machine_data = [
     ["M008", "Steam Cleaner", "Karcher SC3", "Cleaning Machine", datetime(2024, 1, 8), "INV/K/2024/3333", "29AABCK1234A1Z5", 29661, 0.18, "Active", "Team C"],
 ]
 
-for i, row in enumerate(machine_data, start=2):
-    ws_machines.cell(row=i, column=1).value = row[0]
-    ws_machines.cell(row=i, column=2).value = row[1]
-    ws_machines.cell(row=i, column=3).value = row[2]
-    ws_machines.cell(row=i, column=4).value = row[3]
-    ws_machines.cell(row=i, column=5).value = row[4]
-    ws_machines.cell(row=i, column=6).value = row[5]
-    ws_machines.cell(row=i, column=7).value = row[6]
-    ws_machines.cell(row=i, column=8).value = row[7]
-    ws_machines.cell(row=i, column=9).value = row[8]
+machine_fields = input_fields(machine_headers, "GST Amount (₹)", "Total Cost (₹)")
+
+def machine_samples():
+    # The sample rows leave Notes blank
+    return (dict(zip(machine_fields[:-1], row)) for row in machine_data)
+
+MACHINE_ROWS, machine_records = sheet_source("machines", machine_fields, len(machine_data), machine_samples)
+MACHINE_LAST_ROW = MACHINE_ROWS + 1
+for i, rec in enumerate(machine_records, start=2):
+    for col, header in enumerate(machine_headers, start=1):
+        ws_machines.cell(row=i, column=col).value = rec.get(header)
     ws_machines.cell(row=i, column=10).value = f"=H{i}*I{i}"
     ws_machines.cell(row=i, column=11).value = f"=H{i}+J{i}"
-    ws_machines.cell(row=i, column=12).value = row[9]
-    ws_machines.cell(row=i, column=13).value = row[10]
 
-style_data_rows(ws_machines, 2, 9, len(machine_headers))
+style_data_rows(ws_machines, 2, MACHINE_LAST_ROW, len(machine_headers))
 auto_width(ws_machines, len(machine_headers))
 ws_machines.column_dimensions['B'].width = 18
 ws_machines.column_dimensions['C'].width = 18
 ws_machines.column_dimensions['F'].width = 18
 ws_machines.column_dimensions['G'].width = 18
 
-for row in range(2, 10):
+for row in range(2, MACHINE_LAST_ROW + 1):
     ws_machines.cell(row=row, column=5).number_format = date_format
     ws_machines.cell(row=row, column=8).number_format = currency_format
     ws_machines.cell(row=row, column=9).number_format = '0%'
     ws_machines.cell(row=row, column=10).number_format = currency_format
     ws_machines.cell(row=row, column=11).number_format = currency_format
 ws_machines.freeze_panes = 'A2'
-ws_machines.auto_filter.ref = f"A1:N9"
+add_table(ws_machines, "tblMachines", machine_headers, MACHINE_LAST_ROW)
 
 dv_machcat = DataValidation(type="list", formula1='"Cleaning Machine,Spray Equipment,Power Tools,Safety Equipment"', allow_blank=True)
 dv_machstatus = DataValidation(type="list", formula1='"Active,Under Repair,Retired"', allow_blank=True)
@@ -524,14 +701,15 @@ ws_machines.add_data_validation(dv_machcat)
 ws_machines.add_data_validation(dv_machstatus)
 ws_machines.add_data_validation(dv_gst_mach)
 
-dv_machcat.add('D2:D1000')
-dv_gst_mach.add('I2:I1000')
-dv_machstatus.add('L2:L1000')
+dv_machcat.add(entry_range('D', MACHINE_LAST_ROW))
+dv_gst_mach.add(entry_range('I', MACHINE_LAST_ROW))
+dv_machstatus.add(entry_range('L', MACHINE_LAST_ROW))
+
+TIMINGS.mark("Machines & Equipment")
 
 # ============ MACHINE MAINTENANCE ============
 ws_maint = wb.create_sheet("Machine Maintenance")
-maint_headers = ["Date", "Machine ID", "Machine Name", "Maintenance Type", "Description", "Base Cost (₹)",
-                 "GST %", "GST Amount (₹)", "Total Cost (₹)", "Done By", "Next Service", "Service Status", "Notes"]
+maint_headers = MIS_HEADERS["machine_maintenance"]
 ws_maint.append(maint_headers)
 style_header(ws_maint, 1, len(maint_headers))
 
@@ -543,24 +721,23 @@ maint_data = [
     [datetime(2025, 1, 5), "M004", "Pest Sprayer", "Service", "Valve check", 424, 0.18, "In-house", datetime(2025, 7, 5), "Service Completed"],
 ]
 
-for i, row in enumerate(maint_data, start=2):
-    ws_maint.cell(row=i, column=1).value = row[0]
-    ws_maint.cell(row=i, column=2).value = row[1]
-    ws_maint.cell(row=i, column=3).value = row[2]
-    ws_maint.cell(row=i, column=4).value = row[3]
-    ws_maint.cell(row=i, column=5).value = row[4]
-    ws_maint.cell(row=i, column=6).value = row[5]
-    ws_maint.cell(row=i, column=7).value = row[6]
+maint_fields = input_fields(maint_headers, "GST Amount (₹)", "Total Cost (₹)")
+
+def maint_samples():
+    return (dict(zip(maint_fields[:-1], row)) for row in maint_data)
+
+MAINT_ROWS, maint_records = sheet_source("machine_maintenance", maint_fields, len(maint_data), maint_samples)
+MAINT_LAST_ROW = MAINT_ROWS + 1
+for i, rec in enumerate(maint_records, start=2):
+    for col, header in enumerate(maint_headers, start=1):
+        ws_maint.cell(row=i, column=col).value = rec.get(header)
     ws_maint.cell(row=i, column=8).value = f"=F{i}*G{i}"
     ws_maint.cell(row=i, column=9).value = f"=F{i}+H{i}"
-    ws_maint.cell(row=i, column=10).value = row[7]
-    ws_maint.cell(row=i, column=11).value = row[8]
-    ws_maint.cell(row=i, column=12).value = row[9]
 
-style_data_rows(ws_maint, 2, 6, len(maint_headers))
+style_data_rows(ws_maint, 2, MAINT_LAST_ROW, len(maint_headers))
 auto_width(ws_maint, len(maint_headers))
 
-for row in range(2, 7):
+for row in range(2, MAINT_LAST_ROW + 1):
     ws_maint.cell(row=row, column=1).number_format = date_format
     ws_maint.cell(row=row, column=6).number_format = currency_format
     ws_maint.cell(row=row, column=7).number_format = '0%'
@@ -568,7 +745,7 @@ for row in range(2, 7):
     ws_maint.cell(row=row, column=9).number_format = currency_format
     ws_maint.cell(row=row, column=11).number_format = date_format
 ws_maint.freeze_panes = 'A2'
-ws_maint.auto_filter.ref = f"A1:M6"
+add_table(ws_maint, "tblMaintenance", maint_headers, MAINT_LAST_ROW)
 
 dv_mainttype = DataValidation(type="list", formula1='"Repair,Service,Parts Replacement"', allow_blank=True)
 dv_machid = DataValidation(type="list", formula1='"M001,M002,M003,M004,M005,M006,M007,M008"', allow_blank=True)
@@ -580,146 +757,57 @@ ws_maint.add_data_validation(dv_machid)
 ws_maint.add_data_validation(dv_gst_maint)
 ws_maint.add_data_validation(dv_servicestatus)
 
-dv_machid.add('B2:B1000')
-dv_mainttype.add('D2:D1000')
-dv_gst_maint.add('G2:G1000')
-dv_servicestatus.add('L2:L1000')
+dv_machid.add(entry_range('B', MAINT_LAST_ROW))
+dv_mainttype.add(entry_range('D', MAINT_LAST_ROW))
+dv_gst_maint.add(entry_range('G', MAINT_LAST_ROW))
+dv_servicestatus.add(entry_range('L', MAINT_LAST_ROW))
 
-# ============ CHEMICALS STOCK ============
-ws_chem = wb.create_sheet("Chemicals Stock")
-# Added Unit Rate and Est. Value columns
-chem_headers = ["Item ID", "Chemical Name", "Brand", "Category", "Unit", "Unit Rate (₹)", "Opening Stock", "Stock Added", "Stock Used", "Closing Stock", "Min Level", "Status", "Est. Value (₹)", "Last Updated"]
-ws_chem.append(chem_headers)
-style_header(ws_chem, 1, len(chem_headers))
+TIMINGS.mark("Machine Maintenance")
 
-# Data: Item ID, Chemical Name, Brand, Category, Unit, Unit Rate, Opening Stock, Stock Added, Stock Used, Min Level, Last Updated
+# ============ STOCK ITEM MASTERS ============
+# Item masters: stock on hand before the first logged movement, min level, date of that count
+# Item ID, Chemical Name, Brand, Category, Unit, Unit Rate, Initial Stock, Min Level, Counted On
 chem_data = [
-    ["CH001", "Floor Cleaner", "Lizol", "Cleaning Agents", "Liters", 120, 50, 100, 80, 20, datetime(2025, 1, 25)],
-    ["CH002", "Glass Cleaner", "Colin", "Cleaning Agents", "Liters", 95, 30, 50, 45, 15, datetime(2025, 1, 25)],
-    ["CH003", "Toilet Cleaner", "Harpic", "Cleaning Agents", "Liters", 110, 40, 80, 70, 20, datetime(2025, 1, 25)],
-    ["CH004", "Pesticide Spray", "Baygon Pro", "Pest Control", "Cans", 350, 25, 50, 40, 10, datetime(2025, 1, 25)],
-    ["CH005", "Surface Disinfectant", "Lysol", "Sanitizers", "Liters", 180, 25, 50, 40, 15, datetime(2025, 1, 25)],
+    ["CH001", "Floor Cleaner", "Lizol", "Cleaning Agents", "Liters", 120, 50, 20, datetime(2025, 1, 1)],
+    ["CH002", "Glass Cleaner", "Colin", "Cleaning Agents", "Liters", 95, 30, 15, datetime(2025, 1, 1)],
+    ["CH003", "Toilet Cleaner", "Harpic", "Cleaning Agents", "Liters", 110, 40, 20, datetime(2025, 1, 1)],
+    ["CH004", "Pesticide Spray", "Baygon Pro", "Pest Control", "Cans", 350, 25, 10, datetime(2025, 1, 1)],
+    ["CH005", "Surface Disinfectant", "Lysol", "Sanitizers", "Liters", 180, 25, 15, datetime(2025, 1, 1)],
 ]
-
-for i, row in enumerate(chem_data, start=2):
-    ws_chem.cell(row=i, column=1).value = row[0]   # Item ID
-    ws_chem.cell(row=i, column=2).value = row[1]   # Chemical Name
-    ws_chem.cell(row=i, column=3).value = row[2]   # Brand
-    ws_chem.cell(row=i, column=4).value = row[3]   # Category
-    ws_chem.cell(row=i, column=5).value = row[4]   # Unit
-    ws_chem.cell(row=i, column=6).value = row[5]   # Unit Rate
-    ws_chem.cell(row=i, column=7).value = row[6]   # Opening Stock
-    ws_chem.cell(row=i, column=8).value = row[7]   # Stock Added
-    ws_chem.cell(row=i, column=9).value = row[8]   # Stock Used
-    ws_chem.cell(row=i, column=10).value = f"=G{i}+H{i}-I{i}"  # Closing Stock = Opening + Added - Used
-    ws_chem.cell(row=i, column=11).value = row[9]  # Min Level
-    ws_chem.cell(row=i, column=12).value = f'=IF(J{i}<=K{i},"Low Stock","OK")'  # Status
-    ws_chem.cell(row=i, column=13).value = f"=J{i}*F{i}"  # Est. Value = Closing Stock × Unit Rate
-    ws_chem.cell(row=i, column=14).value = row[10]  # Last Updated
-
-style_data_rows(ws_chem, 2, 6, len(chem_headers))
-auto_width(ws_chem, len(chem_headers))
-ws_chem.column_dimensions['B'].width = 20
-for row in range(2, 7):
-    ws_chem.cell(row=row, column=6).number_format = currency_format   # Unit Rate
-    ws_chem.cell(row=row, column=13).number_format = currency_format  # Est. Value
-    ws_chem.cell(row=row, column=14).number_format = date_format      # Last Updated
-ws_chem.freeze_panes = 'A2'
-ws_chem.auto_filter.ref = f"A1:N6"
-
-low_stock_fill = PatternFill("solid", fgColor="FFCCCC")
-ok_fill = PatternFill("solid", fgColor="CCFFCC")
-ws_chem.conditional_formatting.add('L2:L1000', FormulaRule(formula=['L2="Low Stock"'], fill=low_stock_fill))
-ws_chem.conditional_formatting.add('L2:L1000', FormulaRule(formula=['L2="OK"'], fill=ok_fill))
-
-dv_chemcat = DataValidation(type="list", formula1='"Cleaning Agents,Pest Control,Sanitizers,Specialty"', allow_blank=True)
-dv_chemunit = DataValidation(type="list", formula1='"Liters,KG,Bottles,Cans"', allow_blank=True)
-ws_chem.add_data_validation(dv_chemcat)
-ws_chem.add_data_validation(dv_chemunit)
-dv_chemcat.add('D2:D1000')
-dv_chemunit.add('E2:E1000')
-
-# ============ ACCESSORIES STOCK ============
-ws_acc = wb.create_sheet("Accessories Stock")
-# Added Unit Rate and Est. Value columns
-acc_headers = ["Item ID", "Item Name", "Category", "Unit", "Unit Rate (₹)", "Opening Stock", "Stock Added", "Stock Used", "Closing Stock", "Min Level", "Status", "Est. Value (₹)", "Last Updated"]
-ws_acc.append(acc_headers)
-style_header(ws_acc, 1, len(acc_headers))
-
-# Data: Item ID, Item Name, Category, Unit, Unit Rate, Opening Stock, Stock Added, Stock Used, Min Level, Last Updated
+# Item ID, Item Name, Category, Unit, Unit Rate, Initial Stock, Min Level, Counted On
 acc_data = [
-    ["AC001", "Rubber Hose (10m)", "Pipes & Hoses", "Pieces", 450, 10, 15, 12, 5, datetime(2025, 1, 25)],
-    ["AC002", "Floor Mop", "Brushes & Mops", "Pieces", 250, 20, 30, 25, 10, datetime(2025, 1, 25)],
-    ["AC003", "Microfiber Cloth", "Cloths & Wipes", "Pieces", 80, 50, 100, 80, 25, datetime(2025, 1, 25)],
-    ["AC004", "Rubber Gloves", "Gloves & Safety", "Pairs", 45, 30, 50, 40, 15, datetime(2025, 1, 25)],
-    ["AC005", "Spray Bottles", "Other", "Pieces", 120, 20, 30, 22, 10, datetime(2025, 1, 25)],
+    ["AC001", "Rubber Hose (10m)", "Pipes & Hoses", "Pieces", 450, 10, 5, datetime(2025, 1, 1)],
+    ["AC002", "Floor Mop", "Brushes & Mops", "Pieces", 250, 20, 10, datetime(2025, 1, 1)],
+    ["AC003", "Microfiber Cloth", "Cloths & Wipes", "Pieces", 80, 50, 25, datetime(2025, 1, 1)],
+    ["AC004", "Rubber Gloves", "Gloves & Safety", "Pairs", 45, 30, 15, datetime(2025, 1, 1)],
+    ["AC005", "Spray Bottles", "Other", "Pieces", 120, 20, 10, datetime(2025, 1, 1)],
 ]
 
-for i, row in enumerate(acc_data, start=2):
-    ws_acc.cell(row=i, column=1).value = row[0]   # Item ID
-    ws_acc.cell(row=i, column=2).value = row[1]   # Item Name
-    ws_acc.cell(row=i, column=3).value = row[2]   # Category
-    ws_acc.cell(row=i, column=4).value = row[3]   # Unit
-    ws_acc.cell(row=i, column=5).value = row[4]   # Unit Rate
-    ws_acc.cell(row=i, column=6).value = row[5]   # Opening Stock
-    ws_acc.cell(row=i, column=7).value = row[6]   # Stock Added
-    ws_acc.cell(row=i, column=8).value = row[7]   # Stock Used
-    ws_acc.cell(row=i, column=9).value = f"=F{i}+G{i}-H{i}"  # Closing Stock = Opening + Added - Used
-    ws_acc.cell(row=i, column=10).value = row[8]  # Min Level
-    ws_acc.cell(row=i, column=11).value = f'=IF(I{i}<=J{i},"Low Stock","OK")'  # Status
-    ws_acc.cell(row=i, column=12).value = f"=I{i}*E{i}"  # Est. Value = Closing Stock × Unit Rate
-    ws_acc.cell(row=i, column=13).value = row[9]  # Last Updated
-
-style_data_rows(ws_acc, 2, 6, len(acc_headers))
-auto_width(ws_acc, len(acc_headers))
-ws_acc.column_dimensions['B'].width = 18
-for row in range(2, 7):
-    ws_acc.cell(row=row, column=5).number_format = currency_format   # Unit Rate
-    ws_acc.cell(row=row, column=12).number_format = currency_format  # Est. Value
-    ws_acc.cell(row=row, column=13).number_format = date_format      # Last Updated
-ws_acc.freeze_panes = 'A2'
-ws_acc.auto_filter.ref = f"A1:M6"
-ws_acc.conditional_formatting.add('K2:K1000', FormulaRule(formula=['K2="Low Stock"'], fill=low_stock_fill))
-ws_acc.conditional_formatting.add('K2:K1000', FormulaRule(formula=['K2="OK"'], fill=ok_fill))
-
-dv_acccat = DataValidation(type="list", formula1='"Pipes & Hoses,Brushes & Mops,Cloths & Wipes,Gloves & Safety,Tools,Other"', allow_blank=True)
-ws_acc.add_data_validation(dv_acccat)
-dv_acccat.add('C2:C1000')
-
 # ============ STOCK TRANSACTIONS (FIXED - added Base Amount column for calculation breakdown) ============
 ws_trans = wb.create_sheet("Stock Transactions")
 # Added "Base Amount (₹)" column between Unit Rate and GST % for calculation breakdown
-trans_headers = ["Date", "Transaction ID", "Item Type", "Item ID", "Item Name", "Transaction Type",
-                 "Quantity", "Unit Rate (₹)", "Base Amount (₹)", "GST %", "GST Amount (₹)", "Total Cost (₹)", "Project/Team", "Notes"]
+trans_headers = MIS_HEADERS["stock_transactions"]
 ws_trans.append(trans_headers)
 style_header(ws_trans, 1, len(trans_headers))
 
-trans_data = [
-    [datetime(2025, 1, 2), "TXN001", "Chemical", "CH001", "Floor Cleaner", "Purchase", 50, 120, 0.18, "Warehouse"],
-    [datetime(2025, 1, 5), "TXN002", "Accessory", "AC003", "Microfiber Cloth", "Purchase", 50, 80, 0.18, "Warehouse"],
-    [datetime(2025, 1, 6), "TXN003", "Chemical", "CH001", "Floor Cleaner", "Used", 20, 0, 0, "Team A"],
-    [datetime(2025, 1, 8), "TXN004", "Accessory", "AC004", "Rubber Gloves", "Used", 10, 0, 0, "Team B"],
-    [datetime(2025, 1, 10), "TXN005", "Chemical", "CH002", "Glass Cleaner", "Purchase", 25, 95, 0.18, "Warehouse"],
-]
-
-for i, row in enumerate(trans_data, start=2):
-    ws_trans.cell(row=i, column=1).value = row[0]   # Date
-    ws_trans.cell(row=i, column=2).value = row[1]   # Transaction ID
-    ws_trans.cell(row=i, column=3).value = row[2]   # Item Type
-    ws_trans.cell(row=i, column=4).value = row[3]   # Item ID
-    ws_trans.cell(row=i, column=5).value = row[4]   # Item Name
-    ws_trans.cell(row=i, column=6).value = row[5]   # Transaction Type
-    ws_trans.cell(row=i, column=7).value = row[6]   # Quantity
-    ws_trans.cell(row=i, column=8).value = row[7]   # Unit Rate
+# Stock items drawn from the item masters above
+stock_items = ([("Chemical", c[0], c[1], c[4], c[5]) for c in chem_data]
+               + [("Accessory", a[0], a[1], a[3], a[4]) for a in acc_data])
+trans_fields = input_fields(trans_headers, "Base Amount (₹)", "GST Amount (₹)", "Total Cost (₹)")
+TRANS_ROWS, trans_records = sheet_source(
+    "stock_transactions", trans_fields, TRANS_ROWS,
+    lambda: data.stock_movements(TRANS_ROWS, base_date, days=29, items=stock_items))
+for i, rec in enumerate(trans_records, start=2):
+    for col, header in enumerate(trans_headers, start=1):
+        ws_trans.cell(row=i, column=col).value = rec.get(header)
     ws_trans.cell(row=i, column=9).value = f"=G{i}*H{i}"   # Base Amount = Qty × Unit Rate
-    ws_trans.cell(row=i, column=10).value = row[8]  # GST %
     ws_trans.cell(row=i, column=11).value = f"=I{i}*J{i}"  # GST Amount = Base Amount × GST%
     ws_trans.cell(row=i, column=12).value = f"=I{i}+K{i}"  # Total Cost = Base Amount + GST Amount
-    ws_trans.cell(row=i, column=13).value = row[9]  # Project/Team
 
-style_data_rows(ws_trans, 2, 6, len(trans_headers))
+TRANS_LAST_ROW = TRANS_ROWS + 1
+style_data_rows(ws_trans, 2, TRANS_LAST_ROW, len(trans_headers))
 auto_width(ws_trans, len(trans_headers))
-for row in range(2, 7):
+for row in range(2, TRANS_LAST_ROW + 1):
     ws_trans.cell(row=row, column=1).number_format = date_format
     ws_trans.cell(row=row, column=8).number_format = currency_format   # Unit Rate
     ws_trans.cell(row=row, column=9).number_format = currency_format   # Base Amount
@@ -727,7 +815,7 @@ for row in range(2, 7):
     ws_trans.cell(row=row, column=11).number_format = currency_format  # GST Amount
     ws_trans.cell(row=row, column=12).number_format = currency_format  # Total Cost
 ws_trans.freeze_panes = 'A2'
-ws_trans.auto_filter.ref = f"A1:N6"
+add_table(ws_trans, "tblStockTransactions", trans_headers, TRANS_LAST_ROW)
 
 # FIXED: Only Item Type, Transaction Type, GST % have dropdowns
 dv_transtype = DataValidation(type="list", formula1='"Purchase,Used,Returned,Damaged"', allow_blank=True)
@@ -738,47 +826,185 @@ ws_trans.add_data_validation(dv_trans_itemtype)
 ws_trans.add_data_validation(dv_transtype)
 ws_trans.add_data_validation(dv_gst_trans)
 
-dv_trans_itemtype.add('C2:C1000')
-dv_transtype.add('F2:F1000')
-dv_gst_trans.add('J2:J1000')  # GST % is now column J
+dv_trans_itemtype.add(entry_range('C', TRANS_LAST_ROW))
+dv_transtype.add(entry_range('F', TRANS_LAST_ROW))
+dv_gst_trans.add(entry_range('J', TRANS_LAST_ROW))  # GST % is now column J
 # NO dropdowns on Quantity (G), Unit Rate (H), Base Amount (I), Project/Team (M)
 
+TIMINGS.mark("Stock Transactions")
+
+# ============ STOCK MOVEMENTS (INVENTORY ENGINE) ============
+# Chemicals Stock, Accessories Stock and Stock Reports are derived from the
+# Stock Transactions sheet as written: mis_inventory replays the movements, indexed by
+# Item ID, for the --stock-from/--stock-to period (default: the whole log), and
+# values the stock through FIFO / moving-average cost layers (--valuation).
+# With --from-db the period defaults to the store window, and the log is every
+# stored movement up to its end, so movements before the window roll into
+# Opening Stock instead of being lost.
+STOCK_FROM = args.stock_from or (STORE_WINDOW[0] if args.from_db else None)
+STOCK_TO = args.stock_to or (STORE_WINDOW[1] if args.from_db else None)
+
+def stock_log():
+    if args.from_db:
+        return STORE.rows("stock_transactions", None, STOCK_TO)
+    return sheet_records(ws_trans, TRANS_LAST_ROW)
+
+stock = replay_stock(
+    stock_log(),
+    initial={**{c[0]: c[6] for c in chem_data}, **{a[0]: a[5] for a in acc_data}},
+    date_from=STOCK_FROM, date_to=STOCK_TO,
+)
+# Initial stock is valued at the item master's Unit Rate
+valuation = value_stock(
+    stock_log(), method=args.valuation,
+    initial={**{c[0]: (c[6], c[5]) for c in chem_data}, **{a[0]: (a[5], a[4]) for a in acc_data}},
+    date_from=STOCK_FROM, date_to=STOCK_TO,
+)
+stock_period = "all movements"
+if STOCK_FROM or STOCK_TO:
+    stock_period = (f"{STOCK_FROM:%d-%b-%Y}" if STOCK_FROM else "start") + " to " + \
+                   (f"{STOCK_TO:%d-%b-%Y}" if STOCK_TO else "latest")
+
+# Quantity columns written from the engine, in sheet order
+STOCK_QTY_HEADERS = ["Opening Stock", "Purchased", "Used", "Returned", "Damaged"]
+
+def stock_quantities(item_id):
+    item = stock.get(item_id)
+    return [item.opening, item.purchased, item.used, item.returned, item.damaged]
+
+def last_updated(item_id, counted_on):
+    moved = stock.get(item_id).last_movement
+    return datetime(moved.year, moved.month, moved.day) if moved else counted_on
+
+# One stock row per item: the masters, then every other Item ID in the log (Chemicals
+# by Item Type, anything else on Accessories Stock), named and priced from the log
+chem_items, acc_items = list(chem_data), list(acc_data)
+master_ids = {row[0] for row in chem_data + acc_data}
+for item_id in sorted((i for i in stock.items if i not in master_ids), key=str):
+    item = stock.items[item_id]
+    rate = item.unit_rate or round(valuation.item(item_id).unit_cost, 2)
+    if str(item.item_type or "").strip().casefold() == "chemical":
+        chem_items.append([item_id, item.name or item_id, None, None, None, rate, 0, 0, None])
+    else:
+        acc_items.append([item_id, item.name or item_id, None, None, rate, 0, 0, None])
+if stock.skipped:
+    print(f"Stock Transactions: {len(stock.skipped):,} movements skipped (unknown Transaction Type or no Item ID)")
+
+TIMINGS.mark("Stock Movements")
+
+# ============ CHEMICALS STOCK ============
+ws_chem = wb.create_sheet("Chemicals Stock", wb.index(ws_trans))  # before Stock Transactions
+chem_headers = (["Item ID", "Chemical Name", "Brand", "Category", "Unit", "Unit Rate (₹)"] + STOCK_QTY_HEADERS
+                + ["Closing Stock", "Min Level", "Status", "Est. Value (₹)", "Last Updated"])
+ws_chem.append(chem_headers)
+style_header(ws_chem, 1, len(chem_headers))
+
+CHEM_ROWS = {}  # Item ID -> sheet row, for Stock Reports
+for i, row in enumerate(chem_items, start=2):
+    CHEM_ROWS[row[0]] = i
+    for col, value in enumerate(row[:6] + stock_quantities(row[0]), start=1):
+        ws_chem.cell(row=i, column=col).value = value   # Item ID .. Damaged (G-K)
+    ws_chem.cell(row=i, column=12).value = f"=G{i}+H{i}-I{i}+J{i}-K{i}"  # Closing = Opening + Purchased - Used + Returned - Damaged
+    ws_chem.cell(row=i, column=13).value = row[7]  # Min Level
+    ws_chem.cell(row=i, column=14).value = f'=IF(L{i}<=M{i},"Low Stock","OK")'  # Status
+    ws_chem.cell(row=i, column=15).value = valuation.value(row[0])  # Est. Value from the cost layers
+    ws_chem.cell(row=i, column=16).value = last_updated(row[0], row[8])
+CHEM_LAST_ROW = len(chem_items) + 1
+
+style_data_rows(ws_chem, 2, CHEM_LAST_ROW, len(chem_headers))
+auto_width(ws_chem, len(chem_headers))
+ws_chem.column_dimensions['B'].width = 20
+for row in range(2, CHEM_LAST_ROW + 1):
+    ws_chem.cell(row=row, column=6).number_format = currency_format   # Unit Rate
+    ws_chem.cell(row=row, column=15).number_format = currency_format  # Est. Value
+    ws_chem.cell(row=row, column=16).number_format = date_format      # Last Updated
+ws_chem.freeze_panes = 'A2'
+ws_chem.auto_filter.ref = f"A1:P{CHEM_LAST_ROW}"
+
+low_stock_fill = PatternFill("solid", fgColor="FFCCCC")
+ok_fill = PatternFill("solid", fgColor="CCFFCC")
+ws_chem.conditional_formatting.add(entry_range('N', CHEM_LAST_ROW),
+                                    FormulaRule(formula=['N2="Low Stock"'], fill=low_stock_fill))
+ws_chem.conditional_formatting.add(entry_range('N', CHEM_LAST_ROW), FormulaRule(formula=['N2="OK"'], fill=ok_fill))
+
+dv_chemcat = DataValidation(type="list", formula1='"Cleaning Agents,Pest Control,Sanitizers,Specialty"', allow_blank=True)
+dv_chemunit = DataValidation(type="list", formula1='"Liters,KG,Bottles,Cans"', allow_blank=True)
+ws_chem.add_data_validation(dv_chemcat)
+ws_chem.add_data_validation(dv_chemunit)
+dv_chemcat.add(entry_range('D', CHEM_LAST_ROW))
+dv_chemunit.add(entry_range('E', CHEM_LAST_ROW))
+
+TIMINGS.mark("Chemicals Stock")
+
+# ============ ACCESSORIES STOCK ============
+ws_acc = wb.create_sheet("Accessories Stock", wb.index(ws_trans))
+acc_headers = (["Item ID", "Item Name", "Category", "Unit", "Unit Rate (₹)"] + STOCK_QTY_HEADERS
+               + ["Closing Stock", "Min Level", "Status", "Est. Value (₹)", "Last Updated"])
+ws_acc.append(acc_headers)
+style_header(ws_acc, 1, len(acc_headers))
+
+ACC_ROWS = {}  # Item ID -> sheet row, for Stock Reports
+for i, row in enumerate(acc_items, start=2):
+    ACC_ROWS[row[0]] = i
+    for col, value in enumerate(row[:5] + stock_quantities(row[0]), start=1):
+        ws_acc.cell(row=i, column=col).value = value    # Item ID .. Damaged (F-J)
+    ws_acc.cell(row=i, column=11).value = f"=F{i}+G{i}-H{i}+I{i}-J{i}"  # Closing = Opening + Purchased - Used + Returned - Damaged
+    ws_acc.cell(row=i, column=12).value = row[6]  # Min Level
+    ws_acc.cell(row=i, column=13).value = f'=IF(K{i}<=L{i},"Low Stock","OK")'  # Status
+    ws_acc.cell(row=i, column=14).value = valuation.value(row[0])  # Est. Value from the cost layers
+    ws_acc.cell(row=i, column=15).value = last_updated(row[0], row[7])
+ACC_LAST_ROW = len(acc_items) + 1
+
+style_data_rows(ws_acc, 2, ACC_LAST_ROW, len(acc_headers))
+auto_width(ws_acc, len(acc_headers))
+ws_acc.column_dimensions['B'].width = 18
+for row in range(2, ACC_LAST_ROW + 1):
+    ws_acc.cell(row=row, column=5).number_format = currency_format   # Unit Rate
+    ws_acc.cell(row=row, column=14).number_format = currency_format  # Est. Value
+    ws_acc.cell(row=row, column=15).number_format = date_format      # Last Updated
+ws_acc.freeze_panes = 'A2'
+ws_acc.auto_filter.ref = f"A1:O{ACC_LAST_ROW}"
+ws_acc.conditional_formatting.add(entry_range('M', ACC_LAST_ROW),
+                                    FormulaRule(formula=['M2="Low Stock"'], fill=low_stock_fill))
+ws_acc.conditional_formatting.add(entry_range('M', ACC_LAST_ROW), FormulaRule(formula=['M2="OK"'], fill=ok_fill))
+
+dv_acccat = DataValidation(type="list", formula1='"Pipes & Hoses,Brushes & Mops,Cloths & Wipes,Gloves & Safety,Tools,Other"', allow_blank=True)
+ws_acc.add_data_validation(dv_acccat)
+dv_acccat.add(entry_range('C', ACC_LAST_ROW))
+
+TIMINGS.mark("Accessories Stock")
+
 # ============ GST INVOICES (NEW) ============
 ws_gst_inv = wb.create_sheet("GST Invoices")
-gst_inv_headers = ["Invoice Date", "Invoice Number", "Customer Name", "Service Type", "Base Amount (₹)",
-                   "GST %", "GST Amount (₹)", "Total Amount (₹)", "GST Payment Status", "Payment Date", "Notes"]
+gst_inv_headers = MIS_HEADERS["gst_invoices"]
 ws_gst_inv.append(gst_inv_headers)
 style_header(ws_gst_inv, 1, len(gst_inv_headers))
 
 # Sample GST invoice data
-for i in range(10):
+gst_inv_fields = input_fields(gst_inv_headers, "GST Amount (₹)", "Total Amount (₹)")
+GST_INV_ROWS, gst_inv_records = sheet_source("gst_invoices", gst_inv_fields, 10,
+                                             lambda: data.gst_invoices(10, base_date))
+GST_INV_LAST_ROW = GST_INV_ROWS + 1
+for i, rec in enumerate(gst_inv_records):
     row_num = i + 2
-    date = base_date + timedelta(days=random.randint(0, 28))
-    invoice = f"GST-INV-2025-{1001+i}"
-    customer = random.choice(customers)
-    service = random.choice(services)
-    base_amount = random.randint(5000, 50000)
-    gst_rate = 0.18
-    status = random.choice(["Paid", "Pending"])
-    pay_date = date + timedelta(days=random.randint(1, 15)) if status == "Paid" else None
-
-    ws_gst_inv.cell(row=row_num, column=1).value = date
-    ws_gst_inv.cell(row=row_num, column=2).value = invoice
-    ws_gst_inv.cell(row=row_num, column=3).value = customer
-    ws_gst_inv.cell(row=row_num, column=4).value = service
-    ws_gst_inv.cell(row=row_num, column=5).value = base_amount
-    ws_gst_inv.cell(row=row_num, column=6).value = gst_rate
+    ws_gst_inv.cell(row=row_num, column=1).value = rec["Invoice Date"]
+    ws_gst_inv.cell(row=row_num, column=2).value = rec["Invoice Number"]
+    ws_gst_inv.cell(row=row_num, column=3).value = rec["Customer Name"]
+    ws_gst_inv.cell(row=row_num, column=4).value = rec["Service Type"]
+    ws_gst_inv.cell(row=row_num, column=5).value = rec["Base Amount (₹)"]
+    ws_gst_inv.cell(row=row_num, column=6).value = rec["GST %"]
     ws_gst_inv.cell(row=row_num, column=7).value = f"=E{row_num}*F{row_num}"
     ws_gst_inv.cell(row=row_num, column=8).value = f"=E{row_num}+G{row_num}"
-    ws_gst_inv.cell(row=row_num, column=9).value = status
-    ws_gst_inv.cell(row=row_num, column=10).value = pay_date
+    ws_gst_inv.cell(row=row_num, column=9).value = rec["GST Payment Status"]
+    ws_gst_inv.cell(row=row_num, column=10).value = rec["Payment Date"]
+    ws_gst_inv.cell(row=row_num, column=11).value = rec.get("Notes")
 
-style_data_rows(ws_gst_inv, 2, 11, len(gst_inv_headers))
+style_data_rows(ws_gst_inv, 2, GST_INV_LAST_ROW, len(gst_inv_headers))
 auto_width(ws_gst_inv, len(gst_inv_headers))
 ws_gst_inv.column_dimensions['C'].width = 20
 ws_gst_inv.column_dimensions['D'].width = 16
 
-for row in range(2, 12):
+for row in range(2, GST_INV_LAST_ROW + 1):
     ws_gst_inv.cell(row=row, column=1).number_format = date_format
     ws_gst_inv.cell(row=row, column=5).number_format = currency_format
     ws_gst_inv.cell(row=row, column=6).number_format = '0%'
@@ -786,7 +1012,7 @@ for row in range(2, 12):
     ws_gst_inv.cell(row=row, column=8).number_format = currency_format
     ws_gst_inv.cell(row=row, column=10).number_format = date_format
 ws_gst_inv.freeze_panes = 'A2'
-ws_gst_inv.auto_filter.ref = f"A1:K11"
+add_table(ws_gst_inv, "tblGSTInvoices", gst_inv_headers, GST_INV_LAST_ROW)
 
 dv_gst_pay_status = DataValidation(type="list", formula1='"Paid,Pending"', allow_blank=True)
 dv_gst_service = DataValidation(type="list", formula1='"Deep Cleaning,Regular Cleaning,Pest Control,Painting,Plumbing,Electrical,Carpentry,AC Service"', allow_blank=True)
@@ -796,9 +1022,11 @@ ws_gst_inv.add_data_validation(dv_gst_pay_status)
 ws_gst_inv.add_data_validation(dv_gst_service)
 ws_gst_inv.add_data_validation(dv_gst_rate)
 
-dv_gst_service.add('D2:D1000')
-dv_gst_rate.add('F2:F1000')
-dv_gst_pay_status.add('I2:I1000')
+dv_gst_service.add(entry_range('D', GST_INV_LAST_ROW))
+dv_gst_rate.add(entry_range('F', GST_INV_LAST_ROW))
+dv_gst_pay_status.add(entry_range('I', GST_INV_LAST_ROW))
+
+TIMINGS.mark("GST Invoices")
 
 # ============ INCOME SUMMARY ============
 ws_inc_sum = wb.create_sheet("Income Summary")
@@ -813,11 +1041,11 @@ style_header(ws_inc_sum, 4, 6)
 
 for i, svc in enumerate(services, start=5):
     ws_inc_sum.cell(row=i, column=1).value = svc
-    ws_inc_sum.cell(row=i, column=2).value = f'=SUMIF(\'Income Tracker\'!D:D,A{i},\'Income Tracker\'!G:G)'
-    ws_inc_sum.cell(row=i, column=3).value = f'=SUMIF(\'Income Tracker\'!D:D,A{i},\'Income Tracker\'!I:I)'
-    ws_inc_sum.cell(row=i, column=4).value = f'=SUMIF(\'Income Tracker\'!D:D,A{i},\'Income Tracker\'!L:L)'
-    ws_inc_sum.cell(row=i, column=5).value = f'=SUMIF(\'Income Tracker\'!D:D,A{i},\'Income Tracker\'!M:M)'
-    ws_inc_sum.cell(row=i, column=6).value = f'=COUNTIF(\'Income Tracker\'!D:D,A{i})'
+    ws_inc_sum.cell(row=i, column=2).value = f'=SUMIF({col_ref("tblIncome", "Service Type")},A{i},{col_ref("tblIncome", "Base Amount (₹)")})'
+    ws_inc_sum.cell(row=i, column=3).value = f'=SUMIF({col_ref("tblIncome", "Service Type")},A{i},{col_ref("tblIncome", "Discount Amount (₹)")})'
+    ws_inc_sum.cell(row=i, column=4).value = f'=SUMIF({col_ref("tblIncome", "Service Type")},A{i},{col_ref("tblIncome", "GST Amount (₹)")})'
+    ws_inc_sum.cell(row=i, column=5).value = f'=SUMIF({col_ref("tblIncome", "Service Type")},A{i},{col_ref("tblIncome", "Total Amount (₹)")})'
+    ws_inc_sum.cell(row=i, column=6).value = f'=COUNTIF({col_ref("tblIncome", "Service Type")},A{i})'
     for col in [2, 3, 4, 5]:
         ws_inc_sum.cell(row=i, column=col).number_format = currency_format
 
@@ -834,6 +1062,8 @@ auto_width(ws_inc_sum, 6)
 ws_inc_sum.column_dimensions['A'].width = 18
 ws_inc_sum.auto_filter.ref = f"A4:F13"
 
+TIMINGS.mark("Income Summary")
+
 # ============ EXPENSE SUMMARY ============
 ws_exp_sum = wb.create_sheet("Expense Summary")
 ws_exp_sum['A1'] = "EXPENSE SUMMARY REPORT"
@@ -847,10 +1077,10 @@ style_header(ws_exp_sum, 4, 5)
 
 for i, cat in enumerate(expense_cats, start=5):
     ws_exp_sum.cell(row=i, column=1).value = cat
-    ws_exp_sum.cell(row=i, column=2).value = f'=SUMIF(\'Expense Tracker\'!C:C,A{i},\'Expense Tracker\'!F:F)'
-    ws_exp_sum.cell(row=i, column=3).value = f'=SUMIF(\'Expense Tracker\'!C:C,A{i},\'Expense Tracker\'!H:H)'
-    ws_exp_sum.cell(row=i, column=4).value = f'=SUMIF(\'Expense Tracker\'!C:C,A{i},\'Expense Tracker\'!I:I)'
-    ws_exp_sum.cell(row=i, column=5).value = f'=COUNTIF(\'Expense Tracker\'!C:C,A{i})'
+    ws_exp_sum.cell(row=i, column=2).value = f'=SUMIF({col_ref("tblExpenses", "Category")},A{i},{col_ref("tblExpenses", "Base Amount (₹)")})'
+    ws_exp_sum.cell(row=i, column=3).value = f'=SUMIF({col_ref("tblExpenses", "Category")},A{i},{col_ref("tblExpenses", "GST Amount (₹)")})'
+    ws_exp_sum.cell(row=i, column=4).value = f'=SUMIF({col_ref("tblExpenses", "Category")},A{i},{col_ref("tblExpenses", "Total Amount (₹)")})'
+    ws_exp_sum.cell(row=i, column=5).value = f'=COUNTIF({col_ref("tblExpenses", "Category")},A{i})'
     for col in [2, 3, 4]:
         ws_exp_sum.cell(row=i, column=col).number_format = currency_format
 
@@ -866,6 +1096,8 @@ style_data_rows(ws_exp_sum, 5, 10, 5)
 auto_width(ws_exp_sum, 5)
 ws_exp_sum.auto_filter.ref = f"A4:E10"
 
+TIMINGS.mark("Expense Summary")
+
 # ============ GST SUMMARY ============
 ws_gst = wb.create_sheet("GST Summary")
 ws_gst['A1'] = "GST SUMMARY REPORT"
@@ -877,8 +1109,8 @@ ws_gst['A3'].font = Font(bold=True, size=12, color="008000")
 ws_gst.append(["Source", "Base Amount (₹)", "GST Amount (₹)"])
 style_header(ws_gst, 4, 3)
 ws_gst['A5'] = "Service Revenue"
-ws_gst['B5'] = "=SUM('Income Tracker'!J:J)"
-ws_gst['C5'] = "=SUM('Income Tracker'!L:L)"
+ws_gst['B5'] = f'=SUM({col_ref("tblIncome", "Amount After Discount (₹)")})'
+ws_gst['C5'] = f'=SUM({col_ref("tblIncome", "GST Amount (₹)")})'
 ws_gst['A6'] = "TOTAL GST COLLECTED"
 ws_gst['A6'].font = Font(bold=True)
 ws_gst['B6'] = "=B5"
@@ -894,10 +1126,10 @@ ws_gst['A9'].font = Font(bold=True, size=12, color="FF0000")
 ws_gst.append(["Source", "Base Amount (₹)", "GST Amount (₹)"])
 style_header(ws_gst, 10, 3)
 gst_sources = [
-    ("Expenses", "=SUM('Expense Tracker'!F:F)", "=SUM('Expense Tracker'!H:H)"),
-    ("Stock Purchases", "=SUM('Stock Purchases'!K:K)", "=SUM('Stock Purchases'!M:M)"),
-    ("Machine Purchases", "=SUM('Machines & Equipment'!H:H)", "=SUM('Machines & Equipment'!J:J)"),
-    ("Maintenance", "=SUM('Machine Maintenance'!F:F)", "=SUM('Machine Maintenance'!H:H)"),
+    ("Expenses", f'=SUM({col_ref("tblExpenses", "Base Amount (₹)")})', f'=SUM({col_ref("tblExpenses", "GST Amount (₹)")})'),
+    ("Stock Purchases", f'=SUM({col_ref("tblStockPurchases", "Base Amount (₹)")})', f'=SUM({col_ref("tblStockPurchases", "GST Amount (₹)")})'),
+    ("Machine Purchases", f'=SUM({col_ref("tblMachines", "Base Cost (₹)")})', f'=SUM({col_ref("tblMachines", "GST Amount (₹)")})'),
+    ("Maintenance", f'=SUM({col_ref("tblMaintenance", "Base Cost (₹)")})', f'=SUM({col_ref("tblMaintenance", "GST Amount (₹)")})'),
 ]
 for i, (name, base, gst) in enumerate(gst_sources, start=11):
     ws_gst.cell(row=i, column=1).value = name
@@ -917,9 +1149,9 @@ style_data_rows(ws_gst, 11, 15, 3)
 ws_gst['A18'] = "GST INVOICE STATUS"
 ws_gst['A18'].font = Font(bold=True, size=12, color="1F4E79")
 ws_gst['A19'] = "GST Paid (from Invoices)"
-ws_gst['B19'] = "=SUMIF('GST Invoices'!I:I,\"Paid\",'GST Invoices'!G:G)"
+ws_gst['B19'] = f'=SUMIF({col_ref("tblGSTInvoices", "GST Payment Status")},"Paid",{col_ref("tblGSTInvoices", "GST Amount (₹)")})'
 ws_gst['A20'] = "GST Pending (from Invoices)"
-ws_gst['B20'] = "=SUMIF('GST Invoices'!I:I,\"Pending\",'GST Invoices'!G:G)"
+ws_gst['B20'] = f'=SUMIF({col_ref("tblGSTInvoices", "GST Payment Status")},"Pending",{col_ref("tblGSTInvoices", "GST Amount (₹)")})'
 ws_gst['B19'].number_format = currency_format
 ws_gst['B20'].number_format = currency_format
 ws_gst['B20'].font = Font(bold=True, color="FF0000")
@@ -936,6 +1168,79 @@ ws_gst.column_dimensions['A'].width = 25
 ws_gst.column_dimensions['B'].width = 18
 ws_gst.column_dimensions['C'].width = 18
 
+TIMINGS.mark("GST Summary")
+
+# ============ GST RETURNS (PRECOMPUTED) ============
+# Month x rate x vendor GSTIN buckets from one pass over the taxable rows (mis_gst)
+gst_book = build_gst_book(
+    income=sheet_records(ws_income, INCOME_LAST_ROW),
+    invoices=sheet_records(ws_gst_inv, GST_INV_LAST_ROW),
+    expenses=sheet_records(ws_expense, EXPENSE_LAST_ROW),
+    stock_purchases=sheet_records(ws_stock_purch, STOCK_PURCH_LAST_ROW),
+    machines=sheet_records(ws_machines, MACHINE_LAST_ROW),
+    maintenance=sheet_records(ws_maint, MAINT_LAST_ROW),
+)
+ZERO = (0, 0, 0)
+
+ws_gst_ret = wb.create_sheet("GST Returns")
+ws_gst_ret['A1'] = "GST RETURN SUMMARY"
+ws_gst_ret.merge_cells('A1:F1')
+ws_gst_ret['A1'].font = Font(bold=True, size=14, color="1F4E79")
+ws_gst_ret['A2'] = (f"Precomputed from {gst_book.rows:,} taxable rows on {datetime.now():%d-%b-%Y %H:%M} - "
+                    f"values are static, regenerate the workbook to refresh")
+ws_gst_ret['A2'].font = Font(italic=True, color="666666")
+
+# Month-wise liability: output tax less input tax credit
+gst_out = gst_book.rollup("month", direction=OUTPUT)
+gst_in = gst_book.rollup("month", direction=INPUT)
+gst_month_rows = []
+for m in gst_book.months:
+    out, inp = gst_out.get((m,), ZERO), gst_in.get((m,), ZERO)
+    gst_month_rows.append([month_label(m), out[0], out[1], inp[0], inp[1], out[1] - inp[1]])
+gst_month_rows.append(["TOTAL"] + [sum(r[c] for r in gst_month_rows) for c in range(1, 6)])
+next_row = report_table(ws_gst_ret, 4, "MONTH-WISE GST LIABILITY",
+                        ["Month", "Output Taxable (₹)", "Output Tax (₹)", "Input Taxable (₹)",
+                         "Input Tax Credit (₹)", "Net Payable (₹)"],
+                        gst_month_rows, [None] + [currency_format] * 5)
+
+# Rate-wise breakup per month
+gst_rate_out = gst_book.rollup("month", "rate", direction=OUTPUT)
+gst_rate_in = gst_book.rollup("month", "rate", direction=INPUT)
+gst_rate_rows = []
+for key in sorted(set(gst_rate_out) | set(gst_rate_in)):
+    out, inp = gst_rate_out.get(key, ZERO), gst_rate_in.get(key, ZERO)
+    gst_rate_rows.append([month_label(key[0]), key[1], out[0], out[1], inp[0], inp[1]])
+gst_rate_rows.append(["TOTAL", None] + [sum(r[c] for r in gst_rate_rows) for c in range(2, 6)])
+next_row = report_table(ws_gst_ret, next_row, "RATE-WISE BREAKUP",
+                        ["Month", "GST Rate", "Output Taxable (₹)", "Output Tax (₹)", "Input Taxable (₹)",
+                         "Input Tax (₹)"],
+                        gst_rate_rows, [None, '0%'] + [currency_format] * 4)
+
+# Input tax credit per supplier, for matching against the suppliers' filings
+gst_vendor_rows = [[month_label(m), gstin, rate, documents, taxable, tax]
+                   for (m, gstin, rate), (taxable, tax, documents)
+                   in sorted(gst_book.rollup("month", "gstin", "rate", direction=INPUT).items())]
+gst_vendor_rows.append(["TOTAL", None, None] + [sum(r[c] for r in gst_vendor_rows) for c in range(3, 6)])
+next_row = report_table(ws_gst_ret, next_row, "INPUT TAX BY VENDOR GSTIN",
+                        ["Month", "Vendor GSTIN", "GST Rate", "Documents", "Taxable (₹)", "Input Tax (₹)"],
+                        gst_vendor_rows, [None, None, '0%', None, currency_format, currency_format])
+
+# Per source, to reconcile with the GST Summary sheet
+gst_source_rows = [[source, direction, documents, taxable, tax]
+                   for (direction, source), (taxable, tax, documents)
+                   in gst_book.rollup("direction", "source").items()]
+gst_source_rows.append(["NET PAYABLE", None, None, None,
+                        sum(r[4] if r[1] == OUTPUT else -r[4] for r in gst_source_rows)])
+report_table(ws_gst_ret, next_row, "BY SOURCE SHEET",
+             ["Source", "Direction", "Documents", "Taxable (₹)", "GST (₹)"],
+             gst_source_rows, [None, None, None, currency_format, currency_format])
+
+auto_width(ws_gst_ret, 6)
+ws_gst_ret.column_dimensions['A'].width = 22
+ws_gst_ret.column_dimensions['B'].width = 20
+
+TIMINGS.mark("GST Returns")
+
 # ============ TDS SUMMARY ============
 ws_tds = wb.create_sheet("TDS Summary")
 ws_tds['A1'] = "TDS SUMMARY REPORT"
@@ -949,13 +1254,13 @@ ws_tds['A4'].font = Font(bold=True, size=12)
 ws_tds.append(["Metric", "Amount (₹)"])
 style_header(ws_tds, 5, 2)
 ws_tds['A6'] = "Total Contractor Payments (Gross)"
-ws_tds['B6'] = "=SUM('Contractor Payments'!G:G)"
+ws_tds['B6'] = f'=SUM({col_ref("tblContractorPayments", "Gross Amount (₹)")})'
 ws_tds['A7'] = "Total TDS Deducted"
-ws_tds['B7'] = "=SUM('Contractor Payments'!I:I)"
+ws_tds['B7'] = f'=SUM({col_ref("tblContractorPayments", "TDS Amount (₹)")})'
 ws_tds['A8'] = "Total Net Paid to Contractors"
-ws_tds['B8'] = "=SUM('Contractor Payments'!J:J)"
+ws_tds['B8'] = f'=SUM({col_ref("tblContractorPayments", "Net Payable (₹)")})'
 ws_tds['A9'] = "TDS Deposited"
-ws_tds['B9'] = "=SUMIF('Contractor Payments'!N:N,\"Yes\",'Contractor Payments'!I:I)"
+ws_tds['B9'] = f'=SUMIF({col_ref("tblContractorPayments", "TDS Deposited")},"Yes",{col_ref("tblContractorPayments", "TDS Amount (₹)")})'
 ws_tds['A10'] = "TDS Pending Deposit"
 ws_tds['B10'] = "=B7-B9"
 ws_tds['B10'].font = Font(bold=True, color="FF0000")
@@ -963,120 +1268,148 @@ ws_tds['B10'].font = Font(bold=True, color="FF0000")
 for row in range(6, 11):
     ws_tds.cell(row=row, column=2).number_format = currency_format
 style_data_rows(ws_tds, 6, 10, 2)
-auto_width(ws_tds, 2)
+
+# Section 194C thresholds per contractor PAN and financial year (mis_tds)
+tds = build_tds_ledger(sheet_records(ws_contractor, CONTRACTOR_LAST_ROW))
+ws_tds['A12'] = (f"Thresholds: single payment over ₹{SINGLE_LIMIT:,} or financial-year aggregate over "
+                 f"₹{ANNUAL_LIMIT:,} per PAN; rate 1% for individual/HUF PANs, 2% others, 20% without PAN")
+ws_tds['A12'].font = Font(italic=True, color="666666")
+
+check_cols = ["Date", "Payment ID", "Contractor Name", "Contractor PAN", "Financial Year", "Gross Amount",
+              "FY Aggregate", "Rule", "Rate", "TDS Due", "TDS Deducted", "Difference"]
+check_rows = [[c[col] for col in check_cols] for c in tds.checks]
+check_rows.append(["TOTAL", None, None, None, None, sum(c["Gross Amount"] for c in tds.checks), None, None, None,
+                   sum(c["TDS Due"] for c in tds.checks), sum(c["TDS Deducted"] for c in tds.checks),
+                   sum(c["Difference"] for c in tds.checks)])
+next_row = report_table(ws_tds, 14, "SECTION 194C THRESHOLD CHECK (PER PAYMENT)",
+                        [f"{col} (₹)" if col in ("Gross Amount", "FY Aggregate", "TDS Due", "TDS Deducted",
+                                                 "Difference") else col for col in check_cols],
+                        check_rows, [date_format, None, None, None, None, currency_format, currency_format, None,
+                                     '0%', currency_format, currency_format, currency_format])
+flagged = {c["Payment ID"] for c in tds.flagged()}
+for r, c in enumerate(tds.checks, start=16):
+    if c["Payment ID"] in flagged:
+        ws_tds.cell(row=r, column=8).font = Font(bold=True, color="FF6600")     # Rule
+    if abs(c["Difference"]) >= 0.5:
+        ws_tds.cell(row=r, column=12).font = Font(bold=True, color="FF0000")    # short / excess deduction
+
+schedule_rows = [[fy, quarter, pan, tds.names.get(pan), payments, gross, due, deducted]
+                 for (fy, quarter, pan), (payments, gross, due, deducted) in sorted(tds.schedule.items())]
+schedule_rows.append(["TOTAL", None, None, None] + [sum(r[c] for r in schedule_rows) for c in range(4, 8)])
+report_table(ws_tds, next_row, "QUARTERLY TDS SCHEDULE (PER PAN)",
+             ["Financial Year", "Quarter", "Contractor PAN", "Contractor Name", "Payments", "Gross Amount (₹)",
+              "TDS Due (₹)", "TDS Deducted (₹)"],
+             schedule_rows, [None, None, None, None, None, currency_format, currency_format, currency_format])
+
+auto_width(ws_tds, len(check_cols))
 ws_tds.column_dimensions['A'].width = 35
+ws_tds.column_dimensions['C'].width = 24
+ws_tds.column_dimensions['H'].width = 32
+
+TIMINGS.mark("TDS Summary")
 
 # ============ STOCK REPORTS (IMPROVED) ============
 ws_stock_rep = wb.create_sheet("Stock Reports")
 ws_stock_rep['A1'] = "DETAILED STOCK REPORTS"
 ws_stock_rep.merge_cells('A1:F1')
 ws_stock_rep['A1'].font = Font(bold=True, size=14, color="1F4E79")
-
-# Chemical Stock Summary - LINKED TO CHEMICALS STOCK SHEET (updated column positions)
-ws_stock_rep['A3'] = "CHEMICALS STOCK SUMMARY"
-ws_stock_rep['A3'].font = Font(bold=True, size=12, color="008000")
-ws_stock_rep.append(["Item ID", "Chemical Name", "Unit Rate (₹)", "Current Stock", "Min Level", "Status", "Est. Value (₹)"])
-style_header(ws_stock_rep, 4, 7)
-
-# Link to Chemicals Stock sheet - columns updated:
-# A=Item ID, B=Chemical Name, F=Unit Rate, J=Closing Stock, K=Min Level, L=Status, M=Est Value
-for i in range(5, 10):
-    chem_row = i - 3  # Maps to row 2, 3, 4, 5, 6 in Chemicals Stock
-    ws_stock_rep.cell(row=i, column=1).value = f"='Chemicals Stock'!A{chem_row}"  # Item ID
-    ws_stock_rep.cell(row=i, column=2).value = f"='Chemicals Stock'!B{chem_row}"  # Chemical Name
-    ws_stock_rep.cell(row=i, column=3).value = f"='Chemicals Stock'!F{chem_row}"  # Unit Rate
-    ws_stock_rep.cell(row=i, column=4).value = f"='Chemicals Stock'!J{chem_row}"  # Closing Stock (Current)
-    ws_stock_rep.cell(row=i, column=5).value = f"='Chemicals Stock'!K{chem_row}"  # Min Level
-    ws_stock_rep.cell(row=i, column=6).value = f"='Chemicals Stock'!L{chem_row}"  # Status
-    ws_stock_rep.cell(row=i, column=7).value = f"='Chemicals Stock'!M{chem_row}"  # Est. Value (from sheet)
-    ws_stock_rep.cell(row=i, column=3).number_format = currency_format
-    ws_stock_rep.cell(row=i, column=7).number_format = currency_format
-
-style_data_rows(ws_stock_rep, 5, 9, 7)
-ws_stock_rep.cell(row=10, column=1).value = "TOTAL"
-ws_stock_rep.cell(row=10, column=1).font = Font(bold=True)
-ws_stock_rep.cell(row=10, column=4).value = "=SUM(D5:D9)"
-ws_stock_rep.cell(row=10, column=4).font = Font(bold=True)
-ws_stock_rep.cell(row=10, column=7).value = "=SUM(G5:G9)"
-ws_stock_rep.cell(row=10, column=7).font = Font(bold=True)
-ws_stock_rep.cell(row=10, column=7).number_format = currency_format
-
-# Accessories Stock Summary - LINKED TO ACCESSORIES STOCK SHEET (updated column positions)
-ws_stock_rep['A13'] = "ACCESSORIES STOCK SUMMARY"
-ws_stock_rep['A13'].font = Font(bold=True, size=12, color="0066CC")
-ws_stock_rep.append(["Item ID", "Item Name", "Unit Rate (₹)", "Current Stock", "Min Level", "Status", "Est. Value (₹)"])
-style_header(ws_stock_rep, 14, 7)
-
-# Link to Accessories Stock sheet - columns updated:
-# A=Item ID, B=Item Name, E=Unit Rate, I=Closing Stock, J=Min Level, K=Status, L=Est Value
-for i in range(15, 20):
-    acc_row = i - 13  # Maps to row 2, 3, 4, 5, 6 in Accessories Stock
-    ws_stock_rep.cell(row=i, column=1).value = f"='Accessories Stock'!A{acc_row}"  # Item ID
-    ws_stock_rep.cell(row=i, column=2).value = f"='Accessories Stock'!B{acc_row}"  # Item Name
-    ws_stock_rep.cell(row=i, column=3).value = f"='Accessories Stock'!E{acc_row}"  # Unit Rate
-    ws_stock_rep.cell(row=i, column=4).value = f"='Accessories Stock'!I{acc_row}"  # Closing Stock (Current)
-    ws_stock_rep.cell(row=i, column=5).value = f"='Accessories Stock'!J{acc_row}"  # Min Level
-    ws_stock_rep.cell(row=i, column=6).value = f"='Accessories Stock'!K{acc_row}"  # Status
-    ws_stock_rep.cell(row=i, column=7).value = f"='Accessories Stock'!L{acc_row}"  # Est. Value (from sheet)
-    ws_stock_rep.cell(row=i, column=3).number_format = currency_format
-    ws_stock_rep.cell(row=i, column=7).number_format = currency_format
-
-style_data_rows(ws_stock_rep, 15, 19, 7)
-ws_stock_rep.cell(row=20, column=1).value = "TOTAL"
-ws_stock_rep.cell(row=20, column=1).font = Font(bold=True)
-ws_stock_rep.cell(row=20, column=4).value = "=SUM(D15:D19)"
-ws_stock_rep.cell(row=20, column=4).font = Font(bold=True)
-ws_stock_rep.cell(row=20, column=7).value = "=SUM(G15:G19)"
-ws_stock_rep.cell(row=20, column=7).font = Font(bold=True)
-ws_stock_rep.cell(row=20, column=7).number_format = currency_format
+ws_stock_rep['A2'] = (f"Stock period: {stock_period} (from Stock Transactions), "
+                      f"valued {'FIFO' if args.valuation == FIFO else 'at moving average cost'}")
+if stock.skipped:
+    ws_stock_rep['A2'] = (f"{ws_stock_rep['A2'].value}; {len(stock.skipped):,} movements skipped "
+                          f"(unknown Transaction Type or no Item ID)")
+ws_stock_rep['A2'].font = Font(italic=True, color="666666")
+
+stock_rep_headers = ["Item ID", "Name", "Unit Rate (₹)"] + STOCK_QTY_HEADERS + \
+                    ["Current Stock", "Min Level", "Status", "Est. Value (₹)"]
+
+def stock_summary(top, title, color, sheet, item_rows, letters):
+    """
+    Item summary linked to a stock sheet, one row per item (any number of items).
+    `letters` are the sheet's columns in stock_rep_headers order.  Returns the TOTAL row.
+    """
+    ws_stock_rep.cell(row=top, column=1).value = title
+    ws_stock_rep.cell(row=top, column=1).font = Font(bold=True, size=12, color=color)
+    for col, header in enumerate(stock_rep_headers, start=1):
+        ws_stock_rep.cell(row=top + 1, column=col).value = header
+    style_header(ws_stock_rep, top + 1, len(stock_rep_headers))
+    first = top + 2
+    for i, sheet_row in enumerate(item_rows.values(), start=first):
+        for col, letter in enumerate(letters, start=1):
+            ws_stock_rep.cell(row=i, column=col).value = f"='{sheet}'!{letter}{sheet_row}"
+        ws_stock_rep.cell(row=i, column=3).number_format = currency_format
+        ws_stock_rep.cell(row=i, column=12).number_format = currency_format
+    last = first + len(item_rows) - 1
+    style_data_rows(ws_stock_rep, first, last, len(stock_rep_headers))
+    total = last + 1
+    ws_stock_rep.cell(row=total, column=1).value = "TOTAL"
+    ws_stock_rep.cell(row=total, column=1).font = Font(bold=True)
+    for col in list(range(4, 10)) + [12]:
+        col_l = get_column_letter(col)
+        ws_stock_rep.cell(row=total, column=col).value = f"=SUM({col_l}{first}:{col_l}{last})"
+        ws_stock_rep.cell(row=total, column=col).font = Font(bold=True)
+    ws_stock_rep.cell(row=total, column=12).number_format = currency_format
+    return total
+
+# Chemicals: A=Item ID, B=Name, F=Unit Rate, G-K=Opening..Damaged, L=Closing, M=Min Level, N=Status, O=Est Value
+chem_total_row = stock_summary(4, "CHEMICALS STOCK SUMMARY", "008000", "Chemicals Stock", CHEM_ROWS,
+                               ["A", "B", "F", "G", "H", "I", "J", "K", "L", "M", "N", "O"])
+# Accessories: A=Item ID, B=Name, E=Unit Rate, F-J=Opening..Damaged, K=Closing, L=Min Level, M=Status, N=Est Value
+acc_total_row = stock_summary(chem_total_row + 3, "ACCESSORIES STOCK SUMMARY", "0066CC", "Accessories Stock",
+                              ACC_ROWS, ["A", "B", "E", "F", "G", "H", "I", "J", "K", "L", "M", "N"])
 
 # Machine Asset Summary
-ws_stock_rep['A23'] = "MACHINE ASSET SUMMARY"
-ws_stock_rep['A23'].font = Font(bold=True, size=12, color="FF6600")
-ws_stock_rep.append(["Category", "Count", "Base Value (₹)", "GST (₹)", "Total Value (₹)"])
-style_header(ws_stock_rep, 24, 5)
-
-for i, cat in enumerate(machine_cats, start=25):
+r_mach = acc_total_row + 3
+ws_stock_rep.cell(row=r_mach, column=1).value = "MACHINE ASSET SUMMARY"
+ws_stock_rep.cell(row=r_mach, column=1).font = Font(bold=True, size=12, color="FF6600")
+for col, header in enumerate(["Category", "Count", "Base Value (₹)", "GST (₹)", "Total Value (₹)"], start=1):
+    ws_stock_rep.cell(row=r_mach + 1, column=col).value = header
+style_header(ws_stock_rep, r_mach + 1, 5)
+
+for i, cat in enumerate(machine_cats, start=r_mach + 2):
     ws_stock_rep.cell(row=i, column=1).value = cat
-    ws_stock_rep.cell(row=i, column=2).value = f'=COUNTIF(\'Machines & Equipment\'!D:D,A{i})'
-    ws_stock_rep.cell(row=i, column=3).value = f'=SUMIF(\'Machines & Equipment\'!D:D,A{i},\'Machines & Equipment\'!H:H)'
-    ws_stock_rep.cell(row=i, column=4).value = f'=SUMIF(\'Machines & Equipment\'!D:D,A{i},\'Machines & Equipment\'!J:J)'
-    ws_stock_rep.cell(row=i, column=5).value = f'=SUMIF(\'Machines & Equipment\'!D:D,A{i},\'Machines & Equipment\'!K:K)'
+    ws_stock_rep.cell(row=i, column=2).value = f'=COUNTIF({col_ref("tblMachines", "Category")},A{i})'
+    ws_stock_rep.cell(row=i, column=3).value = f'=SUMIF({col_ref("tblMachines", "Category")},A{i},{col_ref("tblMachines", "Base Cost (₹)")})'
+    ws_stock_rep.cell(row=i, column=4).value = f'=SUMIF({col_ref("tblMachines", "Category")},A{i},{col_ref("tblMachines", "GST Amount (₹)")})'
+    ws_stock_rep.cell(row=i, column=5).value = f'=SUMIF({col_ref("tblMachines", "Category")},A{i},{col_ref("tblMachines", "Total Cost (₹)")})'
     for col in [3, 4, 5]:
         ws_stock_rep.cell(row=i, column=col).number_format = currency_format
 
-style_data_rows(ws_stock_rep, 25, 28, 5)
-ws_stock_rep.cell(row=29, column=1).value = "TOTAL"
-ws_stock_rep.cell(row=29, column=1).font = Font(bold=True)
+mach_first, mach_last = r_mach + 2, r_mach + 1 + len(machine_cats)
+style_data_rows(ws_stock_rep, mach_first, mach_last, 5)
+ws_stock_rep.cell(row=mach_last + 1, column=1).value = "TOTAL"
+ws_stock_rep.cell(row=mach_last + 1, column=1).font = Font(bold=True)
 for col in range(2, 6):
-    ws_stock_rep.cell(row=29, column=col).value = f"=SUM({get_column_letter(col)}25:{get_column_letter(col)}28)"
-    ws_stock_rep.cell(row=29, column=col).font = Font(bold=True)
+    ws_stock_rep.cell(row=mach_last + 1, column=col).value = \
+        f"=SUM({get_column_letter(col)}{mach_first}:{get_column_letter(col)}{mach_last})"
+    ws_stock_rep.cell(row=mach_last + 1, column=col).font = Font(bold=True)
     if col > 2:
-        ws_stock_rep.cell(row=29, column=col).number_format = currency_format
+        ws_stock_rep.cell(row=mach_last + 1, column=col).number_format = currency_format
 
 # Purchase Summary - WITH BOX DESIGN
 purple_fill = PatternFill("solid", fgColor="660066")
 light_purple_fill = PatternFill("solid", fgColor="E6D5E6")
 
 # Header row with colored background
-ws_stock_rep['A32'] = "STOCK PURCHASE SUMMARY"
-ws_stock_rep['A32'].font = Font(bold=True, size=12, color="FFFFFF")
-ws_stock_rep['A32'].fill = purple_fill
-ws_stock_rep['A32'].alignment = center_align
-ws_stock_rep.merge_cells('A32:B32')
-ws_stock_rep['A32'].border = thick_border
-ws_stock_rep['B32'].border = thick_border
+r_purch = mach_last + 4
+ws_stock_rep[f'A{r_purch}'] = "STOCK PURCHASE SUMMARY"
+ws_stock_rep[f'A{r_purch}'].font = Font(bold=True, size=12, color="FFFFFF")
+ws_stock_rep[f'A{r_purch}'].fill = purple_fill
+ws_stock_rep[f'A{r_purch}'].alignment = center_align
+ws_stock_rep.merge_cells(f'A{r_purch}:B{r_purch}')
+ws_stock_rep[f'A{r_purch}'].border = thick_border
+ws_stock_rep[f'B{r_purch}'].border = thick_border
 
 # Data rows with borders and alternating fill
 purchase_items = [
-    ("Total Stock Purchases (Base)", "=SUM('Stock Purchases'!K:K)", False),
-    ("Total GST on Purchases", "=SUM('Stock Purchases'!M:M)", False),
-    ("Total with GST", "=SUM('Stock Purchases'!N:N)", True),
-    ("Paid", "=SUMIF('Stock Purchases'!O:O,\"Paid\",'Stock Purchases'!N:N)", False),
-    ("Pending", "=SUMIF('Stock Purchases'!O:O,\"Pending\",'Stock Purchases'!N:N)", False),
+    ("Total Stock Purchases (Base)", f'=SUM({col_ref("tblStockPurchases", "Base Amount (₹)")})', False),
+    ("Total GST on Purchases", f'=SUM({col_ref("tblStockPurchases", "GST Amount (₹)")})', False),
+    ("Total with GST", f'=SUM({col_ref("tblStockPurchases", "Total Amount (₹)")})', True),
+    ("Paid", f'=SUMIF({col_ref("tblStockPurchases", "Payment Status")},"Paid",{col_ref("tblStockPurchases", "Total Amount (₹)")})', False),
+    ("Pending", f'=SUMIF({col_ref("tblStockPurchases", "Payment Status")},"Pending",{col_ref("tblStockPurchases", "Total Amount (₹)")})', False),
 ]
 
-for i, (label, formula, is_bold) in enumerate(purchase_items, start=33):
+for i, (label, formula, is_bold) in enumerate(purchase_items, start=r_purch + 1):
     ws_stock_rep.cell(row=i, column=1).value = label
     ws_stock_rep.cell(row=i, column=2).value = formula
     ws_stock_rep.cell(row=i, column=2).number_format = currency_format
@@ -1086,7 +1419,7 @@ for i, (label, formula, is_bold) in enumerate(purchase_items, start=33):
     ws_stock_rep.cell(row=i, column=2).border = thin_border
 
     # Alternating row fill
-    if i % 2 == 1:
+    if (i - r_purch) % 2 == 1:
         ws_stock_rep.cell(row=i, column=1).fill = light_purple_fill
         ws_stock_rep.cell(row=i, column=2).fill = light_purple_fill
 
@@ -1096,13 +1429,66 @@ for i, (label, formula, is_bold) in enumerate(purchase_items, start=33):
         ws_stock_rep.cell(row=i, column=2).font = Font(bold=True)
 
 # Red color for Pending
-ws_stock_rep['B37'].font = Font(bold=True, color="FF0000")
-
-auto_width(ws_stock_rep, 7)
+ws_stock_rep.cell(row=r_purch + len(purchase_items), column=2).font = Font(bold=True, color="FF0000")
+
+# Cost of goods consumed per team/project, costed from the layers
+r_cogs = r_purch + len(purchase_items) + 3
+ws_stock_rep.cell(row=r_cogs, column=1).value = "COST OF GOODS CONSUMED BY TEAM / PROJECT"
+ws_stock_rep.cell(row=r_cogs, column=1).font = Font(bold=True, size=12, color="1F4E79")
+for col, header in enumerate(["Team / Project", "Used (₹)", "Damaged (₹)", "Total (₹)"], start=1):
+    ws_stock_rep.cell(row=r_cogs + 1, column=col).value = header
+style_header(ws_stock_rep, r_cogs + 1, 4)
+cogs_first = r_cogs + 2
+for i, team in enumerate(valuation.teams(), start=cogs_first):
+    ws_stock_rep.cell(row=i, column=1).value = team
+    ws_stock_rep.cell(row=i, column=2).value = round(valuation.consumed.get((team, "used"), 0), 2)
+    ws_stock_rep.cell(row=i, column=3).value = round(valuation.consumed.get((team, "damaged"), 0), 2)
+    ws_stock_rep.cell(row=i, column=4).value = f"=B{i}+C{i}"
+cogs_last = cogs_first + len(valuation.teams()) - 1
+style_data_rows(ws_stock_rep, cogs_first, cogs_last, 4)
+ws_stock_rep.cell(row=cogs_last + 1, column=1).value = "TOTAL"
+ws_stock_rep.cell(row=cogs_last + 1, column=1).font = Font(bold=True)
+for col in range(2, 5):
+    col_l = get_column_letter(col)
+    ws_stock_rep.cell(row=cogs_last + 1, column=col).value = f"=SUM({col_l}{cogs_first}:{col_l}{cogs_last})"
+    ws_stock_rep.cell(row=cogs_last + 1, column=col).font = Font(bold=True)
+for row in range(cogs_first, cogs_last + 2):
+    for col in range(2, 5):
+        ws_stock_rep.cell(row=row, column=col).number_format = currency_format
+
+# Cost layers left in stock, for every item the valuation holds: under FIFO one layer per
+# receipt still on hand, oldest first; under moving average one layer per item
+r_layers = cogs_last + 4
+ws_stock_rep.cell(row=r_layers, column=1).value = "STOCK COST LAYERS"
+ws_stock_rep.cell(row=r_layers, column=1).font = Font(bold=True, size=12, color="1F4E79")
+for col, header in enumerate(["Item ID", "Name", "Layer", "Quantity", "Unit Cost (₹)", "Value (₹)"], start=1):
+    ws_stock_rep.cell(row=r_layers + 1, column=col).value = header
+style_header(ws_stock_rep, r_layers + 1, 6)
+# in stock sheet order (masters, then logged items), then any other item valued
+item_names = {row[0]: row[1] for row in chem_items + acc_items}
+layer_ids = list(item_names) + [item_id for item_id in valuation.items if item_id not in item_names]
+i = r_layers + 1
+for item_id in layer_ids:
+    layers = valuation.items.get(item_id)
+    if layers is None:
+        continue
+    name = item_names.get(item_id) or (stock.items[item_id].name if item_id in stock.items else None) or item_id
+    for n, (qty, unit_cost) in enumerate(layers.layers, start=1):
+        i += 1
+        for col, value in enumerate([item_id, name, n, qty, unit_cost], start=1):
+            ws_stock_rep.cell(row=i, column=col).value = value
+        ws_stock_rep.cell(row=i, column=6).value = f"=D{i}*E{i}"
+        ws_stock_rep.cell(row=i, column=5).number_format = currency_format
+        ws_stock_rep.cell(row=i, column=6).number_format = currency_format
+style_data_rows(ws_stock_rep, r_layers + 2, i, 6)
+
+auto_width(ws_stock_rep, len(stock_rep_headers))
 ws_stock_rep.column_dimensions['A'].width = 12
 ws_stock_rep.column_dimensions['B'].width = 22
 ws_stock_rep.column_dimensions['C'].width = 14
-ws_stock_rep.auto_filter.ref = f"A4:G10"
+ws_stock_rep.auto_filter.ref = f"A5:{get_column_letter(len(stock_rep_headers))}{chem_total_row}"
+
+TIMINGS.mark("Stock Reports")
 
 # ============ PROFITABILITY REPORT ============
 ws_profit = wb.create_sheet("Profitability Report")
@@ -1116,13 +1502,13 @@ ws_profit.append(["Description", "Amount (₹)"])
 style_header(ws_profit, 4, 2)
 
 profit_items = [
-    ("TOTAL REVENUE (After Discount, excl. GST)", "=SUM('Income Tracker'!J:J)", False, "008000"),
+    ("TOTAL REVENUE (After Discount, excl. GST)", f'=SUM({col_ref("tblIncome", "Amount After Discount (₹)")})', False, "008000"),
     ("", "", False, None),
-    ("Less: Operating Expenses", "=SUM('Expense Tracker'!F:F)", False, "FF0000"),
-    ("Less: Employee Salaries", "=SUM('Employee Salaries'!N:N)", False, "FF0000"),
-    ("Less: Contractor Payments", "=SUM('Contractor Payments'!J:J)", False, "FF0000"),
-    ("Less: Stock Purchases", "=SUM('Stock Purchases'!K:K)", False, "FF0000"),
-    ("Less: Machine Maintenance", "=SUM('Machine Maintenance'!F:F)", False, "FF0000"),
+    ("Less: Operating Expenses", f'=SUM({col_ref("tblExpenses", "Base Amount (₹)")})', False, "FF0000"),
+    ("Less: Employee Salaries", f'=SUM({col_ref("tblSalaries", "Net Salary (₹)")})', False, "FF0000"),
+    ("Less: Contractor Payments", f'=SUM({col_ref("tblContractorPayments", "Net Payable (₹)")})', False, "FF0000"),
+    ("Less: Stock Purchases", f'=SUM({col_ref("tblStockPurchases", "Base Amount (₹)")})', False, "FF0000"),
+    ("Less: Machine Maintenance", f'=SUM({col_ref("tblMaintenance", "Base Cost (₹)")})', False, "FF0000"),
     ("", "", False, None),
     ("TOTAL EXPENSES", "=B6+B7+B8+B9+B10", True, "FF0000"),
     ("", "", False, None),
@@ -1151,6 +1537,139 @@ auto_width(ws_profit, 2)
 ws_profit.column_dimensions['A'].width = 40
 ws_profit.column_dimensions['B'].width = 20
 
+TIMINGS.mark("Profitability Report")
+
+# ============ MONTHLY P&L (PRECOMPUTED CUBE) ============
+# Month x service x cost-category amounts aggregated in Python (mis_pnl) in one
+# pass over the transaction rows and written as static values, instead of a
+# SUMIFS per report cell.
+pnl = build_pnl_cube(
+    income=sheet_records(ws_income, INCOME_LAST_ROW),
+    expenses=sheet_records(ws_expense, EXPENSE_LAST_ROW),
+    salaries=sheet_records(ws_salary, SALARY_LAST_ROW),
+    contractors=sheet_records(ws_contractor, CONTRACTOR_LAST_ROW),
+    stock_purchases=sheet_records(ws_stock_purch, STOCK_PURCH_LAST_ROW),
+    maintenance=sheet_records(ws_maint, MAINT_LAST_ROW),
+)
+pnl_months = pnl.months
+pnl_services = pnl.services
+pnl_costs = pnl.cost_categories
+
+ws_pnl = wb.create_sheet("Monthly P&L")
+ws_pnl['A1'] = "MONTHLY PROFIT & LOSS (excl. GST)"
+ws_pnl.merge_cells('A1:F1')
+ws_pnl['A1'].font = Font(bold=True, size=14, color="1F4E79")
+ws_pnl['A2'] = (f"Precomputed from {pnl.rows:,} transaction rows on {datetime.now():%d-%b-%Y %H:%M} - "
+                f"values are static, regenerate the workbook to refresh")
+ws_pnl['A2'].font = Font(italic=True, color="666666")
+
+# Month-wise P&L: revenue, each cost category, margin
+month_rows = [[month_label(m), pnl.revenue(m)] + [pnl.total(m, category=c) for c in pnl_costs]
+              + [pnl.costs(m), pnl.profit(m), pnl.margin(m)] for m in pnl_months]
+month_rows.append(["TOTAL", pnl.revenue()] + [pnl.total(category=c) for c in pnl_costs]
+                  + [pnl.costs(), pnl.profit(), pnl.margin()])
+next_row = report_table(ws_pnl, 4, "MONTH-WISE PROFIT & LOSS",
+                        ["Month", "Revenue (₹)"] + [f"{c} (₹)" for c in pnl_costs]
+                        + ["Total Costs (₹)", "Net Profit (₹)", "Margin %"],
+                        month_rows, [None] + [currency_format] * (len(pnl_costs) + 3) + ['0.0%'])
+
+# Service-wise: revenue less the contractor payouts booked against the service
+service_rows = [[svc, pnl.revenue(service=svc), pnl.total(service=svc, category=CONTRACTORS),
+                 pnl.profit(service=svc), pnl.margin(service=svc)] for svc in pnl_services]
+service_rows.append([f"{OVERHEADS} (not tied to a service)", 0, pnl.costs(service=OVERHEADS),
+                     -pnl.costs(service=OVERHEADS), None])
+service_rows.append(["NET PROFIT", pnl.revenue(), pnl.costs(), pnl.profit(), pnl.margin()])
+next_row = report_table(ws_pnl, next_row, "SERVICE-WISE PROFITABILITY",
+                        ["Service", "Revenue (₹)", "Direct Costs (₹)", "Contribution (₹)", "Margin %"],
+                        service_rows, [None, currency_format, currency_format, currency_format, '0.0%'])
+
+# Month x service contribution
+matrix_rows = [[month_label(m)] + [pnl.profit(m, svc) for svc in pnl_services] for m in pnl_months]
+matrix_rows.append(["TOTAL"] + [pnl.profit(service=svc) for svc in pnl_services])
+report_table(ws_pnl, next_row, "MONTH x SERVICE CONTRIBUTION (₹)", ["Month"] + pnl_services,
+             matrix_rows, [None] + [currency_format] * len(pnl_services))
+
+auto_width(ws_pnl, max(len(pnl_costs) + 5, len(pnl_services) + 1))
+ws_pnl.column_dimensions['A'].width = 30
+
+TIMINGS.mark("Monthly P&L")
+
+# ============ DAILY LEDGER ============
+# One row per calendar day with per-source daily totals. The date-filtered
+# Dashboard cards aggregate these few hundred rows; the per-day SUMIFS over the
+# transaction tables recalculate only when transactions change, not when the
+# Dashboard dates do.
+ws_ledger = wb.create_sheet("Daily Ledger")
+ledger_columns = [
+    # header, source table, summed column (None = number of transactions)
+    ("Revenue (₹)", "tblIncome", "Total Amount (₹)"),
+    ("Revenue excl. GST (₹)", "tblIncome", "Amount After Discount (₹)"),
+    ("Orders", "tblIncome", None),
+    ("GST Collected (₹)", "tblIncome", "GST Amount (₹)"),
+    ("Expenses (₹)", "tblExpenses", "Total Amount (₹)"),
+    ("Expenses excl. GST (₹)", "tblExpenses", "Base Amount (₹)"),
+    ("GST Paid on Expenses (₹)", "tblExpenses", "GST Amount (₹)"),
+    ("Contractor Payouts (₹)", "tblContractorPayments", "Net Payable (₹)"),
+    ("TDS Deducted (₹)", "tblContractorPayments", "TDS Amount (₹)"),
+    ("Stock Purchases (₹)", "tblStockPurchases", "Total Amount (₹)"),
+    ("Stock Purchases excl. GST (₹)", "tblStockPurchases", "Base Amount (₹)"),
+    ("GST Paid on Stock (₹)", "tblStockPurchases", "GST Amount (₹)"),
+]
+ledger_headers = ["Date"] + [header for header, _, _ in ledger_columns]
+ws_ledger.append(ledger_headers)
+style_header(ws_ledger, 1, len(ledger_headers))
+
+# Whole calendar years around the transactions, so entries added later in the year are covered;
+# ledger_sum() picks up entries dated outside these years from the source tables
+txn_dates = [d for ws, last_row in [(ws_income, INCOME_LAST_ROW), (ws_expense, EXPENSE_LAST_ROW),
+                                    (ws_contractor, CONTRACTOR_LAST_ROW), (ws_stock_purch, STOCK_PURCH_LAST_ROW)]
+             for (d,) in ws.iter_rows(min_row=2, max_row=last_row, max_col=1, values_only=True)
+             if isinstance(d, datetime)] or [base_date]
+ledger_first = datetime(min(txn_dates).year, 1, 1)
+ledger_days = (datetime(max(txn_dates).year + 1, 1, 1) - ledger_first).days
+LEDGER_LAST_ROW = ledger_days + 1
+
+for d in range(ledger_days):
+    row_num = d + 2
+    ws_ledger.cell(row=row_num, column=1).value = ledger_first + timedelta(days=d)
+    for col, (_, table, column) in enumerate(ledger_columns, start=2):
+        day = f'{col_ref(table, "Date")},">="&$A{row_num},{col_ref(table, "Date")},"<"&$A{row_num}+1'
+        if column is None:
+            ws_ledger.cell(row=row_num, column=col).value = f"=COUNTIFS({day})"
+        else:
+            ws_ledger.cell(row=row_num, column=col).value = f"=SUMIFS({col_ref(table, column)},{day})"
+
+style_data_rows(ws_ledger, 2, LEDGER_LAST_ROW, len(ledger_headers))
+auto_width(ws_ledger, len(ledger_headers))
+ws_ledger.column_dimensions['A'].width = 12
+for row in range(2, LEDGER_LAST_ROW + 1):
+    ws_ledger.cell(row=row, column=1).number_format = date_format
+    for col, (_, _, column) in enumerate(ledger_columns, start=2):
+        if column is not None:
+            ws_ledger.cell(row=row, column=col).number_format = currency_format
+ws_ledger.freeze_panes = 'A2'
+add_table(ws_ledger, "tblDailyLedger", ledger_headers, LEDGER_LAST_ROW)
+
+LEDGER_SOURCES = {header: (table, column) for header, table, column in ledger_columns}
+
+def ledger_sum(header):
+    """
+    Daily Ledger column summed over the Dashboard date filter (B5 to D5).  The
+    part of the filter before the ledger's first day or after its last one is
+    summed from the source table; the IF() skips that scan when the filter
+    lies within the ledger.
+    """
+    table, column = LEDGER_SOURCES[header]
+    day, date = col_ref("tblDailyLedger", "Date"), col_ref(table, "Date")
+    first, last = f"MIN({day})", f"MAX({day})"
+    source = "COUNTIFS(" if column is None else f"SUMIFS({col_ref(table, column)},"
+    ledger = f'SUMIFS({col_ref("tblDailyLedger", header)},{day},">="&B5,{day},"<="&D5)'
+    before = f'IF(B5<{first},{source}{date},">="&B5,{date},"<"&MIN(D5+1,{first})),0)'
+    after = f'IF(D5>{last},{source}{date},">="&MAX(B5,{last}+1),{date},"<"&D5+1),0)'
+    return f"({ledger}+{before}+{after})"
+
+TIMINGS.mark("Daily Ledger")
+
 # ============ DASHBOARD (REDESIGNED WITH DATE FILTERS) ============
 ws_dash = wb.create_sheet("Dashboard")
 
@@ -1213,7 +1732,7 @@ ws_dash['A9'].font = Font(bold=True, size=11, color="FFFFFF")
 ws_dash['A9'].fill = PatternFill("solid", fgColor="28A745")
 ws_dash['A9'].alignment = center_align
 ws_dash.merge_cells('A9:B9')
-ws_dash['A10'] = '=SUMIFS(\'Income Tracker\'!M:M,\'Income Tracker\'!A:A,">="&B5,\'Income Tracker\'!A:A,"<="&D5)'
+ws_dash['A10'] = "=" + ledger_sum("Revenue (₹)")
 ws_dash['A10'].font = Font(bold=True, size=18)
 ws_dash['A10'].number_format = currency_format
 ws_dash['A10'].alignment = center_align
@@ -1225,7 +1744,7 @@ ws_dash['C9'].font = Font(bold=True, size=11, color="FFFFFF")
 ws_dash['C9'].fill = PatternFill("solid", fgColor="DC3545")
 ws_dash['C9'].alignment = center_align
 ws_dash.merge_cells('C9:D9')
-ws_dash['C10'] = '=SUMIFS(\'Expense Tracker\'!I:I,\'Expense Tracker\'!A:A,">="&B5,\'Expense Tracker\'!A:A,"<="&D5)'
+ws_dash['C10'] = "=" + ledger_sum("Expenses (₹)")
 ws_dash['C10'].font = Font(bold=True, size=18)
 ws_dash['C10'].number_format = currency_format
 ws_dash['C10'].alignment = center_align
@@ -1237,7 +1756,7 @@ ws_dash['E9'].font = Font(bold=True, size=11, color="FFFFFF")
 ws_dash['E9'].fill = PatternFill("solid", fgColor="FD7E14")
 ws_dash['E9'].alignment = center_align
 ws_dash.merge_cells('E9:F9')
-ws_dash['E10'] = '=SUMIFS(\'Contractor Payments\'!J:J,\'Contractor Payments\'!A:A,">="&B5,\'Contractor Payments\'!A:A,"<="&D5)'
+ws_dash['E10'] = "=" + ledger_sum("Contractor Payouts (₹)")
 ws_dash['E10'].font = Font(bold=True, size=18)
 ws_dash['E10'].number_format = currency_format
 ws_dash['E10'].alignment = center_align
@@ -1249,7 +1768,7 @@ ws_dash['G9'].font = Font(bold=True, size=11, color="FFFFFF")
 ws_dash['G9'].fill = PatternFill("solid", fgColor="17A2B8")
 ws_dash['G9'].alignment = center_align
 ws_dash.merge_cells('G9:H9')
-ws_dash['G10'] = '=SUMIFS(\'Income Tracker\'!L:L,\'Income Tracker\'!A:A,">="&B5,\'Income Tracker\'!A:A,"<="&D5)'
+ws_dash['G10'] = "=" + ledger_sum("GST Collected (₹)")
 ws_dash['G10'].font = Font(bold=True, size=18)
 ws_dash['G10'].number_format = currency_format
 ws_dash['G10'].alignment = center_align
@@ -1261,7 +1780,7 @@ ws_dash['I9'].font = Font(bold=True, size=11, color="FFFFFF")
 ws_dash['I9'].fill = PatternFill("solid", fgColor="6F42C1")
 ws_dash['I9'].alignment = center_align
 ws_dash.merge_cells('I9:J9')
-ws_dash['I10'] = '=SUMIFS(\'Stock Purchases\'!N:N,\'Stock Purchases\'!A:A,">="&B5,\'Stock Purchases\'!A:A,"<="&D5)'
+ws_dash['I10'] = "=" + ledger_sum("Stock Purchases (₹)")
 ws_dash['I10'].font = Font(bold=True, size=18)
 ws_dash['I10'].number_format = currency_format
 ws_dash['I10'].alignment = center_align
@@ -1278,7 +1797,8 @@ ws_dash['A12'].fill = PatternFill("solid", fgColor="007BFF")
 ws_dash['A12'].alignment = center_align
 ws_dash.merge_cells('A12:B12')
 # Net Profit = Revenue (after discount) - Expenses - Contractor Payments - Stock Purchases
-ws_dash['A13'] = '=SUMIFS(\'Income Tracker\'!J:J,\'Income Tracker\'!A:A,">="&B5,\'Income Tracker\'!A:A,"<="&D5)-SUMIFS(\'Expense Tracker\'!F:F,\'Expense Tracker\'!A:A,">="&B5,\'Expense Tracker\'!A:A,"<="&D5)-SUMIFS(\'Contractor Payments\'!J:J,\'Contractor Payments\'!A:A,">="&B5,\'Contractor Payments\'!A:A,"<="&D5)-SUMIFS(\'Stock Purchases\'!K:K,\'Stock Purchases\'!A:A,">="&B5,\'Stock Purchases\'!A:A,"<="&D5)'
+ws_dash['A13'] = ("=" + ledger_sum("Revenue excl. GST (₹)") + "-" + ledger_sum("Expenses excl. GST (₹)")
+               + "-" + ledger_sum("Contractor Payouts (₹)") + "-" + ledger_sum("Stock Purchases excl. GST (₹)"))
 ws_dash['A13'].font = Font(bold=True, size=18, color="006600")
 ws_dash['A13'].number_format = currency_format
 ws_dash['A13'].alignment = center_align
@@ -1291,7 +1811,7 @@ ws_dash['C12'].font = Font(bold=True, size=11, color="FFFFFF")
 ws_dash['C12'].fill = PatternFill("solid", fgColor="20C997")
 ws_dash['C12'].alignment = center_align
 ws_dash.merge_cells('C12:D12')
-ws_dash['C13'] = '=COUNTIFS(\'Income Tracker\'!A:A,">="&B5,\'Income Tracker\'!A:A,"<="&D5)'
+ws_dash['C13'] = "=" + ledger_sum("Orders")
 ws_dash['C13'].font = Font(bold=True, size=18)
 ws_dash['C13'].alignment = center_align
 ws_dash.merge_cells('C13:D13')
@@ -1302,7 +1822,7 @@ ws_dash['E12'].font = Font(bold=True, size=11, color="FFFFFF")
 ws_dash['E12'].fill = PatternFill("solid", fgColor="E83E8C")
 ws_dash['E12'].alignment = center_align
 ws_dash.merge_cells('E12:F12')
-ws_dash['E13'] = '=SUMIFS(\'Expense Tracker\'!H:H,\'Expense Tracker\'!A:A,">="&B5,\'Expense Tracker\'!A:A,"<="&D5)+SUMIFS(\'Stock Purchases\'!M:M,\'Stock Purchases\'!A:A,">="&B5,\'Stock Purchases\'!A:A,"<="&D5)'
+ws_dash['E13'] = "=" + ledger_sum("GST Paid on Expenses (₹)") + "+" + ledger_sum("GST Paid on Stock (₹)")
 ws_dash['E13'].font = Font(bold=True, size=18)
 ws_dash['E13'].number_format = currency_format
 ws_dash['E13'].alignment = center_align
@@ -1326,7 +1846,7 @@ ws_dash['I12'].font = Font(bold=True, size=11, color="FFFFFF")
 ws_dash['I12'].fill = PatternFill("solid", fgColor="343A40")
 ws_dash['I12'].alignment = center_align
 ws_dash.merge_cells('I12:J12')
-ws_dash['I13'] = '=SUMIFS(\'Contractor Payments\'!I:I,\'Contractor Payments\'!A:A,">="&B5,\'Contractor Payments\'!A:A,"<="&D5)'
+ws_dash['I13'] = "=" + ledger_sum("TDS Deducted (₹)")
 ws_dash['I13'].font = Font(bold=True, size=18)
 ws_dash['I13'].number_format = currency_format
 ws_dash['I13'].alignment = center_align
@@ -1343,27 +1863,27 @@ ws_dash.merge_cells('A15:J15')
 
 # All Time Metrics
 ws_dash['A16'] = "Total Revenue (All)"
-ws_dash['B16'] = "=SUM('Income Tracker'!M:M)"
+ws_dash['B16'] = f'=SUM({col_ref("tblIncome", "Total Amount (₹)")})'
 ws_dash['B16'].number_format = currency_format
 ws_dash['B16'].font = Font(bold=True)
 
 ws_dash['C16'] = "Total Expenses (All)"
-ws_dash['D16'] = "=SUM('Expense Tracker'!I:I)+SUM('Employee Salaries'!N:N)+SUM('Contractor Payments'!J:J)+SUM('Stock Purchases'!N:N)+SUM('Machine Maintenance'!I:I)"
+ws_dash['D16'] = f'=SUM({col_ref("tblExpenses", "Total Amount (₹)")})+SUM({col_ref("tblSalaries", "Net Salary (₹)")})+SUM({col_ref("tblContractorPayments", "Net Payable (₹)")})+SUM({col_ref("tblStockPurchases", "Total Amount (₹)")})+SUM({col_ref("tblMaintenance", "Total Cost (₹)")})'
 ws_dash['D16'].number_format = currency_format
 ws_dash['D16'].font = Font(bold=True)
 
 ws_dash['E16'] = "Total Profit (All)"
-ws_dash['F16'] = "=SUM('Income Tracker'!J:J)-SUM('Expense Tracker'!F:F)-SUM('Employee Salaries'!N:N)-SUM('Contractor Payments'!J:J)-SUM('Stock Purchases'!K:K)-SUM('Machine Maintenance'!F:F)"
+ws_dash['F16'] = f'=SUM({col_ref("tblIncome", "Amount After Discount (₹)")})-SUM({col_ref("tblExpenses", "Base Amount (₹)")})-SUM({col_ref("tblSalaries", "Net Salary (₹)")})-SUM({col_ref("tblContractorPayments", "Net Payable (₹)")})-SUM({col_ref("tblStockPurchases", "Base Amount (₹)")})-SUM({col_ref("tblMaintenance", "Base Cost (₹)")})'
 ws_dash['F16'].number_format = currency_format
 ws_dash['F16'].font = Font(bold=True, color="006600")
 ws_dash['F16'].fill = profit_fill
 
 ws_dash['G16'] = "Total Orders"
-ws_dash['H16'] = "=COUNTA('Income Tracker'!A:A)-1"
+ws_dash['H16'] = f'=COUNTA({col_ref("tblIncome", "Date")})'
 ws_dash['H16'].font = Font(bold=True)
 
 ws_dash['I16'] = "Total Employees"
-ws_dash['J16'] = "=COUNTA('Employee Salaries'!B:B)-1"
+ws_dash['J16'] = f'=COUNTIF({col_ref("tblSalaries", "Month")},"{SALARY_MONTHS[-1]:%B %Y}")'  # on the latest payroll
 ws_dash['J16'].font = Font(bold=True)
 
 # Add borders to all time section
@@ -1381,11 +1901,11 @@ ws_dash.merge_cells('A18:J18')
 
 # Pending Data
 pending_items = [
-    ("Pending Income", '=SUMIF(\'Income Tracker\'!O:O,"Pending",\'Income Tracker\'!M:M)'),
-    ("Pending Expenses", '=SUMIF(\'Expense Tracker\'!K:K,"Pending",\'Expense Tracker\'!I:I)'),
-    ("GST Pending", '=SUMIF(\'GST Invoices\'!I:I,"Pending",\'GST Invoices\'!G:G)'),
-    ("TDS Pending Deposit", '=SUM(\'Contractor Payments\'!I:I)-SUMIF(\'Contractor Payments\'!N:N,"Yes",\'Contractor Payments\'!I:I)'),
-    ("Stock Payment Pending", '=SUMIF(\'Stock Purchases\'!O:O,"Pending",\'Stock Purchases\'!N:N)'),
+    ("Pending Income", f'=SUMIF({col_ref("tblIncome", "Payment Status")},"Pending",{col_ref("tblIncome", "Total Amount (₹)")})'),
+    ("Pending Expenses", f'=SUMIF({col_ref("tblExpenses", "Payment Status")},"Pending",{col_ref("tblExpenses", "Total Amount (₹)")})'),
+    ("GST Pending", f'=SUMIF({col_ref("tblGSTInvoices", "GST Payment Status")},"Pending",{col_ref("tblGSTInvoices", "GST Amount (₹)")})'),
+    ("TDS Pending Deposit", f'=SUM({col_ref("tblContractorPayments", "TDS Amount (₹)")})-SUMIF({col_ref("tblContractorPayments", "TDS Deposited")},"Yes",{col_ref("tblContractorPayments", "TDS Amount (₹)")})'),
+    ("Stock Payment Pending", f'=SUMIF({col_ref("tblStockPurchases", "Payment Status")},"Pending",{col_ref("tblStockPurchases", "Total Amount (₹)")})'),
 ]
 
 for i, (label, formula) in enumerate(pending_items):
@@ -1404,6 +1924,34 @@ for col in range(1, 11):
 
 ws_dash.freeze_panes = 'A8'
 
+TIMINGS.mark("Dashboard")
+
 # Save
-wb.save('/var/lib/freelancer/projects/40182876/MIS_System_v7.xlsx')
+check_table_refs(wb)
+os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+wb.save(args.output)
+TIMINGS.mark("save")
+
+# Columnar export (bi_export) of the rows as written, formula columns computed in Python
+if args.export:
+    for table, ws, headers, last_row in [
+        ("income", ws_income, income_headers, INCOME_LAST_ROW),
+        ("expenses", ws_expense, expense_headers, EXPENSE_LAST_ROW),
+        ("salaries", ws_salary, salary_headers, SALARY_LAST_ROW),
+        ("contractor_payments", ws_contractor, contractor_headers, CONTRACTOR_LAST_ROW),
+        ("stock_purchases", ws_stock_purch, stock_purch_headers, STOCK_PURCH_LAST_ROW),
+        ("machines", ws_machines, machine_headers, MACHINE_LAST_ROW),
+        ("machine_maintenance", ws_maint, maint_headers, MAINT_LAST_ROW),
+        ("stock_transactions", ws_trans, trans_headers, TRANS_LAST_ROW),
+        ("gst_invoices", ws_gst_inv, gst_inv_headers, GST_INV_LAST_ROW),
+    ]:
+        print(export_mis(args.export, table, headers, sheet_records(ws, last_row), args.export_format).summary())
+    TIMINGS.mark("export")
+if args.timings:
+    TIMINGS.write(args.timings)
 print("MIS System v7 created successfully with DATE FILTERS!")
+if STORE:
+    action = "rendered" if args.from_db else "saved"
+    print(f"Store ({STORE.path}): " + ", ".join(f"{table} {n:,}" for table, n in STORE_COUNTS.items()) +
+          f" rows {action}")
+    STORE.close()
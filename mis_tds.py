@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Section 194C TDS engine for the MIS TDS Summary.
+
+TDS on a contractor payment is due when the payment is over SINGLE_LIMIT or
+when the contractor's payments in the financial year (April-March) add up to
+more than ANNUAL_LIMIT.  On the payment that crosses the annual limit, TDS
+falls due on the whole year's payments so far, less anything already
+deducted.  The rate is 1% when the PAN's fourth character is P (individual)
+or H (HUF), 2% for other PANs and 20% without a valid PAN (Section 206AA).
+
+TDSLedger keeps one running aggregate per (PAN, financial year), so apply()
+books a payment in constant time: appending a month of payments means
+applying just those rows, in date order, without rescanning the history.
+"""
+
+import re
+from collections import defaultdict
+
+from cell_values import to_day, to_number
+
+SINGLE_LIMIT = 30000
+ANNUAL_LIMIT = 100000
+RATE_INDIVIDUAL = 0.01     # PAN holder is an individual or HUF
+RATE_OTHERS = 0.02
+RATE_NO_PAN = 0.20
+
+PAN_FORMAT = re.compile(r"^[A-Z]{5}[0-9]{4}[A-Z]$")
+
+BELOW = "Below threshold"
+SINGLE = "Single payment over 30,000"
+AGGREGATE = "Annual aggregate crossed 1,00,000"
+OVER_AGGREGATE = "Annual aggregate over 1,00,000"
+
+
+def tds_rate(pan):
+    pan = str(pan or "").strip().upper()
+    if not PAN_FORMAT.match(pan):
+        return RATE_NO_PAN
+    return RATE_INDIVIDUAL if pan[3] in "PH" else RATE_OTHERS
+
+
+def financial_year(day):
+    """'2024-25' for any date from 1 April 2024 to 31 March 2025."""
+    start = day.year if day.month >= 4 else day.year - 1
+    return f"{start}-{(start + 1) % 100:02d}"
+
+
+def fy_quarter(day):
+    """Q1 = Apr-Jun ... Q4 = Jan-Mar."""
+    return f"Q{(day.month - 4) % 12 // 3 + 1}"
+
+
+class PanYear:
+    """Running totals of one PAN in one financial year."""
+
+    __slots__ = ("paid", "taxed", "tds_due", "crossed")
+
+    def __init__(self):
+        self.paid = 0          # gross paid so far
+        self.taxed = 0         # part of `paid` TDS has fallen due on
+        self.tds_due = 0
+        self.crossed = False   # annual aggregate already over ANNUAL_LIMIT
+
+
+class TDSLedger:
+    """
+    Per-payment 194C checks and the per-PAN quarterly schedule.
+
+      checks     one dict per booked payment (see apply())
+      schedule   (financial year, quarter, PAN) -> [payments, gross, TDS due, TDS deducted]
+    """
+
+    def __init__(self):
+        self.years = {}                      # (PAN, financial year) -> PanYear
+        self.names = {}                      # PAN -> contractor name
+        self.checks = []
+        self.schedule = defaultdict(lambda: [0, 0, 0, 0])
+        self.skipped = []                    # rows without a date
+        self.last_day = None                 # date of the latest payment applied
+
+    def apply(self, payment):
+        """Book one Contractor Payments row (Date, Payment ID, Contractor Name, Contractor PAN,
+        Gross Amount (₹), TDS % (Sec 194C)); returns its check, or None if it has no date.
+        Payments must come in date order: a back-dated one would change the thresholds of
+        payments already checked, so it raises ValueError."""
+        day = to_day(payment.get("Date"))
+        if day is None:
+            self.skipped.append(payment)
+            return None
+        if self.last_day is not None and day < self.last_day:
+            raise ValueError(f"payment {payment.get('Payment ID')} dated {day} comes after one dated "
+                             f"{self.last_day}; apply payments in date order (build_tds_ledger sorts)")
+        self.last_day = day
+        pan = str(payment.get("Contractor PAN") or "").strip().upper()
+        gross = to_number(payment.get("Gross Amount (₹)"))
+        deducted = gross * to_number(payment.get("TDS % (Sec 194C)"))
+        fy = financial_year(day)
+        year = self.years.get((pan, fy))
+        if year is None:
+            year = self.years[(pan, fy)] = PanYear()
+        self.names.setdefault(pan, payment.get("Contractor Name"))
+
+        year.paid += gross
+        if year.crossed:
+            rule = OVER_AGGREGATE
+        elif year.paid > ANNUAL_LIMIT:
+            rule = AGGREGATE
+            year.crossed = True
+        elif gross > SINGLE_LIMIT:
+            rule = SINGLE
+        else:
+            rule = BELOW
+        # Crossing the annual limit brings the year's untaxed payments into TDS
+        taxable = 0
+        if rule == AGGREGATE:
+            taxable = year.paid - year.taxed
+        elif rule != BELOW:
+            taxable = gross
+        rate = tds_rate(pan)
+        due = taxable * rate
+        year.taxed += taxable
+        year.tds_due += due
+
+        check = {
+            "Date": payment["Date"], "Payment ID": payment.get("Payment ID"), "Contractor Name": payment.get("Contractor Name"),
+            "Contractor PAN": pan, "Financial Year": fy, "Gross Amount": gross, "FY Aggregate": year.paid,
+            "Rule": rule, "Rate": rate, "TDS Due": due, "TDS Deducted": deducted, "Difference": deducted - due,
+        }
+        self.checks.append(check)
+        totals = self.schedule[(fy, fy_quarter(day), pan)]
+        totals[0] += 1
+        totals[1] += gross
+        totals[2] += due
+        totals[3] += deducted
+        return check
+
+    def flagged(self):
+        """Checks of the payments TDS fell due on (a threshold was crossed)."""
+        return [c for c in self.checks if c["Rule"] != BELOW]
+
+
+def build_tds_ledger(payments):
+    """Book `payments` in date order; returns the TDSLedger."""
+    ledger = TDSLedger()
+    payments = list(payments)
+    dated = [p for p in payments if to_day(p.get("Date")) is not None]
+    ledger.skipped = [p for p in payments if to_day(p.get("Date")) is None]
+    # date and datetime rows do not compare with each other; sort on the day
+    for payment in sorted(dated, key=lambda p: to_day(p["Date"])):
+        ledger.apply(payment)
+    return ledger
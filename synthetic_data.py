@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Deterministic synthetic records for the Lead Tracker and MIS workbooks.
+
+Every generator is a lazy iterator with its own random.Random, seeded from
+(seed, stream name): the same seed gives the same rows whatever else was
+generated first, and millions of rows stream through in constant memory.
+
+  leads()            Lead Tracker records, dicts keyed by schema field key
+  income()           Income Tracker rows   } dicts keyed by sheet header,
+  expenses()         Expense Tracker rows  } input columns only (the sheets
+  stock_purchases()  Stock Purchases rows  } add the formula columns)
+  gst_invoices()     GST Invoices rows     }
+  stock_movements()  Stock Transactions rows (mis_inventory movement dicts)
+  employees()        employee master tuples for mis_payroll.run_payroll()
+
+Categorical fields are drawn from Choice distributions; pass
+distributions={"lead_status": {"Completed": 5, "Cancelled": 1}, ...} to
+override any entry of DEFAULT_DISTRIBUTIONS (a list means equal weights).
+
+Usage:
+  from synthetic_data import SyntheticData
+  data = SyntheticData(seed=42)
+  for lead in data.leads(1_000_000, end=datetime(2025, 3, 31)): ...
+"""
+
+import bisect
+import random
+from datetime import datetime, timedelta
+
+from lead_tracker_schema import AREAS
+
+
+class Choice:
+    """Weighted categorical distribution; pick(rng) is one bisect."""
+
+    def __init__(self, weights):
+        if not isinstance(weights, dict):
+            weights = dict.fromkeys(weights, 1)
+        self.values = list(weights)
+        self.cum_weights = []
+        total = 0
+        for weight in weights.values():
+            total += weight
+            self.cum_weights.append(total)
+        if not self.values or total <= 0:
+            raise ValueError("a distribution needs at least one value with a positive weight")
+        self.total = total
+
+    def pick(self, rng):
+        return self.values[bisect.bisect_right(self.cum_weights, rng.random() * self.total)]
+
+
+# ── Distributions ────────────────────────────────────────────────────────────
+DEFAULT_DISTRIBUTIONS = {
+    # Lead Tracker
+    "lead_service": {"Bathroom Cleaning": 14, "Kitchen Cleaning": 12, "Full Home Cleaning": 22,
+                     "Rental Property Cleaning": 6, "Ready to Move In Cleaning": 6, "Painting": 8,
+                     "Pest Control": 12, "Plumbing": 9, "Electrician": 8, "Other": 3},
+    "area": {area: (2 if area == "Other" else 9) for area in AREAS},
+    "source": {"Website": 20, "Instagram": 14, "JustDial": 12, "Google": 22, "Referral": 12,
+               "WhatsApp": 12, "Walk-in": 4, "Other": 4},
+    "lead_status": {"Confirmed": 15, "Pending": 14, "Cancelled": 10, "Scheduled": 12, "Completed": 45,
+                    "Refunded": 4},
+    "bhk": {"1BHK": 20, "2BHK": 40, "3BHK": 28, "4BHK": 8, "4+BHK": 4},
+    "slot": ["Morning 8-10", "Morning 10-12", "Afternoon 12-2", "Afternoon 2-4", "Evening 4-6", "Evening 6-8"],
+    "services_per_lead": {1: 70, 2: 22, 3: 6, 4: 2},
+    "lead_payment_mode": {"Cash": 20, "UPI": 50, "Debit Card": 8, "Payment Gateway": 12, "Bank Transfer": 8,
+                          "Other": 2},
+    # MIS
+    "service": ["Deep Cleaning", "Regular Cleaning", "Pest Control", "Painting", "Plumbing", "Electrical",
+                "Carpentry", "AC Service"],
+    "project_type": {"Individual": 70, "Apartment Bulk": 20, "Commercial": 10},
+    "payment_mode": ["Cash", "UPI", "Bank Transfer", "Card"],
+    "payment_status": {"Received": 70, "Pending": 30},
+    "expense_category": ["Vendor Payment", "Travel & Fuel", "Marketing", "Office Expenses", "Miscellaneous"],
+    "expense_vendor": ["Kumar Chemicals", "City Fuel Station", "Facebook Ads", "Airtel", "Office Depot",
+                       "Google Ads"],
+    "discount": {0: 60, 0.05: 20, 0.10: 20},
+    "gst_rate": {0.18: 1},
+    "purchase_status": {"Paid": 60, "Pending": 40},
+    "team": ["Team A", "Team B", "Team C", "Team D"],
+    "movement": {"Used": 60, "Purchase": 30, "Returned": 6, "Damaged": 4},
+}
+
+FIRST_NAMES = ["Rajesh", "Priya", "Amit", "Sunita", "Vikram", "Deepa", "Karthik", "Meena", "Rahul", "Anjali",
+               "Suresh", "Lakshmi", "Arun", "Kavitha", "Manoj", "Neha", "Sanjay", "Pooja", "Ravi", "Divya"]
+LAST_NAMES = ["Kumar", "Sharma", "Patel", "Reddy", "Singh", "Nair", "Iyer", "Gupta", "Verma", "Menon",
+              "Rao", "Pillai", "Krishnan", "Srinivasan", "Das", "Joshi", "Shetty", "Hegde"]
+VENDOR_NAMES = ["Suresh", "Ramesh", "Vijay", "Mahesh", "Ganesh", "Prakash", "Naveen", "Kiran"]
+CANCEL_REASONS = ["Price too high", "Booked elsewhere", "Not reachable", "Date not available", "Changed plans"]
+
+# Base price per lead service (prices vary +-20% around it)
+SERVICE_PRICES = {"Bathroom Cleaning": 2000, "Kitchen Cleaning": 2500, "Full Home Cleaning": 4500,
+                  "Rental Property Cleaning": 5000, "Ready to Move In Cleaning": 5500, "Painting": 15000,
+                  "Pest Control": 3500, "Plumbing": 1500, "Electrician": 1200, "Other": 1000}
+BHK_SQFT = {"1BHK": (500, 750), "2BHK": (900, 1300), "3BHK": (1400, 1900), "4BHK": (2000, 2800),
+            "4+BHK": (2800, 4000)}
+
+# Stock items: (Item Type, Item ID, Item Name, Unit, Rate)
+STOCK_ITEMS = [
+    ("Chemical", "CH001", "Floor Cleaner", "Liters", 120), ("Chemical", "CH002", "Glass Cleaner", "Liters", 95),
+    ("Chemical", "CH003", "Toilet Cleaner", "Liters", 110), ("Chemical", "CH004", "Pesticide Spray", "Cans", 350),
+    ("Chemical", "CH005", "Surface Disinfectant", "Liters", 180),
+    ("Accessory", "AC001", "Rubber Hose (10m)", "Pieces", 450), ("Accessory", "AC002", "Floor Mop", "Pieces", 250),
+    ("Accessory", "AC003", "Microfiber Cloth", "Pieces", 80), ("Accessory", "AC004", "Rubber Gloves", "Pairs", 45),
+    ("Accessory", "AC005", "Spray Bottles", "Pieces", 120),
+]
+STOCK_VENDORS = [("Kumar Chemicals Pvt Ltd", "29AABCK1234A1ZV"), ("City Supplies", "29AABCS5678B2ZW"),
+                 ("Metro Cleaning Supplies", "29AABCM9012C3ZX")]
+
+# Designation -> basic salary range
+DESIGNATIONS = {"Helper": (14000, 16000), "Driver": (17000, 19000), "Technician": (20000, 24000),
+                "Supervisor": (26000, 32000)}
+
+
+class SyntheticData:
+    def __init__(self, seed=0, distributions=None):
+        self.seed = seed
+        self.choices = {name: Choice(spec) for name, spec in {**DEFAULT_DISTRIBUTIONS,
+                                                                 **(distributions or {})}.items()}
+
+    def rng(self, stream):
+        """Independent generator for one named stream of this seed."""
+        return random.Random(f"{self.seed}:{stream}")
+
+    def pick(self, name, rng):
+        return self.choices[name].pick(rng)
+
+    @staticmethod
+    def _dates(rng, count, start, days):
+        """`count` datetimes from start over `days` days, in order (evenly spread, jittered within a step)."""
+        step = days * 86400 / max(count, 1)
+        for i in range(count):
+            yield start + timedelta(seconds=int((i + rng.random()) * step))
+
+    @staticmethod
+    def _name(rng):
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+    @staticmethod
+    def _phone(rng):
+        return f"{rng.randint(6, 9)}{rng.randrange(10 ** 9):09d}"
+
+    # ── Lead Tracker ─────────────────────────────────────────────────────────
+    def leads(self, count, end=None, days=365):
+        """`count` leads, oldest first, with timestamps over the `days` days before `end`."""
+        rng = self.rng("leads")
+        end = end or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        for timestamp in self._dates(rng, count, end - timedelta(days=days), days):
+            name = self._name(rng)
+            phone = self._phone(rng)
+            area = self.pick("area", rng)
+            bhk = self.pick("bhk", rng)
+            status = self.pick("lead_status", rng)
+            lead = {
+                "timestamp": timestamp, "customer": name, "phone": phone,
+                "whatsapp": phone if rng.random() < 0.6 else "",
+                "email": f"{name.split()[0].lower()}.{name.split()[1][0].lower()}{rng.randrange(1000)}@email.com",
+                "city": "Bangalore", "area": area,
+                "address": f"{rng.randint(1, 300)}, {rng.randint(1, 20)}th Main, {area}, Bangalore",
+                "bhk": bhk, "sqft": rng.randint(*BHK_SQFT[bhk]),
+                "source": self.pick("source", rng), "status": status,
+            }
+            total = 0
+            services = []
+            for _ in range(self.pick("services_per_lead", rng)):
+                service = self.pick("lead_service", rng)
+                if service not in services:
+                    services.append(service)
+            for n, service in enumerate(services, start=1):
+                price = round(SERVICE_PRICES[service] * rng.uniform(0.8, 1.2), -2)
+                lead[f"service{n}"], lead[f"price{n}"] = service, price
+                total += price
+            if rng.random() < 0.25:
+                lead["discount"] = round(total * rng.choice((0.05, 0.10, 0.15)), -1)
+            total -= lead.get("discount", 0)
+
+            visit = timestamp + timedelta(days=rng.randint(1, 7))
+            slot = self.pick("slot", rng)
+            if status != "Cancelled":
+                lead["preferred_date"], lead["slot"] = visit, slot
+            else:
+                lead["notes"] = rng.choice(CANCEL_REASONS)
+            if status in ("Confirmed", "Scheduled", "Completed", "Refunded"):
+                lead["vendor"] = rng.choice(VENDOR_NAMES)
+                lead["vendor_contact"] = self._phone(rng)
+                lead["scheduled_date"], lead["scheduled_time"] = visit, slot
+                advance = rng.choice((0, 0, 500, 1000))
+                lead["advance"] = advance
+                lead["advance_status"] = "Received" if advance else "NIL"
+            if status in ("Completed", "Refunded"):
+                lead["completed_date"] = visit
+                lead["payment_value"] = total
+                lead["payment_mode"] = self.pick("lead_payment_mode", rng)
+                lead["payment_status"] = "Refund Completed" if status == "Refunded" else "Received"
+                lead["refund"] = total if status == "Refunded" else 0
+            yield lead
+
+    # ── MIS ──────────────────────────────────────────────────────────────────
+    def income(self, count, start, days=29, first_invoice=1001):
+        rng = self.rng("income")
+        prefix = f"INV-{start.year}"
+        for i, day in enumerate(self._dates(rng, count, start, days)):
+            project_type = self.pick("project_type", rng)
+            yield {
+                "Date": day.replace(hour=0, minute=0, second=0), "Invoice No": f"{prefix}-{first_invoice + i}",
+                "Customer Name": self._name(rng), "Service Type": self.pick("service", rng),
+                "Project Type": project_type,
+                "Project Name": {"Apartment Bulk": "Green Valley Apartments", "Commercial": "Tech Park"}.get(
+                    project_type, ""),
+                "Base Amount (₹)": (rng.randint(2000, 25000) if project_type == "Individual"
+                                    else rng.randint(50000, 200000)),
+                "Discount %": self.pick("discount", rng), "GST %": self.pick("gst_rate", rng),
+                "Payment Mode": self.pick("payment_mode", rng), "Payment Status": self.pick("payment_status", rng),
+            }
+
+    def expenses(self, count, start, days=29, first_id=101):
+        rng = self.rng("expenses")
+        prefix = f"EXP-{start.year}"
+        for i, day in enumerate(self._dates(rng, count, start, days)):
+            category = self.pick("expense_category", rng)
+            if category == "Travel & Fuel":
+                description, vendor, amount = "Petrol/Diesel", "City Fuel Station", rng.randint(500, 3000)
+            elif category == "Marketing":
+                description = rng.choice(["Facebook Ads", "Google Ads", "Pamphlets"])
+                vendor, amount = description, rng.randint(2000, 15000)
+            else:
+                description = rng.choice(["Office Supplies", "Utility Bill", "Misc Purchase"])
+                vendor, amount = self.pick("expense_vendor", rng), rng.randint(500, 5000)
+            yield {
+                "Date": day.replace(hour=0, minute=0, second=0), "Expense ID": f"{prefix}-{first_id + i}",
+                "Category": category, "Description": description, "Vendor/Payee": vendor,
+                "Base Amount (₹)": amount, "GST %": self.pick("gst_rate", rng),
+                "Payment Mode": self.pick("payment_mode", rng), "Payment Status": self.pick("payment_status", rng),
+            }
+
+    def stock_purchases(self, count, start, days=29, first_id=201, items=STOCK_ITEMS, vendors=STOCK_VENDORS):
+        rng = self.rng("stock purchases")
+        for i, day in enumerate(self._dates(rng, count, start, days)):
+            vendor, gstin = rng.choice(vendors)
+            item_type, _, name, unit, rate = rng.choice(items)
+            yield {
+                "Date": day.replace(hour=0, minute=0, second=0), "Purchase ID": f"PO-{start.year}-{first_id + i}",
+                "Vendor Name": vendor, "Vendor GSTIN": gstin, "Invoice No": f"INV/{rng.randint(1000, 9999)}",
+                "Item Type": item_type, "Item Name": name, "Quantity": rng.randint(10, 100), "Unit": unit,
+                "Rate (₹)": rate, "GST %": self.pick("gst_rate", rng),
+                "Payment Status": self.pick("purchase_status", rng),
+            }
+
+    def gst_invoices(self, count, start, days=29, first_invoice=1001):
+        rng = self.rng("gst invoices")
+        for i, day in enumerate(self._dates(rng, count, start, days)):
+            day = day.replace(hour=0, minute=0, second=0)
+            status = self.pick("purchase_status", rng)
+            yield {
+                "Invoice Date": day, "Invoice Number": f"GST-INV-{start.year}-{first_invoice + i}",
+                "Customer Name": self._name(rng), "Service Type": self.pick("service", rng),
+                "Base Amount (₹)": rng.randint(5000, 50000), "GST %": self.pick("gst_rate", rng),
+                "GST Payment Status": status,
+                "Payment Date": day + timedelta(days=rng.randint(1, 15)) if status == "Paid" else None,
+            }
+
+    def stock_movements(self, count, start, days=365, first_id=1, items=STOCK_ITEMS):
+        """Stock Transactions rows; purchase prices drift within +-10% of the item rate."""
+        rng = self.rng("stock movements")
+        for i, day in enumerate(self._dates(rng, count, start, days)):
+            item_type, item_id, name, _, rate = rng.choice(items)
+            kind = self.pick("movement", rng)
+            purchase = kind == "Purchase"
+            yield {
+                "Date": day.replace(hour=0, minute=0, second=0), "Transaction ID": f"TXN{first_id + i:06d}",
+                "Item Type": item_type, "Item ID": item_id, "Item Name": name, "Transaction Type": kind,
+                "Quantity": rng.randint(20, 60) if purchase else rng.randint(1, 10),
+                "Unit Rate (₹)": round(rate * rng.uniform(0.9, 1.1)) if purchase else 0,
+                "GST %": self.pick("gst_rate", rng) if purchase else 0,
+                "Project/Team": "Warehouse" if purchase else self.pick("team", rng),
+            }
+
+    def employees(self, count, first_id=1, department="Operations"):
+        """(Employee ID, Name, Designation, Department, Basic) tuples for mis_payroll."""
+        rng = self.rng("employees")
+        designations = list(DESIGNATIONS)
+        for n in range(first_id, first_id + count):
+            designation = rng.choice(designations)
+            low, high = DESIGNATIONS[designation]
+            yield (f"EMP{n:03d}", self._name(rng), designation, department, round(rng.randint(low, high), -2))
@@ -0,0 +1,106 @@
+import os
+import re
+import subprocess
+import sys
+import zipfile
+from datetime import datetime
+
+import openpyxl
+import pytest
+
+from lead_append import SPLICE_TAG, append_leads, sheet_part
+from lead_loader import TrackerLoader
+from synthetic_data import SyntheticData
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY_END = datetime(2026, 1, 1)
+
+
+def generate(path, *flags):
+    subprocess.run([sys.executable, os.path.join(REPO, "create_lead_tracker_v3.py"), "--output", str(path),
+                    "--history-end", f"{HISTORY_END:%Y-%m-%d}", *flags],
+                   cwd=REPO, check=True, capture_output=True)
+    return str(path)
+
+
+def new_leads(count, seed):
+    return list(SyntheticData(seed).leads(count, end=HISTORY_END, days=1))
+
+
+def check_workbook(path):
+    """The zip is intact, openpyxl opens it, and the loader reads every lead."""
+    with zipfile.ZipFile(path) as zf:
+        assert zf.testzip() is None
+    wb = openpyxl.load_workbook(path)
+    assert "Lead Tracker" in wb.sheetnames and "Dashboard" in wb.sheetnames
+    loader = TrackerLoader(path)
+    return wb, list(loader.records()), loader
+
+
+def named_range_end(path, name="LT_Timestamp"):
+    with zipfile.ZipFile(path) as zf:
+        workbook = zf.read("xl/workbook.xml").decode("utf-8")
+    return int(re.search(r'<definedName name="%s">[^<]*\$(\d+)</definedName>' % name, workbook).group(1))
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    return generate(tmp_path / "tracker.xlsx", "--history", "20")
+
+
+def test_append_twice_round_trips(tracker):
+    first = append_leads(tracker, new_leads(5, seed=1))
+    assert first.full_pass and (first.first_row, first.last_row) == (24, 28)
+    second = append_leads(tracker, new_leads(7, seed=2))
+    assert not second.full_pass                   # spliced at the point the first append left
+    assert (second.first_row, second.last_row) == (29, 35)
+
+    wb, records, loader = check_workbook(tracker)
+    assert len(records) == 32 and loader.skipped == 0
+    assert [r["customer"] for r in records[20:]] == [r["customer"] for r in new_leads(5, 1) + new_leads(7, 2)]
+    ws = wb["Lead Tracker"]
+    assert ws["B35"].value is not None and ws["B36"].value is None
+    assert ws["C35"].value.startswith("=")        # auto formulas carried onto the appended rows
+
+
+def test_append_after_resave_without_splice_comment(tracker, tmp_path):
+    append_leads(tracker, new_leads(5, seed=1))
+    resaved = str(tmp_path / "resaved.xlsx")
+    openpyxl.load_workbook(tracker).save(resaved)
+    with zipfile.ZipFile(resaved) as zf:
+        assert not zf.getinfo(sheet_part(zf, "Lead Tracker")).comment.startswith(SPLICE_TAG)
+
+    result = append_leads(resaved, new_leads(3, seed=3))
+    assert result.full_pass and (result.first_row, result.last_row) == (29, 31)
+    _, records, _ = check_workbook(resaved)
+    assert len(records) == 28
+    assert not append_leads(resaved, new_leads(2, seed=4)).full_pass
+    assert len(list(TrackerLoader(resaved).records())) == 30
+
+
+def test_append_past_capacity_extends_named_ranges(tmp_path):
+    path = generate(tmp_path / "small.xlsx", "--history", "20", "--entry-rows", "10", "--capacity", "30")
+    assert named_range_end(path) == 33
+
+    result = append_leads(path, new_leads(15, seed=5))
+    assert (result.first_row, result.last_row, result.capacity_row) == (24, 38, 38)
+    assert named_range_end(path) == 38
+    assert named_range_end(path, "LT_Customer") == 38
+    wb, records, _ = check_workbook(path)
+    assert len(records) == 35
+    assert wb["Lead Tracker"].auto_filter.ref.endswith("38")
+
+
+def test_append_past_the_order_lines_mirror_warns(tmp_path):
+    path = generate(tmp_path / "lines.xlsx", "--history", "20", "--entry-rows", "10", "--capacity", "30",
+                    "--order-lines")
+    within = append_leads(path, new_leads(5, seed=6))
+    assert within.order_lines_end == 33 and "WARNING" not in within.summary()
+
+    past = append_leads(path, new_leads(10, seed=7))
+    assert past.last_row == 38
+    assert "Order Lines mirrors rows up to 33 only, rows 34-38 are missing" in past.summary()
+
+    plain = generate(tmp_path / "plain.xlsx", "--history", "20", "--entry-rows", "10", "--capacity", "30")
+    result = append_leads(plain, new_leads(15, seed=8))
+    assert result.order_lines_end is None and "WARNING" not in result.summary()
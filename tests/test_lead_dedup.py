@@ -0,0 +1,65 @@
+from datetime import datetime
+
+from lead_dedup import PHONE_KEYS, LeadIndex
+
+
+def lead(day, **fields):
+    return dict({"timestamp": datetime(2025, 5, day), "customer": f"Customer {day}"}, **fields)
+
+
+def merge(leads):
+    index = LeadIndex.build(leads)
+    return list(index.merged(lambda: iter(leads)))
+
+
+def numbers(record):
+    return {record[field] for field in PHONE_KEYS if record.get(field)}
+
+
+def test_merge_keeps_the_duplicates_own_number():
+    merged = merge([lead(1, phone="9000000001"),
+                    lead(2, phone="9000000002", whatsapp="9000000001", alt_phone="9000000003")])
+    assert len(merged) == 1
+    record = merged[0]
+    assert record["phone"] == "9000000001"
+    assert record["whatsapp"] == "9000000001"
+    assert record["alt_phone"] == "9000000003"
+    assert "9000000002" in record["notes"]
+
+
+def test_merge_of_three_numbers_keeps_all_three():
+    merged = merge([lead(1, phone="9000000001", email="a@example.com"),
+                    lead(2, phone="9000000003", email="A@example.com"),
+                    lead(3, phone="9000000004", email="a@example.com")])
+    assert len(merged) == 1
+    record = merged[0]
+    assert numbers(record) == {"9000000001", "9000000003"}
+    assert record["notes"] == "Merged 2 duplicate leads; other numbers: 9000000004"
+
+
+def test_merge_fills_blank_fields_from_the_later_leads():
+    merged = merge([lead(1, phone="98450 12345"), lead(2, phone="+91 98450 12345", area="Indiranagar",
+                                                       whatsapp="9845054321")])
+    record = merged[0]
+    assert record["customer"] == "Customer 1" and record["area"] == "Indiranagar"
+    assert record["phone"] == "98450 12345" and record["whatsapp"] == "9845054321"
+    assert record.get("alt_phone") is None
+    assert record["notes"] == "Merged 1 duplicate lead"
+
+
+def test_placeholder_and_landline_numbers_are_not_keys():
+    leads = [lead(d, phone=phone) for d, phone in enumerate(["0000000000", "0000000000", "9999999999",
+                                                             "080-2345678", "080-2345678", "1234567890"],
+                                                            start=1)]
+    index = LeadIndex.build(leads)
+    assert index.duplicates == 0
+    assert len(merge(leads)) == len(leads)
+
+
+def test_normalize_phone_accepts_indian_mobiles_only():
+    from lead_import import normalize_phone
+    assert normalize_phone("+91 98450-12345") == "9845012345"
+    assert normalize_phone(9845012345.0) == "9845012345"
+    assert normalize_phone("09845012345") == "9845012345"
+    for value in ("0000000000", "9999999999", "1234567890", "080-2345678", "5845012345", ""):
+        assert normalize_phone(value) is None
@@ -0,0 +1,85 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from lead_metrics import compute_dashboard
+
+NOW = datetime(2026, 1, 20, 15, 30)
+
+# The generator's five sample leads (create_lead_tracker_v3.py), at a fixed "now"
+SAMPLES = [
+    {"timestamp": NOW - timedelta(days=5), "customer": "Rajesh Kumar", "area": "Indiranagar",
+     "service1": "Bathroom Cleaning", "price1": 2000, "service2": "Pest Control", "price2": 3500,
+     "discount": 500, "source": "Website", "status": "Confirmed", "advance": 500, "advance_status": "Received"},
+    {"timestamp": NOW - timedelta(days=3), "customer": "Priya Sharma", "area": "HSR Layout",
+     "service1": "Full Home Cleaning", "price1": 4500, "source": "Instagram", "status": "Pending"},
+    {"timestamp": NOW - timedelta(days=7), "customer": "Amit Patel", "area": "Whitefield",
+     "service1": "Painting", "price1": 15000, "service2": "Plumbing", "price2": 2000, "discount": 2000,
+     "source": "Google", "status": "Cancelled"},
+    {"timestamp": NOW - timedelta(days=2), "customer": "Meera Reddy", "area": "Koramangala",
+     "service1": "Full Home Cleaning", "price1": 4500, "source": "JustDial", "status": "Scheduled",
+     "advance": 1000, "advance_status": "Received"},
+    {"timestamp": NOW - timedelta(days=10), "customer": "Karthik Nair", "area": "JP Nagar",
+     "service1": "Plumbing", "price1": 1500, "source": "Website", "status": "Completed",
+     "advance": 0, "advance_status": "NIL", "payment_value": 1500, "payment_status": "Received",
+     "payment_mode": "Cash", "refund": 0},
+]
+
+EDGE_ROWS = [
+    # Blank Service 1: no Total Value, but the Service 2 slot still counts; mixed-case criteria
+    {"timestamp": NOW - timedelta(days=1), "area": "Indiranagar", "service1": "", "service2": "Painting",
+     "price2": 3000, "discount": 100, "source": "website", "status": "confirmed",
+     "payment_value": 2000, "payment_status": "RECEIVED", "payment_mode": "upi"},
+    # Text amounts count as 0; a minute before the date range
+    {"timestamp": datetime(2026, 1, 9, 23, 59, 59), "area": "Whitefield", "service1": "Plumbing",
+     "price1": "1,200", "discount": "50", "source": "Google", "status": "Completed",
+     "payment_value": "900", "payment_status": "Pending"},
+    # Last second of the date range; Decimal amounts as lead_loader returns them
+    {"timestamp": datetime(2026, 1, 15, 23, 59, 59), "area": "HSR Layout", "source": "Instagram",
+     "status": "PENDING", "payment_value": Decimal("700.50"), "payment_status": "pending"},
+]
+
+
+@pytest.fixture(scope="module")
+def metrics():
+    return compute_dashboard(SAMPLES + EDGE_ROWS, date(2026, 1, 10), date(2026, 1, 15))
+
+
+def test_order_stats(metrics):
+    assert metrics.leads == metrics.total_orders == 8
+    assert [metrics.status_count(s) for s in ("Confirmed", "Pending", "Completed", "Cancelled", "Scheduled")] \
+        == [2, 2, 2, 1, 1]
+
+
+def test_payment_summary(metrics):
+    # Discounted Total of the rows with Service 1: 5000 + 4500 + 15000 + 4500 + 1500 + 0
+    assert metrics.payment["Total Quoted"] == 30500
+    assert metrics.payment["Total Received"] == 3500
+    assert metrics.payment["Cash Received"] == 1500
+    assert metrics.payment["UPI Received"] == 2000
+    assert metrics.payment["Total Pending"] == Decimal("700.50")
+    assert metrics.payment["Total Advance"] == 1500
+
+
+def test_discounts(metrics):
+    assert metrics.discount_total == 2600
+    assert metrics.discount_orders == 3
+    assert metrics.discount_average == pytest.approx(2600 / 3)
+
+
+def test_breakdowns(metrics):
+    assert (metrics.source("Website", "orders"), metrics.source("Website", "revenue")) == (3, 3500)
+    assert metrics.source("Website", "Confirmed") == 2
+    assert metrics.source("Instagram", "Pending") == 2
+    assert (metrics.service("Plumbing", "orders"), metrics.service("Plumbing", "revenue")) == (3, 1500)
+    assert metrics.service("Plumbing", "Completed") == 2
+    assert (metrics.service("Painting", "orders"), metrics.service("Painting", "revenue")) == (2, 3000)
+    assert metrics.area("Whitefield", "orders") == 2
+
+
+def test_date_range_compares_whole_days(metrics):
+    assert metrics.in_range("orders") == 4          # Jan 10 15:30, Jan 13, Jan 15 15:30, Jan 15 23:59:59
+    assert metrics.in_range("Cancelled") == 1
+    assert metrics.in_range("revenue") == 1500
+    assert metrics.in_range("pending payments") == Decimal("700.50")
@@ -0,0 +1,89 @@
+from datetime import datetime
+
+import pytest
+
+from mis_inventory import AVERAGE, FIFO, StockValuation, replay_stock, value_stock
+
+
+def move(day, kind, qty, rate=0, item="CH001", team="Team A"):
+    return {"Date": datetime(2025, 1, day), "Item ID": item, "Transaction Type": kind, "Quantity": qty,
+            "Unit Rate (₹)": rate, "Project/Team": team}
+
+
+RECEIPTS = [move(1, "Purchase", 10, 100, team="Warehouse"), move(2, "Purchase", 10, 120, team="Warehouse")]
+
+
+def test_fifo_issues_oldest_layer_first():
+    valuation = value_stock(RECEIPTS + [move(3, "Used", 15)], method=FIFO)
+    assert valuation.consumed[("Team A", "used")] == 10 * 100 + 5 * 120
+    assert list(map(list, valuation.item("CH001").layers)) == [[5, 120]]
+    assert valuation.value("CH001") == 600
+
+
+def test_average_merges_receipts_into_one_layer():
+    valuation = value_stock(RECEIPTS + [move(3, "Used", 15)], method=AVERAGE)
+    assert valuation.consumed[("Team A", "used")] == pytest.approx(15 * 110)
+    assert valuation.value("CH001") == pytest.approx(5 * 110)
+    assert len(valuation.item("CH001").layers) == 1
+
+
+def test_initial_stock_is_the_oldest_layer():
+    valuation = value_stock([move(2, "Purchase", 10, 120), move(3, "Damaged", 4, team="Team B")],
+                            initial={"CH001": (5, 90)})
+    assert valuation.consumed[("Team B", "damaged")] == 4 * 90
+    assert valuation.value("CH001") == 1 * 90 + 10 * 120
+
+
+def test_returned_stock_comes_back_at_the_last_issue_cost():
+    valuation = value_stock(RECEIPTS + [move(3, "Used", 12), move(4, "Returned", 2)])
+    assert list(map(list, valuation.item("CH001").layers)) == [[10, 120]]   # same cost: one layer
+
+
+def test_shortfall_is_costed_at_the_last_price():
+    valuation = value_stock([move(1, "Purchase", 5, 100), move(2, "Used", 8)])
+    assert valuation.item("CH001").shortfall == 3
+    assert valuation.consumed[("Team A", "used")] == 800
+
+
+def test_back_dated_movement_is_valued_in_date_order():
+    # The receipt was typed after the issue it precedes
+    log = [move(10, "Used", 5), move(1, "Purchase", 10, 100)]
+    valuation = value_stock(log)
+    assert valuation.consumed[("Team A", "used")] == 500
+    assert valuation.value("CH001") == 500
+
+
+def test_apply_rejects_a_back_dated_movement():
+    valuation = StockValuation()
+    valuation.apply(move(10, "Purchase", 10, 100))
+    with pytest.raises(ValueError):
+        valuation.apply(move(1, "Used", 5))
+
+
+def test_consumption_before_the_period_is_not_charged():
+    valuation = value_stock(RECEIPTS + [move(3, "Used", 5), move(20, "Used", 5)],
+                            date_from=datetime(2025, 1, 15))
+    assert valuation.consumed[("Team A", "used")] == 500     # the second five, still from the 100 layer
+    assert valuation.value("CH001") == 10 * 120
+
+
+def test_replay_rolls_earlier_movements_into_opening():
+    log = RECEIPTS + [move(3, "Used", 4), move(16, "Used", 3), move(17, "Returned", 1), move(25, "Damaged", 2)]
+    stock = replay_stock(log, initial={"CH001": 5}, date_from=datetime(2025, 1, 15),
+                         date_to=datetime(2025, 1, 20)).get("CH001")
+    assert (stock.opening, stock.purchased, stock.used, stock.returned, stock.damaged) == (21, 0, 3, 1, 0)
+    assert stock.closing == 19
+    assert stock.last_movement == datetime(2025, 1, 17).date()
+
+
+def test_replay_skips_unknown_movements():
+    ledger = replay_stock([move(1, "Transfer", 5), move(2, "Purchase", 5, 100, item=None)])
+    assert len(ledger.skipped) == 2
+    assert ledger.items == {}
+
+
+def test_replay_keeps_the_logged_item_details():
+    log = [dict(move(1, "Purchase", 5, 90, item="SP001"), **{"Item Type": "Spare Part", "Item Name": "Nozzle"}),
+           dict(move(2, "Used", 1, item="SP001"), **{"Item Name": ""})]
+    item = replay_stock(log).get("SP001")
+    assert (item.item_type, item.name, item.unit_rate, item.closing) == ("Spare Part", "Nozzle", 90, 4)
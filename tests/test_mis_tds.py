@@ -0,0 +1,113 @@
+from datetime import date, datetime
+
+import pytest
+
+from mis_tds import (AGGREGATE, BELOW, OVER_AGGREGATE, RATE_INDIVIDUAL, RATE_NO_PAN, RATE_OTHERS, SINGLE,
+                     TDSLedger, build_tds_ledger, financial_year, fy_quarter, tds_rate)
+
+COMPANY = "ABCCS1234A"       # fourth character C: company, 2%
+
+
+def payment(day, gross, pan=COMPANY, rate=0.02, pid=None):
+    return {"Date": day, "Payment ID": pid or f"P{day:%m%d}-{gross}", "Contractor Name": "Contractor",
+            "Contractor PAN": pan, "Gross Amount (₹)": gross, "TDS % (Sec 194C)": rate}
+
+
+def rules(ledger):
+    return [c["Rule"] for c in ledger.checks]
+
+
+def test_single_payment_threshold_is_strictly_over_30000():
+    ledger = build_tds_ledger([payment(datetime(2025, 5, 1), 30000), payment(datetime(2025, 5, 2), 30001)])
+    assert rules(ledger) == [BELOW, SINGLE]
+    assert ledger.checks[0]["TDS Due"] == 0
+    assert ledger.checks[1]["TDS Due"] == pytest.approx(30001 * RATE_OTHERS)
+
+
+def test_annual_aggregate_of_exactly_100000_is_below():
+    ledger = build_tds_ledger([payment(datetime(2025, 5, d), 25000) for d in (1, 2, 3, 4)])
+    assert rules(ledger) == [BELOW] * 4
+    assert ledger.checks[-1]["FY Aggregate"] == 100000
+
+
+def test_crossing_the_annual_limit_catches_up_the_whole_year():
+    ledger = build_tds_ledger([payment(datetime(2025, 5, d), 25000) for d in (1, 2, 3, 4)]
+                              + [payment(datetime(2025, 6, 1), 10000), payment(datetime(2025, 6, 2), 5000)])
+    assert rules(ledger) == [BELOW] * 4 + [AGGREGATE, OVER_AGGREGATE]
+    assert ledger.checks[4]["TDS Due"] == pytest.approx(110000 * RATE_OTHERS)
+    assert ledger.checks[5]["TDS Due"] == pytest.approx(5000 * RATE_OTHERS)
+
+
+def test_catch_up_leaves_out_payments_already_taxed():
+    ledger = build_tds_ledger([payment(datetime(2025, 5, 1), 40000), payment(datetime(2025, 5, 2), 20000),
+                               payment(datetime(2025, 5, 3), 45000)])
+    assert rules(ledger) == [SINGLE, BELOW, AGGREGATE]
+    assert ledger.checks[2]["TDS Due"] == pytest.approx((105000 - 40000) * RATE_OTHERS)
+    total_due = sum(c["TDS Due"] for c in ledger.checks)
+    assert total_due == pytest.approx(105000 * RATE_OTHERS)
+
+
+def test_aggregate_restarts_each_financial_year():
+    ledger = build_tds_ledger([payment(datetime(2025, 3, 31), 25000 + n, pid=f"A{n}") for n in range(4)]
+                              + [payment(datetime(2025, 4, 1), 20000)])
+    assert [c["Financial Year"] for c in ledger.checks] == ["2024-25"] * 4 + ["2025-26"]
+    assert rules(ledger)[-2:] == [AGGREGATE, BELOW]
+    assert ledger.checks[-1]["FY Aggregate"] == 20000
+
+
+def test_aggregates_are_kept_per_pan():
+    other = "XYZPK9876L"
+    ledger = build_tds_ledger([payment(datetime(2025, 5, 1), 60000 - 1, pid="A"),
+                               payment(datetime(2025, 5, 2), 50000, pan=other, rate=0.01, pid="B"),
+                               payment(datetime(2025, 5, 3), 30000, pid="C")])
+    assert rules(ledger) == [SINGLE, SINGLE, BELOW]
+    assert ledger.checks[2]["FY Aggregate"] == 89999
+
+
+def test_rate_follows_the_pan_holder_type():
+    assert tds_rate("ABCPS1234A") == RATE_INDIVIDUAL     # individual
+    assert tds_rate("ABCHS1234A") == RATE_INDIVIDUAL     # HUF
+    assert tds_rate("abcfs1234a") == RATE_OTHERS         # firm, normalized
+    assert tds_rate("") == RATE_NO_PAN
+    assert tds_rate("ABC123") == RATE_NO_PAN
+
+
+def test_difference_compares_deducted_with_due():
+    ledger = build_tds_ledger([payment(datetime(2025, 5, 1), 50000, pan="ABCPS1234A", rate=0.02)])
+    check = ledger.checks[0]
+    assert check["TDS Due"] == pytest.approx(500)
+    assert check["TDS Deducted"] == pytest.approx(1000)
+    assert check["Difference"] == pytest.approx(500)       # excess deduction
+
+
+def test_payments_are_booked_in_date_order_and_undated_rows_skipped():
+    late, early = payment(datetime(2025, 7, 1), 90000, pid="late"), payment(datetime(2025, 5, 1), 20000, pid="early")
+    ledger = build_tds_ledger([late, {"Payment ID": "undated", "Gross Amount (₹)": 10}, early])
+    assert [c["Payment ID"] for c in ledger.checks] == ["early", "late"]
+    assert rules(ledger) == [BELOW, AGGREGATE]
+    assert [p["Payment ID"] for p in ledger.skipped] == ["undated"]
+
+
+def test_quarterly_schedule():
+    ledger = build_tds_ledger([payment(datetime(2025, 4, 10), 40000), payment(datetime(2026, 2, 10), 40000)])
+    assert fy_quarter(datetime(2025, 4, 10)) == "Q1" and fy_quarter(datetime(2026, 2, 10)) == "Q4"
+    assert financial_year(datetime(2026, 2, 10)) == "2025-26"
+    assert ledger.schedule[("2025-26", "Q1", COMPANY)] == [1, 40000, pytest.approx(800), pytest.approx(800)]
+    assert ledger.schedule[("2025-26", "Q4", COMPANY)][0] == 1
+
+
+def test_mixed_date_and_datetime_rows_sort_on_the_day():
+    ledger = build_tds_ledger([payment(datetime(2025, 5, 3, 10), 45000, pid="C"),
+                               payment(date(2025, 5, 1), 40000, pid="A"),
+                               payment(datetime(2025, 5, 2), 20000, pid="B")])
+    assert [c["Payment ID"] for c in ledger.checks] == ["A", "B", "C"]
+    assert rules(ledger) == [SINGLE, BELOW, AGGREGATE]
+
+
+def test_back_dated_payment_raises():
+    ledger = TDSLedger()
+    ledger.apply(payment(datetime(2025, 5, 2), 20000))
+    ledger.apply(payment(date(2025, 5, 2), 20000))          # same day is fine
+    with pytest.raises(ValueError, match="date order"):
+        ledger.apply(payment(datetime(2025, 5, 1, 23, 59), 20000))
+    assert len(ledger.checks) == 2
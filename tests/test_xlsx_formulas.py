@@ -0,0 +1,44 @@
+from xlsx_formulas import Ref, any_of, cmp, cond_count, cond_sum, eq, not_blank
+
+
+def test_plain_criteria_become_sumifs():
+    agg = cond_sum("LT_Pay", eq("LT_Status", "Completed"), cmp("LT_Disc", ">", 0))
+    assert agg.form == "SUMIFS"
+    assert agg.expr == 'SUMIFS(LT_Pay,LT_Status,"Completed",LT_Disc,">"&0)'
+    assert agg.sumproduct == 'SUMPRODUCT((LT_Status="Completed")*(LT_Disc>0)*(LT_Pay))'
+
+
+def test_wildcard_and_operator_text_keep_sumproduct():
+    for value in ("Deep*", "Is it?", "~x", ">5", "=x"):
+        agg = cond_count(eq("LT_Service", value))
+        assert agg.form == "SUMPRODUCT" and agg.expr == agg.sumproduct
+    assert cond_count(eq("LT_Service", "Deep*")).expr == 'SUMPRODUCT((LT_Service="Deep*"))'
+
+
+def test_cell_criteria_need_their_text():
+    assert cond_count(eq("LT_Service", Ref("A5", "Deep Cleaning"))).expr == "COUNTIFS(LT_Service,A5)"
+    assert cond_count(eq("LT_Service", Ref("A5"))).form == "SUMPRODUCT"
+    assert cond_count(eq("LT_Service", Ref("A6", "Other*"))).form == "SUMPRODUCT"
+
+
+def test_blank_criteria():
+    assert cond_sum("LT_Pay", not_blank("LT_Ts")).expr == 'SUMIFS(LT_Pay,LT_Ts,"<>")'
+    assert cond_count(eq("LT_Status", "")).expr == 'COUNTIFS(LT_Status,"")'
+
+
+def test_or_criteria_expand_into_disjoint_terms():
+    agg = cond_sum("LT_Pay", any_of("LT_Mode", ["Debit Card", "Payment Gateway"]), eq("LT_PS", "Received"))
+    assert agg.expr == ('SUMIFS(LT_Pay,LT_Mode,"Debit Card",LT_PS,"Received")'
+                        '+SUMIFS(LT_Pay,LT_Mode,"Payment Gateway",LT_PS,"Received")')
+    assert agg.sumproduct == ('SUMPRODUCT(((LT_Mode="Debit Card")+(LT_Mode="Payment Gateway"))'
+                              '*(LT_PS="Received")*(LT_Pay))')
+
+
+def test_int_day_criteria_become_half_open_ranges():
+    agg = cond_count(cmp("LT_Ts", ">=", Ref("B5"), fn="INT"), cmp("LT_Ts", "<=", Ref("D5"), fn="INT"))
+    assert agg.expr == 'COUNTIFS(LT_Ts,">="&INT(B5),LT_Ts,"<"&INT(D5)+1)'
+    assert agg.sumproduct == "SUMPRODUCT((INT(LT_Ts)>=B5)*(INT(LT_Ts)<=D5))"
+    assert cond_count(cmp("LT_Ts", "=", 45000.6, fn="INT")).expr == 'COUNTIFS(LT_Ts,">="&45000,LT_Ts,"<"&45001)'
+    assert cond_count(cmp("LT_Ts", ">", 45000, fn="INT")).expr == 'COUNTIFS(LT_Ts,">="&45001)'
+    assert cond_count(cmp("LT_Ts", "<>", 45000, fn="INT")).form == "SUMPRODUCT"
+    assert cond_count(cmp("LT_Ts", ">=", Ref("B5"), fn="MONTH")).form == "SUMPRODUCT"
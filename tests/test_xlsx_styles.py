@@ -0,0 +1,29 @@
+from openpyxl import Workbook
+from openpyxl.styles import Alignment, Font, PatternFill
+
+from xlsx_styles import StyleRegistry
+
+BOLD = Font(bold=True)
+FILL = PatternFill("solid", fgColor="FFCCCC")
+
+
+def test_update_sets_only_the_given_attributes():
+    wb = Workbook()
+    styles = StyleRegistry(wb)
+    cell = wb.active["A1"]
+    cell.alignment = Alignment(horizontal="center")
+    cell.number_format = "0.00"
+    styles.update(cell, font=BOLD, fill=FILL)
+    assert cell.font.b and cell.fill.fgColor.rgb == "00FFCCCC"
+    assert cell.alignment.horizontal == "center" and cell.number_format == "0.00"
+
+
+def test_ad_hoc_combinations_are_not_named_styles():
+    wb = Workbook()
+    styles = StyleRegistry(wb)
+    styles.add("LT Data", font=BOLD)
+    for row in range(1, 50):
+        styles.update(wb.active.cell(row=row, column=1), font=Font(size=row % 3 + 10), number_format="₹#,##0")
+    assert wb.named_styles == ["Normal", "LT Data"]
+    assert len(styles._arrays) == 3
+    assert wb.active["A2"].font.sz == 12 and wb.active["A2"].number_format == "₹#,##0"
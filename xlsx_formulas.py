@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Formula generation layer for the dashboard sheets.
+
+Conditional aggregates are described once (a sum range plus criteria) and
+emitted as SUMIFS/COUNTIFS whenever that is equivalent to the SUMPRODUCT
+boolean-array form, which Excel and Google Sheets recalculate far more slowly.
+INT() applied to the criteria range - the day of a timestamp - is no
+obstacle: compared with a whole day it is a half-open range on the raw values,
+
+  INT(ts) >= From   ->  ts >= INT(From)
+  INT(ts) <= To     ->  ts <  INT(To)+1
+
+SUMPRODUCT is kept only where SUMIFS cannot express a criterion:
+
+  - any other function applied to the criteria range, or INT() with "<>" or
+    several OR values
+  - a criterion text that SUMIFS would read as a wildcard (* ? ~) or operator
+
+FormulaLog writes the cells and records which form each one was given.
+"""
+
+from itertools import product
+
+SUMIFS_OPS = ("=", "<>", ">", ">=", "<", "<=")
+
+
+class Ref:
+    """Criterion value taken from a cell, e.g. the row label of a breakdown table."""
+
+    def __init__(self, coord, text=None):
+        self.coord = coord
+        self.text = text      # the label the cell holds, to check it is wildcard-free
+
+
+class Criterion:
+    def __init__(self, rng, op, values, fn=None):
+        self.rng = rng
+        self.op = op
+        self.values = values  # several values = OR over the same range
+        self.fn = fn          # function applied to the range, e.g. "INT"
+
+
+def eq(rng, value):
+    return Criterion(rng, "=", [value])
+
+
+def any_of(rng, values):
+    return Criterion(rng, "=", list(values))
+
+
+def not_blank(rng):
+    # Only used on summed ranges and input columns: SUMIFS "<>" also matches
+    # formula cells returning "", which add nothing to a sum.
+    return Criterion(rng, "<>", [""])
+
+
+def cmp(rng, op, value, fn=None):
+    return Criterion(rng, op, [value], fn)
+
+
+# ── Rendering ────────────────────────────────────────────────────────────────
+def _literal(value):
+    if isinstance(value, str):
+        return '"' + value.replace('"', '""') + '"'
+    return str(value)
+
+
+def _operand(value):
+    return value.coord if isinstance(value, Ref) else _literal(value)
+
+
+def _text_of(value):
+    return value.text if isinstance(value, Ref) else value
+
+
+def _sumifs_safe(criterion):
+    if criterion.fn is not None or criterion.op not in SUMIFS_OPS:
+        return False
+    if criterion.op != "=":
+        return True
+    for value in criterion.values:
+        # An equality criterion is matched as a pattern: its text must be known
+        # and free of wildcards and leading comparison operators.
+        text = _text_of(value)
+        if text is None:
+            return False
+        if isinstance(text, str) and (any(ch in text for ch in "*?~") or text[:1] in ("<", ">", "=")):
+            return False
+    return True
+
+
+def _sumifs_criterion(op, value):
+    if op == "=":
+        return _operand(value)
+    if value == "":
+        return f'"{op}"'
+    return f'"{op}"&{_operand(value)}'
+
+
+# INT(range) <op> day  ->  criteria on the raw range (day and the day after it)
+DAY_BOUNDS = {">=": ((">=", 0),), ">": ((">=", 1),), "<=": (("<", 1),), "<": (("<", 0),),
+              "=": ((">=", 0), ("<", 1))}
+
+
+def _day_operand(value, offset):
+    if isinstance(value, Ref):
+        return Ref(f"INT({value.coord})" + (f"+{offset}" if offset else ""))
+    return int(value // 1) + offset
+
+
+def _plain_criteria(criteria):
+    """`criteria` with INT() day comparisons rewritten on the raw range; None if one cannot be."""
+    plain = []
+    for criterion in criteria:
+        if criterion.fn is None:
+            plain.append(criterion)
+            continue
+        value = criterion.values[0]
+        if (criterion.fn != "INT" or len(criterion.values) != 1 or criterion.op not in DAY_BOUNDS
+                or not isinstance(value, (Ref, int, float)) or isinstance(value, bool)):
+            return None
+        plain += [Criterion(criterion.rng, op, [_day_operand(value, offset)])
+                  for op, offset in DAY_BOUNDS[criterion.op]]
+    return plain
+
+
+def _sumproduct_factor(criterion):
+    rng = f"{criterion.fn}({criterion.rng})" if criterion.fn else criterion.rng
+    terms = [f"({rng}{criterion.op}{_operand(v)})" for v in criterion.values]
+    if len(terms) == 1:
+        return terms[0]
+    return "(" + "+".join(terms) + ")"
+
+
+class Aggregate:
+    """
+    One conditional SUM or COUNT.
+
+      .expr        formula text without the leading "=" (SUMIFS/COUNTIFS when possible)
+      .form        "SUMIFS", "COUNTIFS" or "SUMPRODUCT"
+      .sumproduct  the boolean-array equivalent, for the rewrite report
+    """
+
+    def __init__(self, sum_range, criteria):
+        self.sum_range = sum_range
+        self.criteria = criteria
+        factors = [_sumproduct_factor(c) for c in criteria]
+        if sum_range is not None:
+            factors.append(f"({sum_range})")
+        self.sumproduct = f"SUMPRODUCT({'*'.join(factors)})"
+
+        plain = _plain_criteria(criteria)
+        if plain is not None and all(_sumifs_safe(c) for c in plain):
+            self.form = "SUMIFS" if sum_range is not None else "COUNTIFS"
+            self.expr = "+".join(self._ifs_terms(plain))
+        else:
+            self.form = "SUMPRODUCT"
+            self.expr = self.sumproduct
+
+    def _ifs_terms(self, criteria):
+        # OR criteria expand into one SUMIFS per combination; the combinations
+        # are disjoint because each one fixes a different value of a range.
+        options = [[(c.rng, c.op, v) for v in c.values] for c in criteria]
+        for combo in product(*options):
+            args = [self.sum_range] if self.sum_range is not None else []
+            for rng, op, value in combo:
+                args += [rng, _sumifs_criterion(op, value)]
+            yield f"{self.form}({','.join(args)})"
+
+
+def cond_sum(sum_range, *criteria):
+    return Aggregate(sum_range, list(criteria))
+
+
+def cond_count(*criteria):
+    return Aggregate(None, list(criteria))
+
+
+class FormulaLog:
+    """Writes aggregate formulas into cells and keeps the rewrite report."""
+
+    def __init__(self):
+        self.entries = []   # (sheet title, coord, form, formula, sumproduct equivalent)
+
+    def put(self, ws, coord, aggregates, template=None):
+        """
+        Set ws[coord] to the aggregates, summed (default) or formatted into
+        `template` ({0}, {1}, ... = aggregate expressions, leading "=" included).
+        Returns the cell.
+        """
+        if isinstance(aggregates, Aggregate):
+            aggregates = [aggregates]
+        exprs = [a.expr for a in aggregates]
+        legacy = [a.sumproduct for a in aggregates]
+        if template is None:
+            template = "=" + "+".join("{%d}" % i for i in range(len(aggregates)))
+        cell = ws[coord]
+        cell.value = template.format(*exprs)
+        forms = sorted({a.form for a in aggregates})
+        self.entries.append((ws.title, coord, "+".join(forms), cell.value, template.format(*legacy)))
+        return cell
+
+    def rewritten(self):
+        return [e for e in self.entries if "SUMPRODUCT" not in e[2]]
+
+    def kept(self):
+        return [e for e in self.entries if "SUMPRODUCT" in e[2]]
+
+    def summary(self):
+        return (f"{len(self.rewritten())} cells rewritten to SUMIFS/COUNTIFS, "
+                f"{len(self.kept())} kept SUMPRODUCT")
+
+    def report(self):
+        lines = []
+        for title, coord, form, formula, _ in self.entries:
+            lines.append(f"  {title}!{coord:<6} {form:<10} {formula}")
+        return "\n".join(lines)
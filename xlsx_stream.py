@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Streaming helpers for the workbook generators.
+
+openpyxl's write-only workbook keeps memory flat by flushing each row to disk
+as soon as it is appended, but it cannot be edited in random order.  The
+generators therefore lay out their small sheets (guides, dashboards) in an
+ordinary workbook and replay them here into a write-only workbook, chaining
+the large data sheets on as row generators.
+"""
+
+from copy import copy
+
+from openpyxl.cell import WriteOnlyCell
+
+
+def styled_cell(ws, value, style):
+    """Write-only cell that shares a pre-built StyleArray (never mutated)."""
+    cell = WriteOnlyCell(ws, value)
+    cell._style = style
+    return cell
+
+
+def style_template(ws, font=None, fill=None, alignment=None, border=None, number_format=None,
+                   named_style=None):
+    """Register a style combination once and return its StyleArray for styled_cell()."""
+    cell = WriteOnlyCell(ws)
+    if named_style:
+        cell.style = named_style
+    if font:
+        cell.font = font
+    if fill:
+        cell.fill = fill
+    if alignment:
+        cell.alignment = alignment
+    if border:
+        cell.border = border
+    if number_format:
+        cell.number_format = number_format
+    return cell._style
+
+
+class _StyleTranslator:
+    """Maps StyleArrays of the layout workbook onto the write-only workbook."""
+
+    def __init__(self, dst):
+        self.dst = dst
+        self.cache = {}
+        # Named styles must already be registered in the destination workbook
+        # (see StyleRegistry.rebind) to be carried over.
+        self.named_styles = set(dst.parent.named_styles)
+
+    def __call__(self, src_cell):
+        key = tuple(src_cell._style)
+        style = self.cache.get(key)
+        if style is None:
+            named_style = src_cell.style
+            if named_style not in self.named_styles:
+                named_style = None
+            style = style_template(
+                self.dst,
+                named_style=named_style,
+                font=copy(src_cell.font),
+                fill=copy(src_cell.fill),
+                alignment=copy(src_cell.alignment),
+                border=copy(src_cell.border),
+                number_format=src_cell.number_format,
+            )
+            self.cache[key] = style
+        return style
+
+
+def stream_copy_sheet(src, dst, extra_rows=None):
+    """
+    Replay a laid-out worksheet `src` into the write-only worksheet `dst`.
+
+    Sheet-level settings (widths, column styles, heights, panes, merges, validations,
+    conditional formats, filters, charts) are copied first because the
+    write-only writer emits them before the first row.  `extra_rows`, if
+    given, is an iterable of row lists appended after the last row of `src`.
+    """
+    translate = _StyleTranslator(dst)
+    dst.sheet_properties = copy(src.sheet_properties)
+    for key, dim in src.column_dimensions.items():
+        dst.column_dimensions[key].width = dim.width
+        dst.column_dimensions[key].hidden = dim.hidden
+        if dim.has_style:
+            dst.column_dimensions[key]._style = translate(dim)
+    for idx, dim in src.row_dimensions.items():
+        if dim.height is not None:
+            dst.row_dimensions[idx].height = dim.height
+    dst.freeze_panes = src.freeze_panes
+    for rng in src.merged_cells.ranges:
+        dst.merged_cells.add(rng.coord)
+    dst.conditional_formatting = src.conditional_formatting
+    dst.data_validations = src.data_validations
+    dst.auto_filter = src.auto_filter
+    for chart in src._charts:
+        dst.add_chart(chart)
+
+    for row in src.iter_rows(min_row=1, max_row=src.max_row):
+        out = []
+        for cell in row:
+            value = getattr(cell, "value", None)
+            if cell.has_style:
+                out.append(styled_cell(dst, value, translate(cell)))
+            else:
+                out.append(value)
+        dst.append(out)
+
+    if extra_rows is not None:
+        for row in extra_rows:
+            dst.append(row)
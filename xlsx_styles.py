@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Shared style registry for the workbook generators.
+
+The semantic styles of a sheet (header, data, currency columns ...) are
+NamedStyles, assigned to cells by name.  Ad-hoc font/fill/alignment/border/
+number-format combinations are interned as cell-level StyleArrays instead,
+so they do not show up in Excel's Cell Styles gallery; either way each
+combination is hashed and registered with the workbook once, not per cell.
+"""
+
+from copy import copy
+
+from openpyxl.styles import NamedStyle
+from openpyxl.styles.cell_style import StyleArray
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.styles.numbers import BUILTIN_FORMATS_REVERSE
+
+# StyleArray field of each cell style attribute
+STYLE_IDS = (("font", "fontId"), ("fill", "fillId"), ("alignment", "alignmentId"), ("border", "borderId"),
+             ("number_format", "numFmtId"))
+
+
+class StyleRegistry:
+    """
+    Named styles of one workbook, addressed by key.
+
+      styles = StyleRegistry(wb)
+      styles.add("LT Header", font=..., fill=..., alignment=..., border=...)
+      styles.apply(cell, "LT Header")
+      styles.update(cell, font=..., fill=...)   # ad-hoc: sets only the attributes given
+    """
+
+    def __init__(self, wb):
+        self.wb = wb
+        self._defs = {}     # name -> dict of style attributes
+        self._named = {}    # name -> NamedStyle bound to self.wb
+        self._arrays = {}   # (font, fill, alignment, border, number_format) -> StyleArray
+
+    def add(self, name, font=None, fill=None, alignment=None, border=None, number_format=None):
+        """Register a named style (once) and return its key."""
+        if name in self._named:
+            return name
+        attrs = dict(font=font, fill=fill, alignment=alignment, border=border,
+                     number_format=number_format)
+        # Unset attributes keep the workbook defaults, as on an unstyled cell
+        style = NamedStyle(name=name, font=copy(DEFAULT_FONT))
+        for attr, value in attrs.items():
+            if value is not None:
+                setattr(style, attr, copy(value))
+        self.wb.add_named_style(style)
+        self._defs[name] = attrs
+        self._named[name] = style
+        return name
+
+    def cell_style(self, font=None, fill=None, alignment=None, border=None, number_format=None):
+        """Interned cell-level StyleArray of an ad-hoc combination (unset attributes at their defaults)."""
+        combo = (font, fill, alignment, border, number_format)
+        style = self._arrays.get(combo)
+        if style is None:
+            style = StyleArray()
+            wb = self.wb
+            collections = dict(font=wb._fonts, fill=wb._fills, alignment=wb._alignments, border=wb._borders)
+            for (attr, field), value in zip(STYLE_IDS, combo):
+                if value is None:
+                    continue
+                if attr == "number_format":
+                    # Built-in formats by their fixed id, custom ones from 164 (as openpyxl does)
+                    value = (BUILTIN_FORMATS_REVERSE[value] if value in BUILTIN_FORMATS_REVERSE
+                             else wb._number_formats.add(value) + 164)
+                else:
+                    value = collections[attr].add(value)
+                setattr(style, field, value)
+            self._arrays[combo] = style
+        return style
+
+    def update(self, cell, font=None, fill=None, alignment=None, border=None, number_format=None):
+        """Set the given style attributes of `cell`; the others keep their current values."""
+        attrs = dict(font=font, fill=fill, alignment=alignment, border=border, number_format=number_format)
+        style = self.cell_style(**attrs)
+        if not cell.has_style:
+            cell._style = copy(style)
+            return
+        current = copy(cell._style)
+        for attr, field in STYLE_IDS:
+            if attrs[attr] is not None:
+                setattr(current, field, getattr(style, field))
+        cell._style = current
+
+    def style_array(self, name):
+        """StyleArray of a registered named style, for write-only cells."""
+        return self._named[name]._style
+
+    def apply(self, cell, name):
+        cell._style = copy(self._named[name]._style)
+
+    def rebind(self, wb):
+        """Copy every registered style into another workbook (e.g. a write-only one)."""
+        other = StyleRegistry(wb)
+        for name, attrs in self._defs.items():
+            other.add(name, **attrs)
+        return other